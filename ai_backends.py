@@ -0,0 +1,506 @@
+# ai_backends.py
+"""
+Where generated text comes from.
+
+A Backend streams the continuation of a prompt and generates batches of
+prompts. AIModel loads one lazily and the generation worker calls it, so
+nothing above this module knows whether the model runs in this process or
+on another machine.
+
+TransformersBackend runs a local transformers pipeline. HTTPBackend talks
+to an OpenAI-compatible completions server, such as a shared inference box.
+It keeps a small pool of keep-alive connections, caps how many requests are
+in flight, retries overloaded or dropped requests with exponential backoff,
+and sends a batch as a few multi-prompt requests in parallel. MockServer is
+a stand-in for such a server, for tests and for trying the HTTP path without
+one: `python ai_backends.py --mock 8765`.
+
+A stream can carry a `prefix` that many requests share, such as a
+character's persona. TransformersBackend encodes each prefix once and keeps
+its key/value state in a PrefixCache, so later requests only run the model
+over their own tokens. Servers do their own prefix caching, so HTTPBackend
+just sends prefix and prompt together.
+
+`load_backend` picks the backend from the environment. When AGENCY_AI_URL
+is set, the HTTP backend is used, with the API key from AGENCY_AI_KEY. Keys
+are never written to case files. AGENCY_AI_MODEL names the model either way
+(see ai_model.MODEL_NAME).
+
+The local model runs on the CPU in full precision unless
+AGENCY_AI_PRECISION=int8 is set: `quantize_int8` then converts its linear
+layers to dynamically quantized ones, which should take about half the
+resident memory and run faster on laptop CPUs. It stays opt-in until
+bench_ai.py results are recorded. AGENCY_AI_THREADS sets torch's intra-op
+threads. The backend runs one short generation before it reports ready,
+so the first request does not pay for lazy initialization. bench_ai.py
+compares the two precisions.
+
+The local model runs in a worker process (ai_workers.ProcessBackend), not
+in the editor's. AGENCY_AI_WORKERS sets how many workers to run, and 0 loads
+the model in-process. AGENCY_AI_MEMORY_MB caps each worker's resident
+memory.
+"""
+import copy
+import http.client
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+URL_ENV = "AGENCY_AI_URL"
+MODEL_ENV = "AGENCY_AI_MODEL"
+KEY_ENV = "AGENCY_AI_KEY"
+PRECISION_ENV = "AGENCY_AI_PRECISION"
+THREADS_ENV = "AGENCY_AI_THREADS"
+WORKERS_ENV = "AGENCY_AI_WORKERS"
+MEMORY_ENV = "AGENCY_AI_MEMORY_MB"
+
+FP32 = "fp32"
+INT8 = "int8"
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_CONNECTIONS = 4  # Requests in flight to a completions server at once.
+PREFIX_CACHE_SIZE = 8  # Personas kept encoded; a suspect's interview reuses one.
+
+
+class Backend:
+    """A text generator. Subclasses implement `stream`; batches default to one prompt at a time."""
+
+    def stream(self, prompt: str, max_new_tokens: int, should_stop: Callable[[], bool] = lambda: False, seed: Optional[int] = None, prefix: str = "") -> Iterator[str]:
+        """Yields the continuation of `prefix + prompt`. Backends may reuse work across requests with the same prefix."""
+        raise NotImplementedError
+
+    def generate_batch(self, prompts: List[str], max_new_tokens: int, should_stop: Callable[[], bool] = lambda: False, seed: Optional[int] = None) -> List[str]:
+        return ["".join(self.stream(prompt, max_new_tokens, should_stop, seed)) for prompt in prompts]
+
+    def bytes_per_token(self) -> int:
+        """Local memory one sequence position takes during generation; 0 when the work happens elsewhere."""
+        return 0
+
+
+class PrefixCache:
+    """The encoded state of recently used prompt prefixes, least recently used evicted first."""
+
+    def __init__(self, encode: Callable[[str], Any], size: int = PREFIX_CACHE_SIZE):
+        self.encode = encode
+        self.size = size
+        self.encodings = 0
+        self._states: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, prefix: str) -> Any:
+        """A copy of the state after `prefix`; generation extends it in place."""
+        state = self._states.get(prefix)
+        if state is None:
+            state = self._states[prefix] = self.encode(prefix)
+            self.encodings += 1
+            if len(self._states) > self.size:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(prefix)
+        return copy.deepcopy(state)
+
+
+class TransformersBackend(Backend):
+    DEFAULT_BYTES_PER_TOKEN = 300_000  # Roughly GPT-2 small: float32 key/value cache plus a row of logits.
+
+    def __init__(self, generator: Any):
+        """`generator` is a transformers text-generation pipeline."""
+        self.generator = generator
+        self.model, self.tokenizer = generator.model, generator.tokenizer
+        self.prefixes = PrefixCache(self._encode_prefix)
+
+    def stream(self, prompt, max_new_tokens, should_stop=lambda: False, seed=None, prefix=""):
+        import torch
+        from transformers import TextIteratorStreamer, set_seed
+
+        if seed is not None:
+            set_seed(seed)
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        input_ids = self.tokenizer(prompt, return_tensors="pt")["input_ids"]
+        cached = {}
+        if prefix:
+            # Tokenized apart, so the cached state covers exactly the leading ids.
+            prefix_ids, cached["past_key_values"] = self.prefixes.get(prefix)
+            input_ids = torch.cat([prefix_ids, input_ids], dim=1)
+        thread = threading.Thread(
+            target=self.model.generate,
+            kwargs=dict(
+                input_ids=input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                **cached,
+                streamer=streamer,
+                max_new_tokens=max_new_tokens,
+                do_sample=True,
+                pad_token_id=self.tokenizer.eos_token_id,
+                stopping_criteria=self._stopping(should_stop),
+            ),
+            daemon=True,
+        )
+        thread.start()
+        yield from streamer
+        thread.join()
+
+    def generate_batch(self, prompts, max_new_tokens, should_stop=lambda: False, seed=None):
+        """Generates every prompt in one batch, padded on the left so each continues from its own last token."""
+        from transformers import set_seed
+
+        if seed is not None:
+            set_seed(seed)
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True)
+        output = self.model.generate(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            do_sample=True,
+            pad_token_id=self.tokenizer.pad_token_id,
+            stopping_criteria=self._stopping(should_stop),
+        )
+        return self.tokenizer.batch_decode(output[:, inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+
+    def bytes_per_token(self) -> int:
+        config = getattr(self.model, "config", None)
+        if config is None:
+            return self.DEFAULT_BYTES_PER_TOKEN
+        layers, width, vocabulary = getattr(config, "n_layer", 12), getattr(config, "n_embd", 768), getattr(config, "vocab_size", 50257)
+        return 4 * (2 * layers * width + vocabulary)
+
+    def warm_up(self, tokens: int = 4):
+        """One short generation, so kernels and buffers are set up before the first real request."""
+        "".join(self.stream("The detective", tokens))
+
+    def _encode_prefix(self, prefix: str):
+        import torch
+
+        prefix_ids = self.tokenizer(prefix, return_tensors="pt")["input_ids"]
+        with torch.no_grad():
+            state = self.model(prefix_ids, use_cache=True).past_key_values
+        return prefix_ids, state
+
+    @staticmethod
+    def _stopping(should_stop: Callable[[], bool]):
+        from transformers import StoppingCriteria, StoppingCriteriaList
+
+        class Stop(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return should_stop()
+
+        return StoppingCriteriaList([Stop()])
+
+
+class HTTPBackend(Backend):
+    def __init__(self, base_url: str, model: str, api_key: Optional[str] = None, max_connections: int = HTTP_CONNECTIONS,
+                 batch_items: int = 8, retries: int = 3, backoff: float = 0.5, timeout: float = 60):
+        """
+        `base_url` is the server's API root, e.g. "http://inference:8000/v1".
+        At most `max_connections` requests are in flight at once, and a batch
+        request carries at most `batch_items` prompts.
+        """
+        parts = urlsplit(base_url)
+        self.base_url = base_url
+        self.model = model
+        self.api_key = api_key
+        self.batch_items = batch_items
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._scheme, self._host, self._path = parts.scheme, parts.netloc, parts.path.rstrip("/")
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._pool = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="ai-http")
+
+    def stream(self, prompt, max_new_tokens, should_stop=lambda: False, seed=None, prefix=""):
+        with self._post(self._payload(prefix + prompt, max_new_tokens, seed, stream=True)) as response:
+            # Server-sent events: one "data: {json}" line per chunk, then "data: [DONE]".
+            for line in response:
+                line = line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    response.read()  # The end of the chunked body, so the connection can be reused.
+                    break
+                yield json.loads(data)["choices"][0].get("text", "")
+                if should_stop():
+                    return
+
+    def generate_batch(self, prompts, max_new_tokens, should_stop=lambda: False, seed=None):
+        groups = [prompts[start:start + self.batch_items] for start in range(0, len(prompts), self.batch_items)]
+
+        def send(group: List[str]) -> List[str]:
+            if should_stop():
+                return [""] * len(group)
+            with self._post(self._payload(group, max_new_tokens, seed)) as response:
+                choices = json.loads(response.read())["choices"]
+            texts = [""] * len(group)
+            for choice in choices:
+                texts[choice.get("index", 0)] = choice.get("text", "")
+            return texts
+
+        return [text for texts in self._pool.map(send, groups) for text in texts]
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _payload(self, prompt: Any, max_new_tokens: int, seed: Optional[int], stream: bool = False) -> Dict[str, Any]:
+        payload = {"model": self.model, "prompt": prompt, "max_tokens": max_new_tokens, "stream": stream}
+        if seed is not None:
+            payload["seed"] = seed
+        return payload
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _checkout(self) -> http.client.HTTPConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        connection_type = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        return connection_type(self._host, timeout=self.timeout)
+
+    def _checkin(self, connection: http.client.HTTPConnection):
+        with self._lock:
+            self._idle.append(connection)
+
+    @contextmanager
+    def _post(self, payload: Dict[str, Any]):
+        """
+        POSTs to the completions endpoint and yields the 200 response,
+        retrying dropped connections and overloaded servers. The connection
+        goes back to the pool only if the body was read to the end.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        error = ""
+        with self._slots:
+            for attempt in range(self.retries + 1):
+                connection = self._checkout()
+                delay = self.backoff * 2 ** attempt
+                try:
+                    connection.request("POST", f"{self._path}/completions", body, self._headers())
+                    response = connection.getresponse()
+                except (OSError, http.client.HTTPException) as exc:
+                    # Also what a keep-alive connection the server has since closed looks like.
+                    connection.close()
+                    error = f"{type(exc).__name__}: {exc}"
+                else:
+                    if response.status == 200:
+                        break
+                    error = f"HTTP {response.status}: {response.read()[:200].decode('utf-8', 'replace')}"
+                    self._checkin(connection)
+                    if response.status not in RETRY_STATUSES:
+                        raise RuntimeError(f"{self.base_url}: {error}")
+                    delay = max(delay, float(response.getheader("Retry-After") or 0))
+                if attempt < self.retries:
+                    time.sleep(delay)
+            else:
+                raise RuntimeError(f"{self.base_url}: {error} (after {self.retries + 1} attempts)")
+            try:
+                yield response
+            except BaseException:
+                connection.close()
+                raise
+            if response.isclosed():
+                self._checkin(connection)
+            else:
+                connection.close()
+
+
+def quantize_int8(model: Any) -> Any:
+    """
+    Dynamically quantizes the linear layers of a causal language model to
+    int8 for CPU inference. GPT-2 builds its attention and MLP projections
+    from transformers' Conv1D, which torch does not quantize, so those are
+    first rewritten as the equivalent nn.Linear.
+    """
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, Conv1D):
+                linear = torch.nn.Linear(child.weight.shape[0], child.weight.shape[1])
+                # Conv1D stores its weight as (in, out); Linear as (out, in).
+                linear.weight = torch.nn.Parameter(child.weight.detach().t().contiguous())
+                linear.bias = torch.nn.Parameter(child.bias.detach().clone())
+                setattr(parent, name, linear)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_transformers(model_name: str, seed: int, precision: str = FP32, threads: Optional[int] = None) -> TransformersBackend:
+    """A warmed-up local pipeline on the CPU in `precision`, using `threads` intra-op threads if given."""
+    import torch
+    from transformers import pipeline, set_seed
+
+    if threads:
+        torch.set_num_threads(threads)
+    generator = pipeline("text-generation", model=model_name, device="cpu")
+    generator.model.eval()
+    if precision == INT8:
+        generator.model = quantize_int8(generator.model)
+    elif precision != FP32:
+        raise ValueError(f"Unknown precision {precision!r}; use {INT8!r} or {FP32!r}.")
+    set_seed(seed)
+    backend = TransformersBackend(generator)
+    backend.warm_up()
+    return backend
+
+
+def local_backend(model_name: str, seed: int) -> TransformersBackend:
+    """The local pipeline as the environment configures it."""
+    threads = os.environ.get(THREADS_ENV)
+    return load_transformers(model_name, seed, os.environ.get(PRECISION_ENV, FP32), int(threads) if threads else None)
+
+
+def worker_count() -> int:
+    """How many worker processes run the local model; 0 runs it in this process."""
+    return int(os.environ.get(WORKERS_ENV, 1))
+
+
+def concurrency() -> int:
+    """
+    How many generations the configured backend serves at once, so the
+    generation queue runs that many threads: the HTTP backend's connections,
+    or one per local worker process. Read from the environment, since the
+    queue starts before the backend has loaded.
+    """
+    if os.environ.get(URL_ENV):
+        return HTTP_CONNECTIONS
+    return max(1, worker_count())
+
+
+def backend_identity() -> str:
+    """
+    What, besides the model name, decides the configured backend's output:
+    the server behind AGENCY_AI_URL, or the local model's precision. Part of
+    every generation cache key, so an int8 text is never served to an fp32
+    setup or one server's text to another. Read from the environment, since
+    the cache is consulted before the backend has loaded.
+    """
+    return os.environ.get(URL_ENV) or os.environ.get(PRECISION_ENV, FP32)
+
+
+def load_backend(model_name: str, seed: int) -> Backend:
+    """
+    The HTTP backend when AGENCY_AI_URL is set, otherwise a local
+    transformers pipeline in AGENCY_AI_WORKERS worker processes.
+    """
+    url = os.environ.get(URL_ENV)
+    if url:
+        return HTTPBackend(url, model_name, os.environ.get(KEY_ENV))
+    workers = worker_count()
+    if not workers:
+        return local_backend(model_name, seed)
+    from ai_workers import ProcessBackend
+
+    memory_mb = os.environ.get(MEMORY_ENV)
+    return ProcessBackend(model_name, seed, workers, float(memory_mb) if memory_mb else None)
+
+
+class MockServer:
+    """
+    A local OpenAI-compatible completions server that writes canned text,
+    one word per streamed chunk. `fail_next` makes the next requests answer
+    503, and `connections` counts the TCP connections it has accepted.
+    """
+
+    WORDS = "The fog rolled in over the harbour as the bells rang for midnight".split()
+
+    def __init__(self, port: int = 0, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self.fail_next = 0
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def start(self) -> "MockServer":
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, name="ai-mock-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def complete(self, prompt: str, max_tokens: int) -> List[str]:
+        """The words the server answers `prompt` with."""
+        start = sum(map(ord, prompt)) % len(self.WORDS)
+        return [" " + self.WORDS[(start + i) % len(self.WORDS)] for i in range(max_tokens)]
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive.
+
+            def setup(self):
+                super().setup()
+                with mock._lock:
+                    mock.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with mock._lock:
+                    mock.requests += 1
+                    failing = mock.fail_next > 0
+                    mock.fail_next -= failing
+                if mock.api_key and self.headers.get("Authorization") != f"Bearer {mock.api_key}":
+                    return self._send(401, {"error": "invalid API key"})
+                if failing:
+                    return self._send(503, {"error": "overloaded"})
+                prompts = payload["prompt"] if isinstance(payload["prompt"], list) else [payload["prompt"]]
+                max_tokens = payload.get("max_tokens", 16)
+                if not payload.get("stream"):
+                    choices = [{"index": i, "text": "".join(mock.complete(p, max_tokens))} for i, p in enumerate(prompts)]
+                    return self._send(200, {"object": "text_completion", "model": payload.get("model"), "choices": choices})
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                events = [{"choices": [{"index": 0, "text": word}]} for word in mock.complete(prompts[0], max_tokens)]
+                for event in [json.dumps(event) for event in events] + ["[DONE]"]:
+                    self._chunk(f"data: {event}\n\n".encode("utf-8"))
+                self._chunk(b"")
+
+            def _send(self, status: int, body: Dict[str, Any]):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) == 3 and sys.argv[1] == "--mock":
+        mock = MockServer(int(sys.argv[2]))
+        print(f"Mock completions server at {mock.url}")
+        mock.server.serve_forever()
+    else:
+        print("usage: python ai_backends.py --mock PORT")
@@ -0,0 +1,58 @@
+# ai_button.py
+import flet as ft
+from typing import Any, Callable, Optional
+
+from ai_generation import GenerationJob
+from my_control import Control
+
+
+class AIButton:
+    """
+    The STARS button next to a text field that fills it with generated text.
+
+    Generation runs on the control's GenerationQueue; the text streams into
+    `field` as it is produced, and the button turns into a stop button that
+    cancels the job until it finishes. The asset is looked up through
+    `get_asset` on every click, so a form that is rebound to another asset
+    keeps working, and progress for an asset that is no longer shown only
+    updates the model, not the field.
+    """
+
+    def __init__(self, control: Control, field: ft.TextField, get_asset: Callable[[], Optional[Any]], field_name: str):
+        self.control = control
+        self.field = field
+        self.get_asset = get_asset
+        self.field_name = field_name
+        self.view = ft.IconButton(icon=ft.Icons.STARS, tooltip="Generate with AI", on_click=self._on_click)
+
+    def sync(self):
+        """Shows whether the field of the current asset is being generated. Call after rebinding."""
+        asset = self.get_asset()
+        running = asset is not None and self.control.generation_queue.find(asset, self.field_name) is not None
+        self.view.icon = ft.Icons.STOP_CIRCLE if running else ft.Icons.STARS
+        self.view.tooltip = "Stop generating" if running else "Generate with AI"
+
+    def _on_click(self, e):
+        asset = self.get_asset()
+        if asset is None:
+            return
+        job = self.control.generation_queue.find(asset, self.field_name)
+        if job:
+            job.cancel()
+            return
+        self.control.generate_with_ai(asset, self.field_name, on_progress=self._on_progress, on_done=self._on_done)
+        self.sync()
+        self.view.update()
+
+    def _on_progress(self, job: GenerationJob):
+        if self.get_asset() is job.asset:
+            self.field.value = job.text.strip()
+            self.field.update()
+
+    def _on_done(self, job: GenerationJob):
+        if self.get_asset() is not job.asset:
+            return
+        # Finished text has been written to the asset; a cancelled or failed job left it untouched.
+        self.field.value = getattr(job.asset, self.field_name, None) or ""
+        self.sync()
+        self.control.page.update()
@@ -0,0 +1,210 @@
+# ai_generation.py
+"""
+Text generation off the UI thread.
+
+GenerationQueue owns worker threads, one by default or one per model
+worker process, that run jobs in priority order: interactive jobs first,
+then batches, then prefetches. A job streams the model's output in chunks
+as it is produced. Watchers are told about the text so far at most every
+UPDATE_INTERVAL seconds, so the UI redraws a few times per second rather
+than once per token. A job can be cancelled while it waits or while it
+runs; a running generation stops at the next token. Prefetch jobs, which only fill the generation cache, wait until
+no job that someone is watching is left.
+
+A GenerationBatch fills many fields at once. Its prompts go through the
+model in padded batches rather than one at a time, which on a CPU is several
+times the throughput; `batch_size` picks how many sequences fit in the free
+memory. Watchers hear about every item as its batch completes. A batch
+runs one model batch at a time and then goes back in the queue, so a STARS
+click made during a long batch waits for one model batch, not all of them.
+"""
+import itertools
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+UPDATE_INTERVAL = 0.25  # Seconds between progress callbacks.
+MAX_NEW_TOKENS = 80
+MAX_BATCH = 16
+MEMORY_SHARE = 0.5  # Share of the free memory one batch may take.
+
+INTERACTIVE, BATCH, PREFETCH = 0, 1, 2  # Job priorities, most urgent first.
+
+
+def available_memory() -> int:
+    """Free physical memory in bytes, or 1 GiB where the OS does not say."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return 1 << 30
+
+
+def batch_size(sequence_tokens: int, bytes_per_token: int, free_bytes: Optional[int] = None) -> int:
+    """How many sequences of `sequence_tokens` (prompt plus output) to generate together."""
+    free_bytes = available_memory() if free_bytes is None else free_bytes
+    fits = int(free_bytes * MEMORY_SHARE) // max(1, sequence_tokens * bytes_per_token)
+    return max(1, min(MAX_BATCH, fits))
+
+
+@dataclass
+class GenerationJob:
+    asset: Any
+    field_name: str
+    prompt: str
+    max_new_tokens: int = MAX_NEW_TOKENS
+    seed: int = 0
+    prefix: str = ""  # Shared by many jobs, e.g. a character's persona; the backend may keep it encoded.
+    prefetch: bool = False  # Only warms the generation cache; nobody is waiting for it.
+    on_progress: Optional[Callable[["GenerationJob"], None]] = None  # Called with the text so far.
+    on_done: Optional[Callable[["GenerationJob"], None]] = None  # Called once, finished, failed or cancelled.
+    text: str = ""
+    error: Optional[str] = None
+    _cancelled: threading.Event = field(default_factory=threading.Event, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def priority(self) -> int:
+        return PREFETCH if self.prefetch else INTERACTIVE
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+@dataclass
+class GenerationBatch:
+    items: List[Tuple[Any, str]]  # (asset, field name) per prompt.
+    prompts: List[str]
+    seeds: List[int]
+    max_new_tokens: int = MAX_NEW_TOKENS
+    on_item: Optional[Callable[["GenerationBatch", int], None]] = None  # Called with the index of each finished item.
+    on_done: Optional[Callable[["GenerationBatch"], None]] = None
+    texts: List[Optional[str]] = field(default_factory=list)
+    error: Optional[str] = None
+    pending: Optional[List[int]] = None  # Items still to generate, in order; None until the batch first runs.
+    priority: int = BATCH
+    _cancelled: threading.Event = field(default_factory=threading.Event, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def __post_init__(self):
+        self.texts = [None] * len(self.prompts)
+
+    @property
+    def finished(self) -> int:
+        return sum(text is not None for text in self.texts)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self):
+        """Stops after the batch that is running; items finished so far are kept."""
+        self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class GenerationQueue:
+    def __init__(self, run: Callable[[GenerationJob], Any], run_batch: Optional[Callable[[GenerationBatch], bool]] = None, workers: int = 1):
+        """
+        `run(job)` yields the generated text of a job in chunks;
+        `run_batch(batch)` fills in some texts of a batch and returns True once
+        all are done. `workers` threads run jobs side by side.
+        """
+        self.run = run
+        self.run_batch = run_batch
+        self.workers = workers
+        self._jobs: "queue.PriorityQueue" = queue.PriorityQueue()  # (priority, order, job)
+        self._order = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+        self.active: List[GenerationJob] = []  # Waiting or running, oldest first.
+
+    def add_listener(self, listener: Callable[[], None]):
+        """Calls `listener()` whenever a job is queued or finishes, from the thread that did it."""
+        self._listeners.append(listener)
+
+    def waiting(self) -> int:
+        """Jobs and batches queued or running that someone asked for; prefetches do not count."""
+        with self._lock:
+            return sum(1 for job in self.active if not getattr(job, "prefetch", False))
+
+    def submit(self, job):
+        """Queues a GenerationJob or GenerationBatch and returns it."""
+        with self._lock:
+            self.active.append(job)
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"ai-generation-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        self._jobs.put((job.priority, next(self._order), job))
+        self._notify()
+        return job
+
+    def find(self, asset: Any, field_name: str) -> Optional[GenerationJob]:
+        """The waiting or running job for a field, if any, not counting prefetches."""
+        with self._lock:
+            return next((job for job in self.active if isinstance(job, GenerationJob) and job.asset is asset and job.field_name == field_name and not job.prefetch), None)
+
+    def _work(self):
+        while True:
+            _, _, job = self._jobs.get()
+            if not job.cancelled:
+                if isinstance(job, GenerationBatch):
+                    if not self._run_batch(job):
+                        # Back in line, behind any interactive job that came in meanwhile.
+                        self._jobs.put((job.priority, next(self._order), job))
+                        continue
+                else:
+                    self._run(job)
+            with self._lock:
+                self.active.remove(job)
+            job._done.set()
+            if job.on_done:
+                job.on_done(job)
+            self._notify()
+
+    def _notify(self):
+        for listener in self._listeners:
+            listener()
+
+    def _run(self, job: GenerationJob):
+        last_update = time.monotonic()
+        try:
+            for chunk in self.run(job):
+                if job.cancelled:
+                    break
+                job.text += chunk
+                now = time.monotonic()
+                if job.on_progress and now - last_update >= UPDATE_INTERVAL:
+                    last_update = now
+                    job.on_progress(job)
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+
+    def _run_batch(self, batch: GenerationBatch) -> bool:
+        """Runs a step of the batch; True once it is finished, failed or cancelled."""
+        try:
+            return self.run_batch(batch) or batch.cancelled
+        except Exception as exc:
+            batch.error = f"{type(exc).__name__}: {exc}"
+            return True
@@ -0,0 +1,104 @@
+# ai_model.py
+"""
+The text-generation backend, loaded on demand.
+
+Importing transformers (and torch behind it) and loading GPT-2 takes several
+seconds, so nothing here happens at import time. AIModel starts loading the
+first time it is needed, or earlier through `warm_up`, which the app calls
+once the window is showing; `ai_backends.load_backend` decides whether that
+means a local pipeline or a remote server. Loading happens on a background thread, and
+`stream` waits for it, so generation jobs submitted before the model is
+ready simply start once it is. Status listeners see every transition, so
+the UI can show whether the model is idle, loading, ready or failed.
+"""
+import os
+import threading
+from typing import Callable, Iterator, List, Optional
+
+from ai_backends import MODEL_ENV, Backend, load_backend
+
+MODEL_NAME = os.environ.get(MODEL_ENV, "gpt2")
+SEED = 42
+
+IDLE = "idle"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class AIModel:
+    def __init__(self, model_name: str = MODEL_NAME, seed: int = SEED, loader: Callable[[str, int], Backend] = load_backend):
+        self.model_name = model_name
+        self.seed = seed
+        self.loader = loader
+        self.status = IDLE
+        self.error: Optional[str] = None
+        self.backend: Optional[Backend] = None
+        self._listeners: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def add_status_listener(self, listener: Callable[[str], None]):
+        self._listeners.append(listener)
+
+    def warm_up(self):
+        """Starts loading in the background unless it has already started."""
+        with self._lock:
+            if self.status not in (IDLE, FAILED):
+                return
+            self.status, self.error = LOADING, None
+            self._ready.clear()
+        self._notify()
+        threading.Thread(target=self._load, name="ai-model-load", daemon=True).start()
+
+    def wait(self, timeout: Optional[float] = None) -> Backend:
+        """Blocks until the backend is loaded and returns it. For worker threads only."""
+        self.warm_up()
+        if not self._ready.wait(timeout) or self.status != READY:
+            raise RuntimeError(self.error or "The text-generation model did not load.")
+        return self.backend
+
+    def describe(self, queued: int = 0) -> str:
+        """A short status line for the UI, with the number of `queued` generations if any."""
+        if self.status == LOADING:
+            line = "AI model loading..."
+        elif self.status == FAILED:
+            line = f"AI model unavailable ({self.error})"
+        else:
+            line = "AI model ready" if self.status == READY else "AI model not loaded"
+        return f"{line} - {queued} queued" if queued else line
+
+    def stream(self, prompt: str, max_new_tokens: int, should_stop: Callable[[], bool] = lambda: False, seed: Optional[int] = None, prefix: str = "") -> Iterator[str]:
+        """
+        Yields the continuation of `prefix + prompt` in chunks as the backend
+        produces them, waiting for it to load first. Generation stops early
+        once `should_stop()` returns True. A `seed` makes the sampled output
+        reproducible. Call from a worker thread.
+        """
+        return self.wait().stream(prompt, max_new_tokens, should_stop, seed, prefix)
+
+    def generate_batch(self, prompts: List[str], max_new_tokens: int, should_stop: Callable[[], bool] = lambda: False, seed: Optional[int] = None) -> List[str]:
+        """The continuations of several prompts, generated together. Call from a worker thread."""
+        return self.wait().generate_batch(prompts, max_new_tokens, should_stop, seed)
+
+    def bytes_per_token(self) -> int:
+        """Local memory one sequence position takes during generation, for batch sizing."""
+        return self.backend.bytes_per_token() if self.backend else 0
+
+    def _load(self):
+        try:
+            backend = self.loader(self.model_name, self.seed)
+        except Exception as exc:  # Missing packages, no network for the first download, out of memory...
+            with self._lock:
+                self.status, self.error = FAILED, f"{type(exc).__name__}: {exc}"
+            self._ready.set()
+            self._notify()
+            return
+        with self._lock:
+            self.backend, self.status = backend, READY
+        self._ready.set()
+        self._notify()
+
+    def _notify(self):
+        for listener in self._listeners:
+            listener(self.status)
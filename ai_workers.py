@@ -0,0 +1,250 @@
+# ai_workers.py
+"""
+The local model in worker processes.
+
+ProcessBackend runs the transformers model in child processes, not in the
+editor's own. When a worker runs out of memory or crashes, only that
+worker is lost. Its memory goes back to the system when it exits, and the
+model never holds the GIL that the UI thread needs.
+
+Each worker is a spawned process that loads the model once and then serves
+requests over a Pipe, one at a time. A spawned process first re-runs the
+editor's main script, which is why main.py keeps the editor itself in
+app.py: a worker imports only this module and ai_backends, never flet. Streamed text comes back chunk by
+chunk. To stop a request, the parent sets the worker's cancel Event, which
+the child's stopping criterion checks at every token, so cancelling never
+kills the model. The generation queue runs one thread per worker, and each
+thread checks out an idle worker for each request.
+
+While a worker works, the parent watches it. A worker that dies, or whose
+resident memory goes over AGENCY_AI_MEMORY_MB, is killed and replaced in
+the background. Its request fails with an error on the job instead of
+hanging. AGENCY_AI_WORKERS sets how many workers run (see
+ai_backends.worker_count).
+"""
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+from ai_backends import Backend, local_backend
+
+POLL_INTERVAL = 0.1  # Seconds between liveness and memory checks while waiting on a worker.
+
+
+class WorkerLost(RuntimeError):
+    """A worker died or went over its memory cap; a replacement is on its way."""
+
+
+def _serve(connection, cancel, loader: Callable[[str, int], Backend], model_name: str, seed: int):
+    """Worker process main loop: load the model, then answer requests until the pipe closes."""
+    try:
+        backend = loader(model_name, seed)
+    except Exception as exc:
+        connection.send(("failed", f"{type(exc).__name__}: {exc}"))
+        return
+    connection.send(("ready", backend.bytes_per_token()))
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        try:
+            if request[0] == "stream":
+                _, prompt, max_new_tokens, seed, prefix = request
+                for chunk in backend.stream(prompt, max_new_tokens, cancel.is_set, seed, prefix):
+                    connection.send(("chunk", chunk))
+                    if cancel.is_set():
+                        break
+                connection.send(("done", None))
+            else:
+                _, prompts, max_new_tokens, seed = request
+                connection.send(("done", backend.generate_batch(prompts, max_new_tokens, cancel.is_set, seed)))
+        except Exception as exc:
+            connection.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+class WorkerProcess:
+    def __init__(self, context: Any, loader: Callable[[str, int], Backend], model_name: str, seed: int):
+        self.connection, child = context.Pipe()
+        self.cancel = context.Event()
+        self.process = context.Process(target=_serve, args=(child, self.cancel, loader, model_name, seed), name="ai-worker", daemon=True)
+        self.process.start()
+        child.close()
+        self.bytes_per_token = 0
+        self.lost = False
+
+    def resident_mb(self) -> float:
+        """The worker's resident memory, or 0 where /proc is not available."""
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError, IndexError):
+            return 0.0
+
+    def receive(self, memory_mb: Optional[float], should_stop: Callable[[], bool] = lambda: False) -> Tuple[str, Any]:
+        """The worker's next message. Raises WorkerLost if it dies or outgrows `memory_mb` first."""
+        while not self.connection.poll(POLL_INTERVAL):
+            if should_stop():
+                self.cancel.set()
+            if not self.process.is_alive():
+                raise WorkerLost(f"AI worker exited with code {self.process.exitcode}")
+            if memory_mb and self.resident_mb() > memory_mb:
+                raise WorkerLost(f"AI worker went over its {memory_mb:.0f} MB memory cap")
+        try:
+            return self.connection.recv()
+        except (EOFError, OSError):
+            self.process.join(POLL_INTERVAL)  # Usually it has exited; the exit code says why.
+            raise WorkerLost(f"AI worker exited with code {self.process.exitcode}") from None
+
+    def kill(self):
+        self.lost = True
+        self.process.kill()
+        self.process.join(5)
+        self.connection.close()
+
+
+class ProcessBackend(Backend):
+    def __init__(self, model_name: str, seed: int, workers: int = 1, memory_mb: Optional[float] = None,
+                 loader: Callable[[str, int], Backend] = local_backend):
+        """
+        Starts `workers` processes that each load `loader(model_name, seed)`,
+        and waits until all are ready. `loader` runs in the child, so it must
+        be importable there: a module-level function.
+        """
+        self.model_name = model_name
+        self.seed = seed
+        self.memory_mb = memory_mb
+        self.loader = loader
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")  # Fork would copy the editor's threads and UI state.
+        self._idle: "queue.Queue[WorkerProcess]" = queue.Queue()
+        self._workers: List[WorkerProcess] = []
+        self._lock = threading.Lock()
+        self._failure: Optional[str] = None  # Why the last replacement worker could not load the model.
+        started = [self._spawn() for _ in range(max(1, workers))]
+        try:
+            for worker in started:
+                self._wait_ready(worker)
+        except Exception:
+            self.close()
+            raise
+        self._bytes_per_token = started[0].bytes_per_token
+        for worker in started:
+            self._idle.put(worker)
+
+    def stream(self, prompt, max_new_tokens, should_stop=lambda: False, seed=None, prefix=""):
+        worker = self._checkout()
+        finished = False
+        try:
+            worker.connection.send(("stream", prompt, max_new_tokens, seed, prefix))
+            while True:
+                kind, value = self._receive(worker, should_stop)
+                if kind == "chunk":
+                    yield value
+                    continue
+                finished = True
+                if kind == "error":
+                    raise RuntimeError(value)
+                return
+        finally:
+            self._release(worker, finished)
+
+    def generate_batch(self, prompts, max_new_tokens, should_stop=lambda: False, seed=None):
+        worker = self._checkout()
+        finished = False
+        try:
+            worker.connection.send(("batch", prompts, max_new_tokens, seed))
+            kind, value = self._receive(worker, should_stop)
+            finished = True
+            if kind == "error":
+                raise RuntimeError(value)
+            return value
+        finally:
+            self._release(worker, finished)
+
+    def bytes_per_token(self) -> int:
+        return self._bytes_per_token
+
+    def close(self):
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.kill()
+
+    # --- Worker management ---
+
+    def _spawn(self) -> WorkerProcess:
+        worker = WorkerProcess(self._context, self.loader, self.model_name, self.seed)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _wait_ready(self, worker: WorkerProcess):
+        try:
+            kind, value = worker.receive(self.memory_mb)
+        except WorkerLost as exc:
+            self._retire(worker)
+            raise RuntimeError(f"{exc} while loading {self.model_name}") from None
+        if kind != "ready":
+            self._retire(worker)
+            raise RuntimeError(value)
+        worker.bytes_per_token = value
+
+    def _checkout(self) -> WorkerProcess:
+        while True:
+            if self._failure and not self._workers:
+                raise RuntimeError(f"No AI worker: {self._failure}")
+            try:
+                worker = self._idle.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            worker.cancel.clear()
+            return worker
+
+    def _receive(self, worker: WorkerProcess, should_stop: Callable[[], bool]) -> Tuple[str, Any]:
+        try:
+            return worker.receive(self.memory_mb, should_stop)
+        except WorkerLost:
+            self._replace(worker)
+            raise
+
+    def _release(self, worker: WorkerProcess, finished: bool):
+        """Returns a worker to the pool once it is idle, or replaces it if it is no longer fit to serve."""
+        if worker.lost:
+            return
+        if not finished:
+            # The caller stopped listening mid-request; stop the worker and read off the rest of its answer.
+            worker.cancel.set()
+            try:
+                while worker.receive(self.memory_mb)[0] == "chunk":
+                    pass
+            except WorkerLost:
+                self._replace(worker)
+                return
+        if self.memory_mb and worker.resident_mb() > self.memory_mb:
+            # Still answering, but grown past the cap; start afresh before the next request.
+            self._replace(worker)
+            return
+        self._idle.put(worker)
+
+    def _replace(self, worker: WorkerProcess):
+        self._retire(worker)
+        self.restarts += 1
+        threading.Thread(target=self._restart, name="ai-worker-restart", daemon=True).start()
+
+    def _retire(self, worker: WorkerProcess):
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def _restart(self):
+        worker = self._spawn()
+        try:
+            self._wait_ready(worker)
+        except Exception as exc:
+            self._failure = str(exc)
+            return
+        self._idle.put(worker)
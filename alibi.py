@@ -0,0 +1,178 @@
+# alibi.py
+"""
+Opportunity and alibi checks over the characters' timed whereabouts.
+
+WhereaboutsIndex sorts the case's Whereabout stays by (character, start) into
+flat NumPy arrays with per-character offsets, so every check below is a few
+vectorized passes over all stays, and "where was X between t0 and t1" is two
+searchsorted calls. Travel times come from the TravelTable's precomputed
+all-pairs matrix, fetched once per query as one row per place.
+
+A character can be at place P at time t when a truthful stay at P covers t,
+or when t falls in a gap between stays that leaves time to travel from the
+previous stay to P and from P on to the next one. Stays marked isLie are
+left out of that timeline: a false alibi says nothing about where the
+character really was. Conflicts involving a lie are still reported, but
+flagged as intended.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+
+import numpy as np
+
+from routing import TravelTable
+from schemas import Whereabout
+
+Window = Tuple[float, float]
+
+
+@dataclass
+class AlibiConflict:
+    kind: Literal["overlap", "travel", "witness"]
+    first: Whereabout
+    second: Whereabout  # For "witness", the witness's own stay elsewhere.
+    travel_minutes: float = 0.0
+
+    @property
+    def intended(self) -> bool:
+        """At least one side is a known lie, so the contradiction is a clue rather than a mistake."""
+        return self.first.isLie or self.second.isLie
+
+    def describe(self, names: Dict[str, str]) -> str:
+        first, second = self.first, self.second
+        who, here, there = (names.get(i, i) for i in (first.characterId, first.locationId, second.locationId))
+        if self.kind == "overlap":
+            return f"'{who}' is placed at '{here}' and at '{there}' at the same time (minute {second.start})."
+        if self.kind == "travel":
+            return f"'{who}' cannot get from '{here}' to '{there}' in {second.start - first.end:g} minutes; the trip takes {self.travel_minutes:g}."
+        witness = names.get(second.characterId, second.characterId)
+        return f"'{witness}' vouches for '{who}' at '{here}' but was at '{there}' at the time."
+
+
+class WhereaboutsIndex:
+    def __init__(self, whereabouts: Iterable[Whereabout], travel: TravelTable):
+        self.travel = travel
+        stays = [w for w in whereabouts if w.end >= w.start]
+        self.characters: List[str] = sorted({w.characterId for w in stays})
+        self._character_rows = {character_id: i for i, character_id in enumerate(self.characters)}
+        self.places: List[str] = sorted({w.locationId for w in stays})
+        place_rows = {place_id: i for i, place_id in enumerate(self.places)}
+
+        codes = np.array([self._character_rows[w.characterId] for w in stays], dtype=np.int64)
+        starts = np.array([w.start for w in stays], dtype=np.float64)
+        order = np.lexsort((starts, codes))
+        self.stays: List[Whereabout] = [stays[i] for i in order]
+        self.codes = codes[order]
+        self.starts = starts[order]
+        self.ends = np.array([w.end for w in self.stays], dtype=np.float64)
+        self.locations = np.array([place_rows[w.locationId] for w in self.stays], dtype=np.int64)
+        self.lies = np.array([w.isLie for w in self.stays], dtype=bool)
+        # Stays of character c are self.stays[offsets[c]:offsets[c + 1]].
+        self.offsets = np.searchsorted(self.codes, np.arange(len(self.characters) + 1))
+        # Running maximum of end times within each character, for overlap queries.
+        self.max_ends = self.ends.copy()
+        for c in range(len(self.characters)):
+            lo, hi = self.offsets[c], self.offsets[c + 1]
+            np.maximum.accumulate(self.max_ends[lo:hi], out=self.max_ends[lo:hi])
+        self._travel_matrix: Optional[np.ndarray] = None
+
+    def has_whereabouts(self, character_id: str) -> bool:
+        return character_id in self._character_rows
+
+    def stays_between(self, character_id: str, t0: float, t1: float) -> List[Whereabout]:
+        """The character's stays that overlap [t0, t1], in start order."""
+        c = self._character_rows.get(character_id)
+        if c is None:
+            return []
+        lo, hi = self.offsets[c], self.offsets[c + 1]
+        # Stays that start by t1, minus the leading ones that all ended before t0.
+        last = lo + np.searchsorted(self.starts[lo:hi], t1, side="right")
+        first = lo + np.searchsorted(self.max_ends[lo:last], t0, side="left")
+        return [self.stays[i] for i in range(first, last) if self.ends[i] >= t0]
+
+    # --- Opportunity ---
+
+    def opportunity(self, place_id: str, window: Window, characters: Iterable[str]) -> Dict[str, bool]:
+        """
+        Whether each character could have been at `place_id` at some moment in
+        `window`. Characters without any truthful stay are unconstrained.
+        """
+        w0, w1 = window
+        truthful = np.nonzero(~self.lies)[0]
+        codes, starts, ends, locations = self.codes[truthful], self.starts[truthful], self.ends[truthful], self.locations[truthful]
+        to_place = self.travel.submatrix(self.places, [place_id])[:, 0].astype(np.float64)
+
+        # A stay at the place itself that overlaps the window.
+        possible = (to_place[locations] == 0) & (starts <= w1) & (ends >= w0)
+        # The latest-ending stay so far of each character: a stay enclosed by a
+        # longer one opens no gap, so gaps are measured from these.
+        latest_ends = ends.copy()
+        bounds = np.r_[0, np.flatnonzero(codes[1:] != codes[:-1]) + 1, len(codes)]
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            np.maximum.accumulate(latest_ends[lo:hi], out=latest_ends[lo:hi])
+        # Each character's first row qualifies, so the running index never crosses characters.
+        latest = np.maximum.accumulate(np.where(ends == latest_ends, np.arange(len(codes)), 0)) if len(codes) else np.zeros(0, dtype=np.int64)
+        leave = ends[latest] + to_place[locations[latest]]
+        # The gap before each stay, opened by the character's earlier stays if there are any.
+        has_previous = np.r_[False, codes[1:] == codes[:-1]]
+        previous = np.maximum(np.arange(len(codes)) - 1, 0)
+        arrive = np.where(has_previous, leave[previous], -np.inf)
+        possible |= np.maximum(arrive, w0) <= np.minimum(starts - to_place[locations], w1)
+        # The open-ended gap after each character's latest-ending stay.
+        is_last = np.r_[codes[1:] != codes[:-1], True] if len(codes) else np.zeros(0, dtype=bool)
+        possible |= is_last & (np.maximum(leave, w0) <= w1)
+
+        reachable = np.zeros(len(self.characters), dtype=bool)
+        np.logical_or.at(reachable, codes, possible)
+        constrained = np.zeros(len(self.characters), dtype=bool)
+        constrained[codes] = True
+        result = {}
+        for character_id in characters:
+            c = self._character_rows.get(character_id)
+            result[character_id] = w0 <= w1 and (c is None or not constrained[c] or bool(reachable[c]))
+        return result
+
+    # --- Contradictions ---
+
+    def contradictions(self) -> List[AlibiConflict]:
+        """
+        Stays of one character that overlap at different places, back-to-back
+        stays too close together for the travel between them, and stays whose
+        witnesses were somewhere else at the time.
+        """
+        conflicts: List[AlibiConflict] = []
+        n = len(self.stays)
+        if n == 0:
+            return conflicts
+        travel = self._travel()
+
+        # Compare each stay with the earlier stay of the same character that ends latest.
+        latest = np.arange(n)
+        for c in range(len(self.characters)):
+            lo, hi = self.offsets[c], self.offsets[c + 1]
+            is_new_max = np.r_[True, self.ends[lo + 1:hi] > self.max_ends[lo:hi - 1]]
+            latest[lo:hi] = np.maximum.accumulate(np.where(is_new_max, np.arange(lo, hi), lo))
+        current = np.arange(1, n)
+        before = latest[:-1]
+        same_character = self.codes[current] == self.codes[before]
+        gap = self.starts[current] - self.ends[before]
+        moved = self.locations[current] != self.locations[before]
+        overlap = same_character & moved & (gap < 0)
+        too_fast = same_character & moved & (gap >= 0) & (gap < travel[self.locations[before], self.locations[current]])
+        for i in np.nonzero(overlap)[0]:
+            conflicts.append(AlibiConflict("overlap", self.stays[before[i]], self.stays[current[i]]))
+        for i in np.nonzero(too_fast)[0]:
+            minutes = float(travel[self.locations[before[i]], self.locations[current[i]]])
+            conflicts.append(AlibiConflict("travel", self.stays[before[i]], self.stays[current[i]], minutes))
+
+        for stay in self.stays:
+            for witness_id in stay.witnesses:
+                for other in self.stays_between(witness_id, stay.start, stay.end):
+                    if other.locationId != stay.locationId:
+                        conflicts.append(AlibiConflict("witness", stay, other))
+        return conflicts
+
+    def _travel(self) -> np.ndarray:
+        if self._travel_matrix is None:
+            self._travel_matrix = self.travel.submatrix(self.places, self.places).astype(np.float64)
+        return self._travel_matrix
@@ -0,0 +1,332 @@
+import startup
+import flet as ft
+from typing import Optional
+import data_manager
+from my_control import Control
+from ai_model import FAILED, READY
+import schemas
+# View modules are imported when their view is first built, after the window is up.
+
+startup_timeline = startup.StartupTimeline(data_manager.CASES_DIR / startup.STARTUP_LOG)
+
+ASSET_TYPES = {
+    "Characters": schemas.Character,
+    "Locations": schemas.Location,
+    "Items": schemas.Item,
+    "Factions": schemas.Faction,
+    "Districts": schemas.District,
+    "Sleuth": schemas.Sleuth,
+}
+
+ASSET_ICONS = {
+    schemas.Character: ft.Icons.PERSON,
+    schemas.Location: ft.Icons.LOCATION_CITY,
+    schemas.Item: ft.Icons.INVENTORY_2,
+    schemas.Faction: ft.Icons.GROUP,
+    schemas.District: ft.Icons.MAP,
+    schemas.Sleuth: ft.Icons.PERSON_SEARCH,
+}
+
+def main(page: ft.Page):
+    page.title = "The Agency"
+    page.window_width = 1200
+    page.window_height = 800
+    page.theme = ft.Theme(color_scheme_seed="blue")
+    page.dark_theme = ft.Theme(color_scheme_seed="blue")
+    page.theme_mode = ft.ThemeMode.DARK
+
+    def change_theme(e):
+        page.theme_mode = "light" if page.theme_mode == "dark" else "dark"
+        page.update()
+
+    ai_status = ft.Text(size=12)
+    page.appbar = ft.AppBar(
+        title=ft.Text("The Agency"),
+        actions=[
+            ai_status,
+            ft.IconButton(ft.Icons.UNDO, on_click=lambda e: app_control.undo(), tooltip="Undo (Ctrl+Z)"),
+            ft.IconButton(ft.Icons.REDO, on_click=lambda e: app_control.redo(), tooltip="Redo (Ctrl+Shift+Z)"),
+            ft.IconButton(
+                ft.Icons.LIGHT_MODE,
+                on_click=change_theme,
+                tooltip="Toggle theme",
+            ),
+        ],
+    )
+
+    def on_keyboard(e: ft.KeyboardEvent):
+        key = e.key.upper()
+        if not (e.ctrl or e.meta):
+            return
+        if key == "Z" and e.shift or key == "Y":
+            app_control.redo()
+        elif key == "Z":
+            app_control.undo()
+
+    page.on_keyboard_event = on_keyboard
+
+    def nav_changed(e):
+        # Views are built on first visit and reused afterwards.
+        app_control.show_view(e.control.selected_index)
+        page.update()
+
+    nav_rail = ft.NavigationRail(
+        selected_index=0,
+        disabled=True,  # Until the case is open.
+        label_type=ft.NavigationRailLabelType.ALL,
+        group_alignment=-0.9,
+        destinations=[
+            ft.NavigationRailDestination(
+                icon=ft.Icon(ft.Icons.BUILD_CIRCLE_OUTLINED),
+                selected_icon=ft.Icon(ft.Icons.BUILD_CIRCLE),
+                label="World Builder",
+            ),
+            ft.NavigationRailDestination(
+                icon=ft.Icon(ft.Icons.FOLDER_SPECIAL_OUTLINED),
+                selected_icon=ft.Icon(ft.Icons.FOLDER_SPECIAL),
+                label="Case Builder",
+            ),
+            ft.NavigationRailDestination(
+                icon=ft.Icon(ft.Icons.CHECK_CIRCLE_OUTLINE),
+                selected_icon=ft.Icon(ft.Icons.CHECK_CIRCLE),
+                label_content=ft.Text("Validator"),
+            ),
+        ],
+        on_change=nav_changed,
+    )
+
+    main_content = ft.Column(expand=True)
+
+    # Create a single instance of the Control class; the case opens once the window is up.
+    app_control = Control(page, nav_rail, main_content, build_world_builder, build_case_builder, load_case=False)
+    app_control.view_builders[2] = build_validator
+
+    def on_ai_status(status: str):
+        ai_status.value = app_control.ai_model.describe(app_control.generation_queue.waiting())
+        if status == READY:
+            startup_timeline.mark(startup.MODEL_READY)
+        elif status == FAILED:
+            startup_timeline.mark(startup.MODEL_FAILED)
+        page.update()
+
+    ai_status.value = app_control.ai_model.describe()
+    app_control.ai_model.add_status_listener(on_ai_status)
+    # The queue length changes without a status change.
+    app_control.generation_queue.add_listener(lambda: on_ai_status(app_control.ai_model.status))
+
+    search_bar = ft.TextField(
+        label="Global Search",
+        hint_text="Search characters, locations, items...",
+        prefix_icon=ft.Icons.SEARCH,
+        on_change=lambda e: app_control.filter_assets(e.control.value),
+        width=400,
+    )
+
+    opening = ft.Row([ft.ProgressRing(width=16, height=16, stroke_width=2), ft.Text("Opening case...")])
+    main_content.controls.append(opening)
+
+    def open_case():
+        try:
+            app_control.load_initial_data()
+        except Exception as exc:
+            opening.controls = [ft.Icon(ft.Icons.ERROR_OUTLINE, color=ft.Colors.ERROR), ft.Text(f"Could not open the case: {exc}")]
+            page.update()
+            raise
+        startup_timeline.mark(startup.CASE_LOAD)
+        # Initial view
+        app_control.show_view(0)
+        main_content.controls.insert(0, search_bar)
+        nav_rail.disabled = False
+        page.update()
+        # The model loads in the background once the case is open, so the first STARS click is quick.
+        app_control.ai_model.warm_up()
+
+    # The shell goes on screen first; the case and the views follow.
+    page.add(
+        ft.ResponsiveRow(
+            [
+                ft.Column([nav_rail], col={"sm": 2, "md": 1}),
+                ft.VerticalDivider(width=1),
+                ft.Column([main_content], col={"sm": 10, "md": 11}),
+            ],
+            expand=True,
+        )
+    )
+    startup_timeline.mark(startup.FIRST_FRAME)
+    page.run_thread(open_case)
+
+def build_case_builder(control: Control):
+    import case_builder
+
+    return case_builder.build_case_builder_view(control)
+
+def build_validator(control: Control):
+    import validator
+
+    return validator.build_validator_view(control)
+
+def build_world_builder(control: Control, asset_to_select_id: Optional[str] = None):
+    import social_graph
+    import map_tool
+    import faction_dynamics
+    import timeline
+
+    character_view = create_asset_editor(control, "Characters", control.world_data.characters, asset_to_select_id)
+    location_view = create_asset_editor(control, "Locations", control.world_data.locations, asset_to_select_id)
+    item_view = create_asset_editor(control, "Items", control.world_data.items, asset_to_select_id)
+    faction_view = create_asset_editor(control, "Factions", control.world_data.factions, asset_to_select_id)
+    district_view = create_asset_editor(control, "Districts", control.world_data.districts, asset_to_select_id)
+    sleuth_view = create_asset_editor(control, "Sleuth", [control.world_data.sleuth] if control.world_data.sleuth else [], asset_to_select_id)
+
+    asset_tabs = ft.Tabs(
+        selected_index=0,
+        animation_duration=300,
+        tabs=[
+            ft.Tab(text="Characters", content=character_view),
+            ft.Tab(text="Locations", content=location_view),
+            ft.Tab(text="Items", content=item_view),
+            ft.Tab(text="Factions", content=faction_view),
+            ft.Tab(text="Districts", content=district_view),
+            ft.Tab(text="Sleuth", content=sleuth_view),
+            ft.Tab(text="Social Graph", content=social_graph.build_social_graph_view(control)),
+            ft.Tab(text="Map Tool", content=map_tool.build_map_tool_view(control)),
+            ft.Tab(text="Faction Dynamics", content=faction_dynamics.build_faction_dynamics_view(control)),
+            ft.Tab(text="Timeline", content=timeline.build_timeline_view(control)),
+        ],
+        expand=1,
+    )
+    control.asset_tabs = asset_tabs
+
+    return ft.Column([asset_tabs], expand=True)
+
+def create_asset_editor(control: Control, asset_name: str, asset_list: list, asset_to_select_id: Optional[str] = None):
+        from asset_forms import AssetForm
+        from bulk_actions import BulkSelection
+
+        page = control.page
+        asset_type = ASSET_TYPES[asset_name]
+        form: Optional[AssetForm] = None
+
+        def on_asset_click(e):
+            control.select_asset(e.control.data)
+            update_form()
+
+        def build_asset_list():
+            asset_list_view.controls.clear()
+            if asset_list:
+                filtered_assets = [
+                    asset for asset in asset_list
+                    if control.search_term in getattr(asset, 'fullName', getattr(asset, 'name', '')).lower()
+                ]
+                for asset in filtered_assets:
+                    display_name = getattr(asset, 'fullName', getattr(asset, 'name', 'Unknown'))
+                    asset_list_view.controls.append(
+                        ft.ListTile(
+                            title=ft.Text(display_name),
+                            leading=ft.Icon(ASSET_ICONS[asset_type]),
+                            trailing=bulk.checkbox(asset) if bulk else None,
+                            key=schemas.get_asset_id(asset),
+                            data=asset,
+                            on_click=on_asset_click,
+                        )
+                    )
+
+        # The Sleuth tab only ever holds one asset, so it has no multi-select.
+        bulk = BulkSelection(control, asset_type) if asset_name != "Sleuth" else None
+        asset_list_view = ft.ListView(expand=1, spacing=10, padding=20)
+        build_asset_list()
+
+        form_view = ft.Column(
+            expand=True,
+            scroll=ft.ScrollMode.AUTO,
+        )
+
+        def handle_new_asset(e):
+            if asset_name == "Characters":
+                control.create_new_character()
+            elif asset_name == "Locations":
+                control.create_new_location()
+            elif asset_name == "Items":
+                control.create_new_item()
+            elif asset_name == "Factions":
+                control.create_new_faction()
+            elif asset_name == "Districts":
+                control.create_new_district()
+            # The list is redrawn by the refresher registered below.
+            update_form()
+
+        def handle_delete_asset(e):
+            def on_confirm(e):
+                # The list and form are redrawn by the refresher registered below.
+                dlg.open = False
+                control.delete_asset()
+
+            dlg = ft.AlertDialog(
+                modal=True,
+                title=ft.Text("Please confirm"),
+                content=ft.Text("Do you really want to delete this asset?"),
+                actions=[
+                    ft.TextButton("Yes", on_click=on_confirm),
+                    ft.TextButton("No", on_click=lambda e: setattr(dlg, 'open', False) or page.update()),
+                ],
+                actions_alignment=ft.MainAxisAlignment.END,
+            )
+            page.dialog = dlg
+            dlg.open = True
+            page.update()
+
+        form_view.controls.append(
+            ft.Row([
+                ft.ElevatedButton(text="New", on_click=handle_new_asset) if asset_name != "Sleuth" else ft.Container(),
+                ft.ElevatedButton(text="Save", on_click=lambda e: control.save_data()),
+                ft.ElevatedButton(text="Delete", on_click=handle_delete_asset, color="white", bgcolor="red") if asset_name != "Sleuth" else ft.Container(),
+            ])
+        )
+
+        def update_form(update_page: bool = True):
+            # The form for this asset type is built on first use; later selections only rebind it.
+            nonlocal form
+            has_selection = isinstance(control.selected_asset, asset_type)
+            if has_selection:
+                if form is None:
+                    form = AssetForm(control, asset_type)
+                    form_view.controls[:0] = form.controls
+                form.bind(control.selected_asset)
+            if form is not None:
+                for card in form.controls:
+                    card.visible = has_selection
+            if update_page:
+                page.update()
+
+        def select(asset):
+            control.select_asset(asset, update=False)
+            update_form(update_page=False)
+            asset_list_view.scroll_to(key=schemas.get_asset_id(asset), duration=300)
+
+        control.register_selector(asset_type.__name__, select)
+        control.register_refresher(asset_type.__name__, lambda: (build_asset_list(), update_form(update_page=False)))
+
+        # Initial form state
+        if asset_to_select_id:
+            selected_asset_obj = next((asset for asset in asset_list if getattr(asset, 'id', getattr(asset, 'clueId', None)) == asset_to_select_id), None)
+            if selected_asset_obj:
+                control.select_asset(selected_asset_obj)
+            else:
+                control.select_asset(asset_list[0]) if asset_list else None
+        elif asset_list:
+            control.select_asset(asset_list[0])
+        update_form()
+
+
+        return ft.Row(
+            [
+                ft.Column([ft.Text(f"{asset_name} List", style=ft.TextThemeStyle.HEADLINE_SMALL)] + ([bulk.bar] if bulk else []) + [asset_list_view], expand=1),
+                ft.VerticalDivider(width=1),
+                form_view,
+            ],
+            expand=True,
+        )
+
+def run():
+    startup_timeline.mark(startup.IMPORT)
+    ft.app(target=main)
@@ -0,0 +1,143 @@
+# asset_forms.py
+import flet as ft
+from typing import Any, Dict, Optional
+
+import schemas
+from form_specs import FORM_SPECS, FieldSpec, field_choices, from_display, to_display
+from ai_button import AIButton
+from my_control import Control
+from reference_picker import ReferencePicker
+
+
+class AssetForm:
+    """
+    A reusable form for one asset type.
+
+    The control tree is built once from FORM_SPECS; selecting another asset of
+    the same type only rebinds the input values via `bind`. Event handlers look
+    up their FieldSpec through `control.data` and write to whatever asset is
+    currently bound, so no handler captures a specific asset object.
+    """
+
+    def __init__(self, control: Control, asset_type: type):
+        self.control = control
+        self.asset_type = asset_type
+        self.asset: Optional[Any] = None
+        self.inputs: Dict[str, ft.Control] = {}
+        self.link_buttons: Dict[str, ft.IconButton] = {}
+        self.image_previews: Dict[str, ft.Image] = {}
+        self.pickers: Dict[str, ReferencePicker] = {}
+        self.ai_buttons: Dict[str, AIButton] = {}
+        self.controls = [self._build_section(section) for section in FORM_SPECS[asset_type]]
+
+    def _build_section(self, section) -> ft.Card:
+        return ft.Card(
+            content=ft.Container(
+                padding=10,
+                content=ft.Column(
+                    [ft.Text(section.title, style=ft.TextThemeStyle.HEADLINE_SMALL)]
+                    + [self._build_field(spec) for spec in section.fields]
+                ),
+            )
+        )
+
+    def _build_field(self, spec: FieldSpec) -> ft.Control:
+        if spec.kind == "ref":
+            picker = ReferencePicker(self.control, spec.label, spec.link_type, self._on_pick, tooltip=spec.tooltip, data=spec, expand=True)
+            self.pickers[spec.attr] = picker
+            button = ft.IconButton(icon=ft.Icons.LINK, data=spec, on_click=self._on_link, visible=False)
+            self.link_buttons[spec.attr] = button
+            return ft.Row([picker.view, button])
+        if spec.kind == "choice":
+            field = ft.Dropdown(
+                label=spec.label,
+                options=[ft.dropdown.Option(c) for c in field_choices(self.asset_type, spec.attr)],
+                tooltip=spec.tooltip,
+                data=spec,
+                on_change=self._on_change,
+            )
+        elif spec.kind == "bool":
+            field = ft.Checkbox(label=spec.label, tooltip=spec.tooltip, data=spec, on_change=self._on_change)
+        else:
+            field = ft.TextField(
+                label=spec.label,
+                tooltip=spec.tooltip,
+                multiline=spec.kind == "multiline",
+                min_lines=3 if spec.kind == "multiline" else None,
+                keyboard_type=ft.KeyboardType.NUMBER if spec.kind == "int" else None,
+                expand=bool(spec.link_type or spec.ai or spec.kind == "image"),
+                data=spec,
+                on_change=self._on_change,
+            )
+        self.inputs[spec.attr] = field
+
+        if spec.kind == "image":
+            preview = ft.Image(width=100, height=100, visible=False)
+            self.image_previews[spec.attr] = preview
+            return ft.Column([
+                ft.Row([field, ft.IconButton(icon=ft.Icons.UPLOAD_FILE, data=spec, on_click=self._on_upload)]),
+                preview,
+            ])
+        if spec.link_type:
+            button = ft.IconButton(icon=ft.Icons.LINK, data=spec, on_click=self._on_link, visible=False)
+            self.link_buttons[spec.attr] = button
+            return ft.Row([field, button])
+        if spec.ai:
+            button = AIButton(self.control, field, lambda: self.asset, spec.attr)
+            self.ai_buttons[spec.attr] = button
+            return ft.Row([field, button.view])
+        return field
+
+    def bind(self, asset: Any):
+        """Points the form at `asset` and refreshes every input from it."""
+        self.asset = asset
+        for section in FORM_SPECS[self.asset_type]:
+            for spec in section.fields:
+                self._refresh_field(spec)
+
+    def _refresh_field(self, spec: FieldSpec):
+        value = getattr(self.asset, spec.attr, None)
+        if spec.attr in self.pickers:
+            self.pickers[spec.attr].set_value(value)
+            self.link_buttons[spec.attr].visible = bool(value)
+            return
+        field = self.inputs[spec.attr]
+        field.value = to_display(spec, value)
+        if isinstance(field, ft.TextField):
+            field.error_text = None
+        if spec.attr in self.link_buttons:
+            self.link_buttons[spec.attr].visible = bool(value)
+        if spec.attr in self.ai_buttons:
+            self.ai_buttons[spec.attr].sync()
+        if spec.attr in self.image_previews:
+            preview = self.image_previews[spec.attr]
+            preview.src = value or None
+            preview.visible = bool(value)
+
+    def _on_change(self, e):
+        spec: FieldSpec = e.control.data
+        try:
+            value = from_display(spec, e.control.value)
+        except ValueError:
+            e.control.error_text = f"{spec.label} must be a whole number."
+            e.control.update()
+            return
+        if getattr(e.control, "error_text", None):
+            e.control.error_text = None
+        self.control.update_asset(self.asset, spec.attr, value)
+        if spec.attr in self.link_buttons:
+            self.link_buttons[spec.attr].visible = bool(value)
+
+    def _on_pick(self, picker: ReferencePicker, value):
+        spec: FieldSpec = picker.data
+        self.control.update_asset(self.asset, spec.attr, value)
+        self.link_buttons[spec.attr].visible = bool(value)
+
+    def _on_link(self, e):
+        spec: FieldSpec = e.control.data
+        value = getattr(self.asset, spec.attr, None)
+        target_id = value[0] if isinstance(value, list) and value else value
+        self.control.go_to_issue(schemas.ValidationResult(message="", type="", asset_id=target_id, asset_type=spec.link_type))
+
+    def _on_upload(self, e):
+        self.control.pick_image_file(self.asset, e.control.data.attr)
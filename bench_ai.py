@@ -0,0 +1,71 @@
+# bench_ai.py
+"""
+Compares local text generation in full precision and in int8.
+
+Each precision runs in its own process, so resident memory is measured
+without the other model loaded:
+
+    python bench_ai.py [--model gpt2] [--tokens 64] [--runs 5] [--threads N]
+
+For every precision it prints load time (including warm-up), generated
+tokens per second and resident memory after generating.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from ai_backends import FP32, INT8, load_transformers
+
+PROMPT = "You are a clinical, fact-based assistant to the author of a detective story.\n\nGenerate a biography for a Character named Ada Vance:\n"
+
+
+def resident_mb() -> float:
+    """Current resident memory; the peak where /proc is not available."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def measure(model: str, precision: str, tokens: int, runs: int, threads: int) -> dict:
+    started = time.perf_counter()
+    backend = load_transformers(model, 42, precision, threads or None)
+    loaded = time.perf_counter() - started
+    generated, elapsed = 0, 0.0
+    for run in range(runs):
+        started = time.perf_counter()
+        text = "".join(backend.stream(PROMPT, tokens, seed=run))
+        elapsed += time.perf_counter() - started
+        generated += len(backend.tokenizer(text)["input_ids"])
+    return {"precision": precision, "load_s": loaded, "tokens_per_s": generated / elapsed, "rss_mb": resident_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="gpt2")
+    parser.add_argument("--tokens", type=int, default=64)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--child", choices=(FP32, INT8), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure(args.model, args.child, args.tokens, args.runs, args.threads)))
+        return
+    print(f"{'precision':<10}{'load s':>10}{'tokens/s':>12}{'RSS MB':>10}")
+    for precision in (FP32, INT8):
+        command = [sys.executable, __file__, "--child", precision] + [f"--{name}={getattr(args, name)}" for name in ("model", "tokens", "runs", "threads")]
+        result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout.strip().splitlines()[-1])
+        print(f"{precision:<10}{result['load_s']:>10.1f}{result['tokens_per_s']:>12.1f}{result['rss_mb']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
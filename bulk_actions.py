@@ -0,0 +1,205 @@
+# bulk_actions.py
+import flet as ft
+from typing import Any, Dict, Optional
+
+from ai_generation import GenerationBatch
+from form_specs import FORM_SPECS, FieldSpec, field_choices, from_display
+from my_control import Control
+
+
+class BulkSelection:
+    """
+    Multi-select for an asset list and the action bar that works on it.
+
+    Each list row gets a checkbox from `checkbox`. Once anything is checked the
+    bar offers delete, duplicate and a single-field edit. Each action is one
+    Control batch call, which redraws the affected lists through their
+    registered refreshers and updates the page once.
+
+    Types with AI-generated fields also get "Generate with AI", which fills
+    the chosen fields of every checked asset as one batch, with a progress
+    bar and a stop button while it runs.
+    """
+
+    def __init__(self, control: Control, asset_type: type):
+        self.control = control
+        self.asset_type = asset_type
+        self.checked: Dict[int, Any] = {}
+        self.specs: Dict[str, FieldSpec] = {
+            spec.attr: spec
+            for section in FORM_SPECS[asset_type]
+            for spec in section.fields
+            if spec.kind != "image" and spec.attr not in ("id", "clueId")
+        }
+
+        self.count_text = ft.Text()
+        self.field_dropdown = ft.Dropdown(
+            label="Field",
+            options=[ft.dropdown.Option(key=spec.attr, text=spec.label) for spec in self.specs.values()],
+            on_change=self._on_field_change,
+            width=200,
+        )
+        self.text_value = ft.TextField(label="Value", width=200)
+        self.bool_value = ft.Checkbox(label="Value", visible=False)
+        self.choice_value = ft.Dropdown(label="Value", width=200, visible=False)
+        self.ai_specs = [spec for spec in self.specs.values() if spec.ai]
+        self.ai_button = ft.ElevatedButton(text="Generate with AI", icon=ft.Icons.STARS, on_click=self._on_generate, visible=bool(self.ai_specs))
+        self.ai_progress = ft.ProgressBar(width=200, value=0)
+        self.ai_progress_text = ft.Text(size=12)
+        self.ai_progress_row = ft.Row(
+            [self.ai_progress, self.ai_progress_text, ft.IconButton(icon=ft.Icons.STOP_CIRCLE, tooltip="Stop generating", on_click=self._on_stop_generating)],
+            visible=False,
+        )
+        self.batch: Optional[GenerationBatch] = None
+        self.bar = ft.Row(
+            [
+                self.count_text,
+                ft.ElevatedButton(text="Duplicate", on_click=self._on_duplicate),
+                ft.ElevatedButton(text="Delete", on_click=self._on_delete, color="white", bgcolor="red"),
+                self.field_dropdown,
+                self.text_value,
+                self.bool_value,
+                self.choice_value,
+                ft.ElevatedButton(text="Apply", on_click=self._on_apply),
+                self.ai_button,
+                self.ai_progress_row,
+            ],
+            wrap=True,
+            visible=False,
+        )
+
+    def checkbox(self, asset: Any) -> ft.Checkbox:
+        return ft.Checkbox(value=id(asset) in self.checked, data=asset, on_change=self._on_check)
+
+    def clear(self):
+        self.checked.clear()
+        self._refresh_bar()
+
+    def _refresh_bar(self):
+        self.bar.visible = bool(self.checked) or self.batch is not None
+        self.count_text.value = f"{len(self.checked)} selected"
+
+    def _on_check(self, e):
+        asset = e.control.data
+        if e.control.value:
+            self.checked[id(asset)] = asset
+        else:
+            self.checked.pop(id(asset), None)
+        self._refresh_bar()
+        self.control.page.update()
+
+    def _selected_spec(self) -> Optional[FieldSpec]:
+        return self.specs.get(self.field_dropdown.value)
+
+    def _on_field_change(self, e):
+        spec = self._selected_spec()
+        kind = spec.kind if spec else "text"
+        self.text_value.visible = kind not in ("bool", "choice")
+        self.bool_value.visible = kind == "bool"
+        self.choice_value.visible = kind == "choice"
+        if kind == "choice":
+            self.choice_value.options = [ft.dropdown.Option(c) for c in field_choices(self.asset_type, spec.attr)]
+            self.choice_value.value = None
+        self.text_value.error_text = None
+        self.control.page.update()
+
+    def _on_apply(self, e):
+        spec = self._selected_spec()
+        if spec is None or not self.checked:
+            return
+        if spec.kind == "bool":
+            raw = self.bool_value.value
+        elif spec.kind == "choice":
+            raw = self.choice_value.value
+        else:
+            raw = self.text_value.value
+        try:
+            value = from_display(spec, raw)
+        except ValueError:
+            self.text_value.error_text = "Enter a whole number."
+            self.control.page.update()
+            return
+        self.text_value.error_text = None
+        self.control.bulk_update(list(self.checked.values()), spec.attr, value)
+
+    def _on_duplicate(self, e):
+        assets = list(self.checked.values())
+        self.clear()
+        self.control.bulk_duplicate(assets)
+
+    def _on_delete(self, e):
+        page = self.control.page
+
+        def on_confirm(e):
+            dlg.open = False
+            assets = list(self.checked.values())
+            self.clear()
+            self.control.delete_assets(assets)
+
+        dlg = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Please confirm"),
+            content=ft.Text(f"Delete {len(self.checked)} assets? References to them will be cleared."),
+            actions=[
+                ft.TextButton("Yes", on_click=on_confirm),
+                ft.TextButton("No", on_click=lambda e: setattr(dlg, 'open', False) or page.update()),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        page.dialog = dlg
+        dlg.open = True
+        page.update()
+
+    def _on_generate(self, e):
+        page = self.control.page
+        boxes = [ft.Checkbox(label=spec.label, value=True, data=spec.attr) for spec in self.ai_specs]
+
+        def on_start(e):
+            dlg.open = False
+            field_names = [box.data for box in boxes if box.value]
+            if field_names and self.checked and self.batch is None:
+                self._start_batch(list(self.checked.values()), field_names)
+            page.update()
+
+        dlg = ft.AlertDialog(
+            modal=True,
+            title=ft.Text(f"Generate with AI for {len(self.checked)} assets"),
+            content=ft.Column(boxes, tight=True),
+            actions=[
+                ft.TextButton("Generate", on_click=on_start),
+                ft.TextButton("Cancel", on_click=lambda e: setattr(dlg, 'open', False) or page.update()),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        page.dialog = dlg
+        dlg.open = True
+        page.update()
+
+    def _start_batch(self, assets, field_names):
+        self.batch = self.control.generate_batch_with_ai(assets, field_names, on_item=self._on_item, on_done=self._on_batch_done)
+        self.ai_button.visible = False
+        self.ai_progress_row.visible = True
+        self._show_progress(self.batch)
+
+    def _show_progress(self, batch: GenerationBatch, last: Optional[int] = None):
+        total = len(batch.items)
+        self.ai_progress.value = batch.finished / total if total else 1
+        self.ai_progress_text.value = f"{batch.finished}/{total}"
+        if last is not None:
+            asset, field_name = batch.items[last]
+            self.ai_progress_text.value += f" - {getattr(asset, 'fullName', getattr(asset, 'name', ''))}: {field_name}"
+
+    def _on_item(self, batch: GenerationBatch, index: int):
+        self._show_progress(batch, index)
+        self.control.page.update()
+
+    def _on_batch_done(self, batch: GenerationBatch):
+        self.batch = None
+        self.ai_button.visible = True
+        self.ai_progress_row.visible = False
+        self._refresh_bar()
+        self.control.page.update()
+
+    def _on_stop_generating(self, e):
+        if self.batch:
+            self.batch.cancel()
@@ -1,167 +1,342 @@
 import flet as ft
+from typing import Optional
 from my_control import Control
 import schemas
 import plot_graph
 import timeline_editor
+from asset_forms import AssetForm
+from form_specs import field_choices
+from reference_picker import ReferencePicker
+from bulk_actions import BulkSelection
+from ai_button import AIButton
+
+def _split_ids(value: str):
+    return [s.strip() for s in value.split(',') if s.strip()]
 
 def build_case_builder_view(control: Control, asset_to_select_id: Optional[str] = None):
     """
     Builds the UI for the Case Builder view.
     """
+    meta = control.case_data.caseMeta
 
-    case_meta_tab = ft.Column(
-        [
-            ft.Text("Define the Crime", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
-                victim_dropdown = ft.Dropdown(
-        label="Victim",
-        options=[ft.dropdown.Option(char.id, char.fullName) for char in control.world_data.characters],
-        value=control.case_data.caseMeta.victim if control.case_data.caseMeta else None,
-        on_change=lambda e: control.update_case_meta('victim', e.control.value),
-        tooltip="The character who is the victim of the crime."
-    )
-            culprit_dropdown = ft.Dropdown(
-        label="Culprit",
-        options=[ft.dropdown.Option(char.id, char.fullName) for char in control.world_data.characters],
-        value=control.case_data.caseMeta.culprit if control.case_data.caseMeta else None,
-        on_change=lambda e: control.update_case_meta('culprit', e.control.value),
-        tooltip="The character who committed the crime."
-    )
-            crime_scene_dropdown = ft.Dropdown(
-        label="Crime Scene",
-        options=[ft.dropdown.Option(loc.id, loc.name) for loc in control.world_data.locations],
-        value=control.case_data.caseMeta.crimeScene if control.case_data.caseMeta else None,
-        on_change=lambda e: control.update_case_meta('crimeScene', e.control.value),
-        tooltip="The primary location where the crime took place."
-    )
+    meta_pickers = []
 
-            murder_weapon_dropdown = ft.Dropdown(
-        label="Murder Weapon",
-        options=[ft.dropdown.Option(item.id, item.name) for item in control.world_data.items],
-        value=control.case_data.caseMeta.murderWeapon if control.case_data.caseMeta else None,
-        on_change=lambda e: control.update_case_meta('murderWeapon', e.control.value),
-        tooltip="The item used to commit the crime."
-    )
+    def meta_picker(label: str, asset_type: str, attribute_name: str, tooltip: str):
+        # All pickers share the option lists cached on the control.
+        picker = ReferencePicker(control, label, asset_type, lambda p, value: control.update_case_meta(p.data, value), tooltip=tooltip, data=attribute_name)
+        picker.set_value(getattr(meta, attribute_name) if meta else None)
+        meta_pickers.append(picker)
+        return picker.view
 
-            core_mystery_details = ft.TextField(
+    victim_dropdown = meta_picker("Victim", "Character", "victim", "The character who is the victim of the crime.")
+    culprit_dropdown = meta_picker("Culprit", "Character", "culprit", "The character who committed the crime.")
+    crime_scene_dropdown = meta_picker("Crime Scene", "Location", "crimeScene", "The primary location where the crime took place.")
+    murder_weapon_dropdown = meta_picker("Murder Weapon", "Item", "murderWeapon", "The item used to commit the crime.")
+
+    core_mystery_details = ft.TextField(
         label="Core Mystery Solution Details",
         multiline=True,
         min_lines=3,
-        value=control.case_data.caseMeta.coreMysterySolutionDetails if control.case_data.caseMeta else "",
+        value=meta.coreMysterySolutionDetails if meta else "",
         on_change=lambda e: control.update_case_meta('coreMysterySolutionDetails', e.control.value),
         tooltip="Detailed explanation of how the mystery is solved."
     )
-            ft.Checkbox(label="Murder Weapon Hidden", value=control.case_data.caseMeta.murderWeaponHidden if control.case_data.caseMeta else False, on_change=lambda e: control.update_case_meta('murderWeaponHidden', e.control.value), tooltip="Is the murder weapon hidden or not immediately obvious?"),
-            ft.Dropdown(
-                label="Means Clue",
-                options=[ft.dropdown.Option(c.clueId, c.clueSummary) for c in control.case_data.clues],
-                value=control.case_data.caseMeta.meansClue if control.case_data.caseMeta else None,
-                on_change=lambda e: control.update_case_meta('meansClue', e.control.value), tooltip="The clue that reveals the means by which the crime was committed."
-            ),
-            ft.Dropdown(
-                label="Motive Clue",
-                options=[ft.dropdown.Option(c.clueId, c.clueSummary) for c in control.case_data.clues],
-                value=control.case_data.caseMeta.motiveClue if control.case_data.caseMeta else None,
-                on_change=lambda e: control.update_case_meta('motiveClue', e.control.value), tooltip="The clue that reveals the motive for the crime."
-            ),
-            ft.Dropdown(
-                label="Opportunity Clue",
-                options=[ft.dropdown.Option(c.clueId, c.clueSummary) for c in control.case_data.clues],
-                value=control.case_data.caseMeta.opportunityClue if control.case_data.caseMeta else None,
-                on_change=lambda e: control.update_case_meta('opportunityClue', e.control.value), tooltip="The clue that reveals the opportunity the culprit had."
-            ),
-            ft.TextField(label="Red Herring Clues (comma-separated)", value=", ".join(control.case_data.caseMeta.redHerringClues) if control.case_data.caseMeta else "", on_change=lambda e: control.update_case_meta('redHerringClues', [s.strip() for s in e.control.value.split(',')]), tooltip="Comma-separated list of clue IDs that are red herrings."),
+
+    red_herring_field = ft.TextField(label="Red Herring Clues (comma-separated)", value=", ".join(meta.redHerringClues) if meta else "", on_change=lambda e: control.update_case_meta('redHerringClues', _split_ids(e.control.value)), tooltip="Comma-separated list of clue IDs that are red herrings.")
+
+    def generated_text_row(attribute_name: str, label: str, tooltip: str):
+        field = ft.TextField(label=label, multiline=True, min_lines=3, value=getattr(meta, attribute_name) if meta else "", on_change=lambda e: control.update_case_meta(attribute_name, e.control.value), expand=True, tooltip=tooltip)
+        return ft.Row([field, AIButton(control, field, lambda: control.case_data.caseMeta, attribute_name).view])
+
+    case_meta_tab = ft.Column(
+        [
+            ft.Text("Define the Crime", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
+            victim_dropdown,
+            culprit_dropdown,
+            crime_scene_dropdown,
+            murder_weapon_dropdown,
+            ft.Checkbox(label="Murder Weapon Hidden", value=meta.murderWeaponHidden if meta else False, on_change=lambda e: control.update_case_meta('murderWeaponHidden', e.control.value), tooltip="Is the murder weapon hidden or not immediately obvious?"),
+            meta_picker("Means Clue", "Clue", "meansClue", "The clue that reveals the means by which the crime was committed."),
+            meta_picker("Motive Clue", "Clue", "motiveClue", "The clue that reveals the motive for the crime."),
+            meta_picker("Opportunity Clue", "Clue", "opportunityClue", "The clue that reveals the opportunity the culprit had."),
+            red_herring_field,
             ft.Dropdown(
                 label="Narrative Viewpoint",
-                options=[ft.dropdown.Option(v) for v in schemas.CaseMeta.__annotations__['narrativeViewpoint'].__args__],
-                value=control.case_data.caseMeta.narrativeViewpoint if control.case_data.caseMeta else None,
+                options=[ft.dropdown.Option(v) for v in field_choices(schemas.CaseMeta, 'narrativeViewpoint')],
+                value=meta.narrativeViewpoint if meta else None,
                 on_change=lambda e: control.update_case_meta('narrativeViewpoint', e.control.value), tooltip="The narrative perspective of the story."
             ),
             ft.Dropdown(
                 label="Narrative Tense",
-                options=[ft.dropdown.Option(t) for t in schemas.CaseMeta.__annotations__['narrativeTense'].__args__],
-                value=control.case_data.caseMeta.narrativeTense if control.case_data.caseMeta else None,
+                options=[ft.dropdown.Option(t) for t in field_choices(schemas.CaseMeta, 'narrativeTense')],
+                value=meta.narrativeTense if meta else None,
                 on_change=lambda e: control.update_case_meta('narrativeTense', e.control.value), tooltip="The grammatical tense of the narrative."
             ),
             core_mystery_details,
-            ft.Row([
-                ft.TextField(label="Opening Monologue", multiline=True, min_lines=3, value=control.case_data.caseMeta.openingMonologue if control.case_data.caseMeta else "", on_change=lambda e: control.update_case_meta('openingMonologue', e.control.value), expand=True, tooltip="The opening monologue of the story."),
-                ft.IconButton(icon=ft.icons.STARS, on_click=lambda e: control.generate_with_ai(control.case_data.caseMeta, 'openingMonologue')),
-            ]),
-            ft.Row([
-                ft.TextField(label="Ultimate Reveal Scene Description", multiline=True, min_lines=3, value=control.case_data.caseMeta.ultimateRevealSceneDescription if control.case_data.caseMeta else "", on_change=lambda e: control.update_case_meta('ultimateRevealSceneDescription', e.control.value), expand=True, tooltip="Description of the scene where the mystery is finally revealed."),
-                ft.IconButton(icon=ft.icons.STARS, on_click=lambda e: control.generate_with_ai(control.case_data.caseMeta, 'ultimateRevealSceneDescription')),
-            ]),
-            ft.Row([
-                ft.TextField(label="Successful Denouement", multiline=True, min_lines=3, value=control.case_data.caseMeta.successfulDenouement if control.case_data.caseMeta else "", on_change=lambda e: control.update_case_meta('successfulDenouement', e.control.value), expand=True, tooltip="Description of the successful resolution of the story."),
-                ft.IconButton(icon=ft.icons.STARS, on_click=lambda e: control.generate_with_ai(control.case_data.caseMeta, 'successfulDenouement')),
-            ]),
-            ft.Row([
-                ft.TextField(label="Failed Denouement", multiline=True, min_lines=3, value=control.case_data.caseMeta.failedDenouement if control.case_data.caseMeta else "", on_change=lambda e: control.update_case_meta('failedDenouement', e.control.value), expand=True, tooltip="Description of a potential failed resolution of the story."),
-                ft.IconButton(icon=ft.icons.STARS, on_click=lambda e: control.generate_with_ai(control.case_data.caseMeta, 'failedDenouement')),
-            ]),
-        ]
+            generated_text_row('openingMonologue', "Opening Monologue", "The opening monologue of the story."),
+            generated_text_row('ultimateRevealSceneDescription', "Ultimate Reveal Scene Description", "Description of the scene where the mystery is finally revealed."),
+            generated_text_row('successfulDenouement', "Successful Denouement", "Description of the successful resolution of the story."),
+            generated_text_row('failedDenouement', "Failed Denouement", "Description of a potential failed resolution of the story."),
+        ],
+        scroll=ft.ScrollMode.AUTO,
     )
 
+    # --- Suspects ---
+
+    suspects_section = ft.Column(expand=True, scroll=ft.ScrollMode.AUTO)
+
+    # Interview rows are built when their suspect is expanded and kept across
+    # redraws, so collapsed suspects hold no clue pickers and adding a question
+    # builds one row rather than all of them again.
+    expanded_suspects = set()
+    question_rows = {}  # id(question) -> (question, row, sync)
+
+    def build_interview_question(question: schemas.InterviewQuestion):
+        question_field = ft.TextField(label="Question", on_change=lambda e: control.update_interview_question(question, 'question', e.control.value))
+        # Answers are generated in the voice of the suspect being interviewed.
+        answer_field = ft.TextField(label="Answer", multiline=True, expand=True, on_change=lambda e: control.update_interview_question(question, 'answer', e.control.value))
+        is_lie = ft.Checkbox(label="Is Lie", on_change=lambda e: control.update_interview_question(question, 'isLie', e.control.value))
+        is_clue = ft.Checkbox(label="Is Clue", on_change=lambda e: control.toggle_interview_question_is_clue(question, e.control.value))
+        debunking_picker = ReferencePicker(control, "Debunking Clue", "Clue", lambda p, value: control.update_interview_question(question, 'debunkingClue', value), tooltip="The clue that exposes this answer as a lie.")
+
+        def sync():
+            question_field.value, answer_field.value = question.question, question.answer
+            is_lie.value, is_clue.value = question.isLie, question.isClue
+            debunking_picker.set_value(question.debunkingClue)
+
+        sync()
+        row = ft.Container(
+            padding=10,
+            content=ft.Column([
+                question_field,
+                ft.Row([answer_field, AIButton(control, answer_field, lambda: question, 'answer').view]),
+                ft.Row([is_lie, is_clue]),
+                debunking_picker.view,
+            ]),
+        )
+        return row, sync
+
+    def interview_row(question: schemas.InterviewQuestion, rows: dict):
+        entry = question_rows.get(id(question))
+        if entry is None or entry[0] is not question:
+            entry = (question, *build_interview_question(question))
+        else:
+            entry[2]()
+        rows[id(question)] = entry
+        return entry[1]
+
+    def on_expand(e, suspect: schemas.CaseSuspect):
+        tile = e.control
+        if e.data != "true":
+            expanded_suspects.discard(suspect.characterId)
+            return
+        expanded_suspects.add(suspect.characterId)
+        if not tile.data:
+            tile.data = True
+            tile.controls[:0] = [interview_row(iq, question_rows) for iq in suspect.interview]
+            control.page.update()
+
+    def update_suspects_view(update_page: bool = True):
+        suspects_section.controls.clear()
+        rows = {}
+        for suspect in control.case_data.keySuspects:
+            def on_add_question(e, suspect=suspect):
+                expanded_suspects.add(suspect.characterId)
+                # The InterviewQuestion refresher redraws the list, reusing the built rows.
+                control.add_interview_question(suspect)
+
+            def on_delete_suspect(e, suspect=suspect):
+                control.delete_case_suspect(suspect)
+
+            expanded = control.selected_asset is suspect or suspect.characterId in expanded_suspects
+            suspects_section.controls.append(
+                ft.ExpansionTile(
+                    key=suspect.characterId,
+                    title=ft.Text(control.option_cache.label("Character", suspect.characterId) or suspect.characterId),
+                    leading=ft.Icon(ft.Icons.PERSON),
+                    initially_expanded=expanded,
+                    data=expanded,  # Whether the question rows are built.
+                    on_change=lambda e, suspect=suspect: on_expand(e, suspect),
+                    controls=[interview_row(iq, rows) for iq in suspect.interview if expanded] + [
+                        ft.Row([
+                            ft.ElevatedButton(text="Add Question", on_click=on_add_question),
+                            ft.ElevatedButton(text="Remove Suspect", on_click=on_delete_suspect, color="white", bgcolor="red"),
+                        ]),
+                    ],
+                )
+            )
+        question_rows.clear()
+        question_rows.update(rows)
+        if update_page:
+            control.page.update()
+
+    def on_add_suspect(picker: ReferencePicker, character_id: Optional[str]):
+        control.add_case_suspect(character_id)
+        picker.set_value(None)
+        update_suspects_view()
+
+    add_suspect_picker = ReferencePicker(control, "Add Suspect", "Character", on_add_suspect, tooltip="Pick a character to add as a key suspect.")
+
     suspects_tab = ft.Column(
         [
             ft.Text("Manage Suspects", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
+            add_suspect_picker.view,
             suspects_section,
-        ]
+        ],
+        expand=True,
     )
 
+    # --- Clues ---
+
+    clue_list_view = ft.ListView(expand=1, spacing=10, padding=20)
+    clue_form_view = ft.Column(expand=True, scroll=ft.ScrollMode.AUTO)
+    clue_form = AssetForm(control, schemas.Clue)
+    clue_form_view.controls.extend(clue_form.controls)
+    clue_bulk = BulkSelection(control, schemas.Clue)
+
+    def update_clue_list():
+        clue_list_view.controls = [
+            ft.ListTile(title=ft.Text(schemas.get_display_name(clue)), leading=ft.Icon(ft.Icons.SEARCH), trailing=clue_bulk.checkbox(clue), key=clue.clueId, data=clue, on_click=on_clue_click)
+            for clue in control.case_data.clues
+        ]
+
+    def update_clue_form(update_page: bool = True):
+        has_selection = isinstance(control.selected_asset, schemas.Clue)
+        if has_selection:
+            clue_form.bind(control.selected_asset)
+        for card in clue_form.controls:
+            card.visible = has_selection
+        if update_page:
+            control.page.update()
+
+    def on_clue_click(e):
+        control.select_asset(e.control.data)
+        update_clue_form()
+
+    def on_new_clue(e):
+        control.create_new_clue()
+        update_clue_form()
+
+    def on_delete_clue(e):
+        if isinstance(control.selected_asset, schemas.Clue):
+            control.delete_clue(control.selected_asset)
+
+    clue_form_view.controls.append(ft.Row([
+        ft.ElevatedButton(text="New", on_click=on_new_clue),
+        ft.ElevatedButton(text="Save", on_click=lambda e: control.save_data()),
+        ft.ElevatedButton(text="Delete", on_click=on_delete_clue, color="white", bgcolor="red"),
+    ]))
+
     clues_tab = ft.Column(
         [
             ft.Text("Manage Clues", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
-            clues_section,
-        ]
+            ft.Row([ft.Column([clue_bulk.bar, clue_list_view], expand=1), ft.VerticalDivider(width=1), clue_form_view], expand=True),
+        ],
+        expand=True,
     )
 
+    # --- Case Locations ---
+
+    case_locations_section = ft.Column(expand=True, scroll=ft.ScrollMode.AUTO)
+
+    def update_case_locations_view(update_page: bool = True):
+        case_locations_section.controls.clear()
+        for case_loc in control.case_data.caseLocations:
+            def on_add_witness(picker: ReferencePicker, character_id: Optional[str], case_loc=case_loc):
+                control.add_case_witness(case_loc, character_id)
+                update_case_locations_view()
+
+            def on_delete_location(e, case_loc=case_loc):
+                control.delete_case_location(case_loc)
+
+            witness_picker = ReferencePicker(control, "Add Witness", "Character", on_add_witness)
+            case_locations_section.controls.append(
+                ft.ExpansionTile(
+                    key=case_loc.locationId,
+                    title=ft.Text(control.option_cache.label("Location", case_loc.locationId) or case_loc.locationId),
+                    leading=ft.Icon(ft.Icons.LOCATION_CITY),
+                    initially_expanded=control.selected_asset is case_loc,
+                    controls=[
+                        ft.TextField(label="Location Clues", value=", ".join(case_loc.locationClues), on_change=lambda e, case_loc=case_loc: control.update_asset(case_loc, 'locationClues', _split_ids(e.control.value)), tooltip="Comma-separated list of clue IDs found here."),
+                        ft.Text("Witnesses", style=ft.TextThemeStyle.TITLE_SMALL),
+                    ] + [
+                        ft.ListTile(title=ft.Text(control.option_cache.label("Character", w.characterId) or w.characterId), leading=ft.Icon(ft.Icons.VISIBILITY))
+                        for w in case_loc.witnesses
+                    ] + [
+                        witness_picker.view,
+                        ft.ElevatedButton(text="Remove Location", on_click=on_delete_location, color="white", bgcolor="red"),
+                    ],
+                )
+            )
+        if update_page:
+            control.page.update()
+
+    def on_add_case_location(picker: ReferencePicker, location_id: Optional[str]):
+        control.add_case_location(location_id)
+        picker.set_value(None)
+        update_case_locations_view()
+
+    add_case_location_picker = ReferencePicker(control, "Add Location", "Location", on_add_case_location, tooltip="Pick a world location to use in this case.")
+
     case_locations_tab = ft.Column(
         [
             ft.Text("Manage Case Locations", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
+            add_case_location_picker.view,
             case_locations_section,
-        ]
+        ],
+        expand=True,
     )
 
-    update_case_locations_view()
+    # Selectors used by Control.go_to_issue to reveal an asset in this view.
+    def select_suspect(suspect: schemas.CaseSuspect):
+        control.select_asset(suspect, update=False)
+        update_suspects_view(update_page=False)
+        suspects_section.scroll_to(key=suspect.characterId, duration=300)
+
+    def select_clue(clue: schemas.Clue):
+        control.select_asset(clue, update=False)
+        update_clue_form(update_page=False)
+        clue_list_view.scroll_to(key=clue.clueId, duration=300)
+
+    def select_case_location(case_loc: schemas.CaseLocation):
+        control.select_asset(case_loc, update=False)
+        update_case_locations_view(update_page=False)
+        case_locations_section.scroll_to(key=case_loc.locationId, duration=300)
+
+    control.register_selector("CaseSuspect", select_suspect)
+    control.register_selector("Clue", select_clue)
+    control.register_selector("CaseLocation", select_case_location)
+    control.register_selector("CaseMeta", lambda meta: control.select_asset(meta, update=False))
+
+    # Redraws after batch operations (including cascades from world deletes) touch this view.
+    def refresh_meta_pickers():
+        for picker in meta_pickers:
+            picker.set_value(getattr(control.case_data.caseMeta, picker.data, None))
+        if control.case_data.caseMeta:
+            red_herring_field.value = ", ".join(control.case_data.caseMeta.redHerringClues)
+
+    def refresh_clues():
+        update_clue_list()
+        update_clue_form(update_page=False)
+
+    control.register_refresher("CaseMeta", refresh_meta_pickers)
+    control.register_refresher("Clue", refresh_clues)
+    for asset_type in ("CaseSuspect", "InterviewQuestion"):
+        control.register_refresher(asset_type, lambda: update_suspects_view(update_page=False))
+    for asset_type in ("CaseLocation", "CaseWitness"):
+        control.register_refresher(asset_type, lambda: update_case_locations_view(update_page=False))
 
     if asset_to_select_id:
-        # Try to select the asset if an ID is provided
-        selected_asset_obj = None
-        # Check in suspects
-        for suspect in control.case_data.keySuspects:
-            if suspect.characterId == asset_to_select_id:
-                selected_asset_obj = suspect
+        for namespace in ("CaseSuspect", "Clue", "CaseLocation", "CaseMeta"):
+            selected_asset_obj = control.asset_index.get(namespace, asset_to_select_id)
+            if selected_asset_obj:
+                control.select_asset(selected_asset_obj, update=False)
                 break
-            for iq in suspect.interview:
-                if iq.questionId == asset_to_select_id:
-                    selected_asset_obj = iq
-                    break
-            if selected_asset_obj: break
-        
-        # Check in clues
-        if not selected_asset_obj:
-            for clue in control.case_data.clues:
-                if clue.clueId == asset_to_select_id:
-                    selected_asset_obj = clue
-                    break
-        
-        # Check in case locations
-        if not selected_asset_obj:
-            for case_loc in control.case_data.caseLocations:
-                if case_loc.locationId == asset_to_select_id:
-                    selected_asset_obj = case_loc
-                    break
-                for witness in case_loc.witnesses:
-                    if witness.characterId == asset_to_select_id:
-                        selected_asset_obj = witness
-                        break
-                if selected_asset_obj: break
-
-        if selected_asset_obj:
-            control.select_asset(selected_asset_obj)
-        elif control.case_data.caseMeta and asset_to_select_id == "caseMeta":
-            control.select_asset(control.case_data.caseMeta)
+
+    update_suspects_view()
+    update_clue_list()
+    update_clue_form()
+    update_case_locations_view()
 
     return_tabs = ft.Tabs(
         selected_index=0,
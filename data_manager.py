@@ -12,6 +12,10 @@ def _sanitize_name(name: str) -> str:
     """Converts a human-readable name into a valid directory name."""
     return name.lower().replace(" ", "_").replace("-", "_")
 
+def get_case_path(case_name: str) -> Path:
+    """Returns the directory holding a case's data files."""
+    return CASES_DIR / _sanitize_name(case_name)
+
 def create_new_case(case_name: str) -> Path:
     """
     Creates the directory structure and initial empty files for a new case.
@@ -26,7 +30,7 @@ def create_new_case(case_name: str) -> Path:
         case_path: ["case_data.json"],
         world_data_path: [
             "districts.json", "locations.json", "factions.json",
-            "characters.json", "sleuth.json", "items.json"
+            "characters.json", "sleuth.json", "items.json", "events.json"
         ]
     }
 
@@ -76,6 +80,9 @@ def save_case(case_name: str, world_data: WorldData, case_data: CaseData):
     with open(world_data_path / "factions.json", "w") as f:
         json.dump([asdict(fac, dict_factory=dict_factory) for fac in world_data.factions], f, indent=4)
 
+    with open(world_data_path / "events.json", "w") as f:
+        json.dump([asdict(e, dict_factory=dict_factory) for e in world_data.events], f, indent=4)
+
     # Save the main case data
     with open(case_path / "case_data.json", "w") as f:
         json.dump(asdict(case_data, dict_factory=dict_factory), f, indent=4)
@@ -92,8 +99,8 @@ def load_case(case_name: str) -> Tuple[WorldData, CaseData]:
         raise FileNotFoundError(f"Case '{case_name}' not found at {case_path}")
 
     # Dynamically import schemas to avoid circular dependencies if they grow
-    from schemas import Character, Location, District, Faction, Sleuth, Item
-    from schemas import CaseData, CaseMeta, Clue, CaseSuspect, CaseLocation, InterviewQuestion, CaseWitness
+    from schemas import Character, Location, District, Faction, Sleuth, Item, LoreEvent
+    from schemas import CaseData, CaseMeta, Clue, CaseSuspect, CaseLocation, InterviewQuestion, CaseWitness, Whereabout, ChainEvent, ChainLink
 
     def _load_from_file(path: Path, data_class: Type):
         if path.exists() and path.stat().st_size > 2:
@@ -111,6 +118,7 @@ def load_case(case_name: str) -> Tuple[WorldData, CaseData]:
     factions = _load_from_file(world_data_path / "factions.json", Faction)
     sleuth = _load_from_file(world_data_path / "sleuth.json", Sleuth)
     items = _load_from_file(world_data_path / "items.json", Item)
+    events = _load_from_file(world_data_path / "events.json", LoreEvent)
 
     world_data = WorldData(
         characters=characters,
@@ -118,7 +126,8 @@ def load_case(case_name: str) -> Tuple[WorldData, CaseData]:
         districts=districts,
         factions=factions,
         sleuth=sleuth,
-        items=items
+        items=items,
+        events=events,
     )
 
     # Load case data with nested reconstruction
@@ -150,6 +159,15 @@ def load_case(case_name: str) -> Tuple[WorldData, CaseData]:
             reconstructed_locations.append(CaseLocation(**loc_data))
         case_data_dict['caseLocations'] = reconstructed_locations
 
+    if 'whereabouts' in case_data_dict:
+        case_data_dict['whereabouts'] = [Whereabout(**w) for w in case_data_dict['whereabouts']]
+
+    if 'eventChain' in case_data_dict:
+        case_data_dict['eventChain'] = [ChainEvent(**e) for e in case_data_dict['eventChain']]
+
+    if 'chainLinks' in case_data_dict:
+        case_data_dict['chainLinks'] = [ChainLink(**l) for l in case_data_dict['chainLinks']]
+
     case_data = CaseData(**case_data_dict)
 
     return world_data, case_data
@@ -0,0 +1,393 @@
+# event_chain.py
+"""
+Chronological consistency of the case's eventChain.
+
+Every ChainEvent has a start and an end time variable, and every rule about
+them is a difference constraint of the form x_target - x_source <= weight:
+
+    end - start >= minDuration and, when set, <= maxDuration
+    start and end >= 0 (nothing happens before the case starts)
+    start == the pinned start, when an event is pinned
+    the crime event starts inside CaseMeta's crime window
+    after.start - before.end >= minGap and, when set, <= maxGap (ChainLinks)
+
+The rules can all hold at once exactly when the constraint graph (an edge
+source -> target of length weight per constraint) has no negative cycle. The
+solver keeps the shortest distances R from the case start in the reversed
+graph. Then -R is the earliest schedule that satisfies every rule, and a
+negative cycle is a loop of rules that contradict each other.
+
+A full solve is a vectorized Bellman-Ford. After that, edits only mark the
+events and links they touch as dirty. The next query rebuilds the rules of
+those assets alone, and folds new or tightened rules in one at a time with
+the incremental algorithm of Cotton and Maler: a Dijkstra pass over the nodes
+whose distance drops, ordered by how far they drop. It only touches the part
+of the chain that moves, and it finds any negative cycle the new rule closes.
+A rule that would close a cycle is rejected and reported as a ChainConflict.
+Removed or loosened rules fall back to a full solve.
+"""
+import heapq
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from schemas import CaseData, CaseMeta, ChainEvent, ChainLink
+
+ORIGIN = 0
+META_FIELDS = {"crimeWindowStart", "crimeWindowEnd", None}
+UNTIMED_FIELDS = {"description", "characters", "locationId"}  # ChainEvent edits that change no rule.
+
+Key = Tuple[Any, ...]
+Owner = Tuple[str, str]  # ("event", id) or ("link", id)
+
+
+@dataclass(frozen=True)
+class Constraint:
+    """x[target] - x[source] <= weight, with the rule it came from."""
+    key: Key
+    source: int
+    target: int
+    weight: float
+    template: str  # Explanation; {0}, {1} stand for the names of `events`.
+    events: Tuple[str, ...]
+
+    def reason(self, names: Dict[str, str]) -> str:
+        return self.template.format(*(names.get(event_id, event_id) for event_id in self.events))
+
+
+@dataclass
+class ChainConflict:
+    constraint: Constraint  # The rule that was rejected.
+    cycle: List[Constraint]  # The rules it contradicts, including itself.
+
+    @property
+    def events(self) -> List[str]:
+        return list(dict.fromkeys(event_id for c in self.cycle for event_id in c.events))
+
+    def describe(self, names: Dict[str, str]) -> str:
+        reasons = dict.fromkeys(c.reason(names) for c in self.cycle if c.key[0] not in ("start", "end"))
+        return "These cannot all be true: " + "; ".join(reasons) + "."
+
+
+def event_names(case_data: CaseData) -> Dict[str, str]:
+    return {event.id: event.description or event.id for event in case_data.eventChain}
+
+
+def format_minutes(minutes: float) -> str:
+    """Minutes from the start of the case as day and clock time, e.g. 'D1 08:30'."""
+    minutes = int(round(minutes))
+    day, rest = divmod(minutes, 24 * 60)
+    return f"D{day + 1} {rest // 60:02d}:{rest % 60:02d}"
+
+
+def start_node(i: int) -> int:
+    return 1 + 2 * i
+
+
+def end_node(i: int) -> int:
+    return 2 + 2 * i
+
+
+def event_constraints(event: ChainEvent, i: int, meta: Optional[CaseMeta]) -> Dict[Key, Constraint]:
+    s, e, ids = start_node(i), end_node(i), (event.id,)
+    rules = [
+        Constraint(("start", event.id), s, ORIGIN, 0.0, "'{0}' happens after the case starts", ids),
+        Constraint(("end", event.id), e, ORIGIN, 0.0, "'{0}' happens after the case starts", ids),
+        Constraint(("minDuration", event.id), e, s, -float(max(event.minDuration or 0, 0)), f"'{{0}}' lasts at least {event.minDuration or 0} minutes", ids),
+    ]
+    if event.maxDuration is not None:
+        rules.append(Constraint(("maxDuration", event.id), s, e, float(event.maxDuration), f"'{{0}}' lasts at most {event.maxDuration} minutes", ids))
+    if event.start is not None:
+        pinned = f"'{{0}}' is pinned at {format_minutes(event.start)}"
+        rules.append(Constraint(("pin", event.id, "late"), ORIGIN, s, float(event.start), pinned, ids))
+        rules.append(Constraint(("pin", event.id, "early"), s, ORIGIN, -float(event.start), pinned, ids))
+    if event.isCrime and meta is not None:
+        if meta.crimeWindowStart is not None:
+            rules.append(Constraint(("window", event.id, "early"), s, ORIGIN, -float(meta.crimeWindowStart), f"the crime '{{0}}' starts after {format_minutes(meta.crimeWindowStart)}", ids))
+        if meta.crimeWindowEnd is not None:
+            rules.append(Constraint(("window", event.id, "late"), ORIGIN, s, float(meta.crimeWindowEnd), f"the crime '{{0}}' starts before {format_minutes(meta.crimeWindowEnd)}", ids))
+    return {rule.key: rule for rule in rules}
+
+
+def link_constraints(link: ChainLink, index: Dict[str, int]) -> Dict[Key, Constraint]:
+    if link.before not in index or link.after not in index or link.before == link.after:
+        return {}
+    before_end, after_start, ids = end_node(index[link.before]), start_node(index[link.after]), (link.before, link.after)
+    gap = link.minGap or 0
+    template = f"'{{1}}' starts at least {gap} minutes after '{{0}}' ends" if gap else "'{1}' starts after '{0}' ends"
+    rules = [Constraint(("minGap", link.id), after_start, before_end, -float(gap), template, ids)]
+    if link.maxGap is not None:
+        rules.append(Constraint(("maxGap", link.id), before_end, after_start, float(link.maxGap), f"'{{1}}' starts within {link.maxGap} minutes of '{{0}}' ending", ids))
+    return {rule.key: rule for rule in rules}
+
+
+def chain_constraints(case_data: CaseData, index: Dict[str, int]) -> Dict[Owner, Dict[Key, Constraint]]:
+    """Every rule of the eventChain, grouped by the event or link it comes from."""
+    rules: Dict[Owner, Dict[Key, Constraint]] = {}
+    for event in case_data.eventChain:
+        rules[("event", event.id)] = event_constraints(event, index[event.id], case_data.caseMeta)
+    for link in case_data.chainLinks:
+        rules[("link", link.id)] = link_constraints(link, index)
+    return rules
+
+
+def bellman_ford(n: int, constraints: Iterable[Constraint], reverse: bool = True, initial: float = 0.0) -> Optional[np.ndarray]:
+    """
+    Shortest distances from ORIGIN with every node also reachable at
+    `initial`, or None on a negative cycle. With `reverse` the edges run
+    target -> source, which yields -earliest times. Otherwise they run
+    source -> target, which yields the latest times (inf where unbounded).
+    """
+    constraints = list(constraints)
+    sources = np.array([c.target if reverse else c.source for c in constraints], dtype=np.int64)
+    targets = np.array([c.source if reverse else c.target for c in constraints], dtype=np.int64)
+    weights = np.array([c.weight for c in constraints], dtype=np.float64)
+    dist = np.full(n, initial)
+    dist[ORIGIN] = 0.0
+    for _ in range(n + 1):
+        relaxed = dist.copy()
+        np.minimum.at(relaxed, targets, dist[sources] + weights)
+        if np.array_equal(relaxed, dist):
+            return dist
+        dist = relaxed
+    return None
+
+
+class ChainSolver:
+    def __init__(self):
+        self.case_data: Optional[CaseData] = None
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.dist = np.zeros(1)  # Reversed-graph distances; earliest times are -dist.
+        self.rules: Dict[Owner, Dict[Key, Constraint]] = {}  # Every current rule, accepted or not.
+        self.accepted: Dict[Key, Constraint] = {}
+        self.conflicts: List[ChainConflict] = []
+        self._out: Dict[int, Dict[Key, Constraint]] = {}  # Reversed-graph adjacency of the accepted rules.
+        self._dirty: Set[Owner] = set()
+        self._full = True
+        self._stale = False
+        self.full_solves = 0  # For tests and profiling.
+
+    def reset(self, case_data: CaseData):
+        """Switches to another case; the chain is solved on first use."""
+        self.case_data = case_data
+        self._full = self._stale = True
+
+    def on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        """Change listener: marks the events and links an edit touches as dirty."""
+        asset_type = type(asset).__name__
+        if asset_type == "ChainEvent" and attribute_name not in UNTIMED_FIELDS:
+            self._dirty.add(("event", asset.id))
+        elif asset_type == "ChainLink":
+            self._dirty.add(("link", asset.id))
+        elif asset_type == "CaseMeta" and attribute_name in META_FIELDS and self.case_data is not None:
+            self._dirty.update(("event", event.id) for event in self.case_data.eventChain if event.isCrime)
+        else:
+            return
+        if attribute_name == "id":
+            self._full = True  # The old id is gone; nothing short of a rebuild finds its rules.
+        self._stale = True
+
+    # --- Queries ---
+
+    def earliest(self, event_id: str) -> Optional[Tuple[float, float]]:
+        """The earliest (start, end) of an event consistent with every accepted rule."""
+        self._sync()
+        i = self.index.get(event_id)
+        if i is None:
+            return None
+        return self._time(start_node(i)), self._time(end_node(i))
+
+    def schedule(self) -> Dict[str, Tuple[float, float]]:
+        self._sync()
+        return {event_id: (self._time(start_node(i)), self._time(end_node(i))) for event_id, i in self.index.items()}
+
+    def current_conflicts(self) -> List[ChainConflict]:
+        self._sync()
+        return self.conflicts
+
+    def window(self, event_id: str) -> Tuple[float, float, List[str], List[str]]:
+        """
+        The start times `event_id` could be pinned at without breaking any
+        other rule, as (earliest, latest, reasons bounding the earliest,
+        reasons bounding the latest). Rejected rules count too when they are
+        consistent without the event's pin, so dragging a pinned event out of
+        a conflict shows where it has to go. Used while an event is dragged.
+        """
+        self._sync()
+        node = start_node(self.index[event_id])
+        n = len(self.dist)
+        rules = [c for key, c in self.accepted.items() if key[:2] != ("pin", event_id)]
+        backward = None
+        if self.conflicts:
+            with_rejected = rules + [c.constraint for c in self.conflicts if c.constraint.key[:2] != ("pin", event_id)]
+            backward = bellman_ford(n, with_rejected, reverse=True)
+            if backward is not None:
+                rules = with_rejected
+        if backward is None:
+            # A subset of the accepted rules cannot contain a cycle.
+            backward = bellman_ford(n, rules, reverse=True)
+        forward = bellman_ford(n, rules, reverse=False, initial=np.inf)
+        earliest, latest = 0.0 - backward[node], forward[node]
+        names = event_names(self.case_data)
+        return (
+            float(earliest), float(latest),
+            self._tight_reasons(rules, backward, node, True, names),
+            self._tight_reasons(rules, forward, node, False, names) if np.isfinite(latest) else [],
+        )
+
+    def _time(self, node: int) -> float:
+        return 0.0 - float(self.dist[node])
+
+    @staticmethod
+    def _tight_reasons(rules: List[Constraint], dist: np.ndarray, node: int, reverse: bool, names: Dict[str, str]) -> List[str]:
+        """Walks tight edges back from `node` to the case start: the chain of rules that sets its bound."""
+        incoming: Dict[int, List[Tuple[int, Constraint]]] = {}
+        for c in rules:
+            u, v = (c.target, c.source) if reverse else (c.source, c.target)
+            incoming.setdefault(v, []).append((u, c))
+        reasons, seen = [], {node}
+        while node != ORIGIN:
+            step = next(((u, c) for u, c in incoming.get(node, ()) if u not in seen and np.isclose(dist[u] + c.weight, dist[node])), None)
+            if step is None:
+                break
+            node = step[0]
+            seen.add(node)
+            if step[1].key[0] not in ("start", "end"):
+                reasons.append(step[1].reason(names))
+        return list(dict.fromkeys(reasons))
+
+    # --- Maintenance ---
+
+    def _sync(self):
+        if not self._stale or self.case_data is None:
+            return
+        self._stale = False
+        dirty, self._dirty = self._dirty, set()
+        ids = [event.id for event in self.case_data.eventChain]
+        if self._full or len(set(ids)) != len(ids) or not set(self.index) <= set(ids):
+            # First use, renamed ids, or removed or duplicated events that shift nodes around.
+            self._solve(ids)
+            return
+        for event_id in ids:
+            if event_id not in self.index:
+                # New events start out unconstrained at the case start.
+                self.index[event_id] = len(self.ids)
+                self.ids.append(event_id)
+                self.dist = np.r_[self.dist, 0.0, 0.0]
+                dirty.add(("event", event_id))
+
+        events = {event.id: event for event in self.case_data.eventChain}
+        links = {link.id: link for link in self.case_data.chainLinks} if any(kind == "link" for kind, _ in dirty) else {}
+        rebuilt: Dict[Owner, Dict[Key, Constraint]] = {}
+        for owner in dirty:
+            kind, owner_id = owner
+            if kind == "event":
+                rebuilt[owner] = event_constraints(events[owner_id], self.index[owner_id], self.case_data.caseMeta)
+            else:
+                rebuilt[owner] = link_constraints(links[owner_id], self.index) if owner_id in links else {}
+        for owner, rules in rebuilt.items():
+            for key, old in self.rules.get(owner, {}).items():
+                if key not in self.accepted:
+                    continue
+                new = rules.get(key)
+                if new is None or new.weight > old.weight or (new.source, new.target) != (old.source, old.target):
+                    # A removed or loosened rule may have been holding distances down.
+                    self.rules.update(rebuilt)
+                    self._solve(ids, {owner: rules for owner, rules in self.rules.items() if rules})
+                    return
+
+        # Only new or tightened rules: fold them in one at a time.
+        rejected = {conflict.constraint.key: conflict for conflict in self.conflicts}
+        for owner, rules in rebuilt.items():
+            for key in self.rules.get(owner, {}).keys() - rules.keys():
+                if key in rejected:
+                    self.conflicts.remove(rejected.pop(key))
+            self.rules[owner] = rules
+            for key, new in rules.items():
+                conflict = rejected.get(key)
+                if conflict is not None:
+                    if conflict.constraint == new:
+                        continue
+                    self.conflicts.remove(conflict)
+                old = self.accepted.get(key)
+                if old is not None and old.weight == new.weight:
+                    continue
+                self.add(new)
+            if not rules:
+                del self.rules[owner]
+
+    def _solve(self, ids: List[str], rules: Optional[Dict[Owner, Dict[Key, Constraint]]] = None):
+        self.full_solves += 1
+        self._full = False
+        self.ids = list(dict.fromkeys(ids))
+        self.index = {event_id: i for i, event_id in enumerate(self.ids)}
+        self.rules = rules if rules is not None else chain_constraints(self.case_data, self.index)
+        constraints = [c for owned in self.rules.values() for c in owned.values()]
+        n = 1 + 2 * len(self.ids)
+        dist = bellman_ford(n, constraints)
+        self.conflicts, self.accepted, self._out = [], {}, {}
+        if dist is not None:
+            self.dist = dist
+            for constraint in constraints:
+                self._link(constraint)
+            return
+        # Some rules contradict each other: add them one by one and reject the ones that close a cycle.
+        self.dist = np.zeros(n)
+        for constraint in constraints:
+            self.add(constraint)
+
+    def add(self, constraint: Constraint) -> Optional[ChainConflict]:
+        """
+        Folds one new or tightened rule into the solution, or rejects it and
+        returns the conflict when it closes a negative cycle.
+        """
+        u, v, w = constraint.target, constraint.source, constraint.weight
+        if self.dist[u] + w >= self.dist[v]:
+            self._link(constraint)
+            return None
+        # Dijkstra over the decrease of each node's distance, most negative first.
+        decrease = {v: self.dist[u] + w - self.dist[v]}
+        via: Dict[int, Constraint] = {v: constraint}
+        settled: Dict[int, float] = {}
+        heap = [(decrease[v], v)]
+        while heap:
+            delta, x = heapq.heappop(heap)
+            if x in settled:
+                continue
+            if x == u:
+                conflict = ChainConflict(constraint, self._cycle(via, u, v, constraint))
+                self.conflicts.append(conflict)
+                return conflict
+            settled[x] = self.dist[x] + delta
+            for edge in self._out.get(x, {}).values():
+                y = edge.source
+                if y in settled:
+                    continue
+                candidate = settled[x] + edge.weight - self.dist[y]
+                if candidate < decrease.get(y, 0.0):
+                    decrease[y] = candidate
+                    via[y] = edge
+                    heapq.heappush(heap, (candidate, y))
+        for x, value in settled.items():
+            self.dist[x] = value
+        self._link(constraint)
+        return None
+
+    @staticmethod
+    def _cycle(via: Dict[int, Constraint], u: int, v: int, constraint: Constraint) -> List[Constraint]:
+        cycle, node = [], u
+        while node != v:
+            edge = via[node]
+            cycle.append(edge)
+            node = edge.target
+        cycle.append(constraint)
+        return cycle[::-1]
+
+    def _link(self, constraint: Constraint):
+        old = self.accepted.get(constraint.key)
+        if old is not None:
+            self._out[old.target].pop(old.key, None)
+        self.accepted[constraint.key] = constraint
+        self._out.setdefault(constraint.target, {})[constraint.key] = constraint
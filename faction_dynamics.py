@@ -1,10 +1,165 @@
+import threading
+from typing import Any, Optional
+
 import flet as ft
+import flet.canvas as cv
+import numpy as np
+
 from my_control import Control
+from faction_sim import CONTROL_THRESHOLD, FactionSimulation, Scenario, build_faction_model, collapse_scenarios
+
+CELL_WIDTH = 56
+CELL_HEIGHT = 22
+LABEL_WIDTH = 160
+HEADER_HEIGHT = 90
+PUBLISH_EVERY = 10  # Steps between streamed updates.
+MODEL_TYPES = {"Faction", "District", "Location", "Character"}
+
+
+class FactionDynamicsView:
+    """
+    Runs faction_sim on a worker thread and streams the control shares into a
+    faction-by-district heat grid every few steps. In "collapse" mode every
+    faction's collapse is simulated alongside the baseline in one batch, and
+    the outcomes are ranked by how many districts change hands.
+    """
+
+    def __init__(self, control: Control):
+        self.control = control
+        self.simulation: Optional[FactionSimulation] = None
+        self.state: Optional[np.ndarray] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self.mode = ft.Dropdown(
+            label="Scenarios", width=220, value="baseline",
+            options=[ft.dropdown.Option(key="baseline", text="Baseline only"), ft.dropdown.Option(key="collapse", text="Each faction collapses")],
+        )
+        self.steps = ft.TextField(label="Steps", value="200", width=90, keyboard_type=ft.KeyboardType.NUMBER)
+        self.scenario_picker = ft.Dropdown(label="Show scenario", width=280, on_change=lambda e: self._redraw())
+        self.status = ft.Text()
+        self.progress = ft.ProgressBar(width=300, value=0)
+        self.grid = cv.Canvas(width=LABEL_WIDTH, height=HEADER_HEIGHT)
+        self.outcomes = ft.Column(spacing=2)
+        self.view = ft.Column(
+            [
+                ft.Text("Faction Dynamics", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
+                ft.Row([
+                    self.mode, self.steps,
+                    ft.ElevatedButton("Run", icon=ft.Icons.PLAY_ARROW, on_click=lambda e: self.run()),
+                    ft.OutlinedButton("Stop", icon=ft.Icons.STOP, on_click=lambda e: self.stop()),
+                    self.progress, self.status,
+                ]),
+                self.scenario_picker,
+                ft.Row([self.grid], scroll=ft.ScrollMode.AUTO),
+                ft.Text("Outcomes", style=ft.TextThemeStyle.TITLE_MEDIUM),
+                self.outcomes,
+            ],
+            scroll=ft.ScrollMode.AUTO,
+        )
+        control.add_change_listener(self._on_asset_changed)
+
+    # --- Running ---
+
+    def run(self):
+        try:
+            steps = max(int(self.steps.value), 1)
+        except (TypeError, ValueError):
+            self.steps.error_text = "Enter a number"
+            self._update()
+            return
+        self.steps.error_text = None
+        model = build_faction_model(self.control.world_data)
+        scenarios = collapse_scenarios(model) if self.mode.value == "collapse" else [Scenario("Baseline")]
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self.simulation = FactionSimulation(model, scenarios)
+            self.state = self.simulation.state.copy()
+        self.scenario_picker.options = [ft.dropdown.Option(key=str(i), text=s.name) for i, s in enumerate(scenarios)]
+        self.scenario_picker.value = "0"
+        self.outcomes.controls = []
+        self.progress.value = 0
+        self.status.value = f"{len(scenarios)} scenario(s), {len(model.faction_ids)} factions x {len(model.district_ids)} districts"
+        self._redraw()
+        threading.Thread(target=self._run, args=(generation, self.simulation, steps), daemon=True).start()
+
+    def stop(self):
+        with self._lock:
+            self._generation += 1
+
+    def _run(self, generation: int, simulation: FactionSimulation, steps: int):
+        def stale():
+            return generation != self._generation
+
+        def publish(step: int, state: np.ndarray):
+            with self._lock:
+                if stale():
+                    return
+                self.state = state
+            self.progress.value = step / steps
+            self._redraw()
+
+        simulation.run(steps, every=PUBLISH_EVERY, callback=publish, should_stop=stale)
+        if not stale():
+            self._show_outcomes(simulation)
+            self._update()
+
+    def _on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        if self.simulation is not None and type(asset).__name__ in MODEL_TYPES:
+            self.status.value = "The world has changed since this run; run again to include the edits."
+
+    # --- Display ---
+
+    def _redraw(self):
+        simulation, state = self.simulation, self.state
+        if simulation is None or state is None:
+            return
+        model = simulation.model
+        s = int(self.scenario_picker.value or 0)
+        shares = state[s]
+        dominant = np.where(shares.max(axis=0) >= CONTROL_THRESHOLD, shares.argmax(axis=0), -1) if len(shares) else []
+        shapes = []
+        for d, name in enumerate(model.district_names):
+            shapes.append(cv.Text(LABEL_WIDTH + d * CELL_WIDTH + 4, HEADER_HEIGHT - 8, name[:14], style=ft.TextStyle(size=11), rotate=-0.9))
+        for f, name in enumerate(model.faction_names):
+            y = HEADER_HEIGHT + f * CELL_HEIGHT
+            dead = simulation.alive[s, f] == 0
+            shapes.append(cv.Text(4, y + 4, name[:24], style=ft.TextStyle(size=12, decoration=ft.TextDecoration.LINE_THROUGH if dead else None)))
+            for d in range(len(model.district_ids)):
+                x = LABEL_WIDTH + d * CELL_WIDTH
+                share = float(shares[f, d])
+                shapes.append(cv.Rect(x, y, CELL_WIDTH - 2, CELL_HEIGHT - 2, paint=ft.Paint(color=ft.Colors.with_opacity(min(share, 1.0), ft.Colors.DEEP_ORANGE_400))))
+                if dominant[d] == f:
+                    shapes.append(cv.Rect(x, y, CELL_WIDTH - 2, CELL_HEIGHT - 2, paint=ft.Paint(color=ft.Colors.WHITE, stroke_width=2, style=ft.PaintingStyle.STROKE)))
+                if share >= 0.05:
+                    shapes.append(cv.Text(x + 4, y + 4, f"{share:.0%}", style=ft.TextStyle(size=10)))
+        self.grid.width = LABEL_WIDTH + CELL_WIDTH * len(model.district_ids)
+        self.grid.height = HEADER_HEIGHT + CELL_HEIGHT * len(model.faction_ids)
+        self.grid.shapes = shapes
+        self._update()
+
+    def _show_outcomes(self, simulation: FactionSimulation):
+        if len(simulation.scenarios) < 2:
+            self.outcomes.controls = []
+            return
+        model = simulation.model
+        changes = simulation.changes_against_baseline()
+        totals = simulation.state.sum(axis=2)  # (S, F) control summed over districts
+        gains = totals - totals[0]
+        rows = []
+        for s in np.argsort(-changes[1:], kind="stable") + 1:
+            gainer = int(gains[s].argmax())
+            text = f"{simulation.scenarios[s].name}: {changes[s]} district(s) change hands"
+            if gains[s, gainer] > 0.005:
+                text += f"; biggest gainer {model.faction_names[gainer]} (+{gains[s, gainer]:.2f} districts' worth)"
+            rows.append(ft.Text(text))
+        self.outcomes.controls = rows
+
+    def _update(self):
+        if self.view.page:
+            self.view.update()
+
 
 def build_faction_dynamics_view(control: Control):
-    return ft.Column(
-        [
-            ft.Text("Faction Dynamics Map (Under Construction)", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
-            ft.Text("This section will allow you to visualize and manage faction relationships."),
-        ]
-    )
\ No newline at end of file
+    return FactionDynamicsView(control).view
@@ -0,0 +1,204 @@
+# faction_sim.py
+"""
+Faction influence simulation over the city's districts.
+
+The world is boiled down to a FactionModel of plain arrays: a strength per
+faction (reach and membership), a signed faction-by-faction relation matrix
+(allies +1, enemies -1), a row-normalized district adjacency taken from the
+map's travel routes, and the starting control each faction has over each
+district (dominance, owned locations, headquarters, resident members).
+
+A FactionSimulation steps a whole batch of scenarios at once. Its state is
+an (S, F, D) array of control shares, and one step is a handful of matrix
+products over it. Each faction presses on each district with its strength
+times its presence there and next door, amplified by allies in the same
+district and backed by its fixed footholds; shares then move part of the way
+toward the split of those pressures (against the unaligned population), and
+enemies sharing a district wear each other down. Nothing
+loops over factions, districts or scenarios in Python, so hundreds of
+"what if this faction collapses" runs are one simulation.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from routing import travel_edges
+from schemas import WorldData
+
+REACH = {None: 1.0, "Local": 1.0, "District-wide": 1.5, "City-wide": 2.0, "Regional": 2.5, "Global": 3.0}
+# Starting presence a faction gets in a district from each kind of foothold.
+DOMINANCE_PRESENCE = 3.0
+HEADQUARTERS_PRESENCE = 2.0
+OWNED_LOCATION_PRESENCE = 1.0
+MEMBER_PRESENCE = 0.5
+CONTROL_THRESHOLD = 0.2  # Share needed to count as a district's dominant faction.
+
+
+@dataclass
+class FactionModel:
+    faction_ids: List[str]
+    faction_names: List[str]
+    district_ids: List[str]
+    district_names: List[str]
+    strength: np.ndarray  # (F,)
+    relations: np.ndarray  # (F, F), +1 allies, -1 enemies
+    adjacency: np.ndarray  # (D, D), rows sum to 1 where a district has neighbours
+    initial: np.ndarray  # (F, D) control shares, each column summing to at most 1
+
+
+@dataclass
+class Scenario:
+    name: str
+    collapsed: Tuple[str, ...] = ()  # Faction ids removed from the board.
+    strength_factors: Dict[str, float] = field(default_factory=dict)  # Faction id -> multiplier.
+
+
+def build_faction_model(world_data: WorldData) -> FactionModel:
+    factions, districts = world_data.factions, world_data.districts
+    f_index = {f.id: i for i, f in enumerate(factions)}
+    d_index = {d.id: i for i, d in enumerate(districts)}
+    F, D = len(factions), len(districts)
+
+    relations = np.zeros((F, F))
+    for i, faction in enumerate(factions):
+        for other in faction.allyFactions:
+            if other in f_index:
+                relations[i, f_index[other]] = relations[f_index[other], i] = 1.0
+    for i, faction in enumerate(factions):
+        # Enmity wins over a one-sided alliance.
+        for other in faction.enemyFactions:
+            if other in f_index:
+                relations[i, f_index[other]] = relations[f_index[other], i] = -1.0
+    np.fill_diagonal(relations, 0.0)
+
+    members = np.array([len(f.members) for f in factions], dtype=float)
+    reach = np.array([REACH.get(f.influence, 1.0) for f in factions])
+    strength = reach * (1.0 + np.log1p(members))
+
+    location_district = {l.id: l.district for l in world_data.locations}
+    presence = np.zeros((F, D))
+
+    def add(faction_id: Optional[str], district_id: Optional[str], amount: float):
+        if faction_id in f_index and district_id in d_index:
+            presence[f_index[faction_id], d_index[district_id]] += amount
+
+    for district in districts:
+        add(district.dominantFaction, district.id, DOMINANCE_PRESENCE)
+    for faction in factions:
+        add(faction.id, location_district.get(faction.headquarters), HEADQUARTERS_PRESENCE)
+    for location in world_data.locations:
+        add(location.owningFaction, location.district, OWNED_LOCATION_PRESENCE)
+    member_of = {m: f.id for f in factions for m in f.members}
+    for character in world_data.characters:
+        add(character.faction or member_of.get(character.id), character.district, MEMBER_PRESENCE)
+    # Every faction starts with a foothold proportional to its reach; one unit of
+    # presence per district stays unaligned.
+    presence += 0.1 * (reach[:, None] - 1.0)
+    initial = presence / (presence.sum(axis=0, keepdims=True) + 1.0) if F else presence
+
+    # Districts are adjacent when a route joins them or places inside them.
+    place_district = {d.id: d.id for d in districts}
+    place_district.update(location_district)
+    adjacency = np.zeros((D, D))
+    for a, b in travel_edges(world_data):
+        da, db = d_index.get(place_district.get(a)), d_index.get(place_district.get(b))
+        if da is not None and db is not None and da != db:
+            adjacency[da, db] = adjacency[db, da] = 1.0
+    degree = adjacency.sum(axis=1, keepdims=True)
+    adjacency = np.divide(adjacency, degree, out=np.zeros_like(adjacency), where=degree > 0)
+
+    return FactionModel(
+        faction_ids=[f.id for f in factions],
+        faction_names=[f.name for f in factions],
+        district_ids=[d.id for d in districts],
+        district_names=[d.name for d in districts],
+        strength=strength,
+        relations=relations,
+        adjacency=adjacency,
+        initial=initial,
+    )
+
+
+def collapse_scenarios(model: FactionModel) -> List[Scenario]:
+    """The baseline followed by one scenario per faction in which it collapses."""
+    return [Scenario("Baseline")] + [
+        Scenario(f"{name} collapses", collapsed=(faction_id,))
+        for faction_id, name in zip(model.faction_ids, model.faction_names)
+    ]
+
+
+class FactionSimulation:
+    def __init__(self, model: FactionModel, scenarios: Sequence[Scenario], rate: float = 0.1, spread: float = 0.3, support: float = 0.5, conflict: float = 0.4, anchor: float = 1.0, neutral: float = 0.5):
+        """
+        `rate` is how far shares move toward their contested target per step,
+        `spread` how much presence in adjacent districts counts, `support` and
+        `conflict` how strongly allies and enemies in the same district matter,
+        `anchor` the weight of the starting footholds (headquarters, owned
+        locations), which keep local powers from being swept away, and
+        `neutral` the pressure of the unaligned population.
+        """
+        self.model = model
+        self.scenarios = list(scenarios)
+        self.rate, self.spread, self.support, self.conflict, self.anchor, self.neutral = rate, spread, support, conflict, anchor, neutral
+        S, F = len(self.scenarios), len(model.faction_ids)
+        f_index = {faction_id: i for i, faction_id in enumerate(model.faction_ids)}
+
+        self.alive = np.ones((S, F))
+        factors = np.ones((S, F))
+        for s, scenario in enumerate(self.scenarios):
+            for faction_id in scenario.collapsed:
+                if faction_id in f_index:
+                    self.alive[s, f_index[faction_id]] = 0.0
+            for faction_id, factor in scenario.strength_factors.items():
+                if faction_id in f_index:
+                    factors[s, f_index[faction_id]] = factor
+        self.strength = model.strength[None, :] * factors  # (S, F)
+        self.allies = np.maximum(model.relations, 0.0)
+        self.enemies = np.maximum(-model.relations, 0.0)
+
+        self.state = model.initial[None, :, :] * self.alive[:, :, None]  # (S, F, D)
+        self.tension = np.zeros((S, model.initial.shape[1]))  # (S, D) influence lost to conflict in the last step
+        self.steps_run = 0
+
+    def step(self, steps: int = 1) -> np.ndarray:
+        X = self.state
+        strength = self.strength[:, :, None]
+        alive = self.alive[:, :, None]
+        footholds = self.anchor * self.model.initial[None, :, :] * alive
+        for _ in range(steps):
+            presence = X + self.spread * (X @ self.model.adjacency)
+            pressure = (strength * presence * (1.0 + self.support * (self.allies @ X)) + footholds) * alive
+            # The share each faction would settle at if this step's pressures held.
+            target = pressure / (pressure.sum(axis=1, keepdims=True) + self.neutral)
+            loss = self.conflict * X * (self.enemies @ X)
+            X = np.maximum((1.0 - self.rate) * X + self.rate * target - loss, 0.0)
+            # Shares in a district never add up to more than the whole district.
+            X = X / np.maximum(X.sum(axis=1, keepdims=True), 1.0)
+            self.tension = loss.sum(axis=1)
+        self.state = X
+        self.steps_run += steps
+        return X
+
+    def run(self, steps: int, every: int = 10, callback: Optional[Callable[[int, np.ndarray], None]] = None, should_stop: Callable[[], bool] = lambda: False) -> np.ndarray:
+        """Runs `steps` steps, handing a copy of the state to `callback` every `every` steps."""
+        done = 0
+        while done < steps and not should_stop():
+            chunk = min(every, steps - done)
+            self.step(chunk)
+            done += chunk
+            if callback:
+                callback(self.steps_run, self.state.copy())
+        return self.state
+
+    def dominant(self, threshold: float = CONTROL_THRESHOLD) -> np.ndarray:
+        """(S, D) index of the faction controlling each district, or -1 where nobody holds `threshold`."""
+        if not self.model.faction_ids:
+            return np.full(self.state.shape[::2], -1)
+        best = self.state.argmax(axis=1)
+        return np.where(self.state.max(axis=1) >= threshold, best, -1)
+
+    def changes_against_baseline(self, baseline: int = 0) -> np.ndarray:
+        """(S,) number of districts whose controller differs from scenario `baseline`."""
+        dominant = self.dominant()
+        return (dominant != dominant[baseline]).sum(axis=1)
@@ -0,0 +1,302 @@
+# form_specs.py
+"""
+Schema-driven field specifications for the asset forms.
+
+Each asset type maps to a tuple of sections, and each section to the fields it
+shows. The form templates in asset_forms.py are built once per asset type from
+these specs and rebound to whichever asset is selected, so nothing here refers
+to a concrete asset object.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Literal, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+
+import schemas
+
+FieldKind = Literal["text", "multiline", "int", "list", "choice", "ref", "bool", "image"]
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    attr: str
+    label: str
+    kind: FieldKind = "text"
+    tooltip: Optional[str] = None
+    # Asset type referenced by the value; adds a "go to" button, and "ref"
+    # fields pick their value from that type's shared option list.
+    link_type: Optional[str] = None
+    ai: bool = False  # Adds a STARS button that fills the field with generated text.
+
+
+@dataclass(frozen=True)
+class SectionSpec:
+    title: str
+    fields: Tuple[FieldSpec, ...]
+
+
+def field_choices(asset_type: type, attr: str) -> Tuple[Any, ...]:
+    """Returns the allowed values of a Literal (or Optional[Literal]) field."""
+    annotation = get_type_hints(asset_type)[attr]
+    if get_origin(annotation) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if get_origin(annotation) is Literal:
+        return get_args(annotation)
+    return ()
+
+
+def to_display(spec: FieldSpec, value: Any) -> Any:
+    """Converts a stored attribute value into the value shown by its input control."""
+    if spec.kind == "bool":
+        return bool(value)
+    if value is None:
+        return None if spec.kind in ("choice", "ref") else ""
+    if spec.kind == "list":
+        return ", ".join(value)
+    return str(value)
+
+
+def from_display(spec: FieldSpec, raw: Any) -> Any:
+    """
+    Converts an input control value back into the attribute value.
+    Raises ValueError when the text cannot be parsed for the field's kind.
+    """
+    if spec.kind == "bool":
+        return bool(raw)
+    if spec.kind == "list":
+        return [s.strip() for s in (raw or "").split(",") if s.strip()]
+    if spec.kind == "int":
+        raw = (raw or "").strip()
+        return int(raw) if raw else None
+    if spec.kind in ("choice", "ref"):
+        return raw or None
+    return raw
+
+
+FORM_SPECS: Dict[type, Tuple[SectionSpec, ...]] = {
+    schemas.Character: (
+        SectionSpec("Basic Info", (
+            FieldSpec("id", "ID", tooltip="Unique identifier for the character."),
+            FieldSpec("fullName", "Full Name", tooltip="The character's full name."),
+            FieldSpec("alias", "Alias", tooltip="Any known aliases or nicknames."),
+            FieldSpec("employment", "Employment", tooltip="The character's occupation or profession."),
+        )),
+        SectionSpec("Appearance", (
+            FieldSpec("age", "Age", "int", tooltip="The character's age."),
+            FieldSpec("gender", "Gender", "choice", tooltip="The character's gender."),
+            FieldSpec("image", "Image", "image", tooltip="URL or path to an image representing the character."),
+            FieldSpec("characteristics", "Characteristics", "list", tooltip="Comma-separated list of physical or behavioral characteristics."),
+        )),
+        SectionSpec("Personality", (
+            FieldSpec("biography", "Biography", "multiline", tooltip="A brief biography of the character.", ai=True),
+            FieldSpec("personality", "Personality", tooltip="A description of the character's personality.", ai=True),
+            FieldSpec("alignment", "Alignment", "choice", tooltip="The character's moral and ethical alignment."),
+            FieldSpec("archetype", "Archetype", tooltip="The character's archetype (e.g., 'Hero', 'Villain', 'Sidekick')."),
+            FieldSpec("values", "Values", "list", tooltip="Comma-separated list of the character's core values."),
+            FieldSpec("quirks", "Quirks", "list", tooltip="Comma-separated list of the character's unique quirks or habits."),
+        )),
+        SectionSpec("Social", (
+            FieldSpec("faction", "Faction", "ref", tooltip="The faction the character belongs to.", link_type="Faction"),
+            FieldSpec("wealthClass", "Wealth Class", "choice", tooltip="The character's wealth class."),
+            FieldSpec("district", "District", "ref", tooltip="The district the character primarily resides in.", link_type="District"),
+            FieldSpec("allies", "Allies", "list", tooltip="Comma-separated list of character IDs who are allies.", link_type="Character"),
+            FieldSpec("enemies", "Enemies", "list", tooltip="Comma-separated list of character IDs who are enemies.", link_type="Character"),
+        )),
+        SectionSpec("Author's Notes", (
+            FieldSpec("honesty", "Honesty", "int", tooltip="Character's honesty level (1-10)."),
+            FieldSpec("victimLikelihood", "Victim Likelihood", "int", tooltip="Likelihood of the character being a victim (1-10)."),
+            FieldSpec("killerLikelihood", "Killer Likelihood", "int", tooltip="Likelihood of the character being the killer (1-10)."),
+            FieldSpec("motivations", "Motivations", "list", tooltip="Comma-separated list of the character's motivations."),
+            FieldSpec("secrets", "Secrets", "list", tooltip="Comma-separated list of the character's secrets."),
+            FieldSpec("items", "Items", "list", tooltip="Comma-separated list of item IDs owned by the character.", link_type="Item"),
+            FieldSpec("flawsHandicapsLimitations", "Flaws/Handicaps/Limitations", "list", tooltip="Comma-separated list of flaws, handicaps, or limitations."),
+            FieldSpec("vulnerabilities", "Vulnerabilities", "list", tooltip="Comma-separated list of vulnerabilities."),
+            FieldSpec("voiceModel", "Voice Model", tooltip="Description of the character's voice."),
+            FieldSpec("dialogueStyle", "Dialogue Style", tooltip="Description of the character's dialogue style."),
+            FieldSpec("expertise", "Expertise", "list", tooltip="Comma-separated list of areas of expertise."),
+            FieldSpec("portrayalNotes", "Portrayal Notes", tooltip="Notes for portraying the character."),
+        )),
+    ),
+    schemas.Location: (
+        SectionSpec("Basic Info", (
+            FieldSpec("id", "ID", tooltip="Unique identifier for the location."),
+            FieldSpec("name", "Name", tooltip="The name of the location."),
+            FieldSpec("description", "Description", "multiline", tooltip="A detailed description of the location.", ai=True),
+            FieldSpec("type", "Type", tooltip="The type of location (e.g., 'Residence', 'Business', 'Public Space')."),
+            FieldSpec("image", "Image", "image", tooltip="URL or path to an image representing the location."),
+        )),
+        SectionSpec("Social", (
+            FieldSpec("district", "District", "ref", tooltip="The district this location belongs to.", link_type="District"),
+            FieldSpec("owningFaction", "Owning Faction", "ref", tooltip="The faction that owns or controls this location.", link_type="Faction"),
+            FieldSpec("keyCharacters", "Key Characters", "list", tooltip="Comma-separated list of character IDs frequently found here.", link_type="Character"),
+        )),
+        SectionSpec("Details", (
+            FieldSpec("dangerLevel", "Danger Level", "int", tooltip="Level of danger associated with this location (1-5)."),
+            FieldSpec("population", "Population", "int", tooltip="Approximate population or number of regular occupants."),
+            FieldSpec("accessibility", "Accessibility", "choice", tooltip="How accessible is this location to the public?"),
+            FieldSpec("hidden", "Hidden", "bool", tooltip="Is this location hidden or secret?"),
+            FieldSpec("associatedItems", "Associated Items", "list", tooltip="Comma-separated list of item IDs typically found here.", link_type="Item"),
+            FieldSpec("clues", "Clues", "list", tooltip="Comma-separated list of clue IDs found at this location.", link_type="Clue"),
+            FieldSpec("internalLogicNotes", "Internal Logic Notes", "multiline", tooltip="Notes on the internal logic or mechanics related to this location.", ai=True),
+        )),
+    ),
+    schemas.Item: (
+        SectionSpec("Basic Info", (
+            FieldSpec("id", "ID", tooltip="Unique identifier for the item."),
+            FieldSpec("name", "Name", tooltip="The name of the item."),
+            FieldSpec("description", "Description", "multiline", tooltip="A detailed description of the item.", ai=True),
+            FieldSpec("type", "Type", tooltip="The type of item (e.g., 'Weapon', 'Tool', 'Document')."),
+            FieldSpec("image", "Image", "image", tooltip="URL or path to an image representing the item."),
+        )),
+        SectionSpec("Clue Info", (
+            FieldSpec("possibleMeans", "Possible Means", "bool", tooltip="Can this item be used as a means to commit a crime?"),
+            FieldSpec("possibleMotive", "Possible Motive", "bool", tooltip="Does this item suggest a motive for a crime?"),
+            FieldSpec("possibleOpportunity", "Possible Opportunity", "bool", tooltip="Does this item provide an opportunity for a crime?"),
+            FieldSpec("cluePotential", "Clue Potential", "choice", tooltip="The significance of this item as a clue."),
+            FieldSpec("significance", "Significance", "multiline", tooltip="Detailed explanation of the item's significance as a clue."),
+        )),
+        SectionSpec("Details", (
+            FieldSpec("value", "Value", tooltip="The monetary or intrinsic value of the item."),
+            FieldSpec("condition", "Condition", "choice", tooltip="The physical condition of the item."),
+            FieldSpec("defaultLocation", "Default Location", "ref", tooltip="The typical location where this item can be found.", link_type="Location"),
+            FieldSpec("defaultOwner", "Default Owner", "ref", tooltip="The typical owner of this item.", link_type="Character"),
+            FieldSpec("use", "Use", "list", tooltip="Comma-separated list of common uses for this item."),
+            FieldSpec("uniqueProperties", "Unique Properties", "list", tooltip="Comma-separated list of unique characteristics or properties."),
+        )),
+    ),
+    schemas.Faction: (
+        SectionSpec("Basic Info", (
+            FieldSpec("id", "ID", tooltip="Unique identifier for the faction."),
+            FieldSpec("name", "Name", tooltip="The name of the faction."),
+            FieldSpec("description", "Description", "multiline", tooltip="A detailed description of the faction.", ai=True),
+            FieldSpec("archetype", "Archetype", tooltip="The archetype of the faction (e.g., 'Criminal Syndicate', 'Law Enforcement')."),
+            FieldSpec("image", "Image", "image", tooltip="URL or path to an image representing the faction."),
+        )),
+        SectionSpec("Ideology & Influence", (
+            FieldSpec("ideology", "Ideology", tooltip="The core beliefs or principles of the faction."),
+            FieldSpec("influence", "Influence", "choice", tooltip="The geographical reach of the faction's influence."),
+            FieldSpec("publicPerception", "Public Perception", tooltip="How the public generally perceives this faction."),
+        )),
+        SectionSpec("Assets & Relationships", (
+            FieldSpec("headquarters", "Headquarters", "ref", tooltip="The primary base of operations for the faction.", link_type="Location"),
+            FieldSpec("resources", "Resources", "list", tooltip="Comma-separated list of resources controlled by the faction."),
+            FieldSpec("members", "Members", "list", tooltip="Comma-separated list of character IDs who are members of this faction.", link_type="Character"),
+            FieldSpec("allyFactions", "Ally Factions", "list", tooltip="Comma-separated list of faction IDs that are allies.", link_type="Faction"),
+            FieldSpec("enemyFactions", "Enemy Factions", "list", tooltip="Comma-separated list of faction IDs that are enemies.", link_type="Faction"),
+        )),
+    ),
+    schemas.District: (
+        SectionSpec("Basic Info", (
+            FieldSpec("id", "ID", tooltip="Unique identifier for the district."),
+            FieldSpec("name", "Name", tooltip="The name of the district."),
+            FieldSpec("description", "Description", "multiline", tooltip="A detailed description of the district.", ai=True),
+            FieldSpec("image", "Image", "image", tooltip="URL or path to an image representing the district."),
+        )),
+        SectionSpec("Social & Demographics", (
+            FieldSpec("wealthClass", "Wealth Class", "choice", tooltip="The predominant wealth class in this district."),
+            FieldSpec("populationDensity", "Population Density", "choice", tooltip="The population density of the district."),
+            FieldSpec("dominantFaction", "Dominant Faction", "ref", tooltip="The faction with the most influence in this district.", link_type="Faction"),
+        )),
+        SectionSpec("Details", (
+            FieldSpec("atmosphere", "Atmosphere", tooltip="The general mood or atmosphere of the district."),
+            FieldSpec("notableFeatures", "Notable Features", "list", tooltip="Comma-separated list of notable landmarks or features."),
+            FieldSpec("keyLocations", "Key Locations", "list", tooltip="Comma-separated list of key location IDs within this district.", link_type="Location"),
+        )),
+    ),
+    schemas.ChainEvent: (
+        SectionSpec("Step", (
+            FieldSpec("id", "ID", tooltip="Unique identifier for the step."),
+            FieldSpec("description", "Description", "multiline", tooltip="What happens at this step of the chain."),
+            FieldSpec("isCrime", "Is The Crime", "bool", tooltip="The crime itself; it has to start inside the case's crime window."),
+        )),
+        SectionSpec("Timing", (
+            FieldSpec("start", "Pinned Start", "int", tooltip="Minutes from the start of the case. Leave empty to let the step happen as early as the chain allows."),
+            FieldSpec("minDuration", "Min Duration", "int", tooltip="The shortest the step can take, in minutes."),
+            FieldSpec("maxDuration", "Max Duration", "int", tooltip="The longest the step can take, in minutes. Leave empty for no limit."),
+        )),
+        SectionSpec("Involved", (
+            FieldSpec("characters", "Characters", "list", tooltip="Comma-separated list of character IDs taking part in the step.", link_type="Character"),
+            FieldSpec("locationId", "Location", "ref", tooltip="Where the step takes place.", link_type="Location"),
+        )),
+    ),
+    schemas.LoreEvent: (
+        SectionSpec("Event", (
+            FieldSpec("id", "ID", tooltip="Unique identifier for the event."),
+            FieldSpec("name", "Name", tooltip="A short title for the event."),
+            FieldSpec("start", "Start", tooltip="When the event began: a year (1921), month (1921-03) or day (1921-03-14)."),
+            FieldSpec("end", "End", tooltip="When the event ended, in the same format. Leave empty for an event within its start year, month or day."),
+            FieldSpec("category", "Category", tooltip="A grouping such as 'War', 'Founding' or 'Scandal'."),
+            FieldSpec("description", "Description", "multiline", tooltip="What happened.", ai=True),
+        )),
+        SectionSpec("Involved", (
+            FieldSpec("characters", "Characters", "list", tooltip="Comma-separated list of character IDs involved in the event.", link_type="Character"),
+            FieldSpec("factions", "Factions", "list", tooltip="Comma-separated list of faction IDs involved in the event.", link_type="Faction"),
+            FieldSpec("locations", "Locations", "list", tooltip="Comma-separated list of location IDs where the event took place.", link_type="Location"),
+        )),
+    ),
+    schemas.Sleuth: (
+        SectionSpec("Basic Info", (
+            FieldSpec("id", "ID", tooltip="Unique identifier for the sleuth."),
+            FieldSpec("name", "Name", tooltip="The sleuth's name."),
+            FieldSpec("city", "City", tooltip="The city where the sleuth operates."),
+            FieldSpec("employment", "Employment", tooltip="The sleuth's occupation or agency."),
+        )),
+        SectionSpec("Appearance", (
+            FieldSpec("age", "Age", "int", tooltip="The sleuth's age."),
+            FieldSpec("gender", "Gender", "choice", tooltip="The sleuth's gender."),
+            FieldSpec("image", "Image", "image", tooltip="URL or path to an image representing the sleuth."),
+            FieldSpec("characteristics", "Characteristics", "list", tooltip="Comma-separated list of physical or behavioral characteristics."),
+        )),
+        SectionSpec("Personality", (
+            FieldSpec("biography", "Biography", "multiline", tooltip="A brief biography of the sleuth.", ai=True),
+            FieldSpec("personality", "Personality", tooltip="A description of the sleuth's personality.", ai=True),
+            FieldSpec("alignment", "Alignment", "choice", tooltip="The sleuth's moral and ethical alignment."),
+            FieldSpec("archetype", "Archetype", tooltip="The sleuth's archetype (e.g., 'Hardboiled', 'Amateur')."),
+            FieldSpec("values", "Values", "list", tooltip="Comma-separated list of the sleuth's core values."),
+            FieldSpec("quirks", "Quirks", "list", tooltip="Comma-separated list of the sleuth's unique quirks or habits."),
+        )),
+        SectionSpec("Social", (
+            FieldSpec("wealthClass", "Wealth Class", "choice", tooltip="The sleuth's wealth class."),
+            FieldSpec("district", "District", "ref", tooltip="The district the sleuth primarily operates in.", link_type="District"),
+            FieldSpec("relationships", "Relationships", "list", tooltip="Comma-separated list of key relationships."),
+            FieldSpec("nemesis", "Nemesis", "ref", tooltip="The sleuth's primary adversary.", link_type="Character"),
+        )),
+        SectionSpec("Author's Notes", (
+            FieldSpec("primaryArc", "Primary Arc", tooltip="The sleuth's main character arc."),
+            FieldSpec("motivations", "Motivations", "list", tooltip="Comma-separated list of the sleuth's motivations."),
+            FieldSpec("secrets", "Secrets", "list", tooltip="Comma-separated list of the sleuth's secrets."),
+            FieldSpec("flawsHandicapsLimitations", "Flaws/Handicaps/Limitations", "list", tooltip="Comma-separated list of flaws, handicaps, or limitations."),
+            FieldSpec("vulnerabilities", "Vulnerabilities", "list", tooltip="Comma-separated list of vulnerabilities."),
+            FieldSpec("voiceModel", "Voice Model", tooltip="Description of the sleuth's voice."),
+            FieldSpec("dialogueStyle", "Dialogue Style", tooltip="Description of the sleuth's dialogue style."),
+            FieldSpec("expertise", "Expertise", "list", tooltip="Comma-separated list of areas of expertise."),
+            FieldSpec("portrayalNotes", "Portrayal Notes", tooltip="Notes for portraying the sleuth."),
+        )),
+    ),
+    schemas.Clue: (
+        SectionSpec("Basic Info", (
+            FieldSpec("clueId", "ID", tooltip="Unique identifier for the clue."),
+            FieldSpec("clueSummary", "Summary", "multiline", tooltip="A short summary of what the clue reveals."),
+            FieldSpec("source", "Source", tooltip="Where the clue comes from (an interview question ID, a location, ...)."),
+            FieldSpec("knowledgeLevel", "Knowledge Level", "choice", tooltip="Who learns about this clue."),
+            FieldSpec("criticalClue", "Critical Clue", "bool", tooltip="Is this clue required to solve the case?"),
+        )),
+        SectionSpec("Misdirection", (
+            FieldSpec("redHerring", "Red Herring", "bool", tooltip="Does this clue point away from the truth?"),
+            FieldSpec("isLie", "Is Lie", "bool", tooltip="Is this clue based on a lie?"),
+            FieldSpec("redHerringType", "Red Herring Type", "choice", tooltip="The kind of misdirection this clue provides."),
+            FieldSpec("mechanismOfMisdirection", "Mechanism of Misdirection", "multiline", tooltip="How the clue misleads the sleuth and the reader."),
+            FieldSpec("debunkingClue", "Debunking Clue", "ref", tooltip="The clue that exposes this one.", link_type="Clue"),
+            FieldSpec("characterImplicated", "Character Implicated", "ref", tooltip="The character this clue points towards.", link_type="Character"),
+        )),
+        SectionSpec("Discovery", (
+            FieldSpec("discoveryPath", "Discovery Path", "list", tooltip="Comma-separated list of steps that lead to this clue."),
+            FieldSpec("dependencies", "Dependencies", "list", tooltip="Comma-separated list of clue IDs that must be found first.", link_type="Clue"),
+            FieldSpec("requiredActionsForDiscovery", "Required Actions", "list", tooltip="Comma-separated list of actions needed to discover the clue."),
+            FieldSpec("presentationMethod", "Presentation Method", "list", tooltip="Comma-separated list of how the clue is presented (Dialogue, Setting/Description, ...)."),
+        )),
+        SectionSpec("Associations", (
+            FieldSpec("associatedItem", "Associated Item", "ref", tooltip="The item this clue is tied to.", link_type="Item"),
+            FieldSpec("associatedLocation", "Associated Location", "ref", tooltip="The location this clue is tied to.", link_type="Location"),
+            FieldSpec("associatedCharacter", "Associated Character", "ref", tooltip="The character this clue is tied to.", link_type="Character"),
+        )),
+    ),
+}
@@ -0,0 +1,100 @@
+# generation_cache.py
+"""
+Generated text kept on disk, so an identical request never runs the model twice.
+
+An entry is keyed by a digest of everything that decides the output: model
+name, prompt, decoding parameters, backend and seed. Generation is sampled, so
+different seeds give different candidates for the same field, and
+"regenerate" simply asks for the next seed. Those are precomputed in the
+background once a field has been generated, and served from here instantly.
+
+Entries live in one SQLite file shared by all cases. When the stored text
+grows past `max_bytes`, the least recently used entries are evicted. The
+file is a cache: if it cannot be opened, every lookup is a miss.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+GENERATIONS_FILE = "generations.sqlite"
+MAX_BYTES = 16 * 1024 * 1024
+PREFETCH_CANDIDATES = 2  # Candidates generated ahead of the one shown.
+
+
+def cache_key(model_name: str, prompt: str, params: Dict[str, Any], seed: int) -> str:
+    payload = json.dumps([model_name, prompt, params, seed], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    def __init__(self, path: Path, max_bytes: int = MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # Used from the generation worker and the UI thread.
+        self._db: Optional[sqlite3.Connection] = None
+        self._clock = 0
+        self._open()
+
+    def _open(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False)
+            db.execute("CREATE TABLE IF NOT EXISTS generations (key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, used INTEGER NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS generations_used ON generations (used)")
+            self._clock = db.execute("SELECT COALESCE(MAX(used), 0) FROM generations").fetchone()[0]
+            db.commit()
+        except (OSError, sqlite3.Error) as exc:
+            print(f"Generation cache disabled: {exc}")
+            return
+        self._db = db
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._db is not None and self._db.execute("SELECT 1 FROM generations WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, key: str) -> Optional[str]:
+        """The cached text for `key`, marking it as recently used."""
+        with self._lock:
+            row = self._db.execute("SELECT text FROM generations WHERE key = ?", (key,)).fetchone() if self._db else None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._clock += 1
+            self._db.execute("UPDATE generations SET used = ? WHERE key = ?", (self._clock, key))
+            self._db.commit()
+            return row[0]
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            if self._db is None:
+                return
+            self._clock += 1
+            self._db.execute("INSERT OR REPLACE INTO generations VALUES (?, ?, ?, ?)", (key, text, len(text.encode("utf-8")), self._clock))
+            self._evict()
+            self._db.commit()
+
+    def size(self) -> int:
+        """Bytes of text stored."""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0] if self._db else 0
+
+    def describe(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.size() // 1024} KiB cached"
+
+    def _evict(self):
+        excess = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM generations ORDER BY used").fetchall():
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM generations WHERE key = ?", doomed)
@@ -0,0 +1,329 @@
+# graph_analytics.py
+"""
+Structural measures of the social graph: who is central, which clusters
+exist, and whether a character stands out from everyone else.
+
+The graph is the one the Social Graph view draws (graph_model.build_social_graph):
+characters, factions as hub nodes, and the sleuth, joined by ally, enemy,
+faction, relationship and nemesis edges. Centrality treats it as a simple
+undirected graph. Communities only follow the friendly edges, since enemies
+are not what holds a clique together.
+
+  betweenness  Brandes' algorithm, run for a batch of sources at a time as
+               level-synchronous BFS over (batch, n) arrays. Components are
+               computed exactly, small ones packed together; only a component
+               over EXACT_LIMIT nodes uses a random sample of its own source
+               nodes, scaled up to its size (Brandes & Pich).
+  pagerank     Power iteration, damping 0.85.
+  communities  Label propagation: every node repeatedly takes the label most
+               of its neighbours carry. Half the nodes move per round so that
+               labels cannot oscillate between two sides.
+
+Results are computed on first use and kept. Edits only mark them stale; the
+next query rebuilds the graph and compares it with the previous one. Renames
+keep everything. Betweenness is recomputed only for the connected components
+the changed edges touch, since shortest paths never leave a component.
+PageRank and label propagation start from their previous results, which
+after a small edit are a few iterations away from the new ones.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from graph_model import Graph, build_social_graph
+from schemas import WorldData
+
+GRAPH_FIELDS = {
+    "Character": {"allies", "enemies", "faction", "id", None},
+    "Faction": {"members", "id", None},
+    "Sleuth": {"relationships", "nemesis", "id", None},
+}
+COMMUNITY_EDGE_KINDS = {"ally", "faction", "relationship"}
+EXACT_LIMIT = 2000  # Components up to this many nodes get exact betweenness.
+SAMPLE_SOURCES = 256
+BATCH_CELLS = 4_000_000  # Upper bound on batch size * directed edges per BFS step.
+DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-10
+MAX_ITERATIONS = 100
+OUTLIER_Z = 2.0
+MIN_POPULATION = 5  # Fewer characters than this make z-scores meaningless.
+
+
+def undirected_arcs(n: int, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Both directions of every distinct edge as (sources, targets), sorted by target."""
+    if not len(edges):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    pairs = np.unique(np.sort(edges, axis=1), axis=0)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    sources = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    targets = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    order = np.argsort(targets, kind="stable")
+    return sources[order], targets[order]
+
+
+def components(n: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """A component label per node (the smallest node index in it), by label minimisation."""
+    labels = np.arange(n)
+    while True:
+        lowest = labels.copy()
+        np.minimum.at(lowest, targets, labels[sources])
+        lowest = lowest[lowest]  # Pointer jumping speeds up long chains.
+        if np.array_equal(lowest, labels):
+            return labels
+        labels = lowest
+
+
+def component_groups(labels: np.ndarray, nodes: np.ndarray) -> List[np.ndarray]:
+    """
+    `nodes`, which must cover whole components, split into groups of sorted
+    node indices. A component over EXACT_LIMIT nodes is a group of its own;
+    smaller ones are packed together up to EXACT_LIMIT nodes per group.
+    """
+    if not len(nodes):
+        return []
+    order = nodes[np.argsort(labels[nodes], kind="stable")]
+    groups: List[np.ndarray] = []
+    packed: List[np.ndarray] = []
+    size = 0
+    for component in np.split(order, np.flatnonzero(np.diff(labels[order])) + 1):
+        if len(component) > EXACT_LIMIT:
+            groups.append(np.sort(component))
+            continue
+        if size + len(component) > EXACT_LIMIT:
+            groups.append(np.sort(np.concatenate(packed)))
+            packed, size = [], 0
+        packed.append(component)
+        size += len(component)
+    if packed:
+        groups.append(np.sort(np.concatenate(packed)))
+    return groups
+
+
+class _Spreader:
+    """Sums values over each node's in-arcs, for a (batch, n) array at once."""
+
+    def __init__(self, sources: np.ndarray, targets: np.ndarray):
+        self.sources = sources
+        self.targets = targets
+
+    def __call__(self, values: np.ndarray, active: np.ndarray) -> np.ndarray:
+        """`active` marks the nodes whose values may be non-zero; only their arcs are read."""
+        result = np.zeros_like(values)
+        keep = active[self.sources]
+        sources, targets = self.sources[keep], self.targets[keep]
+        if len(sources):
+            starts = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]])
+            result[:, targets[starts]] = np.add.reduceat(values[:, sources], starts, axis=1)
+        return result
+
+
+def betweenness(n: int, sources: np.ndarray, targets: np.ndarray, pivots: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Betweenness centrality of an undirected graph given as arcs sorted by
+    target. With `pivots`, only shortest paths from those nodes are counted.
+    """
+    spread = _Spreader(sources, targets)
+    pivots = np.arange(n) if pivots is None else np.asarray(pivots, dtype=np.int64)
+    batch = int(max(1, min(len(pivots), BATCH_CELLS // max(len(sources), 1))))
+    scores = np.zeros(n)
+    for first in range(0, len(pivots), batch):
+        chunk = pivots[first:first + batch]
+        rows = np.arange(len(chunk))
+        dist = np.full((len(chunk), n), -1, dtype=np.int32)
+        sigma = np.zeros((len(chunk), n))
+        dist[rows, chunk] = 0
+        sigma[rows, chunk] = 1.0
+        frontier = sigma.copy()
+        new = frontier > 0
+        depth = 0
+        while True:
+            reached = spread(frontier, new.any(axis=0))
+            new = (reached > 0) & (dist < 0)
+            if not new.any():
+                break
+            depth += 1
+            dist[new] = depth
+            sigma[new] = reached[new]
+            frontier = np.where(new, sigma, 0.0)
+        # Dependencies flow back one level at a time: delta_v += sigma_v / sigma_w * (1 + delta_w).
+        delta = np.zeros_like(sigma)
+        for level in range(depth, 0, -1):
+            at = dist == level
+            share = np.where(at, (1.0 + delta) / np.where(at, sigma, 1.0), 0.0)
+            delta += np.where(dist == level - 1, sigma * spread(share, at.any(axis=0)), 0.0)
+        delta[rows, chunk] = 0.0
+        scores += delta.sum(axis=0)
+    return scores / 2.0  # Every pair was counted from both ends.
+
+
+def pagerank(n: int, sources: np.ndarray, targets: np.ndarray, start: Optional[np.ndarray] = None) -> Tuple[np.ndarray, int]:
+    """PageRank over the arcs, from `start` if given. Returns (ranks, iterations)."""
+    if n == 0:
+        return np.zeros(0), 0
+    degree = np.bincount(sources, minlength=n).astype(np.float64)
+    dangling = degree == 0
+    ranks = np.full(n, 1.0 / n) if start is None else start / start.sum()
+    for iteration in range(1, MAX_ITERATIONS + 1):
+        share = np.divide(ranks, degree, out=np.zeros(n), where=~dangling)
+        updated = (1 - DAMPING) / n + DAMPING * (np.bincount(targets, weights=share[sources], minlength=n) + ranks[dangling].sum() / n)
+        if np.abs(updated - ranks).sum() < PAGERANK_TOLERANCE:
+            return updated, iteration
+        ranks = updated
+    return ranks, MAX_ITERATIONS
+
+
+def label_propagation(n: int, sources: np.ndarray, targets: np.ndarray, start: Optional[np.ndarray] = None, seed: int = 0) -> Tuple[np.ndarray, int]:
+    """Community labels by label propagation, from `start` if given. Returns (labels, rounds)."""
+    rng = np.random.default_rng(seed)
+    labels = np.arange(n) if start is None else start.copy()
+    connected = np.zeros(n, dtype=bool)
+    connected[targets] = True
+    for round_ in range(1, MAX_ITERATIONS + 1):
+        if not len(sources):
+            return labels, round_
+        keys, counts = np.unique(targets * n + labels[sources], return_counts=True)
+        nodes, candidates = keys // n, keys % n
+        # Keeping the current label wins ties; other ties are broken at random.
+        score = counts + 0.5 * (candidates == labels[nodes]) + 0.1 * rng.random(len(keys))
+        order = np.lexsort((-score, nodes))
+        first = order[np.r_[True, nodes[order][1:] != nodes[order][:-1]]]
+        best = labels.copy()
+        best[nodes[first]] = candidates[first]
+        wants = connected & (best != labels)
+        if not wants.any():
+            return labels, round_
+        moving = wants & (rng.random(n) < 0.5)
+        labels[moving] = best[moving]
+    return labels, MAX_ITERATIONS
+
+
+class GraphAnalytics:
+    def __init__(self):
+        self.world_data: Optional[WorldData] = None
+        self.graph = Graph()
+        self._betweenness: Dict[str, float] = {}
+        self._pagerank: Dict[str, float] = {}
+        self._labels: Dict[str, str] = {}  # Node id -> id of a node of its community.
+        self._results: Set[str] = set()  # Measures that are up to date with the graph.
+        self._stale = False
+        self.recomputed_nodes = 0  # Nodes whose betweenness the last update recomputed; for tests and profiling.
+
+    def reset(self, world_data: WorldData):
+        """Switches to another world; everything is computed on first use."""
+        self.world_data = world_data
+        self.graph = Graph()
+        self._betweenness, self._pagerank, self._labels = {}, {}, {}
+        self._results = set()
+        self._stale = True
+
+    def on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        """Change listener: marks the results stale after edits that touch the graph."""
+        fields = GRAPH_FIELDS.get(type(asset).__name__)
+        if fields is not None and attribute_name in fields:
+            self._stale = True
+
+    # --- Queries ---
+
+    def betweenness(self) -> Dict[str, float]:
+        self._sync()
+        if "betweenness" not in self._results:
+            self._update_betweenness(set(self.graph.node_ids))
+        return self._betweenness
+
+    def pagerank(self) -> Dict[str, float]:
+        self._sync()
+        if "pagerank" not in self._results:
+            sources, targets = undirected_arcs(len(self.graph), self.graph.edges)
+            start = np.array([self._pagerank.get(node_id, 0.0) for node_id in self.graph.node_ids])
+            ranks, _ = pagerank(len(self.graph), sources, targets, start if start.sum() > 0 else None)
+            self._pagerank = dict(zip(self.graph.node_ids, ranks.tolist()))
+            self._results.add("pagerank")
+        return self._pagerank
+
+    def communities(self) -> List[List[str]]:
+        """Groups of node ids, largest first. Isolated nodes are left out."""
+        self._sync()
+        if "communities" not in self._results:
+            graph = self.graph
+            friendly = np.array([kind in COMMUNITY_EDGE_KINDS for kind in graph.edge_kinds], dtype=bool)
+            sources, targets = undirected_arcs(len(graph), graph.edges[friendly] if len(graph.edges) else graph.edges)
+            start = np.array([graph.index.get(self._labels.get(node_id), i) for i, node_id in enumerate(graph.node_ids)], dtype=np.int64)
+            labels, _ = label_propagation(len(graph), sources, targets, start)
+            self._labels = {node_id: graph.node_ids[label] for node_id, label in zip(graph.node_ids, labels.tolist())}
+            self._results.add("communities")
+        groups: Dict[str, List[str]] = {}
+        for node_id, label in self._labels.items():
+            groups.setdefault(label, []).append(node_id)
+        return sorted((group for group in groups.values() if len(group) > 1), key=len, reverse=True)
+
+    def prominence(self, node_ids: Sequence[str]) -> Dict[str, float]:
+        """Betweenness and PageRank, each relative to its maximum over `node_ids`, averaged."""
+        between, ranks = self.betweenness(), self.pagerank()
+        b = np.array([between.get(node_id, 0.0) for node_id in node_ids])
+        p = np.array([ranks.get(node_id, 0.0) for node_id in node_ids])
+        score = (b / b.max() if b.max() > 0 else b) / 2 + (p / p.max() if p.max() > 0 else p) / 2
+        return dict(zip(node_ids, score.tolist()))
+
+    def top_outlier(self, node_ids: Sequence[str]) -> Optional[Tuple[str, float]]:
+        """
+        The most prominent of `node_ids` as (id, z-score), if it stands out
+        from the rest by at least OUTLIER_Z standard deviations.
+        """
+        if len(node_ids) < MIN_POPULATION:
+            return None
+        scores = self.prominence(node_ids)
+        values = np.array(list(scores.values()))
+        if values.std() == 0:
+            return None
+        top = max(scores, key=scores.get)
+        z = float((scores[top] - values.mean()) / values.std())
+        return (top, z) if z >= OUTLIER_Z else None
+
+    # --- Maintenance ---
+
+    def _sync(self):
+        if not self._stale or self.world_data is None:
+            return
+        self._stale = False
+        old = self.graph
+        graph = build_social_graph(self.world_data)
+        self.graph = graph
+        if graph.node_ids == old.node_ids and graph.edge_keys() == old.edge_keys():
+            return
+        self._results.discard("pagerank")
+        self._results.discard("communities")
+        if "betweenness" not in self._results:
+            return
+        # Only components holding a changed node or edge can have different shortest paths.
+        changed = set(graph.node_ids) ^ set(old.node_ids)
+        for a, b, _ in graph.edge_keys() ^ old.edge_keys():
+            changed.update((a, b))
+        self._update_betweenness(changed)
+
+    def _update_betweenness(self, changed: Set[str]):
+        graph = self.graph
+        n = len(graph)
+        sources, targets = undirected_arcs(n, graph.edges)
+        labels = components(n, sources, targets)
+        seeds = [graph.index[node_id] for node_id in changed if node_id in graph.index]
+        affected = np.isin(labels, labels[seeds]) if seeds else np.zeros(n, dtype=bool)
+        previous = self._betweenness
+        self._betweenness = {node_id: previous.get(node_id, 0.0) for node_id in graph.node_ids}
+        local = np.full(n, -1, dtype=np.int64)
+        for nodes in component_groups(labels, np.nonzero(affected)[0]):
+            # Whole components, so the induced subgraph holds all of their edges.
+            local[nodes] = np.arange(len(nodes))
+            inside = np.zeros(n, dtype=bool)
+            inside[nodes] = True
+            keep = inside[sources]
+            pivots = None
+            if len(nodes) > EXACT_LIMIT:
+                # A single component too large for exact scores: sample its sources, scaled to its size.
+                pivots = np.sort(np.random.default_rng(0).choice(len(nodes), SAMPLE_SOURCES, replace=False))
+            scores = betweenness(len(nodes), local[sources[keep]], local[targets[keep]], pivots)
+            if pivots is not None:
+                scores *= len(nodes) / len(pivots)
+            for i, score in zip(nodes.tolist(), scores.tolist()):
+                self._betweenness[graph.node_ids[i]] = score
+        self.recomputed_nodes = int(affected.sum())
+        self._results.add("betweenness")
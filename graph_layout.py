@@ -0,0 +1,332 @@
+# graph_layout.py
+"""
+Vectorized force-directed layout (Fruchterman-Reingold) with a Barnes-Hut
+style approximation of the repulsive forces.
+
+Nodes are binned into a pyramid of uniform grids (a complete quadtree stored
+as arrays). At every level a node interacts with the centres of mass of the
+cells that are children of its parent cell's neighbours but are not adjacent
+to its own cell, the classic well-separated interaction list. Only cells
+adjacent at the finest level are evaluated node by node. All of this is done
+with NumPy over every node at once, so one iteration costs O(n log n) array
+work rather than an O(n^2) Python loop.
+
+LayoutEngine runs layouts on a background thread. When the graph changes it
+keeps the positions of known nodes and only lets the nodes around the change
+move, which settles in a fraction of the iterations of a full layout.
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from graph_model import Graph, structure_hash
+
+LEAF_SIZE = 4  # Target number of nodes per cell at the finest grid level.
+MAX_DEPTH = 10
+GRAVITY = 0.02  # Pull towards the origin; keeps disconnected components nearby.
+EPSILON = 1e-9
+
+# Interaction lists at one level, indexed by the parity of the node's cell:
+# the children of the parent cell's 3x3 neighbourhood (a 6x6 block) minus the
+# node's own 3x3 neighbourhood, which is handled one level further down.
+def _far_offsets(parity: int):
+    span = range(-2, 4) if parity == 0 else range(-3, 3)
+    return [d for d in span]
+
+
+_FAR_OFFSETS = np.array(
+    [
+        [(dx, dy) for dx in _far_offsets(px) for dy in _far_offsets(py) if max(abs(dx), abs(dy)) > 1]
+        for px in (0, 1) for py in (0, 1)
+    ],
+    dtype=np.int64,
+)  # Shape (4, 27, 2), indexed by 2 * (x & 1) + (y & 1).
+_NEAR_OFFSETS = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)], dtype=np.int64)
+
+
+def _repulsion(pos: np.ndarray, targets: np.ndarray, k: float) -> np.ndarray:
+    n = len(pos)
+    force = np.zeros((len(targets), 2))
+    if n < 2 or len(targets) == 0:
+        return force
+    k2 = k * k
+    lo = pos.min(axis=0)
+    span = max(float((pos.max(axis=0) - lo).max()), EPSILON) * (1 + 1e-9)
+    unit = (pos - lo) / span
+    depth = int(np.clip(np.ceil(np.log(max(n / LEAF_SIZE, 1)) / np.log(4)), 1, MAX_DEPTH))
+    while True:
+        size = 1 << depth
+        cell = np.minimum((unit * size).astype(np.int64), size - 1)
+        # Clustered layouts crowd a few cells; refine until the exact near-field
+        # work (roughly the sum of squared cell occupancies) is back to O(n).
+        counts = np.bincount(cell[:, 0] * size + cell[:, 1])
+        if depth == MAX_DEPTH or int((counts * counts).sum()) <= 4 * LEAF_SIZE * n:
+            break
+        depth += 1
+    target_pos = pos[targets]
+
+    # Far field: one centre-of-mass term per interaction-list cell and level.
+    for level in range(2, depth + 1):
+        grid = 1 << level
+        level_cell = cell >> (depth - level)
+        flat = level_cell[:, 0] * grid + level_cell[:, 1]
+        mass = np.bincount(flat, minlength=grid * grid).astype(float)
+        com_x = np.bincount(flat, weights=pos[:, 0], minlength=grid * grid) / np.maximum(mass, 1)
+        com_y = np.bincount(flat, weights=pos[:, 1], minlength=grid * grid) / np.maximum(mass, 1)
+
+        own = level_cell[targets]
+        offsets = _FAR_OFFSETS[2 * (own[:, 0] & 1) + (own[:, 1] & 1)]
+        other_x = own[:, 0:1] + offsets[:, :, 0]
+        other_y = own[:, 1:2] + offsets[:, :, 1]
+        valid = (other_x >= 0) & (other_x < grid) & (other_y >= 0) & (other_y < grid)
+        # Dense (targets x 27) arithmetic; out-of-grid cells get zero mass.
+        cells = np.where(valid, other_x * grid + other_y, 0)
+        m = np.where(valid, mass[cells], 0.0)
+        dx = target_pos[:, 0:1] - com_x[cells]
+        dy = target_pos[:, 1:2] - com_y[cells]
+        scale = k2 * m / (dx * dx + dy * dy + EPSILON)
+        force[:, 0] += (dx * scale).sum(axis=1)
+        force[:, 1] += (dy * scale).sum(axis=1)
+
+    # Near field: exact pairwise terms with nodes in the adjacent finest cells.
+    flat = cell[:, 0] * size + cell[:, 1]
+    order = np.argsort(flat, kind="stable")
+    counts = np.bincount(flat, minlength=size * size)
+    starts = np.cumsum(counts) - counts
+    own = cell[targets]
+    for offset in _NEAR_OFFSETS:
+        other = own + offset
+        valid = ((other >= 0) & (other < size)).all(axis=1)
+        rows = np.nonzero(valid)[0]
+        cells = other[rows, 0] * size + other[rows, 1]
+        cnt = counts[cells]
+        total = int(cnt.sum())
+        if total == 0:
+            continue
+        pair_rows = np.repeat(rows, cnt)
+        within = np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        partners = order[np.repeat(starts[cells], cnt) + within]
+        keep = partners != targets[pair_rows]
+        pair_rows, partners = pair_rows[keep], partners[keep]
+        dx = target_pos[pair_rows, 0] - pos[partners, 0]
+        dy = target_pos[pair_rows, 1] - pos[partners, 1]
+        scale = k2 / (dx * dx + dy * dy + EPSILON)
+        force[:, 0] += np.bincount(pair_rows, weights=dx * scale, minlength=len(targets))
+        force[:, 1] += np.bincount(pair_rows, weights=dy * scale, minlength=len(targets))
+    return force
+
+
+def compute_forces(pos: np.ndarray, edges: np.ndarray, k: float, targets: np.ndarray) -> np.ndarray:
+    """Net force on each node in `targets` (indices into `pos`)."""
+    force = _repulsion(pos, targets, k)
+    if len(edges):
+        delta = pos[edges[:, 1]] - pos[edges[:, 0]]
+        pull = delta * (np.sqrt((delta * delta).sum(axis=1)) / k)[:, None]
+        n = len(pos)
+        attraction = np.zeros((n, 2))
+        for axis in (0, 1):
+            attraction[:, axis] = np.bincount(edges[:, 0], weights=pull[:, axis], minlength=n) - np.bincount(edges[:, 1], weights=pull[:, axis], minlength=n)
+        force += attraction[targets]
+    force -= GRAVITY * pos[targets] * k
+    return force
+
+
+def random_positions(n: int, k: float = 1.0, seed: int = 0) -> np.ndarray:
+    side = max(np.sqrt(n), 1.0) * k
+    return np.random.default_rng(seed).uniform(-side / 2, side / 2, size=(n, 2))
+
+
+def run_layout(
+    pos: np.ndarray,
+    edges: np.ndarray,
+    iterations: int = 100,
+    k: float = 1.0,
+    mobile: Optional[np.ndarray] = None,
+    temperature: Optional[float] = None,
+    callback: Optional[Callable[[np.ndarray], None]] = None,
+    callback_every: int = 10,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> np.ndarray:
+    """
+    Runs `iterations` cooling steps on `pos` (modified in place and returned).
+    Only the nodes in `mobile` move; the others still exert forces.
+    """
+    targets = np.arange(len(pos)) if mobile is None else np.asarray(mobile, dtype=np.int64)
+    if len(targets) == 0 or len(pos) == 0:
+        return pos
+    start = temperature if temperature is not None else max(np.sqrt(len(pos)), 1.0) * k * 0.1
+    for step in range(iterations):
+        if should_stop():
+            break
+        heat = start * (1 - step / iterations) + 0.01 * k
+        force = compute_forces(pos, edges, k, targets)
+        length = np.sqrt((force * force).sum(axis=1)) + EPSILON
+        pos[targets] += force * (np.minimum(length, heat) / length)[:, None]
+        if callback and (step + 1) % callback_every == 0:
+            callback(pos)
+    return pos
+
+
+class LayoutEngine:
+    """
+    Keeps positions for a changing graph and lays it out on a worker thread.
+
+    `on_update(graph, positions)` is called from the worker with a copy of the
+    positions every few iterations and once more when the layout settles;
+    `on_settled(graph, positions)` follows that last call whenever a layout
+    actually moved nodes, which is when views persist it.
+    """
+
+    def __init__(self, on_update: Optional[Callable[[Graph, np.ndarray], None]] = None, iterations: int = 100, incremental_iterations: int = 40, seed: int = 0, on_settled: Optional[Callable[[Graph, np.ndarray], None]] = None):
+        self.on_update = on_update
+        self.on_settled = on_settled
+        self.iterations = iterations
+        self.incremental_iterations = incremental_iterations
+        self.seed = seed
+        self.graph = Graph()
+        self.positions = np.zeros((0, 2))
+        self.signatures: List[str] = []  # Graph.node_signatures() of self.graph.
+        self.structure_hash = ""
+        self.pinned: Dict[str, np.ndarray] = {}  # Node id -> position the user placed it at.
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self):
+        with self._lock:
+            return self.graph, self.positions.copy()
+
+    def set_graph(self, graph: Graph, background: bool = True):
+        """
+        Switches to `graph`. Known nodes keep their positions; new nodes start
+        next to their placed neighbours. A first layout moves every node, later
+        ones only the nodes touched by added or removed edges (and their
+        neighbours).
+        """
+        signatures = graph.node_signatures()
+        digest = structure_hash(graph.node_ids, signatures)
+        with self._lock:
+            old_graph, old_pos, old_signatures, old_digest = self.graph, self.positions, self.signatures, self.structure_hash
+        if digest == old_digest:
+            # Same nodes and edges (only labels may differ): nothing to lay out.
+            positions = old_pos[[old_graph.index[node_id] for node_id in graph.node_ids]] if len(graph) else np.zeros((0, 2))
+            mobile = np.zeros(0, dtype=np.int64)
+        else:
+            positions, mobile = self._carry_over(old_graph, old_pos, old_signatures, graph, signatures)
+        if mobile is None:
+            iterations, temperature = self.iterations, None
+        else:
+            iterations, temperature = self.incremental_iterations, 2.0
+        pinned = [graph.index[node_id] for node_id in self.pinned if node_id in graph.index]
+        if pinned:
+            positions[pinned] = [self.pinned[graph.node_ids[i]] for i in pinned]
+            mobile = np.setdiff1d(np.arange(len(graph)) if mobile is None else mobile, pinned)
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self.graph, self.positions = graph, positions
+            self.signatures, self.structure_hash = signatures, digest
+        if background:
+            self._thread = threading.Thread(target=self._run, args=(generation, graph, positions, mobile, iterations, temperature), daemon=True)
+            self._thread.start()
+        else:
+            self._run(generation, graph, positions, mobile, iterations, temperature)
+
+    def wait(self, timeout: Optional[float] = None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+
+    def pin(self, node_id: str, position):
+        """Fixes a node where the user dropped it; later layouts move around it."""
+        with self._lock:
+            self.pinned[node_id] = np.asarray(position, dtype=float)
+            index = self.graph.index.get(node_id)
+            if index is not None:
+                self.positions[index] = self.pinned[node_id]
+
+    def reset(self):
+        """Forgets all positions and pins, so the next set_graph lays out from scratch."""
+        with self._lock:
+            self._generation += 1
+            self.graph, self.positions = Graph(), np.zeros((0, 2))
+            self.signatures, self.structure_hash = [], ""
+            self.pinned = {}
+
+    def restore(self, positions: Dict[str, Tuple[float, float]], signatures: Dict[str, str], digest: str, pinned: Iterable[str] = ()):
+        """
+        Seeds the engine with a layout saved earlier (see layout_store). The
+        next set_graph then keeps every node whose signature still matches and
+        lays out only the rest; if the structure hash matches nothing runs.
+        """
+        node_ids = [node_id for node_id in positions if node_id in signatures]
+        with self._lock:
+            self._generation += 1
+            self.graph = Graph(node_ids=node_ids, index={node_id: i for i, node_id in enumerate(node_ids)})
+            self.positions = np.array([positions[node_id] for node_id in node_ids], dtype=float).reshape(-1, 2)
+            self.signatures = [signatures[node_id] for node_id in node_ids]
+            self.structure_hash = digest
+            self.pinned = {node_id: self.positions[self.graph.index[node_id]].copy() for node_id in pinned if node_id in self.graph.index}
+
+    def export(self):
+        """(positions by node id, signatures by node id, structure hash, pinned ids) for layout_store."""
+        with self._lock:
+            positions = {node_id: tuple(p) for node_id, p in zip(self.graph.node_ids, self.positions.tolist())}
+            signatures = dict(zip(self.graph.node_ids, self.signatures))
+            return positions, signatures, self.structure_hash, sorted(self.pinned)
+
+    def _carry_over(self, old_graph: Graph, old_pos: np.ndarray, old_signatures: List[str], graph: Graph, signatures: List[str]):
+        n = len(graph)
+        if len(old_graph) == 0:
+            return random_positions(n, seed=self.seed), None
+        positions = np.zeros((n, 2))
+        placed = np.zeros(n, dtype=bool)
+        for i, node_id in enumerate(graph.node_ids):
+            j = old_graph.index.get(node_id)
+            if j is not None:
+                positions[i] = old_pos[j]
+                placed[i] = True
+
+        neighbours: Dict[int, list] = {}
+        for a, b in graph.edges.tolist():
+            neighbours.setdefault(a, []).append(b)
+            neighbours.setdefault(b, []).append(a)
+
+        rng = np.random.default_rng(self.seed + n)
+        for i in np.nonzero(~placed)[0]:
+            anchors = [j for j in neighbours.get(i, ()) if placed[j]]
+            centre = positions[anchors].mean(axis=0) if anchors else np.zeros(2)
+            positions[i] = centre + rng.normal(scale=0.5, size=2)
+
+        # New nodes and nodes that gained or lost an edge.
+        known = dict(zip(old_graph.node_ids, old_signatures))
+        changed = {i for i, (node_id, signature) in enumerate(zip(graph.node_ids, signatures)) if known.get(node_id) != signature}
+        mobile = set(changed)
+        for i in changed:
+            mobile.update(neighbours.get(i, ()))
+        if len(mobile) > n // 2:
+            # Most of the graph is affected; a warm-started full layout is cheaper to reason about.
+            return positions, np.arange(n)
+        return positions, np.array(sorted(mobile), dtype=np.int64)
+
+    def _run(self, generation: int, graph: Graph, positions: np.ndarray, mobile, iterations: int, temperature):
+        def stale():
+            return generation != self._generation
+
+        def publish(pos):
+            with self._lock:
+                if stale():
+                    return
+                self.positions = pos.copy()
+            if self.on_update:
+                self.on_update(graph, pos.copy())
+
+        run_layout(positions, graph.edges, iterations=iterations, mobile=mobile, temperature=temperature, callback=publish, should_stop=stale)
+        if not stale():
+            publish(positions)
+            if self.on_settled and (mobile is None or len(mobile)):
+                self.on_settled(graph, positions.copy())
@@ -0,0 +1,201 @@
+# graph_model.py
+"""
+Graph models derived from the world data for the visual tools.
+
+A Graph is a flat, array-friendly description of nodes and edges: node ids,
+labels and kinds in parallel lists, and edges as an (E, 2) integer array of
+node indices with a parallel list of edge kinds. Layout code only needs the
+array; views use the parallel lists for labels and colours.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from schemas import WorldData, CaseData
+import schemas
+
+
+@dataclass
+class Graph:
+    node_ids: List[str] = field(default_factory=list)
+    labels: List[str] = field(default_factory=list)
+    node_kinds: List[str] = field(default_factory=list)
+    edges: np.ndarray = field(default_factory=lambda: np.zeros((0, 2), dtype=np.int64))
+    edge_kinds: List[str] = field(default_factory=list)
+    index: Dict[str, int] = field(default_factory=dict)
+    directed: bool = False
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def edge_keys(self) -> Set[Tuple[str, str, str]]:
+        """Edges as (source id, target id, kind), for diffing two versions of a graph."""
+        return {
+            (self.node_ids[a], self.node_ids[b], kind)
+            for (a, b), kind in zip(self.edges.tolist(), self.edge_kinds)
+        }
+
+    def node_signatures(self) -> List[str]:
+        """
+        A short digest per node of its incident edges. A node's signature changes
+        exactly when an edge touching it is added or removed, independent of
+        node order, so it can be compared against a layout saved earlier.
+        """
+        incident: List[List[str]] = [[] for _ in self.node_ids]
+        out, into = (">", "<") if self.directed else ("", "")
+        for (a, b), kind in zip(self.edges.tolist(), self.edge_kinds):
+            incident[a].append(f"{out}{self.node_ids[b]}\x1f{kind}")
+            incident[b].append(f"{into}{self.node_ids[a]}\x1f{kind}")
+        return [hashlib.blake2b("\x1e".join(sorted(edges)).encode(), digest_size=8).hexdigest() for edges in incident]
+
+
+def structure_hash(node_ids: List[str], signatures: List[str]) -> str:
+    """One digest for a whole graph, from its node ids and node signatures."""
+    digest = hashlib.blake2b(digest_size=16)
+    for node_id, signature in sorted(zip(node_ids, signatures)):
+        digest.update(f"{node_id}\x1f{signature}\x1e".encode())
+    return digest.hexdigest()
+
+
+class GraphBuilder:
+    """Accumulates nodes and de-duplicated edges, then freezes them into a Graph."""
+
+    def __init__(self, directed: bool = False):
+        self.graph = Graph(directed=directed)
+        self.directed = directed
+        self._edges: List[Tuple[int, int]] = []
+        self._seen: Set[Tuple[int, int, str]] = set()
+
+    def add_node(self, node_id: str, label: str, kind: str) -> int:
+        index = self.graph.index.get(node_id)
+        if index is None:
+            index = self.graph.index[node_id] = len(self.graph.node_ids)
+            self.graph.node_ids.append(node_id)
+            self.graph.labels.append(label)
+            self.graph.node_kinds.append(kind)
+        return index
+
+    def add_edge(self, source_id: Optional[str], target_id: Optional[str], kind: str):
+        """Adds an edge between two known nodes; dangling references and self-loops are skipped."""
+        a, b = self.graph.index.get(source_id), self.graph.index.get(target_id)
+        if a is None or b is None or a == b:
+            return
+        if not self.directed and a > b:
+            a, b = b, a
+        if (a, b, kind) not in self._seen:
+            self._seen.add((a, b, kind))
+            self._edges.append((a, b))
+            self.graph.edge_kinds.append(kind)
+
+    def build(self) -> Graph:
+        if self._edges:
+            self.graph.edges = np.asarray(self._edges, dtype=np.int64)
+        return self.graph
+
+
+def build_social_graph(world_data: WorldData) -> Graph:
+    """
+    Characters (and the sleuth) connected by ally, enemy, relationship and
+    nemesis edges. Factions become hub nodes joined to their members, which
+    keeps a faction of k members at k edges instead of k^2.
+    """
+    builder = GraphBuilder()
+    for char in world_data.characters:
+        builder.add_node(char.id, char.fullName, "Character")
+    for faction in world_data.factions:
+        builder.add_node(faction.id, faction.name, "Faction")
+    sleuth = world_data.sleuth
+    if sleuth:
+        builder.add_node(sleuth.id, sleuth.name, "Sleuth")
+
+    for char in world_data.characters:
+        for ally in char.allies:
+            builder.add_edge(char.id, ally, "ally")
+        for enemy in char.enemies:
+            builder.add_edge(char.id, enemy, "enemy")
+        builder.add_edge(char.id, char.faction, "faction")
+    for faction in world_data.factions:
+        for member in faction.members:
+            builder.add_edge(member, faction.id, "faction")
+    if sleuth:
+        for other in sleuth.relationships:
+            builder.add_edge(sleuth.id, other, "relationship")
+        builder.add_edge(sleuth.id, sleuth.nemesis, "nemesis")
+    return builder.build()
+
+
+
+# revealsUnlocks entries are {"type": ..., "id": ...}; their types map onto plot graph namespaces.
+UNLOCK_NAMESPACES = {
+    "clue": "Clue",
+    "location": "Location",
+    "location_id": "Location",
+    "item": "Item",
+    "character": "CaseSuspect",
+    "suspect": "CaseSuspect",
+}
+PLOT_NAMESPACES = ("Clue", "CaseSuspect", "Location", "Item")
+
+
+def plot_node_id(namespace: str, asset_id: Optional[str]) -> str:
+    """Plot graph node ids are namespaced, since a suspect shares its id with its character."""
+    return f"{namespace}:{asset_id}"
+
+
+def build_plot_graph(world_data: WorldData, case_data: CaseData) -> Graph:
+    """
+    The case as a directed graph of clues, suspects, case locations and the
+    items the case refers to. Edges point from what the player needs first to
+    what it leads to: dependencies and discovery-path steps into a clue, a clue
+    into what it unlocks, and debunking clues into the clue or suspect they expose.
+    """
+    names = {
+        ns: {a.id: schemas.get_display_name(a) for a in assets}
+        for ns, assets in (("Character", world_data.characters), ("Location", world_data.locations), ("Item", world_data.items))
+    }
+    builder = GraphBuilder(directed=True)
+    for clue in case_data.clues:
+        builder.add_node(plot_node_id("Clue", clue.clueId), schemas.get_display_name(clue), "Clue")
+    for suspect in case_data.keySuspects:
+        builder.add_node(plot_node_id("CaseSuspect", suspect.characterId), names["Character"].get(suspect.characterId, suspect.characterId), "CaseSuspect")
+    for case_location in case_data.caseLocations:
+        builder.add_node(plot_node_id("Location", case_location.locationId), names["Location"].get(case_location.locationId, case_location.locationId), "Location")
+
+    item_ids = [clue.associatedItem for clue in case_data.clues]
+    item_ids += [q.hasItem for s in case_data.keySuspects for q in s.interview]
+    item_ids += [u.get("id") for c in case_data.clues for u in c.revealsUnlocks if UNLOCK_NAMESPACES.get(u.get("type")) == "Item"]
+    if case_data.caseMeta:
+        item_ids.append(case_data.caseMeta.murderWeapon)
+    for item_id in item_ids:
+        if item_id in names["Item"]:
+            builder.add_node(plot_node_id("Item", item_id), names["Item"][item_id], "Item")
+
+    def resolve(asset_id: Optional[str], namespace: Optional[str] = None) -> Optional[str]:
+        namespaces = (namespace,) if namespace else PLOT_NAMESPACES
+        for ns in namespaces:
+            node_id = plot_node_id(ns, asset_id)
+            if node_id in builder.graph.index:
+                return node_id
+        return None
+
+    for clue in case_data.clues:
+        clue_node = plot_node_id("Clue", clue.clueId)
+        for dependency in clue.dependencies:
+            builder.add_edge(resolve(dependency, "Clue"), clue_node, "dependency")
+        for unlock in clue.revealsUnlocks:
+            builder.add_edge(clue_node, resolve(unlock.get("id"), UNLOCK_NAMESPACES.get(unlock.get("type"))), "unlocks")
+        builder.add_edge(resolve(clue.debunkingClue, "Clue"), clue_node, "debunks")
+        builder.add_edge(clue_node, resolve(clue.associatedItem, "Item"), "associated")
+        steps = [node for node in (resolve(step) for step in clue.discoveryPath) if node] + [clue_node]
+        for source, target in zip(steps, steps[1:]):
+            builder.add_edge(source, target, "discovery")
+    for suspect in case_data.keySuspects:
+        suspect_node = plot_node_id("CaseSuspect", suspect.characterId)
+        for question in suspect.interview:
+            builder.add_edge(resolve(question.debunkingClue, "Clue"), suspect_node, "debunks")
+    for case_location in case_data.caseLocations:
+        for clue_id in case_location.locationClues:
+            builder.add_edge(plot_node_id("Location", case_location.locationId), resolve(clue_id, "Clue"), "found at")
+    return builder.build()
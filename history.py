@@ -0,0 +1,191 @@
+# history.py
+"""
+Delta-based undo/redo.
+
+Each step is a short list of deltas that point at the live asset objects:
+a FieldChange (owner, attr, old value, new value), an Insertion or a Removal
+(container list, index, asset). Nothing is snapshotted, so recording an edit
+is O(1) regardless of world size, and the stored values are shared with the
+data rather than copied.
+
+Consecutive edits of the same field within `coalesce_seconds` are merged into
+one step, so typing a name is undone as a whole. `group()` collects every
+delta recorded inside it (for example a bulk delete and its cascade) into a
+single step. The oldest steps are dropped once the estimated size of the
+history exceeds `max_bytes`.
+"""
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional, Union
+
+from references import FieldChange, Removal
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_COALESCE_SECONDS = 1.0
+_DELTA_OVERHEAD = 96  # Rough per-delta cost of the dataclass and list slot.
+
+
+@dataclass
+class Insertion:
+    container: list
+    index: int
+    asset: Any
+
+
+Delta = Union[FieldChange, Insertion, Removal]
+
+
+class _Step:
+    __slots__ = ("deltas", "size", "coalesce_key", "timestamp")
+
+    def __init__(self, deltas: List[Delta], timestamp: float):
+        self.deltas = deltas
+        self.size = sum(_delta_size(d) for d in deltas)
+        self.coalesce_key = None
+        self.timestamp = timestamp
+
+
+def _delta_size(delta: Delta) -> int:
+    if isinstance(delta, FieldChange):
+        return _DELTA_OVERHEAD + sys.getsizeof(delta.old_value) + sys.getsizeof(delta.new_value)
+    return _DELTA_OVERHEAD
+
+
+def apply_delta(delta: Delta, reverse: bool = False):
+    """Replays a delta, or reverts it when `reverse` is set."""
+    if isinstance(delta, FieldChange):
+        setattr(delta.owner, delta.attr, delta.old_value if reverse else delta.new_value)
+    elif isinstance(delta, Insertion) != reverse:
+        delta.container.insert(delta.index, delta.asset)
+    else:
+        # Find the asset by identity; dataclass equality would match look-alike copies.
+        index = next(i for i, asset in enumerate(delta.container) if asset is delta.asset)
+        del delta.container[index]
+
+
+class History:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, coalesce_seconds: float = DEFAULT_COALESCE_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.coalesce_seconds = coalesce_seconds
+        self.clock = clock
+        self._undo: deque = deque()
+        self._redo: List[_Step] = []
+        self._size = 0
+        self._group: Optional[List[Delta]] = None
+        self._group_depth = 0
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
+
+    def break_coalescing(self):
+        """Makes the next field edit start a new step."""
+        if self._undo:
+            self._undo[-1].coalesce_key = None
+
+    # --- Recording ---
+
+    def record_field(self, owner: Any, attr: str, old_value: Any, new_value: Any):
+        if old_value is new_value or (type(old_value) is type(new_value) and old_value == new_value):
+            return
+        if self._group is not None:
+            self._group.append(FieldChange(owner, attr, old_value, new_value))
+            return
+        now = self.clock()
+        last = self._undo[-1] if self._undo else None
+        key = (id(owner), attr)
+        if last is not None and last.coalesce_key == key and now - last.timestamp <= self.coalesce_seconds:
+            delta = last.deltas[0]
+            self._resize(last, -sys.getsizeof(delta.new_value) + sys.getsizeof(new_value))
+            delta.new_value = new_value
+            last.timestamp = now
+            self._redo.clear()
+            return
+        step = self._push([FieldChange(owner, attr, old_value, new_value)])
+        step.coalesce_key = key
+
+    def record_insertion(self, container: list, index: int, asset: Any):
+        self.record_all([Insertion(container, index, asset)])
+
+    def record_all(self, deltas: Iterable[Delta]):
+        """Records already-applied deltas as one step (or into the open group)."""
+        deltas = list(deltas)
+        if not deltas:
+            return
+        if self._group is not None:
+            self._group.extend(deltas)
+        else:
+            self._push(deltas)
+
+    @contextmanager
+    def group(self):
+        """Collects every delta recorded inside the block into a single step."""
+        if self._group_depth == 0:
+            self._group = []
+        self._group_depth += 1
+        try:
+            yield
+        finally:
+            self._group_depth -= 1
+            if self._group_depth == 0:
+                deltas, self._group = self._group, None
+                self.record_all(deltas)
+
+    def _push(self, deltas: List[Delta]) -> _Step:
+        step = _Step(deltas, self.clock())
+        self._undo.append(step)
+        self._size += step.size
+        self._redo.clear()
+        self._trim()
+        return step
+
+    def _resize(self, step: _Step, delta_bytes: int):
+        step.size += delta_bytes
+        self._size += delta_bytes
+        self._trim()
+
+    def _trim(self):
+        # Always keep the newest step, even if it alone exceeds the budget.
+        while self._size > self.max_bytes and len(self._undo) > 1:
+            self._size -= self._undo.popleft().size
+
+    # --- Undo / redo ---
+
+    def undo(self) -> List[Delta]:
+        """Reverts the newest step and returns its deltas in the order they were reverted."""
+        if not self._undo:
+            return []
+        step = self._undo.pop()
+        self._size -= step.size
+        step.coalesce_key = None
+        self.break_coalescing()
+        reverted = list(reversed(step.deltas))
+        for delta in reverted:
+            apply_delta(delta, reverse=True)
+        self._redo.append(step)
+        return reverted
+
+    def redo(self) -> List[Delta]:
+        """Replays the most recently undone step and returns its deltas."""
+        if not self._redo:
+            return []
+        step = self._redo.pop()
+        for delta in step.deltas:
+            apply_delta(delta)
+        self.break_coalescing()
+        self._undo.append(step)
+        self._size += step.size
+        self._trim()
+        return step.deltas
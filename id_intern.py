@@ -0,0 +1,214 @@
+# id_intern.py
+"""
+Dense integer ids for assets, and reference fields as CSR adjacency arrays.
+
+Asset ids are long strings ("char-<uuid4>"), so checks that follow
+references through dicts and sets hash them again and again. IdInterner
+gives every asset a small integer per asset type, with maps both ways, and
+turns each reference field of REFERENCE_FIELDS into a CSR array over those
+integers: the targets of owner i are indices[indptr[i]:indptr[i + 1]], -1
+marking an id that names no asset of the target type. Reachability, cycle
+and coverage checks then run on integer arrays and boolean masks.
+
+Integers are stable: an asset keeps its number for as long as its id
+exists, and new ids are appended. Deleted or renamed ids leave a dead slot
+(`alive` is False there) rather than shifting everyone after them. Like the
+TravelTable, the interner is a change listener that only marks things stale.
+Creations and deletions re-intern the affected type on the next query, and an
+edited field only drops its own cached adjacency array.
+
+Only assets held in a top-level list (and the sleuth) are interned. CaseMeta
+and nested questions and witnesses have no id of their own.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from references import FIELDS_BY_OWNER, REFERENCE_FIELDS, ReferenceField
+from schemas import CaseData, WorldData, get_asset_id
+
+
+def asset_lists(world_data: WorldData, case_data: CaseData) -> Dict[str, list]:
+    """Every interned asset type and the list holding its assets."""
+    return {
+        "Character": world_data.characters,
+        "Location": world_data.locations,
+        "Item": world_data.items,
+        "Faction": world_data.factions,
+        "District": world_data.districts,
+        "Sleuth": [world_data.sleuth] if world_data.sleuth else [],
+        "LoreEvent": world_data.events,
+        "Clue": case_data.clues,
+        "CaseSuspect": case_data.keySuspects,
+        "CaseLocation": case_data.caseLocations,
+        "Whereabout": case_data.whereabouts,
+        "ChainEvent": case_data.eventChain,
+        "ChainLink": case_data.chainLinks,
+    }
+
+
+class IdTable:
+    """Two-way map between the ids of one asset type and dense integers."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.alive = np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def intern(self, asset_id: str) -> int:
+        number = self.index.get(asset_id)
+        if number is None:
+            number = self.index[asset_id] = len(self.ids)
+            self.ids.append(asset_id)
+        return number
+
+    def lookup(self, asset_id: Optional[str]) -> int:
+        """The number of a live id, or -1."""
+        number = self.index.get(asset_id, -1)
+        return number if number >= 0 and self.alive[number] else -1
+
+    def lookup_many(self, asset_ids: Iterable[Optional[str]]) -> np.ndarray:
+        return np.array([self.lookup(asset_id) for asset_id in asset_ids], dtype=np.int64)
+
+    def sync(self, asset_ids: Iterable[Optional[str]]):
+        """Makes exactly `asset_ids` alive, interning the new ones."""
+        numbers = [self.intern(asset_id) for asset_id in asset_ids if asset_id]
+        self.alive = np.zeros(len(self.ids), dtype=bool)
+        self.alive[numbers] = True
+
+
+@dataclass
+class Adjacency:
+    """A reference field as CSR: owner i points at indices[indptr[i]:indptr[i + 1]]."""
+    field: ReferenceField
+    indptr: np.ndarray
+    indices: np.ndarray  # Target numbers; -1 for ids that name no live target.
+
+    def targets(self, owner: int) -> np.ndarray:
+        return self.indices[self.indptr[owner]:self.indptr[owner + 1]]
+
+    def owners(self) -> np.ndarray:
+        """The owner number of every entry of `indices`."""
+        return np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+
+    def dangling(self) -> np.ndarray:
+        """Owner numbers with at least one reference that names no live target."""
+        return np.unique(self.owners()[self.indices < 0])
+
+
+def reachable(adjacency: Adjacency, seeds: Iterable[int], size: Optional[int] = None) -> np.ndarray:
+    """A mask of the nodes reachable from `seeds` (included) along a same-type field."""
+    size = size if size is not None else len(adjacency.indptr) - 1
+    owners = adjacency.owners()
+    valid = adjacency.indices >= 0
+    owners, targets = owners[valid], adjacency.indices[valid]
+    seen = np.zeros(size, dtype=bool)
+    frontier = np.zeros(size, dtype=bool)
+    frontier[list(seeds)] = True
+    while frontier.any():
+        seen |= frontier
+        step = np.zeros(size, dtype=bool)
+        step[targets[frontier[owners]]] = True
+        frontier = step & ~seen
+    return seen
+
+
+def cycle_bound(adjacency: Adjacency, alive: np.ndarray) -> np.ndarray:
+    """
+    A mask of the live nodes from which a cycle can be reached along a
+    same-type field. Nodes whose references all lead to dead ends are peeled
+    off until only those remain.
+    """
+    owners = adjacency.owners()
+    valid = (adjacency.indices >= 0) & alive[owners]
+    owners, targets = owners[valid], adjacency.indices[valid]
+    valid = alive[targets]
+    owners, targets = owners[valid], targets[valid]
+    remaining = alive.copy()
+    out_degree = np.bincount(owners, minlength=len(alive))
+    while True:
+        leaves = remaining & (out_degree == 0)
+        if not leaves.any():
+            return remaining
+        remaining &= ~leaves
+        # Every reference into a peeled node no longer counts towards its owner.
+        into_leaves = leaves[targets]
+        out_degree -= np.bincount(owners[into_leaves], minlength=len(alive))
+        owners, targets = owners[~into_leaves], targets[~into_leaves]
+
+
+class IdInterner:
+    def __init__(self):
+        self.world_data: Optional[WorldData] = None
+        self.case_data: Optional[CaseData] = None
+        self.tables: Dict[str, IdTable] = {}
+        self._adjacency: Dict[Tuple[str, str], Adjacency] = {}
+        self._dirty: Set[str] = set()
+
+    def reset(self, world_data: WorldData, case_data: CaseData):
+        """Switches to another case; numbers restart from zero."""
+        self.world_data, self.case_data = world_data, case_data
+        self.tables = {asset_type: IdTable() for asset_type in asset_lists(world_data, case_data)}
+        self._adjacency = {}
+        self._dirty = set(self.tables)
+
+    def on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        """Change listener: drops whatever an edit may have made out of date."""
+        asset_type = type(asset).__name__
+        if attribute_name is None or attribute_name in ("id", "clueId", "characterId", "locationId"):
+            if asset_type in self.tables:
+                self._dirty.add(asset_type)
+        if attribute_name in FIELDS_BY_OWNER.get(asset_type, {}):
+            self._adjacency.pop((asset_type, attribute_name), None)
+
+    # --- Queries ---
+
+    def table(self, asset_type: str) -> IdTable:
+        self._sync()
+        return self.tables[asset_type]
+
+    def number(self, asset_type: str, asset_id: Optional[str]) -> int:
+        return self.table(asset_type).lookup(asset_id)
+
+    def adjacency(self, owner_type: str, attr: str) -> Adjacency:
+        """The CSR array of a reference field, built on first use after an edit."""
+        self._sync()
+        key = (owner_type, attr)
+        if key not in self._adjacency:
+            self._adjacency[key] = self._build(FIELDS_BY_OWNER[owner_type][attr])
+        return self._adjacency[key]
+
+    # --- Maintenance ---
+
+    def _sync(self):
+        if not self._dirty or self.world_data is None:
+            return
+        dirty, self._dirty = self._dirty, set()
+        lists = asset_lists(self.world_data, self.case_data)
+        for asset_type in dirty:
+            self.tables[asset_type].sync(get_asset_id(asset) for asset in lists[asset_type])
+        for field in REFERENCE_FIELDS:
+            if field.owner_type in dirty or field.target_type in dirty:
+                self._adjacency.pop((field.owner_type, field.attr), None)
+
+    def _build(self, field: ReferenceField) -> Adjacency:
+        owners = self.tables[field.owner_type]
+        targets = self.tables[field.target_type]
+        counts = np.zeros(len(owners), dtype=np.int64)
+        rows: Dict[int, List[Optional[str]]] = {}
+        for asset in asset_lists(self.world_data, self.case_data)[field.owner_type]:
+            value = getattr(asset, field.attr, None)
+            values = (value or []) if field.many else ([value] if value else [])
+            number = owners.lookup(get_asset_id(asset))
+            if number >= 0 and values:
+                # A duplicated owner id keeps the references of its first asset.
+                rows.setdefault(number, values)
+                counts[number] = len(rows[number])
+        indptr = np.zeros(len(owners) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        ordered = [asset_id for number in sorted(rows) for asset_id in rows[number]]
+        return Adjacency(field, indptr, targets.lookup_many(ordered))
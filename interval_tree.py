@@ -0,0 +1,72 @@
+# interval_tree.py
+"""
+A static augmented interval tree for closed intervals [start, end].
+
+Intervals are sorted by start and cut into blocks of LEAF_SIZE. A complete
+binary tree over the blocks stores the largest end in each subtree, so an
+overlap query only descends into subtrees that can still reach the query's
+start, and it stops at the last block whose intervals begin before the
+query's end. The surviving blocks are then filtered with one vectorized
+comparison. Queries cost O(log n + k).
+
+The tree is rebuilt rather than updated in place. A rebuild is one argsort
+and a few array reductions, which is cheaper for thousands of intervals than
+rebalancing a pointer-based tree in Python.
+"""
+from typing import Sequence
+
+import numpy as np
+
+LEAF_SIZE = 32
+
+
+class IntervalTree:
+    def __init__(self, starts: Sequence[float], ends: Sequence[float]):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        # Positions of the intervals in the caller's order, sorted by start.
+        self.order = np.argsort(starts, kind="stable")
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        n_blocks = -(-len(starts) // LEAF_SIZE)
+        self._size = 1 << max(n_blocks - 1, 0).bit_length()
+        # Heap layout: node i has children 2i and 2i + 1, leaves start at _size.
+        self._max_end = np.full(2 * self._size, -np.inf)
+        if n_blocks:
+            self._max_end[self._size:self._size + n_blocks] = np.maximum.reduceat(self.ends, np.arange(0, len(starts), LEAF_SIZE))
+        width = self._size
+        while width > 1:
+            width //= 2
+            self._max_end[width:2 * width] = np.maximum(self._max_end[2 * width:4 * width:2], self._max_end[2 * width + 1:4 * width:2])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, t0: float, t1: float) -> np.ndarray:
+        """Positions (in the caller's order) of the intervals overlapping [t0, t1], sorted by start."""
+        stop = int(np.searchsorted(self.starts, t1, side="right"))
+        if stop == 0 or t0 > t1:
+            return np.zeros(0, dtype=np.int64)
+        last_block = (stop - 1) // LEAF_SIZE
+        blocks = []
+        stack = [(1, 0, self._size)]  # (node, first block, end block)
+        while stack:
+            node, lo, hi = stack.pop()
+            if lo > last_block or self._max_end[node] < t0:
+                continue
+            if node >= self._size:
+                blocks.append(lo)
+                continue
+            mid = (lo + hi) // 2
+            # Right child first so blocks come off the stack in order.
+            stack.append((2 * node + 1, mid, hi))
+            stack.append((2 * node, lo, mid))
+        if not blocks:
+            return np.zeros(0, dtype=np.int64)
+        candidates = (np.asarray(blocks)[:, None] * LEAF_SIZE + np.arange(LEAF_SIZE)).ravel()
+        candidates = candidates[candidates < stop]
+        return self.order[candidates[self.ends[candidates] >= t0]]
+
+    def stabbing(self, t: float) -> np.ndarray:
+        """Positions of the intervals containing `t`."""
+        return self.overlapping(t, t)
@@ -0,0 +1,84 @@
+# layout_store.py
+"""
+Graph layouts saved next to a case's data, so the visual tools reopen where
+they were left instead of laying the graph out again.
+
+Each force-laid-out view (the social graph and the plot graph) keeps its
+layout under its own name, "social" or "plot". The map and faction views
+place nodes from the assets themselves and need no store. An entry holds node
+positions keyed by asset id, a signature per node (a digest of its incident
+edges, see Graph.node_signatures) and a hash of the whole structure. An
+engine restored from an entry skips layout entirely while the hash matches,
+and otherwise re-lays out only the nodes whose signatures changed.
+
+The file is a cache: if it is missing, unreadable or from another version,
+views simply start from a fresh layout.
+"""
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from graph_layout import LayoutEngine
+
+LAYOUTS_FILE = "layouts.json"
+FORMAT_VERSION = 1
+
+
+class LayoutStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._layouts: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()  # Engines save from their worker threads.
+
+    def _load(self) -> Dict[str, Any]:
+        if self._layouts is None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self._layouts = data.get("layouts", {}) if data.get("version") == FORMAT_VERSION else {}
+            except (OSError, ValueError, AttributeError):
+                self._layouts = {}
+            if not isinstance(self._layouts, dict):
+                self._layouts = {}
+        return self._layouts
+
+    def restore(self, name: str, engine: LayoutEngine) -> bool:
+        """Seeds `engine` with the saved layout `name`. Returns False if there is none."""
+        with self._lock:
+            entry = self._load().get(name)
+        if not entry:
+            return False
+        try:
+            nodes = entry.get("nodes", {})
+            positions = {node_id: (float(x), float(y)) for node_id, (x, y, _) in nodes.items()}
+            signatures = {node_id: str(signature) for node_id, (_, _, signature) in nodes.items()}
+            digest, pinned = str(entry.get("structureHash", "")), [str(node_id) for node_id in entry.get("pinned", [])]
+            if not all(math.isfinite(value) for position in positions.values() for value in position):
+                return False
+        except (AttributeError, TypeError, ValueError):
+            # A hand-edited or damaged entry; lay out afresh.
+            return False
+        engine.restore(positions=positions, signatures=signatures, digest=digest, pinned=pinned)
+        return True
+
+    def save(self, name: str, engine: LayoutEngine):
+        """Records the engine's current layout as `name` and rewrites the file."""
+        positions, signatures, digest, pinned = engine.export()
+        entry = {
+            "structureHash": digest,
+            "nodes": {node_id: [round(x, 4), round(y, 4), signatures[node_id]] for node_id, (x, y) in positions.items()},
+            "pinned": pinned,
+        }
+        with self._lock:
+            layouts = self._load()
+            layouts[name] = entry
+            if not self.path.parent.exists():
+                return
+            # Write-then-rename so a crash mid-save never leaves a truncated file.
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w") as f:
+                json.dump({"version": FORMAT_VERSION, "layouts": layouts}, f)
+            os.replace(temp_path, self.path)
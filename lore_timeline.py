@@ -0,0 +1,160 @@
+# lore_timeline.py
+"""
+Indexing of the world's LoreEvents for the history timeline.
+
+Dates are "1921", "1921-03" or "1921-03-14" strings. They are mapped onto a
+single axis measured in years, where every month is exactly 1/12 of a year
+and every day 1/372 (31 slots per month). Calendar periods therefore line up
+with the zoom levels' bucket edges. Short months simply leave their last
+slots empty. An event covers [start of its start date, end of its end date).
+
+LoreTimeline keeps the dated events in an IntervalTree for range and overlap
+queries. For each zoom level it also keeps the number of events overlapping
+every bucket, so a zoomed-out view draws a few hundred bars instead of
+thousands of events. The counts are computed the first time a level is
+shown, with one difference-array pass over all events.
+"""
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from interval_tree import IntervalTree
+from schemas import LoreEvent
+
+DAYS_PER_MONTH_SLOT = 31
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+# Zoom levels from coarsest to finest as (name, bucket width in years).
+ZOOM_LEVELS: Tuple[Tuple[str, float], ...] = (
+    ("century", 100.0),
+    ("decade", 10.0),
+    ("year", 1.0),
+    ("month", 1 / 12),
+    ("day", 1 / (12 * DAYS_PER_MONTH_SLOT)),
+)
+MAX_PRECOMPUTED_BUCKETS = 2_000_000  # Finer levels are counted on demand for the visible range only.
+EPSILON = 1e-9  # In bucket units; keeps dates on a bucket edge from rounding into the wrong bucket.
+
+_DATE = re.compile(r"^\s*(-?\d{1,6})(?:-(\d{1,2}))?(?:-(\d{1,2}))?\s*$")
+
+
+def parse_date(text: Optional[str], end: bool = False) -> Optional[float]:
+    """
+    The position of a date on the timeline axis, or None if it does not parse.
+    With `end`, the position just after the year, month or day it names.
+    """
+    match = _DATE.match(text or "")
+    if not match:
+        return None
+    year, month, day = (int(part) if part else None for part in match.groups())
+    if month is not None and not 1 <= month <= 12:
+        return None
+    if day is not None and not 1 <= day <= DAYS_PER_MONTH_SLOT:
+        return None
+    if month is None:
+        return float(year + end)
+    if day is None:
+        return year + (month - 1 + end) / 12
+    return year + (month - 1) / 12 + (day - 1 + end) / (12 * DAYS_PER_MONTH_SLOT)
+
+
+def format_date(t: float, level: str) -> str:
+    """A label for position `t` at the precision of a zoom level."""
+    year = math.floor(t + 1e-9)
+    slot = round((t - year) * 12 * DAYS_PER_MONTH_SLOT)
+    month, day = divmod(min(slot, 12 * DAYS_PER_MONTH_SLOT - 1), DAYS_PER_MONTH_SLOT)
+    if level in ("century", "decade", "year"):
+        return str(year)
+    if level == "month":
+        return f"{MONTHS[month]} {year}"
+    return f"{day + 1} {MONTHS[month]} {year}"
+
+
+def iso_date(t: float, level: str) -> str:
+    """The date string for position `t`, as precise as the zoom level."""
+    year = math.floor(t + 1e-9)
+    month, day = divmod(min(round((t - year) * 12 * DAYS_PER_MONTH_SLOT), 12 * DAYS_PER_MONTH_SLOT - 1), DAYS_PER_MONTH_SLOT)
+    if level in ("century", "decade", "year"):
+        return str(year)
+    if level == "month":
+        return f"{year}-{month + 1:02d}"
+    return f"{year}-{month + 1:02d}-{day + 1:02d}"
+
+
+def level_width(level: str) -> float:
+    return dict(ZOOM_LEVELS)[level]
+
+
+class LoreTimeline:
+    def __init__(self, events: Sequence[LoreEvent]):
+        self.events: List[LoreEvent] = []
+        self.undated: List[LoreEvent] = []
+        starts, ends = [], []
+        for event in events:
+            start = parse_date(event.start)
+            end = parse_date(event.end or event.start, end=True)
+            if start is None or end is None:
+                self.undated.append(event)
+                continue
+            self.events.append(event)
+            starts.append(start)
+            ends.append(max(end, start))
+        self.starts = np.array(starts, dtype=np.float64)
+        self.ends = np.array(ends, dtype=np.float64)
+        self.tree = IntervalTree(self.starts, self.ends)
+        self._buckets: Dict[str, Tuple[int, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def span(self) -> Optional[Tuple[float, float]]:
+        if not self.events:
+            return None
+        return float(self.starts.min()), float(self.ends.max())
+
+    def query(self, t0: float, t1: float) -> np.ndarray:
+        """Indices into `events` of the events overlapping [t0, t1), in start order."""
+        hits = self.tree.overlapping(t0, t1)
+        # The tree works on closed intervals; drop events that end exactly at t0.
+        return hits[self.ends[hits] > t0]
+
+    def buckets(self, level: str, t0: float, t1: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The `level` buckets meeting [t0, t1) as (bucket start positions, number
+        of events overlapping each bucket).
+        """
+        width = level_width(level)
+        first, last = math.floor(t0 / width), math.ceil(t1 / width)
+        edges = np.arange(first, last) * width
+        if not self.events or last <= first:
+            return edges, np.zeros(len(edges), dtype=np.int64)
+        cached = self._level_counts(level)
+        if cached is None:
+            return edges, self._count(self.query(first * width, last * width), width, first, last)
+        origin, counts = cached
+        lo, hi = max(first - origin, 0), min(last - origin, len(counts))
+        result = np.zeros(last - first, dtype=np.int64)
+        if lo < hi:
+            result[lo + origin - first:hi + origin - first] = counts[lo:hi]
+        return edges, result
+
+    def _level_counts(self, level: str) -> Optional[Tuple[int, np.ndarray]]:
+        if level not in self._buckets:
+            width = level_width(level)
+            first = math.floor(self.starts.min() / width + EPSILON)
+            last = math.ceil(self.ends.max() / width - EPSILON)
+            if last - first > MAX_PRECOMPUTED_BUCKETS:
+                return None
+            self._buckets[level] = (first, self._count(np.arange(len(self.events)), width, first, last))
+        return self._buckets[level]
+
+    def _count(self, indices: np.ndarray, width: float, first: int, last: int) -> np.ndarray:
+        """Events in `indices` overlapping each bucket first..last - 1, via a difference array."""
+        lo = np.clip(np.floor(self.starts[indices] / width + EPSILON).astype(np.int64), first, last) - first
+        hi = np.clip(np.ceil(self.ends[indices] / width - EPSILON).astype(np.int64), first, last) - first
+        hi = np.maximum(hi, np.minimum(lo + 1, last - first))  # Zero-length events still count once.
+        diff = np.zeros(last - first + 1, dtype=np.int64)
+        np.add.at(diff, lo, 1)
+        np.add.at(diff, hi, -1)
+        return np.cumsum(diff[:-1])
@@ -1,10 +1,352 @@
+import threading
+from itertools import chain
+from typing import Any, Optional
+
 import flet as ft
+import flet.canvas as cv
+import numpy as np
+
 from my_control import Control
+import schemas
+from spatial_index import QuadTree
 
-def build_map_tool_view(control: Control):
-    return ft.Column(
-        [
-            ft.Text("Map Tool (Under Construction)", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
-            ft.Text("This section will allow you to visualize and manage locations."),
+VIEW_WIDTH = 1000
+VIEW_HEIGHT = 700
+NODE_RADIUS = {"Location": 8, "District": 22}
+NODE_COLORS = {"Location": ft.Colors.BLUE_300, "District": ft.Colors.with_opacity(0.35, ft.Colors.TEAL_300)}
+ROUTE_COLOR = ft.Colors.AMBER_300
+MEMBERSHIP_COLOR = ft.Colors.with_opacity(0.3, ft.Colors.TEAL_100)
+LABEL_SCALE = 0.6  # Names and route times are only drawn from this zoom on.
+MIN_ZOOM, MAX_ZOOM = 0.05, 8.0
+REDRAW_DELAY = 0.2
+TRAVEL_LIST_LENGTH = 8
+
+
+class MapToolView:
+    """
+    The city map: locations and districts placed at (mapX, mapY) and joined by
+    their travelRoutes.
+
+    Placed assets live in a QuadTree, which culls the canvas to the viewport
+    and hit-tests clicks and drags. Routes and district memberships are kept
+    as index pairs into one coordinate array, so a pan or drag frame culls
+    them with a vectorized bounding-box test; a road crossing the view with
+    both ends off it is still drawn. Dragging a place writes its coordinates
+    back as one undoable edit; routes are edited from the side panel, which
+    also lists travel times from the selected place out of the control's
+    incrementally maintained TravelTable.
+    """
+
+    def __init__(self, control: Control):
+        self.control = control
+        self.places = {}  # id -> Location or District with coordinates
+        self.tree = QuadTree()
+        self._index = {}  # place id -> row of _coords
+        self._coords = np.zeros((0, 2))
+        self._routes = np.zeros((0, 2), dtype=np.intp)  # (from, to) rows of _coords
+        self._route_minutes = []
+        self._memberships = np.zeros((0, 2), dtype=np.intp)  # (place, district) rows of _coords
+        self.scale = 1.0
+        self.offset = np.array([0.0, 0.0])  # screen = map * scale + offset
+        self.selected: Optional[str] = None
+        self.dragging: Optional[str] = None
+        self._drag_position = None
+        self._timer: Optional[threading.Timer] = None
+
+        self.canvas = cv.Canvas(width=VIEW_WIDTH, height=VIEW_HEIGHT)
+        surface = ft.GestureDetector(
+            content=ft.Container(
+                self.canvas,
+                width=VIEW_WIDTH,
+                height=VIEW_HEIGHT,
+                clip_behavior=ft.ClipBehavior.HARD_EDGE,
+                border=ft.border.all(1, ft.Colors.OUTLINE),
+            ),
+            drag_interval=16,
+            on_pan_start=self._on_pan_start,
+            on_pan_update=self._on_pan_update,
+            on_pan_end=self._on_pan_end,
+            on_scroll=self._on_scroll,
+            on_tap_down=self._on_tap_down,
+            on_double_tap=self._on_double_tap,
+        )
+
+        self.unplaced_dropdown = ft.Dropdown(label="Unplaced", width=260)
+        self.selected_title = ft.Text(style=ft.TextThemeStyle.TITLE_MEDIUM)
+        self.route_list = ft.Column(spacing=0)
+        self.route_target = ft.Dropdown(label="Route to", width=200)
+        self.route_minutes = ft.TextField(label="Minutes", width=90, keyboard_type=ft.KeyboardType.NUMBER)
+        self.travel_list = ft.Column(spacing=0)
+        self.details = ft.Column(
+            [
+                self.selected_title,
+                ft.Text("Routes", weight=ft.FontWeight.BOLD),
+                self.route_list,
+                ft.Row([self.route_target, self.route_minutes, ft.IconButton(icon=ft.Icons.ADD_ROAD, tooltip="Add route", on_click=self._add_route)]),
+                ft.Text("Travel times", weight=ft.FontWeight.BOLD),
+                self.travel_list,
+            ],
+            visible=False,
+        )
+        side_panel = ft.Column(
+            [
+                ft.Row([self.unplaced_dropdown, ft.IconButton(icon=ft.Icons.ADD_LOCATION_ALT, tooltip="Place at the centre of the view", on_click=self._place_selected)]),
+                ft.Divider(),
+                self.details,
+            ],
+            width=380,
+            scroll=ft.ScrollMode.AUTO,
+        )
+        self.view = ft.Column(
+            [
+                ft.Row([
+                    ft.Text("Map Tool", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
+                    ft.IconButton(icon=ft.Icons.CENTER_FOCUS_STRONG, tooltip="Fit to view", on_click=lambda e: self.fit()),
+                ]),
+                ft.Text("Drag places to move them, drag the background to pan, scroll to zoom, double-click a place to open it."),
+                ft.Row([surface, side_panel], vertical_alignment=ft.CrossAxisAlignment.START),
+            ],
+            scroll=ft.ScrollMode.AUTO,
+        )
+
+        control.add_change_listener(self._on_asset_changed)
+        for asset_type in ("Location", "District"):
+            control.register_refresher(asset_type, self.refresh)
+        self.refresh()
+        self.fit(update=False)
+
+    # --- Data ---
+
+    def refresh(self):
+        """Re-reads the places from the world and redraws; does not call page.update()."""
+        world = self.control.world_data
+        self.places = {p.id: p for p in chain(world.districts, world.locations) if p.mapX is not None and p.mapY is not None}
+        self.tree = QuadTree()
+        for place_id, place in self.places.items():
+            self.tree.insert(place_id, place.mapX, place.mapY)
+        self._index = {place_id: i for i, place_id in enumerate(self.places)}
+        self._coords = np.array([(p.mapX, p.mapY) for p in self.places.values()], dtype=float).reshape(-1, 2)
+        routes, memberships, self._route_minutes = [], [], []
+        for place_id, place in self.places.items():
+            district = getattr(place, "district", None)
+            if district in self.places:
+                memberships.append((self._index[place_id], self._index[district]))
+            for route in place.travelRoutes:
+                if route.get("to") in self.places:
+                    routes.append((self._index[place_id], self._index[route.get("to")]))
+                    self._route_minutes.append(route.get("minutes"))
+        self._routes = np.array(routes, dtype=np.intp).reshape(-1, 2)
+        self._memberships = np.array(memberships, dtype=np.intp).reshape(-1, 2)
+        if self.selected not in self.places:
+            self.selected = None
+        self.unplaced_dropdown.options = [
+            ft.dropdown.Option(key=p.id, text=f"{schemas.get_display_name(p)} ({type(p).__name__})")
+            for p in chain(world.districts, world.locations) if p.id not in self.places
+        ]
+        self.route_target.options = [
+            ft.dropdown.Option(key=p.id, text=schemas.get_display_name(p))
+            for p in chain(world.districts, world.locations)
+        ]
+        self._build_details()
+        self._draw()
+
+    def _on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        if type(asset).__name__ not in ("Location", "District"):
+            return
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(REDRAW_DELAY, self._refresh_and_update)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_and_update(self):
+        self.refresh()
+        if self.view.page:
+            self.view.update()
+
+    # --- Coordinates ---
+
+    def _to_map(self, x: float, y: float) -> np.ndarray:
+        return (np.array([x, y]) - self.offset) / self.scale
+
+    def _screen(self, place_id: str) -> ft.Offset:
+        x, y = np.array(self.tree.position(place_id)) * self.scale + self.offset
+        return ft.Offset(float(x), float(y))
+
+    def fit(self, update: bool = True):
+        if self.places:
+            coords = np.array([self.tree.position(p) for p in self.places])
+            lo, hi = coords.min(axis=0), coords.max(axis=0)
+            span = np.maximum(hi - lo, 1.0)
+            self.scale = float(np.clip(min(VIEW_WIDTH / span[0], VIEW_HEIGHT / span[1]) * 0.8, MIN_ZOOM, MAX_ZOOM))
+            self.offset = np.array([VIEW_WIDTH / 2, VIEW_HEIGHT / 2]) - (lo + hi) / 2 * self.scale
+        self._draw()
+        if update:
+            self._update()
+
+    # --- Drawing ---
+
+    def _draw(self):
+        margin = NODE_RADIUS["District"] / self.scale
+        x0, y0 = self._to_map(0, 0) - margin
+        x1, y1 = self._to_map(VIEW_WIDTH, VIEW_HEIGHT) + margin
+        visible = set(self.tree.query_rect(x0, y0, x1, y1))
+        detailed = self.scale >= LABEL_SCALE
+
+        memberships = self._memberships[self._segments_in(self._memberships, x0, y0, x1, y1)]
+        shown = self._segments_in(self._routes, x0, y0, x1, y1)
+        routes = self._routes[shown]
+        labels = []
+        if detailed:
+            middles = (self._coords[routes[:, 0]] + self._coords[routes[:, 1]]) / 2 * self.scale + self.offset
+            labels = [
+                cv.Text(x, y, f"{self._route_minutes[i]} min", style=ft.TextStyle(size=10, color=ROUTE_COLOR))
+                for (x, y), i in zip(middles.tolist(), shown.tolist())
+            ]
+
+        shapes = [
+            cv.Points(points=self._screen_points(memberships), point_mode=cv.PointMode.LINES, paint=ft.Paint(color=MEMBERSHIP_COLOR, stroke_width=1)),
+            cv.Points(points=self._screen_points(routes), point_mode=cv.PointMode.LINES, paint=ft.Paint(color=ROUTE_COLOR, stroke_width=2)),
         ]
-    )
\ No newline at end of file
+        # Districts first so locations are drawn on top of them.
+        for place_id in sorted(visible, key=lambda p: type(self.places[p]).__name__ != "District"):
+            kind = type(self.places[place_id]).__name__
+            centre = self._screen(place_id)
+            radius = NODE_RADIUS[kind] * min(max(self.scale, 0.3), 2.0)
+            shapes.append(cv.Circle(centre.x, centre.y, radius, paint=ft.Paint(color=NODE_COLORS[kind])))
+            if place_id == self.selected:
+                shapes.append(cv.Circle(centre.x, centre.y, radius + 3, paint=ft.Paint(color=ft.Colors.WHITE, stroke_width=2, style=ft.PaintingStyle.STROKE)))
+            if detailed or kind == "District":
+                shapes.append(cv.Text(centre.x + radius + 3, centre.y - 7, schemas.get_display_name(self.places[place_id]), style=ft.TextStyle(size=12)))
+        self.canvas.shapes = shapes + labels
+
+    def _segments_in(self, segments: np.ndarray, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """Rows of `segments` whose bounding boxes overlap the map rectangle."""
+        a, b = self._coords[segments[:, 0]], self._coords[segments[:, 1]]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        return np.flatnonzero((lo[:, 0] <= x1) & (hi[:, 0] >= x0) & (lo[:, 1] <= y1) & (hi[:, 1] >= y0))
+
+    def _screen_points(self, segments: np.ndarray):
+        """Both ends of each segment on screen, in order, for a LINES Points shape."""
+        screen = self._coords[segments.ravel()] * self.scale + self.offset
+        return [ft.Offset(x, y) for x, y in screen.tolist()]
+
+    def _build_details(self):
+        place = self.places.get(self.selected)
+        self.details.visible = place is not None
+        if place is None:
+            return
+        self.selected_title.value = f"{schemas.get_display_name(place)} ({type(place).__name__})"
+        names = {p.id: schemas.get_display_name(p) for p in chain(self.control.world_data.districts, self.control.world_data.locations)}
+
+        # Routes are stored on one end; show both directions and edit the owner.
+        rows = []
+        for owner in chain(self.control.world_data.districts, self.control.world_data.locations):
+            for route in owner.travelRoutes:
+                if owner is place or route.get("to") == place.id:
+                    other = route.get("to") if owner is place else owner.id
+                    rows.append(ft.Row([
+                        ft.Text(f"{names.get(other, other)}: {route.get('minutes')} min", expand=True),
+                        ft.IconButton(icon=ft.Icons.DELETE_OUTLINE, tooltip="Remove route", on_click=lambda e, o=owner, r=route: self._remove_route(o, r)),
+                    ]))
+        self.route_list.controls = rows or [ft.Text("No routes yet.", italic=True)]
+
+        travel = self.control.travel_table.travel_times_from(place.id, limit=TRAVEL_LIST_LENGTH)
+        self.travel_list.controls = [ft.Text(f"{names.get(other, other)}: {minutes:g} min") for other, minutes in travel] or [ft.Text("Nothing reachable.", italic=True)]
+
+    def _update(self):
+        if self.view.page:
+            self.view.update()
+
+    # --- Editing ---
+
+    def _place_selected(self, e):
+        place_id = self.unplaced_dropdown.value
+        place = next((p for p in chain(self.control.world_data.districts, self.control.world_data.locations) if p.id == place_id), None)
+        if place is None:
+            return
+        x, y = self._to_map(VIEW_WIDTH / 2, VIEW_HEIGHT / 2).tolist()
+        self.selected = place.id
+        self._move(place, x, y)
+
+    def _move(self, place: Any, x: float, y: float):
+        with self.control.history.group():
+            self.control.update_asset(place, "mapX", round(x, 1))
+            self.control.update_asset(place, "mapY", round(y, 1))
+
+    def _add_route(self, e):
+        place = self.places.get(self.selected)
+        target = self.route_target.value
+        try:
+            minutes = float(self.route_minutes.value)
+        except (TypeError, ValueError):
+            self.route_minutes.error_text = "Enter a number"
+            self._update()
+            return
+        if place is None or not target or target == place.id or minutes < 0:
+            return
+        self.route_minutes.error_text = None
+        minutes = int(minutes) if minutes.is_integer() else minutes
+        routes = [r for r in place.travelRoutes if r.get("to") != target]
+        self.control.update_asset(place, "travelRoutes", routes + [{"to": target, "minutes": minutes}])
+
+    def _remove_route(self, owner: Any, route: dict):
+        self.control.update_asset(owner, "travelRoutes", [r for r in owner.travelRoutes if r is not route])
+
+    # --- Interaction ---
+
+    def _hit(self, x: float, y: float) -> Optional[str]:
+        mx, my = self._to_map(x, y)
+        # Prefer locations, which are drawn on top of their districts.
+        location = self.tree.nearest(mx, my, (NODE_RADIUS["Location"] + 4) / min(self.scale, 1.0))
+        return location or self.tree.nearest(mx, my, NODE_RADIUS["District"] / min(self.scale, 1.0))
+
+    def _on_tap_down(self, e: ft.TapEvent):
+        self.selected = self._hit(e.local_x, e.local_y)
+        self._build_details()
+        self._draw()
+        self._update()
+
+    def _on_double_tap(self, e):
+        place = self.places.get(self.selected)
+        if place is not None:
+            self.control.go_to_issue(schemas.ValidationResult(message="", type="", asset_id=place.id, asset_type=type(place).__name__))
+
+    def _on_pan_start(self, e: ft.DragStartEvent):
+        self.dragging = self._hit(e.local_x, e.local_y)
+        if self.dragging is not None:
+            self.selected = self.dragging
+            self._drag_position = np.array(self.tree.position(self.dragging))
+
+    def _on_pan_update(self, e: ft.DragUpdateEvent):
+        if self.dragging is not None:
+            self._drag_position = self._drag_position + np.array([e.delta_x, e.delta_y]) / self.scale
+            self.tree.move(self.dragging, *self._drag_position.tolist())
+            self._coords[self._index[self.dragging]] = self._drag_position
+        else:
+            self.offset = self.offset + (e.delta_x, e.delta_y)
+        self._draw()
+        if self.canvas.page:
+            self.canvas.update()
+
+    def _on_pan_end(self, e):
+        if self.dragging is not None:
+            place = self.places[self.dragging]
+            self.dragging = None
+            self._move(place, *self._drag_position.tolist())
+
+    def _on_scroll(self, e: ft.ScrollEvent):
+        if not e.scroll_delta_y:
+            return
+        factor = 0.9 if e.scroll_delta_y > 0 else 1 / 0.9
+        new_scale = float(np.clip(self.scale * factor, MIN_ZOOM, MAX_ZOOM))
+        cursor = np.array([e.local_x, e.local_y])
+        self.offset = cursor - (cursor - self.offset) * (new_scale / self.scale)
+        self.scale = new_scale
+        self._draw()
+        if self.canvas.page:
+            self.canvas.update()
+
+
+def build_map_tool_view(control: Control):
+    return MapToolView(control).view
@@ -1,13 +1,34 @@
 import flet as ft
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Callable, List, Tuple
 import data_manager
 from schemas import WorldData, CaseData
 import schemas
 import os
-from transformers import pipeline, set_seed
+import copy
+import itertools
+from option_cache import OptionListCache
+from navigation import AssetIndex
+from references import ReferenceIndex, FieldChange, Removal
+from history import History, Insertion
+from layout_store import LayoutStore, LAYOUTS_FILE
+from routing import TravelTable
+from alibi import WhereaboutsIndex
+from event_chain import ChainSolver, event_names
+from graph_analytics import GraphAnalytics
+from id_intern import IdInterner, cycle_bound
+from retrieval import RetrievalIndex, build_prompt
+import voices
+from ai_backends import backend_identity, concurrency
+from ai_model import AIModel, READY
+from ai_generation import MAX_BATCH, GenerationBatch, GenerationJob, GenerationQueue, batch_size
+from generation_cache import GENERATIONS_FILE, PREFETCH_CANDIDATES, GenerationCache, cache_key
 
 class Control:
-    def __init__(self, page: ft.Page, nav_rail: ft.NavigationRail, main_content: ft.Column, build_world_builder_func: Callable, build_case_builder_view_func: Callable, asset_tabs: Optional[ft.Tabs] = None, case_builder_tabs: Optional[ft.Tabs] = None):
+    def __init__(self, page: ft.Page, nav_rail: ft.NavigationRail, main_content: ft.Column, build_world_builder_func: Callable, build_case_builder_view_func: Callable, asset_tabs: Optional[ft.Tabs] = None, case_builder_tabs: Optional[ft.Tabs] = None, load_case: bool = True):
+        """
+        With `load_case=False` no case is open yet; the caller shows the window
+        first and calls `load_initial_data` before building any view.
+        """
         self.page = page
         self.nav_rail = nav_rail
         self.main_content = main_content
@@ -17,7 +38,33 @@ class Control:
         self.case_builder_tabs = case_builder_tabs
         self.selected_asset: Optional[Any] = None
         self.search_term: str = ""
-        self.load_initial_data()
+        self.option_cache = OptionListCache()
+        self.asset_index = AssetIndex()
+        self.reference_index = ReferenceIndex()
+        self.history = History()
+        self.ai_model = AIModel()
+        self.generation_cache = GenerationCache(data_manager.CASES_DIR / GENERATIONS_FILE)
+        self.generation_queue = GenerationQueue(self._generate, self._generate_batch, workers=concurrency())
+        self.ai_candidates: dict = {}  # (asset type, asset id, field) -> seed offset of the text last generated.
+        self.travel_table = TravelTable()
+        self.chain_solver = ChainSolver()
+        self.graph_analytics = GraphAnalytics()
+        self.id_interner = IdInterner()
+        self.retrieval_index = RetrievalIndex()
+        self.view_builders = {0: build_world_builder_func, 1: build_case_builder_view_func}
+        self.views = {}
+        self.selectors: dict = {}
+        self.refreshers: dict = {}
+        self.change_listeners: list = []
+        self.add_change_listener(self.travel_table.on_asset_changed)
+        self.add_change_listener(self.chain_solver.on_asset_changed)
+        self.add_change_listener(self.graph_analytics.on_asset_changed)
+        self.add_change_listener(self.id_interner.on_asset_changed)
+        self.add_change_listener(self.retrieval_index.on_asset_changed)
+        self.world_data: Optional[WorldData] = None
+        self.case_data: Optional[CaseData] = None
+        if load_case:
+            self.load_initial_data()
 
         self.file_picker = ft.FilePicker(on_result=self.on_file_picker_result)
         self.page.overlay.append(self.file_picker)
@@ -26,10 +73,6 @@ class Control:
         self.current_image_asset = None
         self.current_image_field = None
 
-        # Initialize AI text generation pipeline
-        self.generator = pipeline('text-generation', model='gpt2')
-        set_seed(42)
-
     def on_file_picker_result(self, e: ft.FilePickerResultEvent):
         if e.files:
             selected_file = e.files[0]
@@ -45,37 +88,179 @@ class Control:
             shutil.copy(selected_file.path, destination_path)
 
             if self.current_image_asset and self.current_image_field:
-                setattr(self.current_image_asset, self.current_image_field, destination_path)
-                self.page.update()
-                # Rebuild the view to reflect the image change
-                if isinstance(self.current_image_asset, schemas.Character):
-                    self.main_content.controls.clear()
-                    self.main_content.controls.append(self.build_world_builder_func(self, self.current_image_asset.id))
-                # Add similar logic for other asset types if needed
-                self.page.update()
+                self.update_asset(self.current_image_asset, self.current_image_field, destination_path)
+                # Re-select the asset so its form shows the new image
+                self.go_to_issue(schemas.ValidationResult(
+                    message="",
+                    type="",
+                    asset_id=schemas.get_asset_id(self.current_image_asset),
+                    asset_type=type(self.current_image_asset).__name__,
+                ))
 
     def pick_image_file(self, asset: Any, field_name: str):
         self.current_image_asset = asset
         self.current_image_field = field_name
         self.file_picker.pick_files(allow_multiple=False, allowed_extensions=["png", "jpg", "jpeg", "gif", "webp"])
 
-    def generate_with_ai(self, asset: Any, field_name: str):
-        # Placeholder for AI generation logic
-        print(f"AI generation requested for {type(asset).__name__}.{field_name}")
-        
-        prompt = f"Generate a {field_name} for a {type(asset).__name__} named {getattr(asset, 'fullName', getattr(asset, 'name', ''))}:\n"
-        generated_text = self.generator(prompt, max_length=100, num_return_sequences=1)[0]['generated_text']
-        
-        # Extract only the generated part, removing the prompt
-        generated_content = generated_text[len(prompt):].strip()
+    def generate_with_ai(self, asset: Any, field_name: str, on_progress: Optional[Callable[[GenerationJob], None]] = None, on_done: Optional[Callable[[GenerationJob], None]] = None) -> GenerationJob:
+        """
+        Fills a text field of an asset with generated text, on the generation
+        worker rather than the UI thread. `on_progress(job)` sees the text so
+        far a few times per second. When the job finishes the text is written
+        to the asset, unless it was cancelled or failed, and then
+        `on_done(job)` is called. Asking again for a field that is already
+        being generated returns the running job.
 
-        setattr(asset, field_name, generated_content)
-        self.page.update()
-        self.world_data: Optional[WorldData] = None
-        self.case_data: Optional[CaseData] = None
-        self.selected_asset: Optional[Any] = None
-        self.search_term: str = ""
-        self.load_initial_data()
+        Each request for the same field uses the next seed, so asking again
+        regenerates. The next PREFETCH_CANDIDATES seeds are generated in the
+        background once a job finishes, and come from the generation cache.
+        Interview answers are written in their character's voice, everything
+        else by the clinical assistant (see voices.py).
+        """
+        job = self.generation_queue.find(asset, field_name)
+        if job:
+            return job
+        prefix, prompt = self._ai_prompt(asset, field_name)
+        voice = self.ai_voice(asset, field_name)
+        candidate = self._next_candidate(asset, field_name)
+
+        def finished(job: GenerationJob):
+            text = voices.tidy(voice, job.text)
+            if job.error:
+                self.page.snack_bar = ft.SnackBar(ft.Text(f"AI generation failed: {job.error}"), open=True)
+                self.page.update()
+            elif not job.cancelled and text:
+                self.update_asset(asset, field_name, text)
+                for later in range(candidate + 1, candidate + 1 + PREFETCH_CANDIDATES):
+                    prefetch = GenerationJob(asset, field_name, prompt, seed=self.ai_model.seed + later, prefix=prefix, prefetch=True)
+                    if self._generation_key(prefetch) not in self.generation_cache:
+                        self.generation_queue.submit(prefetch)
+            if on_done:
+                on_done(job)
+
+        if self.ai_model.status != READY:
+            self.page.snack_bar = ft.SnackBar(ft.Text("The AI model is still loading; the text will appear when it is ready."), open=True)
+            self.page.update()
+        return self.generation_queue.submit(GenerationJob(asset, field_name, prompt, seed=self.ai_model.seed + candidate, prefix=prefix, on_progress=on_progress, on_done=finished))
+
+    def generate_batch_with_ai(self, assets: List[Any], field_names: List[str], on_item: Optional[Callable[[GenerationBatch, int], None]] = None, on_done: Optional[Callable[[GenerationBatch], None]] = None) -> GenerationBatch:
+        """
+        Fills `field_names` on every one of `assets` with generated text,
+        running the prompts through the model in padded batches. `on_item(batch,
+        index)` is called as each item finishes. At the end every generated text
+        is written in one undoable step; a cancelled batch still applies the
+        items that finished. Then `on_done(batch)` is called.
+        """
+        items = [(asset, field_name) for asset in assets for field_name in field_names]
+
+        def finished(batch: GenerationBatch):
+            if batch.error:
+                self.page.snack_bar = ft.SnackBar(ft.Text(f"AI generation failed: {batch.error}"), open=True)
+            texts = [voices.tidy(self.ai_voice(asset, field_name), text or "") for (asset, field_name), text in zip(batch.items, batch.texts)]
+            changes = [(asset, field_name, text) for (asset, field_name), text in zip(batch.items, texts) if text]
+            if changes:
+                self.bulk_update_fields(changes)
+            else:
+                self.page.update()
+            if on_done:
+                on_done(batch)
+
+        batch = GenerationBatch(
+            items,
+            ["".join(self._ai_prompt(asset, field_name)) for asset, field_name in items],
+            [self.ai_model.seed + self._next_candidate(asset, field_name) for asset, field_name in items],
+            on_item=on_item,
+            on_done=finished,
+        )
+        return self.generation_queue.submit(batch)
+
+    def ai_voice(self, asset: Any, field_name: str) -> str:
+        """Interview answers are spoken by their character; everything else is written by the assistant."""
+        return voices.CHARACTER if self._ai_speaker(asset, field_name) else voices.ASSISTANT
+
+    def _ai_speaker(self, asset: Any, field_name: str) -> Optional[schemas.Character]:
+        if isinstance(asset, schemas.InterviewQuestion) and field_name == "answer":
+            return voices.interview_speaker(self.case_data, self.world_data, asset)
+        return None
+
+    def _ai_prompt(self, asset: Any, field_name: str) -> Tuple[str, str]:
+        """The (prefix, prompt) of a generation in the voice of `ai_voice`."""
+        speaker = self._ai_speaker(asset, field_name)
+        if speaker:
+            return voices.persona_prefix(speaker), voices.answer_prompt(speaker, asset)
+        return voices.ASSISTANT_PREFIX, build_prompt(asset, field_name, self.retrieval_index.related(asset))
+
+    def _next_candidate(self, asset: Any, field_name: str) -> int:
+        """Counts the requests for one field, so each asks for another seed."""
+        slot = (type(asset).__name__, schemas.get_asset_id(asset), field_name)
+        self.ai_candidates[slot] = self.ai_candidates.get(slot, -1) + 1
+        return self.ai_candidates[slot]
+
+    def _generation_key(self, job: GenerationJob) -> str:
+        return self._cache_key(job.prefix + job.prompt, job.max_new_tokens, job.seed)
+
+    def _cache_key(self, prompt: str, max_new_tokens: int, seed: int, batched: bool = False) -> str:
+        """
+        Batched texts are sampled with padding alongside other prompts, so a
+        single generation with the same seed would not reproduce them; they
+        get keys of their own. So does each backend (see
+        ai_backends.backend_identity).
+        """
+        params = {"max_new_tokens": max_new_tokens, "do_sample": True, "backend": backend_identity()}
+        if batched:
+            params["batched"] = True
+        return cache_key(self.ai_model.model_name, prompt, params, seed)
+
+    def _generate(self, job: GenerationJob):
+        """Runs a generation job on the worker, from the generation cache when possible."""
+        key = self._generation_key(job)
+        text = self.generation_cache.get(key)
+        if text is not None:
+            yield text
+            return
+        chunks = []
+        for chunk in self.ai_model.stream(job.prompt, job.max_new_tokens, lambda: job.cancelled, seed=job.seed, prefix=job.prefix):
+            chunks.append(chunk)
+            yield chunk
+        if not job.cancelled:
+            self.generation_cache.put(key, "".join(chunks))
+
+    def _generate_batch(self, batch: GenerationBatch) -> bool:
+        """
+        Runs one step of a generation batch on a worker: the first step serves
+        cached items, each later one runs a padded model batch. Returns True
+        when nothing is left.
+        """
+        if batch.pending is None:
+            batch.pending = []
+            for index, (prompt, seed) in enumerate(zip(batch.prompts, batch.seeds)):
+                text = self.generation_cache.get(self._cache_key(prompt, batch.max_new_tokens, seed, batched=True))
+                if text is None:
+                    batch.pending.append(index)
+                    continue
+                batch.texts[index] = text
+                if batch.on_item:
+                    batch.on_item(batch, index)
+            # Sampling is seeded once per model batch, so only items with the same seed
+            # share one; among those, similar lengths do, so little of it is padding.
+            batch.pending.sort(key=lambda index: (batch.seeds[index], len(batch.prompts[index])))
+            return not batch.pending
+        self.ai_model.wait()
+        seed = batch.seeds[batch.pending[0]]
+        same_seed = list(itertools.takewhile(lambda index: batch.seeds[index] == seed, batch.pending))
+        # Four characters per token is close enough for sizing; the longest prompt comes last.
+        longest = batch.prompts[same_seed[min(MAX_BATCH, len(same_seed)) - 1]]
+        chunk = same_seed[:batch_size(len(longest) // 4 + 1 + batch.max_new_tokens, self.ai_model.bytes_per_token())]
+        texts = self.ai_model.generate_batch([batch.prompts[index] for index in chunk], batch.max_new_tokens, lambda: batch.cancelled, seed=seed)
+        if batch.cancelled:
+            return True
+        for index, text in zip(chunk, texts):
+            batch.texts[index] = text
+            self.generation_cache.put(self._cache_key(batch.prompts[index], batch.max_new_tokens, seed, batched=True), text)
+            if batch.on_item:
+                batch.on_item(batch, index)
+        del batch.pending[:len(chunk)]
+        return not batch.pending
 
     def filter_assets(self, search_term: str):
         self.search_term = search_term.lower()
@@ -90,6 +275,17 @@ class Control:
         except FileNotFoundError:
             data_manager.create_new_case("The Crimson Stain")
             self.world_data, self.case_data = data_manager.load_case("The Crimson Stain")
+        self.option_cache.rebuild(self.world_data, self.case_data)
+        self.asset_index.rebuild(self.world_data, self.case_data)
+        self.reference_index.rebuild(self.world_data, self.case_data)
+        self.travel_table.reset(self.world_data)
+        self.chain_solver.reset(self.case_data)
+        self.graph_analytics.reset(self.world_data)
+        self.id_interner.reset(self.world_data, self.case_data)
+        self.retrieval_index.reset(self.world_data, self.case_data)
+        # Recorded deltas point at the objects that were just replaced.
+        self.history.clear()
+        self.layout_store = LayoutStore(data_manager.get_case_path("The Crimson Stain") / LAYOUTS_FILE)
 
     def save_data(self):
         """
@@ -100,12 +296,56 @@ class Control:
             self.page.snack_bar = ft.SnackBar(ft.Text("Case data saved successfully!"), open=True)
             self.page.update()
 
-    def select_asset(self, asset: Any):
+    def select_asset(self, asset: Any, update: bool = True):
         """
         Sets the currently selected asset and updates the page.
         """
         self.selected_asset = asset
-        self.page.update()
+        if update:
+            self.page.update()
+
+    def register_selector(self, namespace: str, selector: Callable[[Any], None]):
+        """
+        Registers the function a view uses to select and reveal one of its assets.
+        Selectors must not call page.update(); go_to_issue does that once.
+        """
+        self.selectors[namespace] = selector
+
+    def register_refresher(self, asset_type: str, refresher: Callable[[], None]):
+        """
+        Registers a function that redraws a view's list of `asset_type` after a
+        batch operation changed it. Refreshers must not call page.update().
+        """
+        self.refreshers.setdefault(asset_type, []).append(refresher)
+
+    def add_change_listener(self, listener: Callable[[Any, Optional[str]], None]):
+        """
+        Registers `listener(asset, attribute_name)`, called after every edit.
+        The attribute name is None when the asset was added or removed.
+        Listeners run on every keystroke, so they should only mark work as due.
+        """
+        self.change_listeners.append(listener)
+
+    def _notify_change(self, asset: Any, attribute_name: Optional[str]):
+        for listener in self.change_listeners:
+            listener(asset, attribute_name)
+
+    def _refresh_views(self, asset_types):
+        for asset_type in set(asset_types):
+            for refresher in self.refreshers.get(asset_type, ()):
+                refresher()
+
+    def show_view(self, index: int):
+        """
+        Shows one of the main views, building it only the first time.
+        """
+        view = self.views.get(index)
+        if view is None:
+            view = self.views[index] = self.view_builders[index](self)
+        self.nav_rail.selected_index = index
+        if view not in self.main_content.controls:
+            self.main_content.controls.clear()
+            self.main_content.controls.append(view)
 
     def create_new_district(self):
         """
@@ -118,6 +358,7 @@ class Control:
             description="",
         )
         self.world_data.districts.append(new_district)
+        self._on_asset_created(new_district)
         self.select_asset(new_district)
         self.page.update()
 
@@ -132,6 +373,7 @@ class Control:
             description="",
         )
         self.world_data.factions.append(new_faction)
+        self._on_asset_created(new_faction)
         self.select_asset(new_faction)
         self.page.update()
 
@@ -152,6 +394,7 @@ class Control:
             condition="New",
         )
         self.world_data.items.append(new_item)
+        self._on_asset_created(new_item)
         self.select_asset(new_item)
         self.page.update()
 
@@ -166,6 +409,7 @@ class Control:
             description="",
         )
         self.world_data.locations.append(new_loc)
+        self._on_asset_created(new_loc)
         self.select_asset(new_loc)
         self.page.update()
 
@@ -185,16 +429,120 @@ class Control:
             killerLikelihood=5,
         )
         self.world_data.characters.append(new_char)
+        self._on_asset_created(new_char)
         self.select_asset(new_char)
         # We need a way to tell the UI to refresh the list.
         # This will be handled in the next step.
         self.page.update()
 
+    def create_new_event(self, start: str) -> schemas.LoreEvent:
+        """
+        Creates a new lore event dated `start` and adds it to the timeline.
+        """
+        import uuid
+        new_event = schemas.LoreEvent(
+            id=f"event-{uuid.uuid4()}",
+            name="New Event",
+            description="",
+            start=start,
+        )
+        self.world_data.events.append(new_event)
+        self._on_asset_created(new_event)
+        self.select_asset(new_event)
+        self.page.update()
+        return new_event
+
+    def create_new_chain_event(self, start: Optional[int] = None) -> schemas.ChainEvent:
+        """
+        Creates a new step of the case's eventChain, pinned at `start` minutes if given.
+        """
+        import uuid
+        new_event = schemas.ChainEvent(
+            id=f"step-{uuid.uuid4()}",
+            description="New Step",
+            start=start,
+        )
+        self.case_data.eventChain.append(new_event)
+        self._on_asset_created(new_event)
+        self.page.update()
+        return new_event
+
+    def create_new_chain_link(self, before: str, after: str) -> schemas.ChainLink:
+        """
+        Orders two eventChain steps: `after` starts once `before` has ended.
+        """
+        import uuid
+        new_link = schemas.ChainLink(id=f"link-{uuid.uuid4()}", before=before, after=after)
+        self.case_data.chainLinks.append(new_link)
+        self._on_asset_created(new_link)
+        self.page.update()
+        return new_link
+
+    def _on_asset_created(self, asset: Any, container: Optional[list] = None, refresh: bool = True):
+        """
+        Indexes an asset that was just appended to its list, records the
+        insertion for undo and redraws the views listing its type, unless
+        `refresh` is False because the caller refreshes once for many assets.
+        `container` is the list holding a nested asset (a witness or
+        question); top-level lists are looked up by type.
+        """
+        container = container if container is not None else self.reference_index.default_container(asset)
+        self._index_asset(asset, container)
+        if container is not None:
+            self.history.record_insertion(container, len(container) - 1, asset)
+        if refresh:
+            self._refresh_views({type(asset).__name__})
+
+    def _index_asset(self, asset: Any, container: Optional[list]):
+        self.option_cache.add_asset(asset)
+        self.asset_index.add(asset)
+        self.reference_index.add(asset, container)
+        self._notify_change(asset, None)
+
+    def _unindex_asset(self, asset: Any):
+        self.option_cache.remove_asset(asset)
+        self.asset_index.remove(asset)
+        self.reference_index.remove(asset)
+        self._notify_change(asset, None)
+
+    def _on_asset_changed(self, asset: Any, attribute_name: str, old_value: Any):
+        """
+        Keeps the shared lookup structures in sync after an attribute edit.
+        """
+        if attribute_name in ("id", "clueId"):
+            self.option_cache.update_asset(asset, previous_id=old_value)
+            self.asset_index.rename(asset, old_value)
+        elif attribute_name in ("fullName", "name", "clueSummary"):
+            self.option_cache.update_asset(asset)
+        else:
+            self.reference_index.update_field(asset, attribute_name, old_value, getattr(asset, attribute_name, None))
+        self._notify_change(asset, attribute_name)
+
+    def update_asset(self, asset: Any, attribute_name: str, new_value: Any):
+        """
+        Updates an attribute of a world or case asset.
+        """
+        old_value = getattr(asset, attribute_name, None)
+        setattr(asset, attribute_name, new_value)
+        self.history.record_field(asset, attribute_name, old_value, new_value)
+        self._on_asset_changed(asset, attribute_name, old_value)
+        self.page.update()
+
+    def update_selected_asset(self, attribute_name: str, new_value: Any):
+        """
+        Updates an attribute of the currently selected asset.
+        """
+        if self.selected_asset is not None:
+            self.update_asset(self.selected_asset, attribute_name, new_value)
+
     def update_clue(self, clue: schemas.Clue, attribute_name: str, new_value: Any):
         """
         Updates an attribute of a clue.
         """
+        old_value = getattr(clue, attribute_name, None)
         setattr(clue, attribute_name, new_value)
+        self.history.record_field(clue, attribute_name, old_value, new_value)
+        self._on_asset_changed(clue, attribute_name, old_value)
         self.page.update()
 
     def create_new_clue(self):
@@ -212,6 +560,7 @@ class Control:
             knowledgeLevel="Sleuth Only",
         )
         self.case_data.clues.append(new_clue)
+        self._on_asset_created(new_clue)
         self.select_asset(new_clue)
         self.page.update()
 
@@ -219,26 +568,59 @@ class Control:
         """
         Toggles the isClue flag on an interview question and creates/removes a corresponding clue.
         """
-        question.isClue = is_clue
-        if is_clue:
-            # Create a new clue if one doesn't already exist for this question
-            if not any(c.source == question.questionId for c in self.case_data.clues):
-                new_clue = schemas.Clue(
-                    clueId=f"clue-{question.questionId}",
-                    criticalClue=False,
-                    redHerring=False,
-                    isLie=False,
-                    source=question.questionId,
-                    clueSummary=f"From interview: {question.question}",
-                    knowledgeLevel="Sleuth Only",
-                )
-                self.case_data.clues.append(new_clue)
-        else:
-            # Remove the clue if it exists
-            self.case_data.clues = [c for c in self.case_data.clues if c.source != question.questionId]
-        
+        with self.history.group():
+            self.history.record_field(question, "isClue", question.isClue, is_clue)
+            question.isClue = is_clue
+            if is_clue:
+                # Create a new clue if one doesn't already exist for this question
+                if not any(c.source == question.questionId for c in self.case_data.clues):
+                    new_clue = schemas.Clue(
+                        clueId=f"clue-{question.questionId}",
+                        criticalClue=False,
+                        redHerring=False,
+                        isLie=False,
+                        source=question.questionId,
+                        clueSummary=f"From interview: {question.question}",
+                        knowledgeLevel="Sleuth Only",
+                    )
+                    self.case_data.clues.append(new_clue)
+                    self._on_asset_created(new_clue)
+            else:
+                # Remove the clue if it exists
+                self.delete_assets([c for c in self.case_data.clues if c.source == question.questionId], update=False)
+
         self.page.update()
 
+    def add_case_suspect(self, character_id: str):
+        """
+        Adds a character to the case's key suspects.
+        """
+        if character_id and not any(s.characterId == character_id for s in self.case_data.keySuspects):
+            new_suspect = schemas.CaseSuspect(characterId=character_id)
+            self.case_data.keySuspects.append(new_suspect)
+            self._on_asset_created(new_suspect)
+            self.page.update()
+
+    def add_case_location(self, location_id: str):
+        """
+        Adds a world location to the case.
+        """
+        if location_id and not any(l.locationId == location_id for l in self.case_data.caseLocations):
+            new_case_location = schemas.CaseLocation(locationId=location_id)
+            self.case_data.caseLocations.append(new_case_location)
+            self._on_asset_created(new_case_location)
+            self.page.update()
+
+    def add_case_witness(self, case_location: schemas.CaseLocation, character_id: str):
+        """
+        Adds a witness to a case location.
+        """
+        if character_id and not any(w.characterId == character_id for w in case_location.witnesses):
+            new_witness = schemas.CaseWitness(characterId=character_id)
+            case_location.witnesses.append(new_witness)
+            self._on_asset_created(new_witness, case_location.witnesses)
+            self.page.update()
+
     def add_interview_question(self, suspect: schemas.CaseSuspect):
         """
         Adds a new, empty interview question to a suspect.
@@ -253,13 +635,17 @@ class Control:
             isClue=False,
         )
         suspect.interview.append(new_question)
+        self._on_asset_created(new_question, suspect.interview)
         self.page.update()
 
     def update_interview_question(self, question: schemas.InterviewQuestion, attribute_name: str, new_value: Any):
         """
         Updates an attribute of an interview question.
         """
+        old_value = getattr(question, attribute_name, None)
         setattr(question, attribute_name, new_value)
+        self.history.record_field(question, attribute_name, old_value, new_value)
+        self._on_asset_changed(question, attribute_name, old_value)
         self.page.update()
 
     def update_case_meta(self, attribute_name: str, new_value: Any):
@@ -274,100 +660,173 @@ class Control:
                 murderWeapon="",
                 coreMysterySolutionDetails=""
             )
-        
+            self._on_asset_created(self.case_data.caseMeta)
+
+        old_value = getattr(self.case_data.caseMeta, attribute_name, None)
         setattr(self.case_data.caseMeta, attribute_name, new_value)
+        self.history.record_field(self.case_data.caseMeta, attribute_name, old_value, new_value)
+        self._on_asset_changed(self.case_data.caseMeta, attribute_name, old_value)
         self.page.update()
 
     def delete_asset(self):
         """
         Deletes the currently selected asset.
         """
-        if self.selected_asset:
-            asset_type_map = {
-                schemas.Character: self.world_data.characters,
-                schemas.Location: self.world_data.locations,
-                schemas.Item: self.world_data.items,
-                schemas.Faction: self.world_data.factions,
-                schemas.District: self.world_data.districts,
-            }
-            for asset_type, asset_list in asset_type_map.items():
-                if isinstance(self.selected_asset, asset_type):
-                    asset_list.remove(self.selected_asset)
-                    self.selected_asset = None
-                    self.page.update()
-                    return
+        world_types = (schemas.Character, schemas.Location, schemas.Item, schemas.Faction, schemas.District)
+        if isinstance(self.selected_asset, world_types):
+            self.delete_assets([self.selected_asset])
 
     def delete_case_suspect(self, suspect: schemas.CaseSuspect):
         """
         Deletes a case suspect.
         """
         if suspect in self.case_data.keySuspects:
-            self.case_data.keySuspects.remove(suspect)
-            self.selected_asset = None
-            self.page.update()
+            self.delete_assets([suspect])
 
     def delete_case_location(self, case_location: schemas.CaseLocation):
         """
         Deletes a case location.
         """
         if case_location in self.case_data.caseLocations:
-            self.case_data.caseLocations.remove(case_location)
-            self.selected_asset = None
-            self.page.update()
+            self.delete_assets([case_location])
 
     def delete_clue(self, clue: schemas.Clue):
         """
         Deletes a clue.
         """
         if clue in self.case_data.clues:
-            self.case_data.clues.remove(clue)
-            self.selected_asset = None
+            self.delete_assets([clue])
+
+    def delete_assets(self, assets: List[Any], update: bool = True) -> List[Any]:
+        """
+        Deletes several assets as one batch. Every reference to them is cleared
+        through the reverse-reference index, and suspects, case locations and
+        witnesses wrapping a deleted asset go with it. Returns the applied changes.
+        """
+        if not assets:
+            return []
+        changes = self.reference_index.cascade_delete(assets)
+        self.history.record_all(changes)
+        removed_ids = {}
+        touched_types = set()
+        for change in changes:
+            if isinstance(change, Removal):
+                self.asset_index.remove(change.asset)
+                self._notify_change(change.asset, None)
+                removed_ids.setdefault(type(change.asset).__name__, []).append(schemas.get_asset_id(change.asset))
+                touched_types.add(type(change.asset).__name__)
+                if change.asset is self.selected_asset:
+                    self.selected_asset = None
+            else:
+                self._notify_change(change.owner, change.attr)
+                touched_types.add(type(change.owner).__name__)
+        for asset_type, asset_ids in removed_ids.items():
+            self.option_cache.remove_ids(asset_type, asset_ids)
+        self._refresh_views(touched_types)
+        if update:
             self.page.update()
+        return changes
+
+    def bulk_update(self, assets: List[Any], attribute_name: str, new_value: Any):
+        """
+        Sets one attribute on several assets and refreshes the page once.
+        """
+        self.bulk_update_fields([(asset, attribute_name, copy.copy(new_value)) for asset in assets])
+
+    def bulk_update_fields(self, changes: List[Tuple[Any, str, Any]]):
+        """
+        Applies (asset, attribute, value) changes as one undoable step and
+        refreshes the page once.
+        """
+        with self.history.group():
+            for asset, attribute_name, new_value in changes:
+                old_value = getattr(asset, attribute_name, None)
+                setattr(asset, attribute_name, new_value)
+                self.history.record_field(asset, attribute_name, old_value, new_value)
+                self._on_asset_changed(asset, attribute_name, old_value)
+        self._refresh_views(type(asset).__name__ for asset, _, _ in changes)
+        self.page.update()
+
+    def bulk_duplicate(self, assets: List[Any]) -> List[Any]:
+        """
+        Copies several world assets or clues under fresh ids and refreshes the page once.
+        """
+        import uuid
+        copies = []
+        with self.history.group():
+            for asset in assets:
+                container = self.reference_index.default_container(asset)
+                if container is None:
+                    continue
+                duplicate = copy.deepcopy(asset)
+                id_attr = "clueId" if isinstance(asset, schemas.Clue) else "id"
+                prefix = getattr(asset, id_attr).split("-", 1)[0]
+                setattr(duplicate, id_attr, f"{prefix}-{uuid.uuid4()}")
+                for name_attr in ("fullName", "name", "clueSummary"):
+                    if hasattr(duplicate, name_attr):
+                        setattr(duplicate, name_attr, f"{getattr(duplicate, name_attr)} (Copy)")
+                        break
+                container.append(duplicate)
+                self._on_asset_created(duplicate, container, refresh=False)
+                copies.append(duplicate)
+        self._refresh_views(type(asset).__name__ for asset in copies)
+        self.page.update()
+        return copies
+
+    def undo(self):
+        """
+        Reverts the last recorded step.
+        """
+        self._sync_history(self.history.undo(), undone=True)
+
+    def redo(self):
+        """
+        Replays the last undone step.
+        """
+        self._sync_history(self.history.redo(), undone=False)
+
+    def _sync_history(self, deltas: List[Any], undone: bool):
+        """
+        Brings the lookup structures and views up to date after the history
+        reverted or replayed `deltas` on the data.
+        """
+        if not deltas:
+            return
+        touched_types = set()
+        for delta in deltas:
+            if isinstance(delta, FieldChange):
+                previous = delta.new_value if undone else delta.old_value
+                self._on_asset_changed(delta.owner, delta.attr, previous)
+                touched_types.add(type(delta.owner).__name__)
+                continue
+            if isinstance(delta, Insertion) != undone:
+                self._index_asset(delta.asset, delta.container)
+            else:
+                self._unindex_asset(delta.asset)
+                if delta.asset is self.selected_asset:
+                    self.selected_asset = None
+            touched_types.add(type(delta.asset).__name__)
+        self._refresh_views(touched_types)
+        self.page.update()
 
     def go_to_issue(self, result: schemas.ValidationResult):
-        print(f"Navigating to: {result}")
-        # Navigate to the correct main tab
-        if result.asset_type in ["Character", "Location", "Item", "Faction", "District", "Sleuth"]:
-            self.nav_rail.selected_index = 0  # World Builder
-            self.main_content.controls.clear()
-            self.main_content.controls.append(self.build_world_builder_func(self, result.asset_id))
-            self.page.update()
-            # Select the correct sub-tab and asset
-            if self.asset_tabs:
-                asset_type_to_tab_index = {
-                    "Character": 0,
-                    "Location": 1,
-                    "Item": 2,
-                    "Faction": 3,
-                    "District": 4,
-                    "Sleuth": 5,
-                }
-                tab_index = asset_type_to_tab_index.get(result.asset_type)
-                if tab_index is not None:
-                    self.asset_tabs.selected_index = tab_index
-                    self.page.update()
-                    # The asset selection within the list is handled by create_asset_editor now
-        elif result.asset_type in ["CaseMeta", "CaseSuspect", "Clue", "CaseLocation", "InterviewQuestion", "CaseWitness"]:
-            self.nav_rail.selected_index = 1  # Case Builder
-            self.main_content.controls.clear()
-            self.main_content.controls.append(self.build_case_builder_view_func(self, result.asset_id))
-            self.page.update()
-            # Select the correct sub-tab and asset
-            if self.case_builder_tabs:
-                asset_type_to_tab_index = {
-                    "CaseMeta": 0,
-                    "CaseSuspect": 1,
-                    "Clue": 2,
-                    "CaseLocation": 3,
-                    "InterviewQuestion": 1, # Interview questions are part of suspects tab
-                    "CaseWitness": 3, # Witnesses are part of case locations tab
-                }
-                tab_index = asset_type_to_tab_index.get(result.asset_type)
-                if tab_index is not None:
-                    self.case_builder_tabs.selected_index = tab_index
-                    self.page.update()
-                    # The asset selection within the list is handled by build_case_builder_view now
+        """
+        Shows the view, tab and asset a validation result (or link) refers to.
+        Views are built once and reused; the asset is found through the id index.
+        """
+        target = self.asset_index.resolve(result)
+        if target is None:
+            return
+        self.show_view(target.view_index)
+        tabs = self.asset_tabs if target.view_index == 0 else self.case_builder_tabs
+        if tabs:
+            tabs.selected_index = target.tab_index
+        # The target list must be on the page before it can be scrolled.
         self.page.update()
+        selector = self.selectors.get(target.namespace)
+        if target.asset is not None and selector:
+            selector(target.asset)
+            self.page.update()
 
     def validate_case(self):
         errors: List[schemas.ValidationResult] = []
@@ -719,16 +1178,16 @@ class Control:
                         errors.append(schemas.ValidationResult(
                             message=f"Invalid Reference: Witness interview question '{iq.question}' references non-existent debunking clue ID '{iq.debunkingClue}'.",
                             type="error",
-                            asset_id=witness.characterId,
-                            asset_type="InterviewQuestion",
+                            asset_id=case_loc.locationId,
+                            asset_type="CaseWitness",
                             field_name="debunkingClue"
                         ))
                     if iq.hasItem and iq.hasItem not in valid_item_ids:
                         errors.append(schemas.ValidationResult(
                             message=f"Invalid Reference: Witness interview question '{iq.question}' references non-existent item ID '{iq.hasItem}'.",
                             type="error",
-                            asset_id=witness.characterId,
-                            asset_type="InterviewQuestion",
+                            asset_id=case_loc.locationId,
+                            asset_type="CaseWitness",
                             field_name="hasItem"
                         ))
 
@@ -827,25 +1286,64 @@ class Control:
                     ))
 
         # 2.3 Circular Logic in Clue Dependencies
+        clue_numbers = self.id_interner.table("Clue")
+        dependencies = self.id_interner.adjacency("Clue", "dependencies")
+        circular = cycle_bound(dependencies, clue_numbers.alive)
         for clue in self.case_data.clues:
-            path = set()
-            stack = [clue.clueId]
-            while stack:
-                current_clue_id = stack.pop()
-                if current_clue_id in path:
-                    errors.append(schemas.ValidationResult(
-                        message=f"Circular Dependency: Clue '{clue.clueSummary}' has a circular dependency involving '{current_clue_id}'.",
-                        type="error",
-                        asset_id=clue.clueId,
-                        asset_type="Clue",
-                        field_name="dependencies"
-                    ))
-                    break
-                path.add(current_clue_id)
-                current_clue = next((c for c in self.case_data.clues if c.clueId == current_clue_id), None)
-                if current_clue:
-                    for dep_id in current_clue.dependencies:
-                        stack.append(dep_id)
+            number = clue_numbers.lookup(clue.clueId)
+            if number >= 0 and circular[number]:
+                involved = next(clue_numbers.ids[t] for t in dependencies.targets(number).tolist() if t >= 0 and circular[t])
+                errors.append(schemas.ValidationResult(
+                    message=f"Circular Dependency: Clue '{clue.clueSummary}' has a circular dependency involving '{involved}'.",
+                    type="error",
+                    asset_id=clue.clueId,
+                    asset_type="Clue",
+                    field_name="dependencies"
+                ))
+
+        # 2.4 Alibis and Opportunity: whereabouts checked against travel times
+        alibis = WhereaboutsIndex(self.case_data.whereabouts, self.travel_table)
+        names = {a.id: schemas.get_display_name(a) for a in self.world_data.characters + self.world_data.locations}
+        for conflict in alibis.contradictions():
+            if not conflict.intended:
+                errors.append(schemas.ValidationResult(
+                    message=f"Alibi Contradiction: {conflict.describe(names)}",
+                    type="error",
+                    asset_id=conflict.first.characterId,
+                    asset_type="Character"
+                ))
+        scene_opportunity = {}
+        meta = self.case_data.caseMeta
+        if meta and meta.crimeScene and meta.crimeWindowStart is not None and meta.crimeWindowEnd is not None:
+            window = (meta.crimeWindowStart, meta.crimeWindowEnd)
+            suspects = [s.characterId for s in self.case_data.keySuspects] + [meta.culprit]
+            scene_opportunity = alibis.opportunity(meta.crimeScene, window, suspects)
+            if meta.culprit and not scene_opportunity.get(meta.culprit):
+                errors.append(schemas.ValidationResult(
+                    message=f"No Opportunity: The culprit '{names.get(meta.culprit, meta.culprit)}' cannot reach the crime scene during the crime window given their whereabouts.",
+                    type="error",
+                    asset_id=meta.culprit,
+                    asset_type="Character"
+                ))
+            weapon = next((i for i in self.world_data.items if i.id == meta.murderWeapon), None)
+            if meta.culprit and weapon and weapon.defaultLocation and not alibis.opportunity(weapon.defaultLocation, window, [meta.culprit])[meta.culprit]:
+                warnings.append(schemas.ValidationResult(
+                    message=f"No Opportunity: The culprit '{names.get(meta.culprit, meta.culprit)}' cannot reach the weapon's location '{names.get(weapon.defaultLocation, weapon.defaultLocation)}' during the crime window.",
+                    type="warning",
+                    asset_id=weapon.id,
+                    asset_type="Item",
+                    field_name="defaultLocation"
+                ))
+
+        # 2.5 Chronological Impossibilities in the eventChain
+        step_names = event_names(self.case_data)
+        for conflict in self.chain_solver.current_conflicts():
+            errors.append(schemas.ValidationResult(
+                message=f"Impossible Timeline: {conflict.describe(step_names)}",
+                type="error",
+                asset_id=conflict.constraint.events[0],
+                asset_type="ChainEvent"
+            ))
 
         # Tier 3: Playability & Narrative Craft (Warnings)
         # 3.1 Narrative Dead-End Detection (existing)
@@ -916,12 +1414,14 @@ class Control:
                         field_name="items"
                      ))
 
-            # Crime Scene Accessibility
+            # Crime Scene Accessibility: the culprit must be able to travel to the scene
+            # from their district or from a location they frequent.
             if culprit:
                 scene = next((l for l in self.world_data.locations if l.id == meta.crimeScene), None)
-                if scene and culprit.id not in scene.keyCharacters:
+                origins = [culprit.district] + [l.id for l in self.world_data.locations if culprit.id in l.keyCharacters]
+                if scene and culprit.id not in scene.keyCharacters and self.travel_table.fastest(filter(None, origins), scene.id) == float("inf"):
                     warnings.append(schemas.ValidationResult(
-                        message=f"Crime Scene Accessibility: Culprit '{culprit.fullName}' may not have access to the crime scene '{scene.name}'.",
+                        message=f"Crime Scene Accessibility: Culprit '{culprit.fullName}' has no route to the crime scene '{scene.name}'.",
                         type="warning",
                         asset_id=culprit.id,
                         asset_type="Character",
@@ -953,6 +1453,9 @@ class Control:
                     # Check if suspect is at crime scene or has item related to crime
                     if self.case_data.caseMeta.crimeScene and suspect_char.district == next((loc.district for loc in self.world_data.locations if loc.id == self.case_data.caseMeta.crimeScene), None):
                         has_connection = True
+                    # A suspect whose whereabouts let them reach the scene during the crime window
+                    if alibis.has_whereabouts(suspect_char.id) and scene_opportunity.get(suspect_char.id):
+                        has_connection = True
                     if self.case_data.caseMeta.murderWeapon and self.case_data.caseMeta.murderWeapon in suspect_char.items:
                         has_connection = True
 
@@ -984,6 +1487,19 @@ class Control:
                     field_name="debunkingClue"
                 ))
 
+        # 3.6 Culprit Prominence: the culprit should not be the obvious hub of the social graph
+        if self.case_data.caseMeta and self.case_data.caseMeta.culprit:
+            culprit_id = self.case_data.caseMeta.culprit
+            outlier = self.graph_analytics.top_outlier([c.id for c in self.world_data.characters])
+            if outlier and outlier[0] == culprit_id:
+                culprit = next(c for c in self.world_data.characters if c.id == culprit_id)
+                warnings.append(schemas.ValidationResult(
+                    message=f"Culprit Prominence: '{culprit.fullName}' is by far the most central character in the social graph ({outlier[1]:.1f} standard deviations above the rest). Players may suspect them on structure alone.",
+                    type="warning",
+                    asset_id=culprit_id,
+                    asset_type="Character"
+                ))
+
         # Tier 4: Player Experience & Cognition (Warnings)
         # 4.1 Cognitive Overload
         num_clues = len(self.case_data.clues)
@@ -0,0 +1,99 @@
+# navigation.py
+"""
+Id index used to jump from a ValidationResult (or a "go to" link) straight to
+the view, tab and asset it refers to.
+
+Ids are only unique within an asset type: a CaseSuspect shares its id with the
+Character it wraps, and a CaseLocation with its Location. The index is
+therefore namespaced by asset type, and RESULT_TARGETS maps each
+ValidationResult.asset_type to the namespace its asset_id lives in.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import schemas
+from schemas import WorldData, CaseData
+
+WORLD_VIEW = 0
+CASE_VIEW = 1
+
+NAMESPACES = (
+    "Character", "Location", "Item", "Faction", "District", "Sleuth",
+    "Clue", "CaseSuspect", "CaseLocation", "CaseMeta", "ChainEvent",
+)
+
+# ValidationResult.asset_type -> (main view, tab index inside it, index namespace)
+RESULT_TARGETS: Dict[str, Tuple[int, int, Optional[str]]] = {
+    "Character": (WORLD_VIEW, 0, "Character"),
+    "Location": (WORLD_VIEW, 1, "Location"),
+    "Item": (WORLD_VIEW, 2, "Item"),
+    "Faction": (WORLD_VIEW, 3, "Faction"),
+    "District": (WORLD_VIEW, 4, "District"),
+    "Sleuth": (WORLD_VIEW, 5, "Sleuth"),
+    "CaseMeta": (CASE_VIEW, 0, "CaseMeta"),
+    "CaseData": (CASE_VIEW, 0, None),
+    "CaseSuspect": (CASE_VIEW, 1, "CaseSuspect"),
+    "InterviewQuestion": (CASE_VIEW, 1, "CaseSuspect"),  # A suspect's question, reported against their characterId.
+    "Clue": (CASE_VIEW, 2, "Clue"),
+    "CaseLocation": (CASE_VIEW, 3, "CaseLocation"),
+    "CaseWitness": (CASE_VIEW, 3, "CaseLocation"),  # A witness or their question, reported against the case location's locationId.
+    "ChainEvent": (CASE_VIEW, 5, "ChainEvent"),
+}
+
+
+@dataclass
+class NavigationTarget:
+    view_index: int
+    tab_index: int
+    namespace: Optional[str]
+    asset: Optional[Any]
+
+
+class AssetIndex:
+    def __init__(self):
+        self._assets: Dict[str, Dict[str, Any]] = {ns: {} for ns in NAMESPACES}
+
+    def rebuild(self, world_data: WorldData, case_data: CaseData):
+        self._assets = {ns: {} for ns in NAMESPACES}
+        for assets in (
+            world_data.characters, world_data.locations, world_data.items,
+            world_data.factions, world_data.districts, case_data.clues,
+            case_data.keySuspects, case_data.caseLocations, case_data.eventChain,
+        ):
+            for asset in assets:
+                self.add(asset)
+        if world_data.sleuth:
+            self.add(world_data.sleuth)
+        if case_data.caseMeta:
+            self.add(case_data.caseMeta)
+
+    def get(self, namespace: str, asset_id: Optional[str]) -> Optional[Any]:
+        return self._assets[namespace].get(asset_id)
+
+    def add(self, asset: Any):
+        namespace = type(asset).__name__
+        if namespace == "CaseMeta":
+            self._assets[namespace]["caseMeta"] = asset
+        elif namespace in self._assets:
+            self._assets[namespace][schemas.get_asset_id(asset)] = asset
+
+    def remove(self, asset: Any):
+        namespace = type(asset).__name__
+        if namespace in self._assets:
+            self._assets[namespace].pop(schemas.get_asset_id(asset), None)
+
+    def rename(self, asset: Any, previous_id: Optional[str]):
+        namespace = type(asset).__name__
+        if namespace in self._assets:
+            if self._assets[namespace].get(previous_id) is asset:
+                del self._assets[namespace][previous_id]
+            self.add(asset)
+
+    def resolve(self, result: schemas.ValidationResult) -> Optional[NavigationTarget]:
+        """Maps a validation result to its view, tab and asset with dictionary lookups only."""
+        target = RESULT_TARGETS.get(result.asset_type)
+        if target is None:
+            return None
+        view_index, tab_index, namespace = target
+        asset = self.get(namespace, result.asset_id) if namespace else None
+        return NavigationTarget(view_index, tab_index, namespace, asset)
@@ -0,0 +1,152 @@
+# option_cache.py
+"""
+Shared option lists for the cross-reference pickers (victim, crime scene,
+means clue, faction, district, ...).
+
+Every picker used to build its own option list with a full pass over the
+world. The cache keeps one ordered (id, label) list per asset type and is
+updated incrementally by Control whenever an asset is created, renamed or
+deleted. Each list carries a version number so pickers can tell when their
+options are stale, and listeners hear about every new version. A version
+that only relabels one asset (a keystroke in a name) says which position it
+touched, so a picker can patch that one option instead of rebuilding all of
+them. Listeners
+are held weakly, so a picker that is no longer on screen is not kept alive
+by the cache.
+"""
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import schemas
+from schemas import WorldData, CaseData
+
+# Asset types that can be the target of a reference field, keyed by the names
+# used in ValidationResult.asset_type.
+REFERENCE_TYPES = ("Character", "Location", "Item", "Faction", "District", "Clue")
+
+# Lists longer than this are served through a searchable typeahead instead of
+# a dropdown.
+TYPEAHEAD_THRESHOLD = 50
+
+
+class OptionListCache:
+    def __init__(self, typeahead_threshold: int = TYPEAHEAD_THRESHOLD):
+        self.typeahead_threshold = typeahead_threshold
+        self._options: Dict[str, List[Tuple[str, str]]] = {t: [] for t in REFERENCE_TYPES}
+        self._positions: Dict[str, Dict[str, int]] = {t: {} for t in REFERENCE_TYPES}
+        self._versions: Dict[str, int] = {t: 0 for t in REFERENCE_TYPES}
+        self._listeners: Dict[str, List[weakref.WeakMethod]] = {t: [] for t in REFERENCE_TYPES}
+        self._relabels: Dict[str, Tuple[int, int]] = {}  # asset type -> (version, position it relabeled)
+
+    def rebuild(self, world_data: WorldData, case_data: CaseData):
+        """Fills every list from scratch. Only needed after a case is loaded."""
+        sources = {
+            "Character": world_data.characters,
+            "Location": world_data.locations,
+            "Item": world_data.items,
+            "Faction": world_data.factions,
+            "District": world_data.districts,
+            "Clue": case_data.clues,
+        }
+        for asset_type, assets in sources.items():
+            self._options[asset_type] = [(schemas.get_asset_id(a), schemas.get_display_name(a)) for a in assets]
+            self._reindex(asset_type)
+
+    def options(self, asset_type: str) -> List[Tuple[str, str]]:
+        """Returns the shared (id, label) list. Callers must not mutate it."""
+        return self._options[asset_type]
+
+    def version(self, asset_type: str) -> int:
+        return self._versions[asset_type]
+
+    def relabeled(self, asset_type: str, since_version: Optional[int]) -> Optional[int]:
+        """
+        The position of the one option whose label or id changed since
+        `since_version`, or None when anything else changed.
+        """
+        version, position = self._relabels.get(asset_type, (None, None))
+        if since_version is None or version != since_version + 1 or version != self._versions[asset_type]:
+            return None
+        return position
+
+    def add_listener(self, asset_type: str, listener: Callable[[], None]):
+        """Calls the bound method `listener` whenever the list for `asset_type` gets a new version."""
+        self._listeners[asset_type].append(weakref.WeakMethod(listener))
+
+    def label(self, asset_type: str, asset_id: Optional[str]) -> Optional[str]:
+        position = self._positions[asset_type].get(asset_id)
+        return None if position is None else self._options[asset_type][position][1]
+
+    def needs_typeahead(self, asset_type: str) -> bool:
+        return len(self._options[asset_type]) > self.typeahead_threshold
+
+    def search(self, asset_type: str, query: str, limit: int = 20) -> List[Tuple[str, str]]:
+        """
+        Returns up to `limit` options whose label or id contains `query`,
+        with prefix matches on the label first.
+        """
+        query = query.strip().lower()
+        options = self._options[asset_type]
+        if not query:
+            return options[:limit]
+        prefix, substring = [], []
+        for option in options:
+            label = option[1].lower()
+            if label.startswith(query):
+                prefix.append(option)
+                if len(prefix) >= limit:
+                    break
+            elif query in label or query in option[0].lower():
+                substring.append(option)
+        return (prefix + substring)[:limit]
+
+    # --- Incremental updates ---
+
+    def add_asset(self, asset: Any):
+        asset_type = type(asset).__name__
+        if asset_type not in self._options:
+            return
+        self._positions[asset_type][schemas.get_asset_id(asset)] = len(self._options[asset_type])
+        self._options[asset_type].append((schemas.get_asset_id(asset), schemas.get_display_name(asset)))
+        self._bump(asset_type)
+
+    def update_asset(self, asset: Any, previous_id: Optional[str] = None):
+        """Refreshes the label (and id, if it changed) of an existing asset."""
+        asset_type = type(asset).__name__
+        if asset_type not in self._options:
+            return
+        asset_id = schemas.get_asset_id(asset)
+        positions = self._positions[asset_type]
+        position = positions.pop(previous_id if previous_id is not None else asset_id, None)
+        if position is None:
+            self.add_asset(asset)
+            return
+        positions[asset_id] = position
+        self._options[asset_type][position] = (asset_id, schemas.get_display_name(asset))
+        self._relabels[asset_type] = (self._versions[asset_type] + 1, position)
+        self._bump(asset_type)
+
+    def remove_asset(self, asset: Any):
+        self.remove_ids(type(asset).__name__, [schemas.get_asset_id(asset)])
+
+    def remove_ids(self, asset_type: str, asset_ids):
+        """Removes several ids of one type with a single compaction pass."""
+        if asset_type not in self._options:
+            return
+        doomed = set(asset_ids) & self._positions[asset_type].keys()
+        if not doomed:
+            return
+        self._options[asset_type] = [o for o in self._options[asset_type] if o[0] not in doomed]
+        self._reindex(asset_type)
+
+    def _reindex(self, asset_type: str):
+        self._positions[asset_type] = {option[0]: i for i, option in enumerate(self._options[asset_type])}
+        self._bump(asset_type)
+
+    def _bump(self, asset_type: str):
+        self._versions[asset_type] += 1
+        listeners = [ref() for ref in self._listeners[asset_type]]
+        self._listeners[asset_type] = [ref for ref, listener in zip(self._listeners[asset_type], listeners) if listener is not None]
+        for listener in listeners:
+            if listener is not None:
+                listener()
@@ -1,10 +1,320 @@
+import threading
+from typing import Any, List, Optional
+
 import flet as ft
+import flet.canvas as cv
+import numpy as np
+
 from my_control import Control
+import schemas
+from graph_model import Graph, build_plot_graph
+from graph_layout import LayoutEngine
+from spatial_index import QuadTree
 
-def build_plot_graph_view(control: Control):
-    return ft.Column(
-        [
-            ft.Text("Interactive Bulletin Board (Plot Graph) (Under Construction)", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
-            ft.Text("This section will allow you to visualize and manage the plot graph."),
+VIEW_WIDTH = 1000
+VIEW_HEIGHT = 700
+WORLD_SCALE = 90.0  # Board pixels per layout unit at zoom 1.
+NODE_RADIUS = 14
+LOD_SCALE = 0.6  # Below this zoom, nodes are drawn as plain dots without labels.
+MIN_ZOOM, MAX_ZOOM = 0.05, 4.0
+LAYOUT_NAME = "plot"  # Key of this view's entry in the case's layouts.json.
+REBUILD_DELAY = 0.4
+
+NODE_COLORS = {
+    "Clue": ft.Colors.AMBER_300,
+    "CaseSuspect": ft.Colors.RED_300,
+    "Location": ft.Colors.TEAL_300,
+    "Item": ft.Colors.BLUE_300,
+}
+EDGE_COLORS = {
+    "dependency": ft.Colors.BLUE_GREY_300,
+    "unlocks": ft.Colors.GREEN_400,
+    "debunks": ft.Colors.RED_400,
+    "discovery": ft.Colors.AMBER_200,
+    "associated": ft.Colors.BLUE_200,
+    "found at": ft.Colors.TEAL_200,
+}
+# Plot graph namespace -> ValidationResult.asset_type used to open the asset.
+NAVIGATION_TYPES = {"Clue": "Clue", "CaseSuspect": "CaseSuspect", "Location": "CaseLocation", "Item": "Item"}
+CASE_TYPES = {"Clue", "CaseSuspect", "CaseLocation", "CaseWitness", "InterviewQuestion", "CaseMeta"}
+
+
+class PlotGraphView:
+    """
+    The Interactive Bulletin Board.
+
+    Two stacked canvases: the static layer holds every visible node and edge
+    except the one being dragged, the dynamic layer holds only the dragged node
+    and its edges, so a drag step redraws a few shapes. Node positions live in
+    a QuadTree used both to cull the static layer to the viewport and to
+    hit-test clicks. When zoomed out past LOD_SCALE nodes collapse to one dot
+    shape per kind and labels are dropped. Layouts and pins are saved in the
+    case's layouts.json, so a finished case opens without laying out again.
+    """
+
+    def __init__(self, control: Control):
+        self.control = control
+        self.graph = Graph()
+        self.positions = np.zeros((0, 2))  # Board coordinates, WORLD_SCALE * layout units.
+        self.tree = QuadTree()
+        self.scale = 1.0
+        self.offset = np.array([VIEW_WIDTH / 2, VIEW_HEIGHT / 2])  # screen = board * scale + offset
+        self.dragging: Optional[int] = None
+        self.selected: Optional[int] = None
+        self._panning = False
+        self._auto_fit = True  # Follow the layout until the user pans, zooms or drags.
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+        self.static_layer = cv.Canvas(width=VIEW_WIDTH, height=VIEW_HEIGHT)
+        self.dynamic_layer = cv.Canvas(width=VIEW_WIDTH, height=VIEW_HEIGHT)
+        self.status = ft.Text()
+        surface = ft.GestureDetector(
+            content=ft.Container(
+                ft.Stack([self.static_layer, self.dynamic_layer], width=VIEW_WIDTH, height=VIEW_HEIGHT),
+                clip_behavior=ft.ClipBehavior.HARD_EDGE,
+                border=ft.border.all(1, ft.Colors.OUTLINE),
+            ),
+            drag_interval=16,
+            on_pan_start=self._on_pan_start,
+            on_pan_update=self._on_pan_update,
+            on_pan_end=self._on_pan_end,
+            on_scroll=self._on_scroll,
+            on_tap_down=self._on_tap_down,
+            on_double_tap=self._on_double_tap,
+        )
+        self.view = ft.Column(
+            [
+                ft.Row([
+                    ft.Text("Interactive Bulletin Board", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
+                    self.status,
+                    ft.IconButton(icon=ft.Icons.CENTER_FOCUS_STRONG, tooltip="Fit to view", on_click=lambda e: self.fit()),
+                    ft.IconButton(icon=ft.Icons.REFRESH, tooltip="Lay out from scratch", on_click=lambda e: self.refresh(full=True)),
+                ]),
+                ft.Text("Drag nodes to arrange them, drag the background to pan, scroll to zoom, double-click a node to open it."),
+                surface,
+            ],
+            scroll=ft.ScrollMode.AUTO,
+        )
+
+        self.engine = LayoutEngine(on_update=self._on_layout, on_settled=self._on_settled)
+        control.layout_store.restore(LAYOUT_NAME, self.engine)
+        # Batch operations, undo and redo notify the listener per asset too, so
+        # one debounced rebuild covers them; a refresher would rebuild again.
+        control.add_change_listener(self._on_asset_changed)
+        self.refresh()
+
+    # --- Data ---
+
+    def refresh(self, full: bool = False):
+        if full:
+            self.engine.reset()
+        graph = build_plot_graph(self.control.world_data, self.control.case_data)
+        self.status.value = f"{len(graph)} nodes, {len(graph.edge_kinds)} links - laying out..."
+        self.engine.set_graph(graph)
+
+    def _on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        if type(asset).__name__ not in CASE_TYPES:
+            return
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(REBUILD_DELAY, self.refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_settled(self, graph: Graph, positions: np.ndarray):
+        self.control.layout_store.save(LAYOUT_NAME, self.engine)
+
+    def _on_layout(self, graph: Graph, positions: np.ndarray):
+        # Called from the layout thread.
+        with self._lock:
+            held = None
+            if self.dragging is not None:
+                # Keep the node under the pointer until it is dropped.
+                held = self.graph.node_ids[self.dragging], self.positions[self.dragging].copy()
+            if graph is not self.graph:
+                self.graph, self.selected = graph, None
+                self.tree = QuadTree()
+                if held:
+                    # Indices change with the graph; a node that is gone ends the drag.
+                    self.dragging = self.selected = graph.index.get(held[0])
+            self.positions = positions * WORLD_SCALE
+            if self.dragging is not None:
+                self.positions[self.dragging] = held[1]
+            for i, (x, y) in enumerate(self.positions.tolist()):
+                self.tree.move(i, x, y)
+            self.status.value = f"{len(graph)} nodes, {len(graph.edge_kinds)} links"
+            if self._auto_fit:
+                self._fit()
+            self._draw_static()
+            if held and self.dragging is None:
+                self._draw_dynamic()
+        if self.view.page:
+            self.view.update()
+
+    # --- Coordinates ---
+
+    def _to_board(self, x: float, y: float) -> np.ndarray:
+        return (np.array([x, y]) - self.offset) / self.scale
+
+    def _visible_rect(self):
+        margin = NODE_RADIUS / self.scale
+        x0, y0 = self._to_board(0, 0) - margin
+        x1, y1 = self._to_board(VIEW_WIDTH, VIEW_HEIGHT) + margin
+        return x0, y0, x1, y1
+
+    def fit(self):
+        with self._lock:
+            self._fit()
+            self._draw_static()
+        self._update(self.static_layer)
+
+    def _fit(self):
+        if len(self.positions):
+            lo, hi = self.positions.min(axis=0), self.positions.max(axis=0)
+            span = np.maximum(hi - lo, 1.0)
+            self.scale = float(np.clip(min(VIEW_WIDTH / span[0], VIEW_HEIGHT / span[1]) * 0.9, MIN_ZOOM, MAX_ZOOM))
+            self.offset = np.array([VIEW_WIDTH / 2, VIEW_HEIGHT / 2]) - (lo + hi) / 2 * self.scale
+
+    # --- Drawing ---
+
+    def _draw_static(self):
+        x0, y0, x1, y1 = self._visible_rect()
+        visible = [i for i in self.tree.query_rect(x0, y0, x1, y1) if i != self.dragging]
+        shapes = self._edge_shapes(self._visible_edges(x0, y0, x1, y1))
+        shapes += self._node_shapes(visible)
+        self.static_layer.shapes = shapes
+
+    def _draw_dynamic(self):
+        if self.dragging is None:
+            self.dynamic_layer.shapes = []
+            return
+        incident = np.nonzero((self.graph.edges == self.dragging).any(axis=1))[0] if len(self.graph.edges) else []
+        self.dynamic_layer.shapes = self._edge_shapes(incident) + self._node_shapes([self.dragging])
+
+    def _visible_edges(self, x0, y0, x1, y1) -> np.ndarray:
+        """Edges whose bounding box meets the viewport, minus those drawn on the dynamic layer."""
+        edges = self.graph.edges
+        if not len(edges):
+            return np.zeros(0, dtype=np.int64)
+        a, b = self.positions[edges[:, 0]], self.positions[edges[:, 1]]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        mask = (hi[:, 0] >= x0) & (lo[:, 0] <= x1) & (hi[:, 1] >= y0) & (lo[:, 1] <= y1)
+        if self.dragging is not None:
+            mask &= ~(edges == self.dragging).any(axis=1)
+        return np.nonzero(mask)[0]
+
+    def _screen(self, i: int) -> ft.Offset:
+        x, y = self.positions[i] * self.scale + self.offset
+        return ft.Offset(float(x), float(y))
+
+    def _edge_shapes(self, edge_indices) -> list:
+        segments = {}
+        for e in np.asarray(edge_indices, dtype=np.int64).tolist():
+            a, b = self.graph.edges[e]
+            segments.setdefault(self.graph.edge_kinds[e], []).extend((self._screen(a), self._screen(b)))
+        width = 2 if self.scale >= LOD_SCALE else 1
+        return [
+            cv.Points(points=points, point_mode=cv.PointMode.LINES, paint=ft.Paint(color=EDGE_COLORS.get(kind, ft.Colors.GREY), stroke_width=width))
+            for kind, points in segments.items()
         ]
-    )
\ No newline at end of file
+
+    def _node_shapes(self, nodes: List[int]) -> list:
+        if self.scale < LOD_SCALE:
+            dots = {}
+            for i in nodes:
+                dots.setdefault(self.graph.node_kinds[i], []).append(self._screen(i))
+            return [
+                cv.Points(points=points, point_mode=cv.PointMode.POINTS, paint=ft.Paint(color=NODE_COLORS.get(kind, ft.Colors.GREY), stroke_width=max(3, 2 * NODE_RADIUS * self.scale), stroke_cap=ft.StrokeCap.ROUND))
+                for kind, points in dots.items()
+            ]
+        shapes = []
+        radius = NODE_RADIUS * min(self.scale, 1.5)
+        for i in nodes:
+            centre = self._screen(i)
+            shapes.append(cv.Circle(centre.x, centre.y, radius, paint=ft.Paint(color=NODE_COLORS.get(self.graph.node_kinds[i], ft.Colors.GREY))))
+            if i == self.selected:
+                shapes.append(cv.Circle(centre.x, centre.y, radius + 4, paint=ft.Paint(color=ft.Colors.WHITE, stroke_width=2, style=ft.PaintingStyle.STROKE)))
+            shapes.append(cv.Text(centre.x + radius + 4, centre.y - 8, self.graph.labels[i], style=ft.TextStyle(size=12)))
+        return shapes
+
+    def _update(self, layer: cv.Canvas):
+        if layer.page:
+            layer.update()
+
+    # --- Interaction ---
+
+    def _hit(self, x: float, y: float) -> Optional[int]:
+        bx, by = self._to_board(x, y)
+        return self.tree.nearest(bx, by, NODE_RADIUS / min(self.scale, 1.0) + 2)
+
+    def _on_tap_down(self, e: ft.TapEvent):
+        with self._lock:
+            self.selected = self._hit(e.local_x, e.local_y)
+            self._draw_static()
+        self._update(self.static_layer)
+
+    def _on_double_tap(self, e):
+        if self.selected is None:
+            return
+        namespace, _, asset_id = self.graph.node_ids[self.selected].partition(":")
+        self.control.go_to_issue(schemas.ValidationResult(message="", type="", asset_id=asset_id, asset_type=NAVIGATION_TYPES[namespace]))
+
+    def _on_pan_start(self, e: ft.DragStartEvent):
+        with self._lock:
+            self.dragging = self._hit(e.local_x, e.local_y)
+            self._auto_fit = False
+            self._panning = self.dragging is None
+            if self.dragging is not None:
+                self.selected = self.dragging
+                # One static redraw without the node; from now on only the dynamic layer changes.
+                self._draw_static()
+                self._draw_dynamic()
+        if not self._panning:
+            self._update(self.static_layer)
+            self._update(self.dynamic_layer)
+
+    def _on_pan_update(self, e: ft.DragUpdateEvent):
+        with self._lock:
+            if self._panning:
+                self.offset = self.offset + (e.delta_x, e.delta_y)
+                self._draw_static()
+                layer = self.static_layer
+            elif self.dragging is not None:
+                self.positions[self.dragging] += np.array([e.delta_x, e.delta_y]) / self.scale
+                self.tree.move(self.dragging, *self.positions[self.dragging].tolist())
+                self._draw_dynamic()
+                layer = self.dynamic_layer
+            else:
+                return
+        self._update(layer)
+
+    def _on_pan_end(self, e):
+        with self._lock:
+            if self.dragging is not None:
+                self.engine.pin(self.graph.node_ids[self.dragging], self.positions[self.dragging] / WORLD_SCALE)
+                self.control.layout_store.save(LAYOUT_NAME, self.engine)
+            self.dragging = None
+            self._panning = False
+            self._draw_static()
+            self._draw_dynamic()
+        self._update(self.static_layer)
+        self._update(self.dynamic_layer)
+
+    def _on_scroll(self, e: ft.ScrollEvent):
+        if not e.scroll_delta_y:
+            return
+        with self._lock:
+            self._auto_fit = False
+            factor = 0.9 if e.scroll_delta_y > 0 else 1 / 0.9
+            new_scale = float(np.clip(self.scale * factor, MIN_ZOOM, MAX_ZOOM))
+            cursor = np.array([e.local_x, e.local_y])
+            # Zoom around the cursor.
+            self.offset = cursor - (cursor - self.offset) * (new_scale / self.scale)
+            self.scale = new_scale
+            self._draw_static()
+        self._update(self.static_layer)
+
+
+def build_plot_graph_view(control: Control):
+    return PlotGraphView(control).view
@@ -0,0 +1,92 @@
+# reference_picker.py
+import flet as ft
+from typing import Any, Callable, Optional
+
+from my_control import Control
+
+
+class ReferencePicker:
+    """
+    Selects the id of another asset (a character, location, clue, ...).
+
+    Options come from the shared OptionListCache on `control`. Short lists are
+    shown as a dropdown; lists above the cache's typeahead threshold become a
+    search field that only materializes the matching suggestions. The picker
+    listens to the cache and syncs its options whenever the version for its
+    asset type changes, so an asset created in another view shows up
+    without the picker being rebuilt. A rename patches the one option it
+    touched.
+    """
+
+    SUGGESTION_LIMIT = 20
+
+    def __init__(self, control: Control, label: str, asset_type: str, on_select: Callable[["ReferencePicker", Optional[str]], None], tooltip: Optional[str] = None, data: Any = None, expand: bool = False):
+        self.control = control
+        self.asset_type = asset_type
+        self.on_select = on_select
+        self.data = data
+        self.value: Optional[str] = None
+        self._version: Optional[int] = None
+
+        self.dropdown = ft.Dropdown(label=label, tooltip=tooltip, on_change=self._on_dropdown_change, expand=expand)
+        self.search_field = ft.TextField(
+            label=label,
+            tooltip=tooltip,
+            hint_text="Type to search...",
+            suffix_icon=ft.Icons.SEARCH,
+            on_change=self._on_search,
+            visible=False,
+            expand=expand,
+        )
+        self.suggestions = ft.ListView(height=200, visible=False)
+        self.view = ft.Column([self.dropdown, self.search_field, self.suggestions], expand=expand, spacing=0)
+        self.refresh()
+        control.option_cache.add_listener(asset_type, self.refresh)
+
+    def refresh(self):
+        """Syncs the options with the cache if they changed since the last call. Called by the cache on every change."""
+        cache = self.control.option_cache
+        version = cache.version(self.asset_type)
+        if version == self._version:
+            return
+        position = cache.relabeled(self.asset_type, self._version)
+        self._version = version
+        typeahead = cache.needs_typeahead(self.asset_type)
+        if position is not None and not typeahead and self.dropdown.visible:
+            option = self.dropdown.options[position]
+            option.key, option.text = cache.options(self.asset_type)[position]
+        else:
+            self.dropdown.visible = not typeahead
+            self.search_field.visible = typeahead
+            self.dropdown.options = [] if typeahead else [ft.dropdown.Option(key, text) for key, text in cache.options(self.asset_type)]
+        self.search_field.value = self._label_for(self.value)
+
+    def set_value(self, value: Optional[str]):
+        self.refresh()
+        self.value = value or None
+        self.dropdown.value = self.value
+        self.search_field.value = self._label_for(self.value)
+        self.suggestions.visible = False
+
+    def _label_for(self, value: Optional[str]) -> str:
+        if not value:
+            return ""
+        return self.control.option_cache.label(self.asset_type, value) or value
+
+    def _on_dropdown_change(self, e):
+        self.value = e.control.value or None
+        self.on_select(self, self.value)
+
+    def _on_search(self, e):
+        matches = self.control.option_cache.search(self.asset_type, e.control.value or "", self.SUGGESTION_LIMIT)
+        self.suggestions.controls = [
+            ft.ListTile(title=ft.Text(text), subtitle=ft.Text(key), data=key, on_click=self._on_pick, dense=True)
+            for key, text in matches
+        ]
+        self.suggestions.visible = bool(matches)
+        self.control.page.update()
+
+    def _on_pick(self, e):
+        self.set_value(e.control.data)
+        self.on_select(self, self.value)
+        self.control.page.update()
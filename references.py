@@ -0,0 +1,294 @@
+# references.py
+"""
+Cross-reference bookkeeping between assets.
+
+REFERENCE_FIELDS lists every field that stores the id of another asset. The
+ReferenceIndex inverts them: for each referenced (type, id) it knows which
+owner objects point at it and through which field, and for each indexed asset
+which list contains it. That is enough to delete any set of assets together
+with every dangling reference to them in a single pass, instead of scanning
+the whole world once per deleted asset.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import schemas
+from schemas import WorldData, CaseData
+
+
+@dataclass(frozen=True)
+class ReferenceField:
+    owner_type: str
+    attr: str
+    target_type: str
+    many: bool = False
+    # The owner only exists to wrap its target (a CaseSuspect wraps a
+    # Character), so deleting the target deletes the owner too.
+    owned: bool = False
+
+
+REFERENCE_FIELDS: Tuple[ReferenceField, ...] = (
+    ReferenceField("Character", "allies", "Character", many=True),
+    ReferenceField("Character", "enemies", "Character", many=True),
+    ReferenceField("Character", "items", "Item", many=True),
+    ReferenceField("Character", "faction", "Faction"),
+    ReferenceField("Character", "district", "District"),
+    ReferenceField("Location", "district", "District"),
+    ReferenceField("Location", "owningFaction", "Faction"),
+    ReferenceField("Location", "keyCharacters", "Character", many=True),
+    ReferenceField("Location", "associatedItems", "Item", many=True),
+    ReferenceField("Location", "clues", "Clue", many=True),
+    ReferenceField("Faction", "headquarters", "Location"),
+    ReferenceField("Faction", "allyFactions", "Faction", many=True),
+    ReferenceField("Faction", "enemyFactions", "Faction", many=True),
+    ReferenceField("Faction", "members", "Character", many=True),
+    ReferenceField("District", "dominantFaction", "Faction"),
+    ReferenceField("District", "keyLocations", "Location", many=True),
+    ReferenceField("Sleuth", "nemesis", "Character"),
+    ReferenceField("Sleuth", "relationships", "Character", many=True),
+    ReferenceField("Sleuth", "district", "District"),
+    ReferenceField("Item", "defaultLocation", "Location"),
+    ReferenceField("Item", "defaultOwner", "Character"),
+    ReferenceField("Clue", "dependencies", "Clue", many=True),
+    ReferenceField("Clue", "debunkingClue", "Clue"),
+    ReferenceField("Clue", "characterImplicated", "Character"),
+    ReferenceField("Clue", "associatedItem", "Item"),
+    ReferenceField("Clue", "associatedLocation", "Location"),
+    ReferenceField("Clue", "associatedCharacter", "Character"),
+    ReferenceField("CaseMeta", "victim", "Character"),
+    ReferenceField("CaseMeta", "culprit", "Character"),
+    ReferenceField("CaseMeta", "crimeScene", "Location"),
+    ReferenceField("CaseMeta", "murderWeapon", "Item"),
+    ReferenceField("CaseMeta", "meansClue", "Clue"),
+    ReferenceField("CaseMeta", "motiveClue", "Clue"),
+    ReferenceField("CaseMeta", "opportunityClue", "Clue"),
+    ReferenceField("CaseMeta", "redHerringClues", "Clue", many=True),
+    ReferenceField("CaseSuspect", "characterId", "Character", owned=True),
+    ReferenceField("CaseLocation", "locationId", "Location", owned=True),
+    ReferenceField("CaseLocation", "locationClues", "Clue", many=True),
+    ReferenceField("CaseWitness", "characterId", "Character", owned=True),
+    ReferenceField("InterviewQuestion", "debunkingClue", "Clue"),
+    ReferenceField("InterviewQuestion", "clueId", "Clue"),
+    ReferenceField("InterviewQuestion", "hasItem", "Item"),
+    ReferenceField("Whereabout", "characterId", "Character", owned=True),
+    ReferenceField("Whereabout", "locationId", "Location", owned=True),
+    ReferenceField("Whereabout", "witnesses", "Character", many=True),
+    ReferenceField("ChainEvent", "characters", "Character", many=True),
+    ReferenceField("ChainEvent", "locationId", "Location"),
+    ReferenceField("ChainLink", "before", "ChainEvent", owned=True),
+    ReferenceField("ChainLink", "after", "ChainEvent", owned=True),
+    ReferenceField("LoreEvent", "characters", "Character", many=True),
+    ReferenceField("LoreEvent", "factions", "Faction", many=True),
+    ReferenceField("LoreEvent", "locations", "Location", many=True),
+)
+
+FIELDS_BY_OWNER: Dict[str, Dict[str, ReferenceField]] = {}
+for _field in REFERENCE_FIELDS:
+    FIELDS_BY_OWNER.setdefault(_field.owner_type, {})[_field.attr] = _field
+
+# CaseMeta's reference fields are required strings; cleared references become "".
+_REQUIRED_STRING_FIELDS = {("CaseMeta", "victim"), ("CaseMeta", "culprit"), ("CaseMeta", "crimeScene"), ("CaseMeta", "murderWeapon")}
+
+
+@dataclass
+class FieldChange:
+    owner: Any
+    attr: str
+    old_value: Any
+    new_value: Any
+
+
+@dataclass
+class Removal:
+    container: list
+    index: int
+    asset: Any
+
+
+Change = Union[FieldChange, Removal]
+
+
+class ReferenceIndex:
+    def __init__(self):
+        self.world_data: Optional[WorldData] = None
+        self.case_data: Optional[CaseData] = None
+        # (target type, target id) -> {(id(owner), attr): owner}
+        self._incoming: Dict[Tuple[str, str], Dict[Tuple[int, str], Any]] = {}
+        # id(asset) -> list that holds it
+        self._containers: Dict[int, list] = {}
+
+    def rebuild(self, world_data: WorldData, case_data: CaseData):
+        self.world_data, self.case_data = world_data, case_data
+        self._incoming, self._containers = {}, {}
+        for container in (
+            world_data.characters, world_data.locations, world_data.items,
+            world_data.factions, world_data.districts, world_data.events, case_data.clues,
+            case_data.keySuspects, case_data.caseLocations, case_data.whereabouts,
+            case_data.eventChain, case_data.chainLinks,
+        ):
+            for asset in container:
+                self.add(asset, container)
+        if world_data.sleuth:
+            self.add(world_data.sleuth)
+        if case_data.caseMeta:
+            self.add(case_data.caseMeta)
+
+    def default_container(self, asset: Any) -> Optional[list]:
+        return {
+            "Character": self.world_data.characters,
+            "Location": self.world_data.locations,
+            "Item": self.world_data.items,
+            "Faction": self.world_data.factions,
+            "District": self.world_data.districts,
+            "LoreEvent": self.world_data.events,
+            "Clue": self.case_data.clues,
+            "CaseSuspect": self.case_data.keySuspects,
+            "CaseLocation": self.case_data.caseLocations,
+            "Whereabout": self.case_data.whereabouts,
+            "ChainEvent": self.case_data.eventChain,
+            "ChainLink": self.case_data.chainLinks,
+        }.get(type(asset).__name__)
+
+    # --- Incremental maintenance ---
+
+    def add(self, asset: Any, container: Optional[list] = None):
+        """Indexes an asset's outgoing references, and those of the objects nested in it."""
+        container = container if container is not None else self.default_container(asset)
+        if container is not None:
+            self._containers[id(asset)] = container
+        for field in FIELDS_BY_OWNER.get(type(asset).__name__, {}).values():
+            self._link(asset, field, getattr(asset, field.attr, None))
+        for child_container in self._child_containers(asset):
+            for child in child_container:
+                self.add(child, child_container)
+
+    def remove(self, asset: Any):
+        self._containers.pop(id(asset), None)
+        for field in FIELDS_BY_OWNER.get(type(asset).__name__, {}).values():
+            self._unlink(asset, field, getattr(asset, field.attr, None))
+        for child_container in self._child_containers(asset):
+            for child in child_container:
+                self.remove(child)
+
+    def update_field(self, owner: Any, attr: str, old_value: Any, new_value: Any):
+        field = FIELDS_BY_OWNER.get(type(owner).__name__, {}).get(attr)
+        if field:
+            self._unlink(owner, field, old_value)
+            self._link(owner, field, new_value)
+
+    def referrers(self, target_type: str, target_id: str) -> List[Tuple[Any, str]]:
+        """Returns the (owner, attr) pairs that reference the given asset."""
+        return [(owner, key[1]) for key, owner in self._incoming.get((target_type, target_id), {}).items()]
+
+    def _link(self, owner: Any, field: ReferenceField, value: Any):
+        for target_id in self._ids(field, value):
+            self._incoming.setdefault((field.target_type, target_id), {})[(id(owner), field.attr)] = owner
+
+    def _unlink(self, owner: Any, field: ReferenceField, value: Any):
+        for target_id in self._ids(field, value):
+            owners = self._incoming.get((field.target_type, target_id))
+            if owners:
+                owners.pop((id(owner), field.attr), None)
+                if not owners:
+                    del self._incoming[(field.target_type, target_id)]
+
+    @staticmethod
+    def _ids(field: ReferenceField, value: Any) -> Iterable[str]:
+        if not value:
+            return ()
+        return value if field.many else (value,)
+
+    @staticmethod
+    def _child_containers(asset: Any) -> List[list]:
+        return [getattr(asset, attr) for attr in ("interview", "witnesses") if hasattr(asset, attr)]
+
+    # --- Cascading deletes ---
+
+    def _interview_clues(self, asset: Any) -> List[Any]:
+        """Clues made from the interview answers of a suspect or witness, or of the witnesses at a case location."""
+        people = asset.witnesses if isinstance(asset, schemas.CaseLocation) else [asset]
+        sources = {question.questionId for person in people for question in getattr(person, "interview", [])}
+        if not sources or not self.case_data:
+            return []
+        return [clue for clue in self.case_data.clues if clue.source in sources]
+
+    def cascade_delete(self, assets: Iterable[Any]) -> List[Change]:
+        """
+        Deletes `assets` and clears every reference to them.
+
+        Owners that only wrap a deleted asset (case suspects, case locations
+        and witnesses) are deleted as well, together with the clues made from
+        their interview answers. Each affected list field is
+        rewritten once, and each container is compacted once. Returns the
+        applied changes in order so callers can record or revert them.
+        """
+        doomed: Dict[int, Any] = {}
+        pending = list(assets)
+        while pending:
+            asset = pending.pop()
+            if id(asset) in doomed:
+                continue
+            doomed[id(asset)] = asset
+            asset_id = schemas.get_asset_id(asset)
+            for owner, attr in self.referrers(type(asset).__name__, asset_id):
+                if FIELDS_BY_OWNER[type(owner).__name__][attr].owned:
+                    pending.append(owner)
+            pending.extend(self._interview_clues(asset))
+
+        # Group the ids to drop per (owner, field) so each field is rewritten once.
+        cleared: Dict[Tuple[int, str], Tuple[Any, set]] = {}
+        for asset in doomed.values():
+            for owner, attr in self.referrers(type(asset).__name__, schemas.get_asset_id(asset)):
+                if id(owner) not in doomed:
+                    cleared.setdefault((id(owner), attr), (owner, set()))[1].add(schemas.get_asset_id(asset))
+
+        changes: List[Change] = []
+        for (_, attr), (owner, ids) in cleared.items():
+            field = FIELDS_BY_OWNER[type(owner).__name__][attr]
+            old_value = getattr(owner, attr)
+            if field.many:
+                new_value = [v for v in old_value if v not in ids]
+            else:
+                new_value = "" if (field.owner_type, attr) in _REQUIRED_STRING_FIELDS else None
+            setattr(owner, attr, new_value)
+            self.update_field(owner, attr, old_value, new_value)
+            changes.append(FieldChange(owner, attr, old_value, new_value))
+
+        # Clues unlocked by a deleted clue keep a dangling {"type", "id"} entry otherwise.
+        doomed_clue_ids = {a.clueId for a in doomed.values() if isinstance(a, schemas.Clue)}
+        if doomed_clue_ids and self.case_data:
+            for clue in self.case_data.clues:
+                if id(clue) not in doomed and any(u.get("id") in doomed_clue_ids for u in clue.revealsUnlocks):
+                    new_value = [u for u in clue.revealsUnlocks if u.get("id") not in doomed_clue_ids]
+                    changes.append(FieldChange(clue, "revealsUnlocks", clue.revealsUnlocks, new_value))
+                    clue.revealsUnlocks = new_value
+
+        # Likewise for travel routes leading to a deleted location or district.
+        doomed_place_ids = {a.id for a in doomed.values() if isinstance(a, (schemas.Location, schemas.District))}
+        if doomed_place_ids and self.world_data:
+            for place in self.world_data.locations + self.world_data.districts:
+                if id(place) not in doomed and any(r.get("to") in doomed_place_ids for r in place.travelRoutes):
+                    new_value = [r for r in place.travelRoutes if r.get("to") not in doomed_place_ids]
+                    changes.append(FieldChange(place, "travelRoutes", place.travelRoutes, new_value))
+                    place.travelRoutes = new_value
+
+        by_container: Dict[int, Tuple[list, set]] = {}
+        for asset in doomed.values():
+            container = self._containers.get(id(asset))
+            if container is not None:
+                by_container.setdefault(id(container), (container, set()))[1].add(id(asset))
+        for container, asset_ids in by_container.values():
+            kept, removals = [], []
+            for index, asset in enumerate(container):
+                if id(asset) in asset_ids:
+                    removals.append(Removal(container, index, asset))
+                else:
+                    kept.append(asset)
+            container[:] = kept
+            # Highest index first, so replaying the removals one by one (or
+            # reinserting them in reverse) reproduces the compaction exactly.
+            changes.extend(reversed(removals))
+
+        for asset in doomed.values():
+            self.remove(asset)
+        return changes
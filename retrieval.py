@@ -0,0 +1,227 @@
+# retrieval.py
+"""
+World context for AI prompts, retrieved from a local embedding index.
+
+Every character, location, faction, item and clue is embedded as a hashed
+TF-IDF vector: the words of its text fields are hashed into DIMENSIONS
+buckets, counted with sublinear term frequency, and weighted by inverse
+document frequency over the whole world. Nothing is downloaded and no model
+runs, so a 10k-asset world embeds in a few seconds on a CPU. The rows sit in
+one NumPy matrix, and a query is a single matrix-vector product. At this
+size that is faster than building and maintaining an approximate index.
+
+The index is a change listener. Like the TravelTable it only marks things
+stale, and the next query re-embeds what changed. An edited field
+re-embeds one asset, and a creation or deletion rescans the membership of
+that asset type. Document frequencies are kept as running counts, so an
+edit never touches the other rows.
+
+`build_prompt` puts the asset's own fields and its nearest neighbours in
+front of the instruction, trimmed to a token budget.
+"""
+import re
+import zlib
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from id_intern import asset_lists
+from references import FIELDS_BY_OWNER
+from schemas import CaseData, WorldData, get_display_name
+
+RETRIEVED_TYPES = ("Character", "Location", "Faction", "Item", "Clue")
+DIMENSIONS = 1024
+TOP_K = 6
+PROMPT_BUDGET = 400  # Tokens of prompt; GPT-2 sees 1024 in all, output included.
+LINE_BUDGET = 60  # Tokens per context line.
+
+_WORD = re.compile(r"[a-z][a-z']+")
+_STOPWORDS = frozenset("the and for with that this from his her their they them was were are has have had not but who whom which into onto over under about its".split())
+_SKIPPED_FIELDS = frozenset(("id", "clueId", "characterId", "locationId", "image"))
+_NAME_FIELDS = ("fullName", "name")  # Already at the start of a context line.
+_buckets: Dict[str, int] = {}
+
+
+def estimate_tokens(text: str) -> int:
+    """About four characters per token, near enough for budgeting."""
+    return len(text) // 4 + 1
+
+
+def asset_text(asset: Any, skip: Iterable[str] = ()) -> str:
+    """The free text of an asset: its string fields and lists of strings, without ids and references."""
+    if not is_dataclass(asset):
+        return ""
+    skipped = _SKIPPED_FIELDS.union(FIELDS_BY_OWNER.get(type(asset).__name__, {}), skip)
+    parts = []
+    for spec in fields(asset):
+        if spec.name in skipped:
+            continue
+        value = getattr(asset, spec.name)
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(item for item in value if isinstance(item, str))
+    return "\n".join(part for part in parts if part)
+
+
+def term_counts(text: str) -> np.ndarray:
+    """Word counts hashed into DIMENSIONS buckets."""
+    counts = np.zeros(DIMENSIONS, dtype=np.float32)
+    words = [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+    if not words:
+        return counts
+    indices = []
+    for word in words:
+        bucket = _buckets.get(word)
+        if bucket is None:
+            # crc32 rather than hash(): the same word lands in the same bucket in every run.
+            bucket = _buckets[word] = zlib.crc32(word.encode("utf-8")) % DIMENSIONS
+        indices.append(bucket)
+    np.add.at(counts, indices, 1)
+    return counts
+
+
+class RetrievalIndex:
+    def __init__(self):
+        self.world_data: Optional[WorldData] = None
+        self.case_data: Optional[CaseData] = None
+        self.matrix = np.zeros((0, DIMENSIONS), dtype=np.float32)  # Sublinear term frequencies, a row per slot.
+        self.slot_assets: List[Optional[Any]] = []
+        self.slots: Dict[int, int] = {}  # id(asset) -> row
+        self.document_frequency = np.zeros(DIMENSIONS, dtype=np.int64)
+        self.embedded = 0  # Rows embedded since the last reset, for tests and profiling.
+        self._free: List[int] = []
+        self._dirty_types: Set[str] = set()
+        self._dirty_assets: Dict[int, Any] = {}
+        self._weights: Optional[np.ndarray] = None  # IDF, cached until a row changes.
+        self._norms: Optional[np.ndarray] = None
+
+    def reset(self, world_data: WorldData, case_data: CaseData):
+        self.world_data, self.case_data = world_data, case_data
+        self.matrix = np.zeros((0, DIMENSIONS), dtype=np.float32)
+        self.slot_assets, self.slots, self._free = [], {}, []
+        self.document_frequency = np.zeros(DIMENSIONS, dtype=np.int64)
+        self.embedded = 0
+        self._dirty_types = set(RETRIEVED_TYPES)
+        self._dirty_assets = {}
+        self._weights = self._norms = None
+
+    def on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        """Change listener: marks what an edit made out of date."""
+        asset_type = type(asset).__name__
+        if asset_type not in RETRIEVED_TYPES:
+            return
+        if attribute_name is None:
+            self._dirty_types.add(asset_type)
+        else:
+            self._dirty_assets[id(asset)] = asset
+
+    # --- Queries ---
+
+    def related(self, asset: Any, k: int = TOP_K) -> List[Any]:
+        """The `k` assets whose text is closest to `asset`'s, best first."""
+        return self.search(f"{get_display_name(asset)}\n{asset_text(asset)}", k, exclude=asset)
+
+    def search(self, text: str, k: int = TOP_K, exclude: Any = None) -> List[Any]:
+        self._sync()
+        if not self.slots:
+            return []
+        weights, norms = self._weighting()
+        query = np.log1p(term_counts(text)) * weights
+        query_norm = float(np.linalg.norm(query))
+        if query_norm == 0:
+            return []
+        scores = (self.matrix @ (query * weights)) / (norms * query_norm)
+        skip = self.slots.get(id(exclude))
+        if skip is not None:
+            scores[skip] = 0
+        count = min(k, len(scores))
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best])]
+        return [self.slot_assets[row] for row in best if scores[row] > 0]
+
+    # --- Maintenance ---
+
+    def _sync(self):
+        if self.world_data is None or not (self._dirty_types or self._dirty_assets):
+            return
+        dirty_types, self._dirty_types = self._dirty_types, set()
+        dirty_assets, self._dirty_assets = self._dirty_assets, {}
+        lists = asset_lists(self.world_data, self.case_data)
+        for asset_type in dirty_types:
+            current = {id(asset): asset for asset in lists[asset_type]}
+            for key, row in list(self.slots.items()):
+                if type(self.slot_assets[row]).__name__ == asset_type and key not in current:
+                    self._remove(key)
+            for key, asset in current.items():
+                if key not in self.slots:
+                    self._embed(asset)
+        for key, asset in dirty_assets.items():
+            if key in self.slots:
+                self._embed(asset)
+        self._weights = self._norms = None
+
+    def _embed(self, asset: Any):
+        row = self.slots.get(id(asset))
+        if row is None:
+            row = self._free.pop() if self._free else self._grow()
+            self.slots[id(asset)] = row
+            self.slot_assets[row] = asset
+        else:
+            self.document_frequency -= self.matrix[row] > 0
+        self.matrix[row] = np.log1p(term_counts(asset_text(asset)))
+        self.document_frequency += self.matrix[row] > 0
+        self.embedded += 1
+
+    def _remove(self, key: int):
+        row = self.slots.pop(key)
+        self.document_frequency -= self.matrix[row] > 0
+        self.matrix[row] = 0
+        self.slot_assets[row] = None
+        self._free.append(row)
+
+    def _grow(self) -> int:
+        row = len(self.slot_assets)
+        if row == len(self.matrix):
+            grown = np.zeros((max(64, 2 * len(self.matrix)), DIMENSIONS), dtype=np.float32)
+            grown[:row] = self.matrix
+            self.matrix = grown
+        self.slot_assets.append(None)
+        return row
+
+    def _weighting(self):
+        if self._weights is None:
+            documents = len(self.slots)
+            self._weights = (np.log((1 + documents) / (1 + self.document_frequency)) + 1).astype(np.float32)
+            norms = np.sqrt((self.matrix ** 2) @ (self._weights ** 2))
+            norms[norms == 0] = 1
+            self._norms = norms
+        return self._weights, self._norms
+
+
+def _clip(text: str, tokens: int) -> str:
+    text = " ".join(text.split())
+    limit = tokens * 4
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "..."
+
+
+def build_prompt(asset: Any, field_name: str, related: List[Any], budget: int = PROMPT_BUDGET) -> str:
+    """
+    The generation prompt for one field: what is known about the asset, then
+    the related assets most similar to it, as many as fit in `budget`
+    tokens, then the instruction.
+    """
+    name = getattr(asset, 'fullName', getattr(asset, 'name', ''))
+    instruction = f"Generate a {field_name} for a {type(asset).__name__} named {name}:\n"
+    budget -= estimate_tokens(instruction)
+    own = asset_text(asset, skip=(field_name,) + _NAME_FIELDS)
+    candidates = [f"About {name}: {_clip(own, 2 * LINE_BUDGET)}"] if own else []
+    candidates += [f"{type(other).__name__} {get_display_name(other)}: {_clip(asset_text(other, skip=_NAME_FIELDS), LINE_BUDGET)}" for other in related]
+    lines = []
+    for line in candidates:
+        cost = estimate_tokens(line) + 1
+        if cost <= budget:
+            lines.append(line)
+            budget -= cost
+    return ("Context:\n" + "\n".join(lines) + "\n\n" if lines else "") + instruction
@@ -0,0 +1,202 @@
+# routing.py
+"""
+Travel times between places on the map.
+
+Locations and districts are the nodes. Edges come from the travelRoutes
+entries on either end ({"to": place id, "minutes": m}, two-way), plus an
+implicit INTRA_DISTRICT_MINUTES hop between each location and its district,
+so a route drawn between two districts also connects the locations in them.
+
+TravelTable keeps all-pairs shortest travel times in an (n, n) array computed
+with a vectorized Floyd-Warshall, one O(n^2) NumPy step per pivot. Edits only
+mark the table stale; the next query brings it up to date incrementally: new
+places add an unreachable row and column, a new or shorter route is folded in
+with one O(n^2) relaxation, and a longer or removed route forces a full
+recompute only if it was on a shortest path.
+"""
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from schemas import WorldData
+
+INTRA_DISTRICT_MINUTES = 5.0
+PLACE_TYPES = ("Location", "District")
+ROUTE_FIELDS = {"travelRoutes", "district", "id", None}  # Edits that can change the network.
+
+Edge = Tuple[str, str]
+
+
+def travel_edges(world_data: WorldData) -> Dict[Edge, float]:
+    """Undirected edges as {(id, id) sorted: minutes}; the fastest of parallel routes wins."""
+    places = {p.id for p in chain(world_data.locations, world_data.districts)}
+    edges: Dict[Edge, float] = {}
+
+    def add(a: str, b: Optional[str], minutes: float):
+        if a == b or b not in places:
+            return
+        key = (a, b) if a < b else (b, a)
+        edges[key] = min(edges.get(key, np.inf), minutes)
+
+    for place in chain(world_data.locations, world_data.districts):
+        for route in place.travelRoutes:
+            try:
+                minutes = float(route.get("minutes"))
+            except (TypeError, ValueError):
+                continue
+            if minutes >= 0:
+                add(place.id, route.get("to"), minutes)
+    for location in world_data.locations:
+        if location.district:
+            add(location.id, location.district, INTRA_DISTRICT_MINUTES)
+    return edges
+
+
+def floyd_warshall(weights: np.ndarray) -> np.ndarray:
+    """All-pairs shortest paths of a dense weight matrix (np.inf for no edge, 0 on the diagonal)."""
+    dist = weights.astype(np.float32)  # Half the memory traffic of float64; exact for whole minutes.
+    via = np.empty_like(dist)
+    # Places without any route can never be a stop on the way.
+    connected = np.isfinite(weights).sum(axis=1) > 1
+    for k in np.nonzero(connected)[0]:
+        # Row and column k cannot change while k is the pivot, so updating in place is safe.
+        np.add(dist[:, k, None], dist[k], out=via)
+        np.minimum(dist, via, out=dist)
+    return dist
+
+
+class TravelTable:
+    def __init__(self):
+        self.world_data: Optional[WorldData] = None
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.weights = np.zeros((0, 0), dtype=np.float32)
+        self.dist = np.zeros((0, 0), dtype=np.float32)
+        self._edges: Dict[Edge, float] = {}
+        self._stale = False
+        self.full_recomputes = 0  # For tests and profiling.
+
+    def reset(self, world_data: WorldData):
+        """Switches to another world; the table is computed on first use."""
+        self.world_data = world_data
+        self.ids, self.index, self._edges = [], {}, {}
+        self.weights = self.dist = np.zeros((0, 0), dtype=np.float32)
+        self._stale = True
+
+    def on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        """Change listener: marks the table stale after edits that touch the network."""
+        if type(asset).__name__ in PLACE_TYPES and attribute_name in ROUTE_FIELDS:
+            self._stale = True
+
+    # --- Queries ---
+
+    def minutes(self, source: str, target: str) -> float:
+        """Shortest travel time in minutes, or inf when there is no route (or no such place)."""
+        self._sync()
+        i, j = self.index.get(source), self.index.get(target)
+        return np.inf if i is None or j is None else float(self.dist[i, j])
+
+    def fastest(self, sources: Iterable[str], target: str) -> float:
+        """Shortest travel time to `target` from whichever of `sources` is closest."""
+        self._sync()
+        j = self.index.get(target)
+        rows = [self.index[s] for s in sources if s in self.index]
+        if j is None or not rows:
+            return np.inf
+        return float(self.dist[rows, j].min())
+
+    def submatrix(self, sources: List[str], targets: List[str]) -> np.ndarray:
+        """Travel times from each of `sources` to each of `targets`; inf for unknown places."""
+        self._sync()
+        rows = np.array([self.index.get(s, -1) for s in sources], dtype=np.int64)
+        cols = np.array([self.index.get(t, -1) for t in targets], dtype=np.int64)
+        result = np.full((len(rows), len(cols)), np.inf, dtype=np.float32)
+        known_rows, known_cols = rows >= 0, cols >= 0
+        result[np.ix_(known_rows, known_cols)] = self.dist[np.ix_(rows[known_rows], cols[known_cols])]
+        # Staying put takes no time, even at a place the map does not know.
+        same = np.equal.outer(np.array(sources, dtype=object), np.array(targets, dtype=object))
+        result[same] = 0.0
+        return result
+
+    def travel_times_from(self, source: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Reachable places ordered by travel time from `source` (excluding itself)."""
+        self._sync()
+        i = self.index.get(source)
+        if i is None:
+            return []
+        row = self.dist[i]
+        order = [j for j in np.argsort(row, kind="stable").tolist() if j != i and np.isfinite(row[j])]
+        return [(self.ids[j], float(row[j])) for j in order[:limit]]
+
+    # --- Maintenance ---
+
+    def _sync(self):
+        if not self._stale or self.world_data is None:
+            return
+        self._stale = False
+        ids = [p.id for p in chain(self.world_data.locations, self.world_data.districts)]
+        edges = travel_edges(self.world_data)
+        if not self.index or len(set(ids)) != len(ids) or not set(self.index) <= set(ids):
+            # First use, or removed or duplicated ids that shift rows around.
+            self._recompute(ids, edges)
+            return
+        self._add_places([place_id for place_id in ids if place_id not in self.index])
+
+        lengthened, shortened = [], []
+        for key in self._edges.keys() | edges.keys():
+            old, new = self._edges.get(key, np.inf), edges.get(key, np.inf)
+            if new > old:
+                lengthened.append((key, old, new))
+            elif new < old:
+                shortened.append((key, new))
+        self._edges = edges
+        for (a, b), _, new in lengthened:
+            self._set_weight(a, b, new)
+        if any(self.dist[self.index[a], self.index[b]] >= old for (a, b), old, _ in lengthened):
+            # A shortest path may have used the old edge; nothing cheaper than a rerun is exact.
+            for (a, b), new in shortened:
+                self._set_weight(a, b, new)
+            self._floyd_warshall()
+            return
+        for (a, b), new in shortened:
+            self._set_weight(a, b, new)
+            self._relax(self.index[a], self.index[b], new)
+
+    def _recompute(self, ids: List[str], edges: Dict[Edge, float]):
+        self.ids = list(dict.fromkeys(ids))
+        self.index = {place_id: i for i, place_id in enumerate(self.ids)}
+        n = len(self.ids)
+        self.weights = np.full((n, n), np.inf, dtype=np.float32)
+        np.fill_diagonal(self.weights, 0.0)
+        self._edges = edges
+        for (a, b), minutes in edges.items():
+            self._set_weight(a, b, minutes)
+        self._floyd_warshall()
+
+    def _floyd_warshall(self):
+        self.dist = floyd_warshall(self.weights)
+        self.full_recomputes += 1
+
+    def _add_places(self, new_ids: List[str]):
+        if not new_ids:
+            return
+        n, m = len(self.ids), len(self.ids) + len(new_ids)
+        for matrix in ("weights", "dist"):
+            grown = np.full((m, m), np.inf, dtype=np.float32)
+            grown[:n, :n] = getattr(self, matrix)
+            grown[np.arange(n, m), np.arange(n, m)] = 0.0
+            setattr(self, matrix, grown)
+        for place_id in new_ids:
+            self.index[place_id] = len(self.ids)
+            self.ids.append(place_id)
+
+    def _set_weight(self, a: str, b: str, minutes: float):
+        i, j = self.index[a], self.index[b]
+        self.weights[i, j] = self.weights[j, i] = minutes
+
+    def _relax(self, i: int, j: int, minutes: float):
+        """Folds a new or shorter two-way edge i-j into the distances in O(n^2)."""
+        via_ij = self.dist[:, i, None] + minutes + self.dist[None, j, :]
+        via_ji = self.dist[:, j, None] + minutes + self.dist[None, i, :]
+        np.minimum(self.dist, np.minimum(via_ij, via_ji), out=self.dist)
@@ -33,6 +33,9 @@ class District:
     notableFeatures: List[str] = field(default_factory=list)
     dominantFaction: Optional[str] = None
     keyLocations: List[str] = field(default_factory=list)
+    mapX: Optional[float] = None
+    mapY: Optional[float] = None
+    travelRoutes: List[dict] = field(default_factory=list) # e.g., {"to": "district-02", "minutes": 20}
 
 @dataclass
 class Location:
@@ -51,6 +54,9 @@ class Location:
     hidden: Optional[bool] = False
     internalLogicNotes: Optional[str] = None
     clues: List[str] = field(default_factory=list)
+    mapX: Optional[float] = None
+    mapY: Optional[float] = None
+    travelRoutes: List[dict] = field(default_factory=list) # e.g., {"to": "loc-02", "minutes": 12}
 
 @dataclass
 class Faction:
@@ -151,6 +157,19 @@ class Item:
     uniqueProperties: List[str] = field(default_factory=list)
     significance: Optional[str] = None
 
+@dataclass
+class LoreEvent:
+    """A dated event in the world's history, attached to the assets it involves."""
+    id: str
+    name: str
+    description: str
+    start: str # "1921", "1921-03" or "1921-03-14"
+    end: Optional[str] = None # Same format; the event lasts until the end of that year, month or day.
+    category: Optional[str] = None
+    characters: List[str] = field(default_factory=list)
+    factions: List[str] = field(default_factory=list)
+    locations: List[str] = field(default_factory=list)
+
 @dataclass
 class WorldData:
     """The root object for all world assets."""
@@ -160,6 +179,7 @@ class WorldData:
     characters: List[Character] = field(default_factory=list)
     sleuth: Optional[Sleuth] = None
     items: List[Item] = field(default_factory=list)
+    events: List[LoreEvent] = field(default_factory=list)
 
 
 # --- Case Data Schemas ---
@@ -185,6 +205,8 @@ class CaseMeta:
     ultimateRevealSceneDescription: Optional[str] = None
     successfulDenouement: Optional[str] = None
     failedDenouement: Optional[str] = None
+    crimeWindowStart: Optional[int] = None # Minutes from the start of the case.
+    crimeWindowEnd: Optional[int] = None
 
 @dataclass
 class InterviewQuestion:
@@ -247,6 +269,39 @@ class ValidationResult:
     asset_type: Optional[str] = None
     field_name: Optional[str] = None
 
+@dataclass
+class Whereabout:
+    """A character's stay at a location, in minutes from the start of the case."""
+    id: str
+    characterId: str
+    locationId: str
+    start: int
+    end: int
+    witnesses: List[str] = field(default_factory=list) # Character IDs who can vouch for the stay.
+    isLie: bool = False # A false alibi, meant to be broken.
+    notes: Optional[str] = None
+
+@dataclass
+class ChainEvent:
+    """A step of the case's ground-truth eventChain, in minutes from the start of the case."""
+    id: str
+    description: str
+    start: Optional[int] = None # Pinned start time; unpinned events happen as early as the chain allows.
+    minDuration: int = 0
+    maxDuration: Optional[int] = None
+    characters: List[str] = field(default_factory=list)
+    locationId: Optional[str] = None
+    isCrime: bool = False # "The Crime", held inside the case's crime window.
+
+@dataclass
+class ChainLink:
+    """`after` starts at least minGap (and at most maxGap) minutes after `before` ends."""
+    id: str
+    before: str
+    after: str
+    minGap: int = 0
+    maxGap: Optional[int] = None
+
 @dataclass
 class CaseData:
     """The root object for a specific mystery case."""
@@ -254,3 +309,25 @@ class CaseData:
     keySuspects: List[CaseSuspect] = field(default_factory=list)
     caseLocations: List[CaseLocation] = field(default_factory=list)
     clues: List[Clue] = field(default_factory=list)
+    whereabouts: List[Whereabout] = field(default_factory=list)
+    eventChain: List[ChainEvent] = field(default_factory=list)
+    chainLinks: List[ChainLink] = field(default_factory=list)
+
+
+# --- Asset Helpers ---
+
+def get_asset_id(asset) -> Optional[str]:
+    """Returns the identifier of a world or case asset, whatever its id field is called."""
+    for attr in ("id", "clueId", "questionId", "characterId", "locationId"):
+        value = getattr(asset, attr, None)
+        if value is not None:
+            return value
+    return None
+
+def get_display_name(asset) -> str:
+    """Returns the human-readable label of a world or case asset."""
+    for attr in ("fullName", "name", "clueSummary", "question"):
+        value = getattr(asset, attr, None)
+        if value:
+            return value
+    return get_asset_id(asset) or "Unknown"
@@ -1,10 +1,174 @@
+import threading
+from typing import Any, Optional
+
 import flet as ft
+import flet.canvas as cv
+import numpy as np
+
 from my_control import Control
+from graph_model import Graph, build_social_graph
+from graph_layout import LayoutEngine
+
+CANVAS_SIZE = 1000
+MARGIN = 40
+LABEL_LIMIT = 150  # Node labels are only drawn for graphs up to this size.
+LAYOUT_NAME = "social"  # Key of this view's entry in the case's layouts.json.
+REBUILD_DELAY = 0.4  # Seconds of quiet after an edit before the graph is rebuilt.
+TOP_COUNT = 5  # Names listed per measure in the analytics summary.
+
+EDGE_COLORS = {
+    "ally": ft.Colors.GREEN_400,
+    "enemy": ft.Colors.RED_400,
+    "faction": ft.Colors.BLUE_GREY_400,
+    "relationship": ft.Colors.AMBER_400,
+    "nemesis": ft.Colors.PURPLE_300,
+}
+NODE_COLORS = {
+    "Character": ft.Colors.BLUE_300,
+    "Faction": ft.Colors.TEAL_300,
+    "Sleuth": ft.Colors.AMBER_300,
+}
+NODE_SIZES = {"Character": 10, "Faction": 16, "Sleuth": 14}
+
+# Fields whose edits change the social graph.
+GRAPH_FIELDS = {
+    "Character": {"allies", "enemies", "faction", "fullName", "id"},
+    "Faction": {"members", "name", "id"},
+    "Sleuth": {"relationships", "nemesis", "name", "id"},
+}
+
+
+class SocialGraphView:
+    """
+    Renders the character graph laid out by a background LayoutEngine.
+
+    Edges and nodes are drawn as one Points shape per kind, so the canvas holds
+    a handful of shapes however large the world is. Panning and zooming happen
+    client-side in an InteractiveViewer and never touch the shapes. Edits to
+    graph fields schedule a debounced rebuild; the engine then re-lays out only
+    the nodes around the change. Settled layouts are saved in the case's
+    layouts.json and restored when the view is built.
+    """
+
+    def __init__(self, control: Control):
+        self.control = control
+        self.engine = LayoutEngine(on_update=self._on_layout, on_settled=self._on_settled)
+        control.layout_store.restore(LAYOUT_NAME, self.engine)
+        self.canvas = cv.Canvas(width=CANVAS_SIZE, height=CANVAS_SIZE)
+        self.status = ft.Text()
+        self.analytics = ft.Text(visible=False)
+        self._timer: Optional[threading.Timer] = None
+        self.view = ft.Column(
+            [
+                ft.Row([
+                    ft.Text("Social Graph", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
+                    self.status,
+                    ft.IconButton(icon=ft.Icons.REFRESH, tooltip="Lay out from scratch", on_click=lambda e: self.refresh(full=True)),
+                    ft.IconButton(icon=ft.Icons.INSIGHTS, tooltip="Centrality and communities", on_click=lambda e: threading.Thread(target=self.analyze, daemon=True).start()),
+                ]),
+                self.analytics,
+                ft.InteractiveViewer(
+                    content=self.canvas,
+                    min_scale=0.1,
+                    max_scale=20,
+                    boundary_margin=ft.margin.all(CANVAS_SIZE),
+                    expand=True,
+                ),
+            ],
+            expand=True,
+        )
+        # Batch operations, undo and redo notify the listener per asset too, so
+        # one debounced rebuild covers them; a refresher would rebuild again.
+        control.add_change_listener(self._on_asset_changed)
+        self.refresh()
+
+    def refresh(self, full: bool = False):
+        if full:
+            self.engine.reset()
+        graph = build_social_graph(self.control.world_data)
+        self.status.value = f"{len(graph)} nodes, {len(graph.edge_kinds)} edges - laying out..."
+        self.engine.set_graph(graph)
+
+    def analyze(self):
+        """Shows the most central characters and the largest communities. Runs off the UI thread."""
+        analytics = self.control.graph_analytics
+        self.analytics.value = "Analyzing..."
+        self.analytics.visible = True
+        self._update()
+        between, ranks, communities = analytics.betweenness(), analytics.pagerank(), analytics.communities()
+        graph = analytics.graph
+        labels = {node_id: label for node_id, label, kind in zip(graph.node_ids, graph.labels, graph.node_kinds) if kind != "Faction"}
+
+        def top(scores):
+            people = [node_id for node_id in scores if node_id in labels]
+            return ", ".join(labels[node_id] for node_id in sorted(people, key=scores.get, reverse=True)[:TOP_COUNT])
+
+        sizes = ", ".join(str(len(group)) for group in communities[:TOP_COUNT])
+        self.analytics.value = (
+            f"Brokers (betweenness): {top(between)}\n"
+            f"Most influential (PageRank): {top(ranks)}\n"
+            f"{len(communities)} communities; largest have {sizes or 'no'} members"
+        )
+        self._update()
+
+    def _update(self):
+        if self.view.page:
+            self.view.update()
+
+    def _on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        fields = GRAPH_FIELDS.get(type(asset).__name__)
+        if fields is None or (attribute_name is not None and attribute_name not in fields):
+            return
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(REBUILD_DELAY, self.refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_settled(self, graph: Graph, positions: np.ndarray):
+        self.control.layout_store.save(LAYOUT_NAME, self.engine)
+
+    def _on_layout(self, graph: Graph, positions: np.ndarray):
+        # Called from the layout thread.
+        self.canvas.shapes = self._shapes(graph, positions)
+        self.status.value = f"{len(graph)} nodes, {len(graph.edge_kinds)} edges"
+        if self.canvas.page:
+            self.canvas.page.update()
+
+    def _shapes(self, graph: Graph, positions: np.ndarray):
+        if len(graph) == 0:
+            return []
+        lo = positions.min(axis=0)
+        span = max(float((positions.max(axis=0) - lo).max()), 1e-9)
+        xy = MARGIN + (positions - lo) / span * (CANVAS_SIZE - 2 * MARGIN)
+        points = [ft.Offset(float(x), float(y)) for x, y in xy]
+
+        shapes = []
+        segments = {}
+        for (a, b), kind in zip(graph.edges.tolist(), graph.edge_kinds):
+            segments.setdefault(kind, []).extend((points[a], points[b]))
+        for kind, segment_points in segments.items():
+            shapes.append(cv.Points(
+                points=segment_points,
+                point_mode=cv.PointMode.LINES,
+                paint=ft.Paint(color=EDGE_COLORS.get(kind, ft.Colors.GREY), stroke_width=1),
+            ))
+
+        nodes = {}
+        for point, kind in zip(points, graph.node_kinds):
+            nodes.setdefault(kind, []).append(point)
+        for kind, node_points in nodes.items():
+            shapes.append(cv.Points(
+                points=node_points,
+                point_mode=cv.PointMode.POINTS,
+                paint=ft.Paint(color=NODE_COLORS.get(kind, ft.Colors.GREY), stroke_width=NODE_SIZES.get(kind, 10), stroke_cap=ft.StrokeCap.ROUND),
+            ))
+
+        if len(graph) <= LABEL_LIMIT:
+            for point, label in zip(points, graph.labels):
+                shapes.append(cv.Text(point.x + 8, point.y - 6, label, style=ft.TextStyle(size=11)))
+        return shapes
+
 
 def build_social_graph_view(control: Control):
-    return ft.Column(
-        [
-            ft.Text("Social Graph (Under Construction)", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
-            ft.Text("This section will allow you to visualize and manage character relationships."),
-        ]
-    )
\ No newline at end of file
+    return SocialGraphView(control).view
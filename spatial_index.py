@@ -0,0 +1,159 @@
+# spatial_index.py
+"""
+A point quadtree for the canvas views.
+
+Keys are any hashable node ids. Leaves hold up to `capacity` points and split
+into four quadrants when they overflow; removing points merges quadrants back
+once they fit in one leaf again. The root grows to cover points placed outside
+it, so callers never have to know the extent of their data up front.
+"""
+from itertools import islice
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+Rect = Tuple[float, float, float, float]  # (x0, y0, x1, y1)
+
+
+class _Node:
+    __slots__ = ("x0", "y0", "x1", "y1", "points", "children")
+
+    def __init__(self, x0: float, y0: float, x1: float, y1: float):
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+        self.points: Optional[Dict[Hashable, Tuple[float, float]]] = {}
+        self.children: Optional[List["_Node"]] = None
+
+    def contains(self, x: float, y: float) -> bool:
+        return self.x0 <= x < self.x1 and self.y0 <= y < self.y1
+
+    def intersects(self, x0: float, y0: float, x1: float, y1: float) -> bool:
+        return self.x0 <= x1 and x0 < self.x1 and self.y0 <= y1 and y0 < self.y1
+
+    def child_for(self, x: float, y: float) -> "_Node":
+        mx, my = (self.x0 + self.x1) / 2, (self.y0 + self.y1) / 2
+        return self.children[(2 if x >= mx else 0) + (1 if y >= my else 0)]
+
+
+class QuadTree:
+    def __init__(self, bounds: Rect = (0.0, 0.0, 1024.0, 1024.0), capacity: int = 8, max_depth: int = 20):
+        self.capacity = capacity
+        self.max_depth = max_depth
+        self._root = _Node(*bounds)
+        self._positions: Dict[Hashable, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def position(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        return self._positions.get(key)
+
+    # --- Updates ---
+
+    def insert(self, key: Hashable, x: float, y: float):
+        if key in self._positions:
+            self.remove(key)
+        if not self._root.contains(x, y):
+            self._grow_to(x, y)
+        self._positions[key] = (x, y)
+        self._insert(self._root, key, x, y, 0)
+
+    def remove(self, key: Hashable) -> bool:
+        position = self._positions.pop(key, None)
+        if position is None:
+            return False
+        path = [self._root]
+        while path[-1].children is not None:
+            path.append(path[-1].child_for(*position))
+        del path[-1].points[key]
+        # Collapse parents whose subtrees fit in a single leaf again.
+        for node in reversed(path[:-1]):
+            if sum(1 for _ in islice(self._iter_points(node), self.capacity + 1)) > self.capacity:
+                break
+            node.points = dict(self._iter_points(node))
+            node.children = None
+        return True
+
+    def move(self, key: Hashable, x: float, y: float):
+        old = self._positions.get(key)
+        if old is not None:
+            leaf = self._leaf_for(*old)
+            if leaf.contains(x, y):
+                leaf.points[key] = self._positions[key] = (x, y)
+                return
+        self.insert(key, x, y)
+
+    # --- Queries ---
+
+    def query_rect(self, x0: float, y0: float, x1: float, y1: float) -> List[Hashable]:
+        """Keys of all points inside the rectangle (edges inclusive)."""
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if not node.intersects(x0, y0, x1, y1):
+                continue
+            if node.children is None:
+                found.extend(k for k, (x, y) in node.points.items() if x0 <= x <= x1 and y0 <= y <= y1)
+            else:
+                stack.extend(node.children)
+        return found
+
+    def nearest(self, x: float, y: float, max_distance: float) -> Optional[Hashable]:
+        """The closest key within `max_distance` of (x, y), for hit-testing clicks."""
+        best, best_d2 = None, max_distance * max_distance
+        for key in self.query_rect(x - max_distance, y - max_distance, x + max_distance, y + max_distance):
+            px, py = self._positions[key]
+            d2 = (px - x) ** 2 + (py - y) ** 2
+            if d2 <= best_d2:
+                best, best_d2 = key, d2
+        return best
+
+    # --- Internals ---
+
+    def _insert(self, node: _Node, key: Hashable, x: float, y: float, depth: int):
+        while node.children is not None:
+            node, depth = node.child_for(x, y), depth + 1
+        node.points[key] = (x, y)
+        if len(node.points) > self.capacity and depth < self.max_depth:
+            mx, my = (node.x0 + node.x1) / 2, (node.y0 + node.y1) / 2
+            node.children = [
+                _Node(node.x0, node.y0, mx, my), _Node(node.x0, my, mx, node.y1),
+                _Node(mx, node.y0, node.x1, my), _Node(mx, my, node.x1, node.y1),
+            ]
+            points, node.points = node.points, None
+            for k, (px, py) in points.items():
+                self._insert(node, k, px, py, depth)
+
+    def _leaf_for(self, x: float, y: float) -> _Node:
+        node = self._root
+        while node.children is not None:
+            node = node.child_for(x, y)
+        return node
+
+    def _iter_points(self, node: _Node) -> Iterator[Tuple[Hashable, Tuple[float, float]]]:
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.children is None:
+                yield from current.points.items()
+            else:
+                stack.extend(current.children)
+
+    def _grow_to(self, x: float, y: float):
+        root = self._root
+        x0, y0, x1, y1 = root.x0, root.y0, root.x1, root.y1
+        while not (x0 <= x < x1 and y0 <= y < y1):
+            width, height = x1 - x0, y1 - y0
+            if x < x0:
+                x0 -= width
+            elif x >= x1:
+                x1 += width
+            if y < y0:
+                y0 -= height
+            elif y >= y1:
+                y1 += height
+        # Growth is rare (only when a node is dragged off the known area), so rebuild.
+        self._root = _Node(x0, y0, x1, y1)
+        for key, (px, py) in self._positions.items():
+            self._insert(self._root, key, px, py, 0)
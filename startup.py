@@ -0,0 +1,55 @@
+# startup.py
+"""
+How long the editor takes to start, phase by phase.
+
+main.py imports this module before anything else, then marks each phase of
+a launch as it completes: IMPORT when the modules are loaded, FIRST_FRAME
+when the shell is on screen, CASE_LOAD when the case is open and
+MODEL_READY when the AI model can answer. Each mark is appended to the
+startup log with the seconds since this module was imported, so a slow
+launch can be read back one phase at a time:
+
+    2026-10-19T09:14:03 import          0.431s
+    2026-10-19T09:14:03 first-frame     0.902s
+    2026-10-19T09:14:03 case-load       1.047s
+    2026-10-19T09:14:03 model-ready     6.318s
+
+The module imports only the standard library, so importing it adds nothing
+to the time it measures.
+"""
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Union
+
+STARTUP_LOG = "startup.log"
+
+IMPORT = "import"
+FIRST_FRAME = "first-frame"
+CASE_LOAD = "case-load"
+MODEL_READY = "model-ready"
+MODEL_FAILED = "model-failed"
+
+_STARTED = time.perf_counter()
+
+
+class StartupTimeline:
+    def __init__(self, path: Union[str, Path], started: float = _STARTED):
+        """`started` is the perf_counter reading the phases are timed from; by default, when this module was imported."""
+        self.path = Path(path)
+        self.started = started
+        self.launch = datetime.now().isoformat(timespec="seconds")
+        self.phases: Dict[str, float] = {}  # Phase -> seconds after start.
+
+    def mark(self, phase: str) -> float:
+        """Records that `phase` is done and returns when it finished. Only the first mark of a phase counts."""
+        if phase in self.phases:
+            return self.phases[phase]
+        elapsed = self.phases[phase] = time.perf_counter() - self.started
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{self.launch} {phase:<12} {elapsed:8.3f}s\n")
+        except OSError:
+            pass  # The timeline is a diagnostic; an unwritable log must not stop the editor from starting.
+        return elapsed
@@ -0,0 +1,33 @@
+import pytest
+
+from schemas import Character
+
+class FakePage:
+    def __init__(self):
+        self.overlay = []
+
+    def update(self, *controls):
+        pass
+
+def make_character(char_id, name=None, **fields):
+    """A character with filler for every required field; `fields` sets the rest (allies, biography, ...)."""
+    defaults = dict(fullName=name or char_id, biography="", personality="", alignment="True Neutral", honesty=5, victimLikelihood=5, killerLikelihood=5)
+    return Character(id=char_id, **{**defaults, **fields})
+
+@pytest.fixture
+def character():
+    """The character factory: `character("c1", "Ada Vance", allies=["c2"])`."""
+    return make_character
+
+@pytest.fixture
+def control(tmp_path, monkeypatch):
+    """A Control on a fake page with an empty case under tmp_path. View 1 is the Case Builder."""
+    # Imported here so the tests that need no Control run without the UI toolkit.
+    import flet as ft
+
+    import case_builder
+    import data_manager
+    from my_control import Control
+
+    monkeypatch.setattr(data_manager, "CASES_DIR", tmp_path)
+    return Control(FakePage(), ft.NavigationRail(destinations=[]), ft.Column(), lambda control: ft.Column(), case_builder.build_case_builder_view)
@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import pytest
+
+import ai_backends
+from ai_backends import HTTPBackend, MockServer, PrefixCache
+
+@pytest.fixture
+def server():
+    mock = MockServer().start()
+    yield mock
+    mock.stop()
+
+def test_streams_and_reuses_one_connection(server):
+    backend = HTTPBackend(server.url, "mock", max_connections=2)
+    chunks = list(backend.stream("Generate a biography", 5))
+    assert chunks == server.complete("Generate a biography", 5)
+    assert "".join(backend.stream("Generate a secret", 3)) == "".join(server.complete("Generate a secret", 3))
+    assert backend.generate_batch(["a"], 2) == ["".join(server.complete("a", 2))]
+    assert server.requests == 3 and server.connections == 1
+
+def test_batches_are_split_and_kept_in_order(server):
+    backend = HTTPBackend(server.url, "mock", batch_items=2)
+    prompts = [f"prompt {i}" for i in range(5)]
+    assert backend.generate_batch(prompts, 3) == ["".join(server.complete(p, 3)) for p in prompts]
+    assert server.requests == 3
+
+def test_overloaded_server_is_retried(server):
+    server.fail_next = 2
+    backend = HTTPBackend(server.url, "mock", backoff=0.01)
+    assert backend.generate_batch(["a"], 1) == server.complete("a", 1)
+    server.fail_next = 5
+    with pytest.raises(RuntimeError, match="503"):
+        backend.generate_batch(["a"], 1)
+
+def test_api_key_is_sent_and_rejections_are_not_retried():
+    server = MockServer(api_key="secret").start()
+    try:
+        assert HTTPBackend(server.url, "mock", api_key="secret").generate_batch(["a"], 1) == server.complete("a", 1)
+        with pytest.raises(RuntimeError, match="401"):
+            HTTPBackend(server.url, "mock", api_key="wrong", backoff=0.01).generate_batch(["a"], 1)
+        assert server.requests == 2
+    finally:
+        server.stop()
+
+def test_stopping_a_stream_early():
+    server = MockServer().start()
+    try:
+        backend = HTTPBackend(server.url, "mock")
+        seen = []
+        for chunk in backend.stream("a", 50, should_stop=lambda: len(seen) >= 2):
+            seen.append(chunk)
+        assert len(seen) == 2 and "".join(backend.stream("b", 2)) == "".join(server.complete("b", 2))
+    finally:
+        server.stop()
+
+def test_generation_threads_follow_the_backend(monkeypatch):
+    monkeypatch.delenv(ai_backends.URL_ENV, raising=False)
+    monkeypatch.setenv(ai_backends.WORKERS_ENV, "0")
+    assert ai_backends.concurrency() == 1
+    monkeypatch.setenv(ai_backends.WORKERS_ENV, "3")
+    assert ai_backends.concurrency() == 3
+    monkeypatch.setenv(ai_backends.URL_ENV, "http://inference:8000/v1")
+    assert ai_backends.concurrency() == ai_backends.HTTP_CONNECTIONS
+
+def test_prefixes_are_encoded_once_and_copied_out():
+    encoded = []
+    cache = PrefixCache(lambda prefix: encoded.append(prefix) or [prefix], size=2)
+    states = [cache.get("persona A") for _ in range(40)]
+    assert cache.encodings == 1 and states[0] == ["persona A"] and states[0] is not states[1]
+    states[0].append("generated")
+    cache.get("persona B")
+    cache.get("persona A")
+    cache.get("persona C")
+    assert cache.get("persona A") == ["persona A"] and cache.encodings == 3
+    cache.get("persona B")
+    assert encoded == ["persona A", "persona B", "persona C", "persona B"]
+
+def test_int8_model_keeps_its_predictions():
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    from ai_backends import quantize_int8
+    torch.manual_seed(0)
+    model = transformers.GPT2LMHeadModel(transformers.GPT2Config(n_layer=2, n_embd=64, n_head=4, vocab_size=128, n_positions=32)).eval()
+    ids = torch.randint(0, 128, (1, 12))
+    with torch.no_grad():
+        expected = model(ids).logits
+        quantized = quantize_int8(model)
+        actual = quantized(ids).logits
+    assert not any(type(module).__name__ == "Conv1D" for module in quantized.modules())
+    assert torch.allclose(actual, expected, atol=0.1) and (actual.argmax(-1) == expected.argmax(-1)).float().mean() > 0.9
+
+def test_cached_prefixes_generate_what_the_full_prompt_would(monkeypatch):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    tokenizers = pytest.importorskip("tokenizers")
+    from ai_backends import TransformersBackend
+    # A word-level vocabulary, so the prefix and prompt tokenize apart exactly as they do together.
+    words = ["<eos>", "<unk>"] + [f"w{i}" for i in range(126)]
+    vocabulary = tokenizers.Tokenizer(tokenizers.models.WordLevel({word: i for i, word in enumerate(words)}, unk_token="<unk>"))
+    vocabulary.pre_tokenizer = tokenizers.pre_tokenizers.WhitespaceSplit()
+    tokenizer = transformers.PreTrainedTokenizerFast(tokenizer_object=vocabulary, eos_token="<eos>", unk_token="<unk>")
+    torch.manual_seed(0)
+    # Wide, untied weights, so the continuation depends on the whole context rather than echoing the last word.
+    config = transformers.GPT2Config(n_layer=2, n_embd=64, n_head=4, vocab_size=128, n_positions=64, initializer_range=0.5,
+                                     tie_word_embeddings=False, bos_token_id=0, eos_token_id=0)
+    model = transformers.GPT2LMHeadModel(config).eval()
+    generate = model.generate
+    monkeypatch.setattr(model, "generate", lambda **kwargs: generate(**{**kwargs, "do_sample": False}))
+    backend = TransformersBackend(SimpleNamespace(model=model, tokenizer=tokenizer))
+    prefix = "w1 w2 w3 w4 w5 w6 w7 w8"
+    prompts = ["w9 w10", "w11 w12 w13", "w14"]
+    cached = ["".join(backend.stream(prompt, 12, prefix=prefix)) for prompt in prompts]
+    assert backend.prefixes.encodings == 1
+    assert cached == ["".join(backend.stream(f"{prefix} {prompt}", 12)) for prompt in prompts]
+    assert cached != ["".join(backend.stream(prompt, 12)) for prompt in prompts]
@@ -0,0 +1,92 @@
+import threading
+
+import ai_generation
+from ai_generation import GenerationBatch, GenerationJob, GenerationQueue
+
+def test_jobs_run_in_order_and_progress_is_throttled(monkeypatch):
+    monkeypatch.setattr(ai_generation, "UPDATE_INTERVAL", 3600)
+    queue = GenerationQueue(lambda job: iter(job.prompt.split()))
+    progress, finished = [], []
+    first = queue.submit(GenerationJob("a", "bio", "one two three", on_progress=progress.append, on_done=finished.append))
+    second = queue.submit(GenerationJob("b", "bio", "four", on_done=finished.append))
+    assert second.wait(5) and first.done
+    assert first.text == "onetwothree" and second.text == "four"
+    assert finished == [first, second] and progress == [] and queue.active == []
+
+def test_cancel_stops_a_running_job_and_skips_a_waiting_one():
+    started, release = threading.Event(), threading.Event()
+    def run(job):
+        started.set()
+        yield "first"
+        release.wait(5)
+        yield "second"
+    queue = GenerationQueue(run)
+    running = queue.submit(GenerationJob("a", "bio", ""))
+    waiting = queue.submit(GenerationJob("b", "bio", ""))
+    assert started.wait(5) and queue.find("a", "bio") is running and queue.find("a", "name") is None
+    waiting.cancel()
+    running.cancel()
+    release.set()
+    assert waiting.wait(5) and running.done
+    assert running.text == "first" and waiting.text == ""
+
+def test_errors_are_reported_on_the_job():
+    def run(job):
+        yield "partial"
+        raise RuntimeError("out of memory")
+    job = GenerationQueue(run).submit(GenerationJob("a", "bio", ""))
+    assert job.wait(5) and job.error == "RuntimeError: out of memory" and job.text == "partial"
+
+def test_batch_size_fits_free_memory():
+    assert ai_generation.batch_size(100, 1000, free_bytes=10**9) == ai_generation.MAX_BATCH
+    assert ai_generation.batch_size(100, 1000, free_bytes=1_000_000) == 5
+    assert ai_generation.batch_size(100, 1000, free_bytes=0) == 1
+
+def test_batches_report_each_item():
+    def run_batch(batch):
+        index = batch.finished
+        batch.texts[index] = batch.prompts[index].upper()
+        batch.on_item(batch, index)
+        return batch.finished == len(batch.prompts)
+    queue = GenerationQueue(lambda job: iter(()), run_batch)
+    seen = []
+    batch = GenerationBatch([("a", "bio"), ("b", "bio")], ["x", "y"], [42, 42], on_item=lambda batch, index: seen.append((index, batch.finished)))
+    assert queue.submit(batch).wait(5)
+    assert batch.texts == ["X", "Y"] and seen == [(0, 1), (1, 2)] and queue.find("a", "bio") is None
+
+def test_interactive_jobs_overtake_a_running_batch():
+    order, late = [], []
+    def run_batch(batch):
+        order.append(f"batch {batch.finished}")
+        if batch.finished == 0:
+            # A STARS click while the batch is running.
+            late.append(queue.submit(GenerationJob("d", "bio", "interactive")))
+        batch.texts[batch.finished] = ""
+        return batch.finished == len(batch.prompts)
+    def run(job):
+        order.append(job.prompt)
+        yield ""
+    queue = GenerationQueue(run, run_batch)
+    prefetch = queue.submit(GenerationJob("c", "bio", "prefetch", prefetch=True))
+    batch = queue.submit(GenerationBatch([("b", "bio")] * 3, ["x"] * 3, [42] * 3))
+    assert batch.wait(5) and prefetch.wait(5) and late[0].done
+    assert order[order.index("batch 0"):] == ["batch 0", "interactive", "batch 1", "batch 2", "prefetch"]
+
+def test_listeners_hear_about_queued_and_finished_jobs():
+    release = threading.Event()
+    def run(job):
+        release.wait(5)
+        yield "done"
+    queue = GenerationQueue(run)
+    counts, finished = [], threading.Event()
+    def listener():
+        counts.append(queue.waiting())
+        if len(counts) == 4:
+            finished.set()
+    queue.add_listener(listener)
+    first = queue.submit(GenerationJob("a", "bio", ""))
+    prefetch = queue.submit(GenerationJob("a", "name", "", prefetch=True))
+    assert counts == [1, 1]
+    release.set()
+    assert first.wait(5) and prefetch.wait(5) and finished.wait(5)
+    assert counts == [1, 1, 0, 0]
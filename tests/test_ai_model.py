@@ -0,0 +1,55 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from ai_backends import Backend
+from ai_model import FAILED, READY, AIModel
+
+class Echo(Backend):
+    def __init__(self, suffix):
+        self.suffix = suffix
+
+    def stream(self, prompt, max_new_tokens, should_stop=lambda: False, seed=None, prefix=""):
+        yield self.suffix
+
+def test_stream_waits_for_the_model_to_load():
+    release = threading.Event()
+    def loader(name, seed):
+        release.wait(5)
+        return Echo(f" from {name}")
+    model = AIModel(loader=loader)
+    statuses, results = [], []
+    model.add_status_listener(statuses.append)
+    worker = threading.Thread(target=lambda: results.extend(model.stream("text", 10)))
+    worker.start()
+    worker.join(0.05)
+    assert results == [] and model.status == "loading"
+    release.set()
+    worker.join(5)
+    assert results == [" from gpt2"] and model.status == READY and statuses[-1] == READY
+
+def test_failed_load_reports_and_can_retry():
+    attempts = []
+    def loader(name, seed):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise ImportError("No module named 'transformers'")
+        return Echo("x")
+    model = AIModel(loader=loader)
+    with pytest.raises(RuntimeError, match="transformers"):
+        model.wait(5)
+    assert model.status == FAILED and "unavailable" in model.describe()
+    assert list(model.stream("a", 10)) == ["x"] and model.status == READY
+
+def test_importing_control_does_not_import_transformers():
+    # In a fresh interpreter: other tests may already have loaded transformers into this one.
+    code = "import sys, my_control; sys.exit('transformers' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).resolve().parent.parent).returncode == 0
+
+def test_status_line_counts_queued_generations():
+    model = AIModel(loader=lambda name, seed: Echo(""))
+    assert model.describe() == "AI model not loaded"
+    assert model.describe(queued=2) == "AI model not loaded - 2 queued"
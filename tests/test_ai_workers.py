@@ -0,0 +1,71 @@
+import os
+import time
+
+import pytest
+
+from ai_backends import Backend
+from ai_workers import ProcessBackend
+
+class Words(Backend):
+    """Runs in the worker: streams the prompt back word by word, or misbehaves on request."""
+
+    def __init__(self):
+        self.ballast = []
+
+    def stream(self, prompt, max_new_tokens, should_stop=lambda: False, seed=None, prefix=""):
+        if prompt == "crash":
+            os._exit(3)
+        if prompt.startswith("grow"):
+            self.ballast.append(b"x" * (64 << 20))
+            if prompt == "grow and hang":
+                time.sleep(5)
+        for word in (prefix + prompt).split()[:max_new_tokens]:
+            if should_stop():
+                return
+            time.sleep(0.01 if prompt.startswith("slow") else 0)
+            yield word + " "
+
+    def bytes_per_token(self):
+        return 123
+
+def load_words(model_name, seed):
+    return Words()
+
+def load_nothing(model_name, seed):
+    raise OSError(f"no such model {model_name}")
+
+@pytest.fixture
+def backend():
+    backend = ProcessBackend("test", 42, workers=1, memory_mb=None, loader=load_words)
+    yield backend
+    backend.close()
+
+def test_requests_are_served_by_a_worker_process(backend):
+    assert "".join(backend.stream("one two three", 2, prefix="zero ")) == "zero one "
+    assert backend.generate_batch(["a b", "c"], 5) == ["a b ", "c "]
+    assert backend.bytes_per_token() == 123
+
+def test_a_stopped_stream_leaves_the_worker_usable(backend):
+    chunks = backend.stream("slow " + "word " * 200, 200, should_stop=lambda: True)
+    assert next(chunks) == "slow "
+    chunks.close()
+    assert "".join(backend.stream("still here", 5)) == "still here "
+    assert backend.restarts == 0
+
+def test_a_crashed_worker_fails_its_request_and_is_replaced(backend):
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        "".join(backend.stream("crash", 5))
+    assert backend.restarts == 1
+    assert "".join(backend.stream("back again", 5)) == "back again "
+
+def test_a_worker_over_its_memory_cap_is_replaced(backend):
+    backend.memory_mb = backend._workers[0].resident_mb() + 32
+    assert "".join(backend.stream("grow", 5)) == "grow "  # Finishes, then the worker is replaced.
+    with pytest.raises(RuntimeError, match="memory cap"):
+        "".join(backend.stream("grow and hang", 5))
+    assert backend.restarts == 2
+    assert "".join(backend.stream("back again", 5)) == "back again "
+
+def test_a_model_that_does_not_load_fails_to_start():
+    with pytest.raises(RuntimeError, match="OSError: no such model missing"):
+        ProcessBackend("missing", 42, loader=load_nothing)
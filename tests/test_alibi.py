@@ -0,0 +1,61 @@
+import random
+
+from alibi import WhereaboutsIndex
+from routing import TravelTable
+from schemas import Location, Whereabout, WorldData
+
+def make_travel():
+    locations = [Location(id=i, name=i, description="") for i in ("A", "B", "C", "D")]
+    locations[0].travelRoutes.append({"to": "B", "minutes": 10})
+    locations[1].travelRoutes.append({"to": "C", "minutes": 10})
+    table = TravelTable()
+    table.reset(WorldData(locations=locations))
+    return table
+
+def stay(character, location, start, end, **kwargs):
+    return Whereabout(id=f"{character}-{start}", characterId=character, locationId=location, start=start, end=end, **kwargs)
+
+def test_opportunity_accounts_for_travel_between_stays():
+    stays = [stay("x", "A", 0, 60), stay("x", "C", 100, 200), stay("x", "C", 60, 100, isLie=True)]
+    index = WhereaboutsIndex(stays, make_travel())
+    assert index.opportunity("B", (70, 80), ["x", "nobody"]) == {"x": True, "nobody": True}
+    assert index.opportunity("C", (70, 80), ["x"]) == {"x": True}
+    assert index.opportunity("C", (65, 75), ["x"]) == {"x": False}
+    assert index.opportunity("D", (0, 500), ["x"]) == {"x": False}  # No route to D at all.
+    assert index.opportunity("C", (150, 160), ["x"]) == {"x": True}
+
+def test_an_enclosed_stay_opens_no_gap():
+    # The short stay at A ends at 60, but x is still at A until 200.
+    enclosed = [stay("x", "A", 0, 200), stay("x", "A", 50, 60)]
+    index = WhereaboutsIndex(enclosed, make_travel())
+    assert index.opportunity("B", (100, 110), ["x"]) == {"x": False}
+    assert index.opportunity("B", (205, 215), ["x"]) == {"x": True}
+    index = WhereaboutsIndex(enclosed + [stay("x", "C", 300, 400)], make_travel())
+    assert index.opportunity("B", (100, 110), ["x"]) == {"x": False}
+    assert index.opportunity("B", (250, 260), ["x"]) == {"x": True}
+
+def test_contradictions_and_intended_lies():
+    stays = [
+        stay("x", "A", 0, 60), stay("x", "C", 65, 90),  # 20 minutes of travel in 5.
+        stay("y", "A", 0, 30), stay("y", "B", 20, 40, isLie=True),  # Overlap, but a known lie.
+        stay("z", "C", 0, 30, witnesses=["x"]),  # x was at A then.
+    ]
+    conflicts = WhereaboutsIndex(stays, make_travel()).contradictions()
+    found = sorted((c.kind, c.first.characterId, c.intended) for c in conflicts)
+    assert found == [("overlap", "y", True), ("travel", "x", False), ("witness", "z", False)]
+    travel = next(c for c in conflicts if c.kind == "travel")
+    assert travel.describe({"x": "Xavier"}) == "'Xavier' cannot get from 'A' to 'C' in 5 minutes; the trip takes 20."
+
+def test_stays_between_matches_brute_force():
+    rng = random.Random(3)
+    stays = []
+    for character in range(20):
+        for _ in range(30):
+            start = rng.randint(0, 1000)
+            stays.append(stay(f"c{character}", rng.choice("ABCD"), start, start + rng.randint(0, 120)))
+    index = WhereaboutsIndex(stays, make_travel())
+    for _ in range(200):
+        character, t0 = f"c{rng.randrange(20)}", rng.randint(0, 1100)
+        t1 = t0 + rng.randint(0, 100)
+        expected = {id(s) for s in stays if s.characterId == character and s.start <= t1 and s.end >= t0}
+        assert {id(s) for s in index.stays_between(character, t0, t1)} == expected
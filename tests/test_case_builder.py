@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import flet as ft
+
+
+def find(control, predicate):
+    """The first control under `control`, itself included, that satisfies `predicate`."""
+    if predicate(control):
+        return control
+    children = list(getattr(control, "controls", None) or []) + list(getattr(control, "tabs", None) or [])
+    children += [child for child in (getattr(control, "content", None),) if isinstance(child, ft.Control)]
+    for child in children:
+        found = find(child, predicate)
+        if found is not None:
+            return found
+    return None
+
+def find_dropdown(control, label):
+    """The first Dropdown labelled `label` anywhere under `control`."""
+    return find(control, lambda child: isinstance(child, ft.Dropdown) and child.label == label)
+
+def test_pickers_list_assets_created_after_the_view_was_built(control):
+    control.show_view(1)
+    control.show_view(0)
+    control.create_new_character()
+    control.create_new_location()
+    control.show_view(1)
+    view = control.views[1]
+    character, location = control.world_data.characters[-1], control.world_data.locations[-1]
+    assert character.id in [option.key for option in find_dropdown(view, "Add Suspect").options]
+    assert location.id in [option.key for option in find_dropdown(view, "Add Location").options]
+    assert character.id in [option.key for option in find_dropdown(view, "Victim").options]
+
+def test_ticking_is_clue_lists_the_new_clue(control):
+    control.create_new_character()
+    control.add_case_suspect(control.world_data.characters[-1].id)
+    suspect = control.case_data.keySuspects[-1]
+    control.add_interview_question(suspect)
+    question = suspect.interview[-1]
+    control.show_view(1)
+    view = control.views[1]
+    control.toggle_interview_question_is_clue(question, True)
+    clue = next(clue for clue in control.case_data.clues if clue.source == question.questionId)
+    assert find(view, lambda child: isinstance(child, ft.ListTile) and child.data is clue) is not None
+    control.toggle_interview_question_is_clue(question, False)
+    assert find(view, lambda child: isinstance(child, ft.ListTile) and child.data is clue) is None
+
+def test_interview_pickers_are_built_lazily_and_kept(control):
+    control.create_new_character()
+    control.create_new_clue()
+    control.add_case_suspect(control.world_data.characters[-1].id)
+    suspect = control.case_data.keySuspects[-1]
+    control.add_interview_question(suspect)
+    control.select_asset(None, update=False)
+    control.show_view(1)
+    view = control.views[1]
+    is_debunking = lambda child: isinstance(child, ft.Dropdown) and child.label == "Debunking Clue"
+    # Collapsed suspects hold no pickers until they are expanded.
+    tile = find(view, lambda child: isinstance(child, ft.ExpansionTile) and child.key == suspect.characterId)
+    assert find(tile, is_debunking) is None
+    tile.on_change(SimpleNamespace(control=tile, data="true"))
+    picker = find(tile, is_debunking)
+    assert picker is not None
+    # Adding a question builds its row and keeps the others.
+    control.add_interview_question(suspect)
+    tile = find(view, lambda child: isinstance(child, ft.ExpansionTile) and child.key == suspect.characterId)
+    pickers = [row.content.controls[-1].controls[0] for row in tile.controls[:-1]]
+    assert len(pickers) == 2 and pickers[0] is picker
+    # Renaming a clue patches its option in place.
+    clue = control.case_data.clues[-1]
+    options = list(picker.options)
+    control.update_asset(clue, "clueSummary", "Torn glove")
+    assert picker.options == options and picker.options[-1].text == "Torn glove"
@@ -0,0 +1,79 @@
+import random
+
+from event_chain import ChainSolver, event_names
+from schemas import CaseData, CaseMeta, ChainEvent, ChainLink
+
+def case(events, links, window=(None, None)):
+    meta = CaseMeta(victim="", culprit="", crimeScene="", murderWeapon="", coreMysterySolutionDetails="", crimeWindowStart=window[0], crimeWindowEnd=window[1])
+    return CaseData(caseMeta=meta, eventChain=events, chainLinks=links)
+
+def solved(case_data):
+    solver = ChainSolver()
+    solver.reset(case_data)
+    return solver
+
+def test_schedule_and_conflicting_pin():
+    events = [
+        ChainEvent("argue", "Argument", minDuration=30),
+        ChainEvent("murder", "Murder", minDuration=5, isCrime=True),
+        ChainEvent("escape", "Escape", start=500),
+    ]
+    links = [ChainLink("l1", "argue", "murder", minGap=10), ChainLink("l2", "murder", "escape")]
+    data = case(events, links, window=(600, 660))
+    solver = solved(data)
+    assert solver.earliest("argue") == (0.0, 30.0)
+    assert solver.earliest("murder") == (600.0, 605.0)
+    [conflict] = solver.current_conflicts()
+    assert set(conflict.events) == {"murder", "escape"}
+    assert "'Escape' is pinned at D1 08:20" in conflict.describe(event_names(data))
+    earliest, latest, reasons, _ = solver.window("escape")
+    assert (earliest, latest) == (605.0, float("inf"))
+    assert "the crime 'Murder' starts after D1 10:00" in reasons
+
+    events[2].start = 700
+    solver.on_asset_changed(events[2], "start")
+    assert solver.current_conflicts() == [] and solver.earliest("escape") == (700.0, 700.0)
+
+def test_new_rules_are_folded_in_without_a_full_solve():
+    events = [ChainEvent(f"e{i}", f"Step {i}", minDuration=10) for i in range(4)]
+    data = case(events, [ChainLink("l0", "e0", "e1"), ChainLink("l1", "e1", "e2")])
+    solver = solved(data)
+    assert solver.earliest("e2") == (20.0, 30.0) and solver.full_solves == 1
+    data.chainLinks.append(ChainLink("l2", "e2", "e3", minGap=5))
+    solver.on_asset_changed(data.chainLinks[-1], None)
+    events[0].minDuration = 40
+    solver.on_asset_changed(events[0], "minDuration")
+    assert solver.earliest("e3") == (65.0, 75.0) and solver.full_solves == 1
+    data.chainLinks.append(ChainLink("l3", "e3", "e0"))
+    solver.on_asset_changed(data.chainLinks[-1], None)
+    [conflict] = solver.current_conflicts()
+    assert conflict.constraint.key == ("minGap", "l3") and solver.full_solves == 1
+    del data.chainLinks[-1]
+    solver.on_asset_changed(ChainLink("l3", "e3", "e0"), None)
+    assert solver.current_conflicts() == []
+
+def test_incremental_edits_match_a_fresh_solve():
+    rng = random.Random(3)
+    events = [ChainEvent(f"e{i}", f"Step {i}", minDuration=rng.randint(0, 20)) for i in range(40)]
+    links = []
+    data = case(events, links, window=(100, 400))
+    events[7].isCrime = True
+    solver = solved(data)
+    for step in range(200):
+        roll = rng.random()
+        if roll < 0.5:
+            a, b = rng.sample(range(len(events)), 2)
+            links.append(ChainLink(f"l{step}", events[a].id, events[b].id, minGap=rng.randint(0, 30)))
+            solver.on_asset_changed(links[-1], None)
+        elif roll < 0.8:
+            event = rng.choice(events)
+            event.start = rng.choice([None, rng.randint(0, 600)])
+            solver.on_asset_changed(event, "start")
+        elif links:
+            link = links.pop(rng.randrange(len(links)))
+            solver.on_asset_changed(link, None)
+        if step % 20 == 19:
+            fresh = solved(data)
+            if not fresh.current_conflicts() and not solver.current_conflicts():
+                assert solver.schedule() == fresh.schedule()
+            assert bool(solver.current_conflicts()) == bool(fresh.current_conflicts())
@@ -0,0 +1,48 @@
+import numpy as np
+
+from faction_sim import FactionSimulation, Scenario, build_faction_model, collapse_scenarios
+from schemas import District, Faction, Location, WorldData
+
+def make_world():
+    districts = [District(id=f"d{i}", name=f"d{i}", description="") for i in range(4)]
+    for a, b in [(0, 1), (1, 2), (2, 3)]:
+        districts[a].travelRoutes.append({"to": f"d{b}", "minutes": 10})
+    districts[0].dominantFaction = "guild"
+    districts[3].dominantFaction = "watch"
+    factions = [
+        Faction(id="guild", name="Guild", description="", influence="City-wide", enemyFactions=["watch"], allyFactions=["church"]),
+        Faction(id="watch", name="Watch", description="", influence="District-wide", headquarters="hq"),
+        Faction(id="church", name="Church", description=""),
+    ]
+    locations = [Location(id="hq", name="HQ", description="", district="d2"), Location(id="chapel", name="Chapel", description="", district="d1", owningFaction="church")]
+    return WorldData(districts=districts, factions=factions, locations=locations)
+
+def test_model_reads_relations_adjacency_and_footholds():
+    model = build_faction_model(make_world())
+    assert model.relations[0, 1] == model.relations[1, 0] == -1
+    assert model.relations[0, 2] == model.relations[2, 0] == 1
+    assert np.allclose(model.adjacency.sum(axis=1), 1)
+    assert model.adjacency[0, 1] == 1 and model.adjacency[0, 2] == 0
+    assert model.initial[:, 0].argmax() == 0 and model.initial[:, 3].argmax() == 1
+    assert np.all(model.initial.sum(axis=0) <= 1)
+
+def test_collapsed_faction_stays_gone_and_shares_stay_bounded():
+    model = build_faction_model(make_world())
+    simulation = FactionSimulation(model, collapse_scenarios(model))
+    updates = []
+    simulation.run(100, every=25, callback=lambda step, state: updates.append(step))
+    assert updates == [25, 50, 75, 100]
+    assert np.all(simulation.state[1, 0] == 0)  # The guild collapses in scenario 1.
+    assert np.all(simulation.state >= 0) and np.all(simulation.state.sum(axis=1) <= 1 + 1e-9)
+    assert simulation.dominant()[1, 0] != 0
+    assert simulation.changes_against_baseline()[0] == 0
+
+def test_batched_scenarios_match_separate_runs():
+    model = build_faction_model(make_world())
+    scenarios = collapse_scenarios(model) + [Scenario("Strong watch", strength_factors={"watch": 2.0})]
+    batch = FactionSimulation(model, scenarios)
+    batch.step(50)
+    for s, scenario in enumerate(scenarios):
+        single = FactionSimulation(model, [scenario])
+        single.step(50)
+        assert np.allclose(batch.state[s], single.state[0])
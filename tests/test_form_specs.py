@@ -0,0 +1,37 @@
+import dataclasses
+
+import pytest
+from form_specs import FORM_SPECS, FieldSpec, field_choices, from_display, to_display
+import schemas
+
+def test_specs_reference_real_fields():
+    for asset_type, sections in FORM_SPECS.items():
+        names = {f.name for f in dataclasses.fields(asset_type)}
+        for section in sections:
+            for spec in section.fields:
+                assert spec.attr in names, f"{asset_type.__name__}.{spec.attr}"
+
+def test_choice_fields_have_choices():
+    for asset_type, sections in FORM_SPECS.items():
+        for section in sections:
+            for spec in section.fields:
+                if spec.kind == "choice":
+                    assert field_choices(asset_type, spec.attr)
+
+def test_field_choices_unwraps_optional_literal():
+    assert field_choices(schemas.District, "populationDensity") == ("Sparse", "Moderate", "Dense", "Crowded")
+    assert field_choices(schemas.Character, "fullName") == ()
+
+def test_list_round_trip():
+    spec = FieldSpec("allies", "Allies", "list")
+    assert to_display(spec, ["a", "b"]) == "a, b"
+    assert from_display(spec, " a, ,b ") == ["a", "b"]
+    assert from_display(spec, "") == []
+
+def test_int_parsing():
+    spec = FieldSpec("age", "Age", "int")
+    assert to_display(spec, None) == ""
+    assert from_display(spec, " 42 ") == 42
+    assert from_display(spec, "") is None
+    with pytest.raises(ValueError):
+        from_display(spec, "forty")
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import ai_backends
+from ai_backends import Backend
+from ai_generation import GenerationJob
+from ai_model import AIModel
+from generation_cache import GenerationCache, cache_key
+
+class Counting(Backend):
+    def __init__(self):
+        self.calls = []
+
+    def stream(self, prompt, max_new_tokens, should_stop=lambda: False, seed=None, prefix=""):
+        self.calls.append(("stream", seed))
+        yield "single"
+
+    def generate_batch(self, prompts, max_new_tokens, should_stop=lambda: False, seed=None):
+        self.calls.append(("batch", seed))
+        return ["batched"] * len(prompts)
+
+def test_keys_cover_every_setting():
+    base = cache_key("gpt2", "Generate a biography", {"max_new_tokens": 80, "do_sample": True}, 42)
+    assert base == cache_key("gpt2", "Generate a biography", {"do_sample": True, "max_new_tokens": 80}, 42)
+    assert base != cache_key("gpt2", "Generate a biography", {"max_new_tokens": 80, "do_sample": True}, 43)
+    assert base != cache_key("distilgpt2", "Generate a biography", {"max_new_tokens": 80, "do_sample": True}, 42)
+
+def test_entries_persist_and_count_hits(tmp_path):
+    cache = GenerationCache(tmp_path / "generations.sqlite")
+    assert cache.get("a") is None
+    cache.put("a", "A grim tale.")
+    assert cache.get("a") == "A grim tale." and (cache.hits, cache.misses) == (1, 1)
+    reopened = GenerationCache(tmp_path / "generations.sqlite")
+    assert "a" in reopened and reopened.get("a") == "A grim tale." and reopened.size() == 12
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = GenerationCache(tmp_path / "generations.sqlite", max_bytes=30)
+    for key in "abc":
+        cache.put(key, key * 10)
+    cache.get("a")
+    cache.put("d", "d" * 10)
+    assert [key in cache for key in "abcd"] == [True, False, True, True] and cache.size() == 30
+
+def test_batched_texts_are_not_served_to_single_generations(control):
+    backend = Counting()
+    control.ai_model = AIModel(loader=lambda name, seed: backend)
+    control.create_new_character()
+    character = control.world_data.characters[-1]
+    batch = control.generate_batch_with_ai([character], ["biography"])
+    assert batch.wait(5) and batch.texts == ["batched"]
+    prefix, prompt = control._ai_prompt(character, "biography")
+    assert control._cache_key(prefix + prompt, batch.max_new_tokens, batch.seeds[0], batched=True) in control.generation_cache
+    # The same prompt and seed, generated on its own, runs the model rather than reusing the batched text.
+    job = GenerationJob(character, "biography", prompt, seed=batch.seeds[0], prefix=prefix)
+    assert "".join(control._generate(job)) == "single"
+    assert backend.calls == [("batch", batch.seeds[0]), ("stream", batch.seeds[0])]
+
+def test_texts_are_kept_apart_by_backend(control, monkeypatch):
+    monkeypatch.delenv(ai_backends.URL_ENV, raising=False)
+    monkeypatch.delenv(ai_backends.PRECISION_ENV, raising=False)
+    fp32 = control._cache_key("Generate a biography", 80, 42)
+    monkeypatch.setenv(ai_backends.PRECISION_ENV, ai_backends.INT8)
+    int8 = control._cache_key("Generate a biography", 80, 42)
+    monkeypatch.setenv(ai_backends.URL_ENV, "http://inference:8000/v1")
+    remote = control._cache_key("Generate a biography", 80, 42)
+    monkeypatch.setenv(ai_backends.URL_ENV, "http://other:8000/v1")
+    assert len({fp32, int8, remote, control._cache_key("Generate a biography", 80, 42)}) == 4
+
+class StopsWhenAsked(Backend):
+    """Ends the stream normally on should_stop, as the process and HTTP backends do."""
+    def __init__(self):
+        self.started = threading.Event()
+
+    def stream(self, prompt, max_new_tokens, should_stop=lambda: False, seed=None, prefix=""):
+        for index in range(max_new_tokens):
+            if should_stop():
+                return
+            yield f" w{index}"
+            self.started.set()
+            time.sleep(0.01)
+
+def test_cancelled_generations_are_not_cached(control):
+    backend = StopsWhenAsked()
+    control.ai_model = AIModel(loader=lambda name, seed: backend)
+    control.create_new_character()
+    character = control.world_data.characters[-1]
+    prefix, prompt = control._ai_prompt(character, "biography")
+    job = control.generation_queue.submit(GenerationJob(character, "biography", prompt, max_new_tokens=1000, seed=42, prefix=prefix))
+    assert backend.started.wait(5)
+    job.cancel()
+    assert job.wait(5) and job.text
+    assert control._generation_key(job) not in control.generation_cache
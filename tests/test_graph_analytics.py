@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+
+import graph_analytics
+from graph_analytics import GraphAnalytics, betweenness, undirected_arcs
+from schemas import Faction, WorldData
+
+def analytics_for(world):
+    analytics = GraphAnalytics()
+    analytics.reset(world)
+    return analytics
+
+def test_betweenness_of_path_and_star():
+    path = np.array([[0, 1], [1, 2], [2, 3], [3, 4]])
+    assert betweenness(5, *undirected_arcs(5, path)).tolist() == [0, 3, 4, 3, 0]
+    star = np.array([[0, i] for i in range(1, 6)] + [[1, 0]])  # The duplicate edge counts once.
+    scores = betweenness(6, *undirected_arcs(6, star))
+    assert scores[0] == 10 and not scores[1:].any()
+
+def test_communities_and_prominent_hub(character):
+    left = [character(f"a{i}", allies=[f"a{j}" for j in range(5) if j != i]) for i in range(5)]
+    right = [character(f"b{i}", allies=[f"b{j}" for j in range(5) if j != i]) for i in range(5)]
+    hub = character("hub", allies=["a0", "b0"], enemies=["a1", "b1", "a2", "b2"])
+    world = WorldData(characters=left + right + [hub])
+    analytics = analytics_for(world)
+    groups = [set(group) for group in analytics.communities()]
+    assert {f"a{i}" for i in range(5)} <= groups[0] | groups[1]
+    assert not any({"a0", "b0"} <= group for group in groups)
+    assert max(analytics.betweenness().items(), key=lambda item: item[1])[0] == "hub"
+    top, z = analytics.top_outlier([c.id for c in world.characters])
+    assert top == "hub" and z >= 2
+
+def test_edits_recompute_only_touched_components(character):
+    rng = random.Random(4)
+    chars = [character(f"c{i}") for i in range(60)]
+    for i, char in enumerate(chars):
+        # Two separate halves.
+        half = range(0, 30) if i < 30 else range(30, 60)
+        char.allies = [f"c{rng.choice(half)}" for _ in range(2)]
+    world = WorldData(characters=chars, factions=[Faction(id="f", name="f", description="", members=["c40", "c41"])])
+    analytics = analytics_for(world)
+    analytics.betweenness()
+    analytics.pagerank()
+    chars[3].allies.append("c7")
+    analytics.on_asset_changed(chars[3], "allies")
+    chars[5].fullName = "Renamed"
+    analytics.on_asset_changed(chars[5], "fullName")
+    updated = analytics.betweenness()
+    assert analytics.recomputed_nodes <= 30
+    fresh = analytics_for(world)
+    assert np.allclose([updated[k] for k in sorted(updated)], [fresh.betweenness()[k] for k in sorted(updated)])
+    ranks = analytics.pagerank()
+    assert np.allclose([ranks[k] for k in sorted(ranks)], [fresh.pagerank()[k] for k in sorted(ranks)], atol=1e-8)
+
+def test_many_small_components_stay_exact_past_the_limit(character, monkeypatch):
+    monkeypatch.setattr(graph_analytics, "EXACT_LIMIT", 20)
+    monkeypatch.setattr(graph_analytics, "SAMPLE_SOURCES", 8)
+    stars = [c for i in range(30) for c in (character(f"s{i}", allies=[f"l{i}", f"r{i}"]), character(f"l{i}"), character(f"r{i}"))]
+    path = [character(f"p{i}", allies=[f"p{i + 1}"] if i < 24 else []) for i in range(25)]
+    scores = analytics_for(WorldData(characters=stars + path)).betweenness()
+    assert all(scores[f"s{i}"] == 1 and scores[f"l{i}"] == 0 for i in range(30))
+    # Only the 25-node path is over the limit and sampled, scaled to its own size.
+    assert 0 < scores["p12"] and scores["p0"] == 0
@@ -0,0 +1,63 @@
+import numpy as np
+
+from graph_layout import LayoutEngine, _repulsion, random_positions
+from graph_model import build_plot_graph, build_social_graph
+from schemas import CaseData, CaseLocation, CaseSuspect, Clue, Faction, Item, Location, Sleuth, WorldData
+
+def make_world(character):
+    characters = [character("c1", allies=["c2"], faction="f1"), character("c2", allies=["c1"], enemies=["c3", "missing"]), character("c3")]
+    sleuth = Sleuth(id="s1", name="Sam", city="", biography="", wealthClass="Middle Class", archetype="", personality="", alignment="True Neutral", relationships=["c1"], nemesis="c3")
+    return WorldData(characters=characters, factions=[Faction(id="f1", name="Guild", description="", members=["c1", "c2"])], sleuth=sleuth)
+
+def test_social_graph_dedupes_and_skips_dangling_edges(character):
+    graph = build_social_graph(make_world(character))
+    assert graph.node_ids == ["c1", "c2", "c3", "f1", "s1"]
+    assert sorted(graph.edge_keys()) == [
+        ("c1", "c2", "ally"), ("c1", "f1", "faction"), ("c1", "s1", "relationship"),
+        ("c2", "c3", "enemy"), ("c2", "f1", "faction"), ("c3", "s1", "nemesis"),
+    ]
+
+def test_barnes_hut_repulsion_matches_exact_sum():
+    pos = random_positions(400, seed=3)
+    approx = _repulsion(pos, np.arange(len(pos)), 1.0)
+    delta = pos[:, None, :] - pos[None, :, :]
+    dist2 = (delta ** 2).sum(axis=2)
+    np.fill_diagonal(dist2, np.inf)
+    exact = (delta / dist2[:, :, None]).sum(axis=1)
+    error = np.linalg.norm(approx - exact, axis=1) / np.linalg.norm(exact, axis=1)
+    assert np.median(error) < 0.02
+
+def test_incremental_layout_only_moves_nodes_near_the_change(character):
+    world = WorldData(characters=[character(f"c{i}", allies=[f"c{i + 1}"]) for i in range(40)])
+    engine = LayoutEngine()
+    engine.set_graph(build_social_graph(world), background=False)
+    _, before = engine.snapshot()
+    world.characters[0].allies.append("c20")
+    engine.set_graph(build_social_graph(world), background=False)
+    _, after = engine.snapshot()
+    moved = set(np.nonzero(np.abs(after - before).sum(axis=1) > 0)[0].tolist())
+    assert {0, 20} <= moved
+    assert moved <= {0, 1, 19, 20, 21}
+
+def test_plot_graph_links_clues_suspects_locations_and_items(character):
+    def clue(clue_id, **kwargs):
+        return Clue(clueId=clue_id, criticalClue=False, redHerring=False, isLie=False, source="", clueSummary=clue_id, knowledgeLevel="Both", **kwargs)
+    world = make_world(character)
+    world.locations = [Location(id="l1", name="Library", description="")]
+    world.items = [Item(id="i1", name="Knife", description="", possibleMeans=True, possibleMotive=False, possibleOpportunity=False, cluePotential="High", value="", condition="Used")]
+    case = CaseData(
+        keySuspects=[CaseSuspect(characterId="c1")],
+        caseLocations=[CaseLocation(locationId="l1", locationClues=["k1"])],
+        clues=[
+            clue("k1", associatedItem="i1", revealsUnlocks=[{"type": "location", "id": "l1"}]),
+            clue("k2", dependencies=["k1", "missing"], discoveryPath=["l1", "i1"], debunkingClue="k1"),
+        ],
+    )
+    graph = build_plot_graph(world, case)
+    assert graph.node_ids == ["Clue:k1", "Clue:k2", "CaseSuspect:c1", "Location:l1", "Item:i1"]
+    assert sorted(graph.edge_keys()) == sorted([
+        ("Clue:k1", "Clue:k2", "dependency"), ("Clue:k1", "Location:l1", "unlocks"),
+        ("Clue:k1", "Item:i1", "associated"), ("Clue:k1", "Clue:k2", "debunks"),
+        ("Location:l1", "Item:i1", "discovery"), ("Item:i1", "Clue:k2", "discovery"),
+        ("Location:l1", "Clue:k1", "found at"),
+    ])
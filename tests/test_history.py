@@ -0,0 +1,71 @@
+from history import History
+from references import ReferenceIndex
+from schemas import CaseData, Faction, WorldData
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def type_into(history, asset, attr, text):
+    for i in range(1, len(text) + 1):
+        old = getattr(asset, attr)
+        setattr(asset, attr, text[:i])
+        history.record_field(asset, attr, old, text[:i])
+
+def test_keystrokes_coalesce_until_pause(character):
+    clock = FakeClock()
+    history = History(clock=clock)
+    char = character("c1")
+    char.fullName = ""
+    type_into(history, char, "fullName", "Ada")
+    clock.now += 5
+    old = char.fullName
+    char.fullName = "Ada Vance"
+    history.record_field(char, "fullName", old, char.fullName)
+    history.undo()
+    assert char.fullName == "Ada"
+    history.undo()
+    assert char.fullName == ""
+    assert not history.can_undo
+    history.redo()
+    history.redo()
+    assert char.fullName == "Ada Vance"
+
+def test_new_edit_clears_redo(character):
+    history = History()
+    char = character("c1")
+    history.record_field(char, "honesty", 5, 7)
+    char.honesty = 7
+    history.undo()
+    history.record_field(char, "honesty", 5, 3)
+    assert not history.can_redo
+
+def test_grouped_cascade_undoes_as_one_step(character):
+    a, b, c, d = (character(i, allies=["c3"]) for i in ("c1", "c2", "c3", "c4"))
+    world = WorldData(characters=[a, b, c, d], factions=[Faction(id="f1", name="Guild", description="", members=["c1", "c3"])])
+    index = ReferenceIndex()
+    index.rebuild(world, CaseData())
+    history = History()
+    with history.group():
+        history.record_all(index.cascade_delete([a, c]))
+    assert [x.id for x in world.characters] == ["c2", "c4"]
+    history.undo()
+    assert world.characters == [a, b, c, d]
+    assert world.factions[0].members == ["c1", "c3"]
+    assert b.allies == ["c3"]
+    history.redo()
+    assert [x.id for x in world.characters] == ["c2", "c4"]
+
+def test_memory_cap_drops_oldest_steps(character):
+    history = History(max_bytes=2000, coalesce_seconds=0)
+    char = character("c1")
+    for i in range(100):
+        history.record_field(char, "biography", str(i), str(i + 1))
+        history.break_coalescing()
+    undone = 0
+    while history.can_undo:
+        history.undo()
+        undone += 1
+    assert 0 < undone < 100
@@ -0,0 +1,45 @@
+import numpy as np
+
+from id_intern import IdInterner, cycle_bound, reachable
+from schemas import CaseData, Clue, WorldData
+
+def clue(clue_id, dependencies=()):
+    return Clue(clueId=clue_id, criticalClue=False, redHerring=False, isLie=False, source="", clueSummary=clue_id, knowledgeLevel="Both", dependencies=list(dependencies))
+
+def interner_for(world, case=None):
+    interner = IdInterner()
+    interner.reset(world, case or CaseData())
+    return interner
+
+def test_numbers_stay_stable_across_edits(character):
+    world = WorldData(characters=[character("a"), character("b", allies=["a", "ghost"]), character("c", allies=["b"])])
+    interner = interner_for(world)
+    assert [interner.number("Character", i) for i in "abc"] == [0, 1, 2]
+    allies = interner.adjacency("Character", "allies")
+    assert allies.targets(1).tolist() == [0, -1] and allies.dangling().tolist() == [1]
+
+    removed = world.characters.pop(0)
+    interner.on_asset_changed(removed, None)
+    world.characters.append(character("ghost"))
+    interner.on_asset_changed(world.characters[-1], None)
+    world.characters[0].id = "c2"
+    interner.on_asset_changed(world.characters[0], "id")
+    table = interner.table("Character")
+    assert interner.number("Character", "c") == 2 and interner.number("Character", "a") == interner.number("Character", "b") == -1
+    assert table.ids[3:] == ["c2", "ghost"] and table.alive.tolist() == [False, False, True, True, True]
+    allies = interner.adjacency("Character", "allies")
+    assert allies.targets(3).tolist() == [-1, 4] and allies.targets(2).tolist() == [-1]
+
+def test_only_clues_leading_into_a_cycle_are_circular():
+    clues = [clue("root", ["left", "right"]), clue("left", ["base"]), clue("right", ["base"]), clue("base"),
+             clue("x", ["y"]), clue("y", ["z"]), clue("z", ["x"]), clue("above", ["x", "missing"])]
+    interner = interner_for(WorldData(), CaseData(clues=clues))
+    table = interner.table("Clue")
+    circular = cycle_bound(interner.adjacency("Clue", "dependencies"), table.alive)
+    assert sorted(table.ids[i] for i in np.flatnonzero(circular)) == ["above", "x", "y", "z"]
+
+def test_reachability_over_a_field(character):
+    world = WorldData(characters=[character("a", allies=["b"]), character("b", allies=["c"]), character("c"), character("d", allies=["a"])])
+    interner = interner_for(world)
+    seen = reachable(interner.adjacency("Character", "allies"), [interner.number("Character", "a")])
+    assert seen.tolist() == [True, True, True, False]
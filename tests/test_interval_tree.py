@@ -0,0 +1,27 @@
+import numpy as np
+
+from interval_tree import LEAF_SIZE, IntervalTree
+
+def brute_force(starts, ends, t0, t1):
+    return np.nonzero((starts <= t1) & (ends >= t0))[0].tolist()
+
+def test_overlap_queries_match_brute_force():
+    rng = np.random.default_rng(3)
+    for n in (0, 1, LEAF_SIZE, LEAF_SIZE + 1, 1000):
+        starts = rng.uniform(1900, 1960, n)
+        ends = starts + rng.exponential(0.5, n) * (rng.random(n) < 0.7)
+        tree = IntervalTree(starts, ends)
+        for _ in range(100):
+            t0 = rng.uniform(1890, 1970)
+            t1 = t0 + rng.exponential(2)
+            hits = tree.overlapping(t0, t1)
+            assert sorted(hits.tolist()) == brute_force(starts, ends, t0, t1)
+            assert np.all(np.diff(starts[hits]) >= 0)
+
+def test_long_interval_is_found_far_from_its_start():
+    starts = np.r_[0.0, np.arange(1, 500, dtype=float)]
+    ends = np.r_[1000.0, np.arange(1, 500, dtype=float) + 0.5]
+    tree = IntervalTree(starts, ends)
+    assert tree.stabbing(700).tolist() == [0]
+    assert tree.overlapping(499.6, 499.7).tolist() == [0]
+    assert tree.overlapping(3, 2).tolist() == []
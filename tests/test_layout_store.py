@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+
+from graph_layout import LayoutEngine
+from graph_model import build_social_graph
+from layout_store import FORMAT_VERSION, LayoutStore
+from schemas import WorldData
+
+def make_world(character, n=30):
+    characters = [character(f"c{i}", allies=[f"c{i + 1}"]) for i in range(n)]
+    return WorldData(characters=characters)
+
+def test_unchanged_graph_reopens_without_layout(character, tmp_path):
+    world = make_world(character)
+    first = LayoutEngine()
+    first.set_graph(build_social_graph(world), background=False)
+    first.pin("c3", (5.0, 5.0))
+    LayoutStore(tmp_path / "layouts.json").save("social", first)
+    _, saved = first.snapshot()
+
+    settled = []
+    second = LayoutEngine(on_settled=lambda graph, positions: settled.append(graph))
+    world.characters.reverse()  # Node order does not matter, only structure.
+    world.characters[0].fullName = "Renamed"
+    assert LayoutStore(tmp_path / "layouts.json").restore("social", second)
+    graph = build_social_graph(world)
+    second.set_graph(graph, background=False)
+    _, restored = second.snapshot()
+    assert settled == []
+    order = [graph.index[f"c{i}"] for i in range(30)]
+    assert np.allclose(restored[order], saved, atol=1e-3)
+    assert second.pinned.keys() == {"c3"}
+
+def test_changed_graph_only_moves_affected_nodes(character, tmp_path):
+    world = make_world(character)
+    first = LayoutEngine()
+    first.set_graph(build_social_graph(world), background=False)
+    LayoutStore(tmp_path / "layouts.json").save("social", first)
+    _, before = first.snapshot()
+
+    world.characters[0].allies.append("c20")
+    second = LayoutEngine()
+    LayoutStore(tmp_path / "layouts.json").restore("social", second)
+    second.set_graph(build_social_graph(world), background=False)
+    _, after = second.snapshot()
+    moved = {f"c{i}" for i in np.nonzero(np.linalg.norm(after - before, axis=1) > 1e-3)[0]}
+    assert moved and moved <= {"c0", "c1", "c19", "c20", "c21"}
+
+def test_missing_or_corrupt_file_is_ignored(tmp_path):
+    engine = LayoutEngine()
+    assert not LayoutStore(tmp_path / "layouts.json").restore("social", engine)
+    (tmp_path / "layouts.json").write_text("{not json")
+    assert not LayoutStore(tmp_path / "layouts.json").restore("social", engine)
+
+def test_malformed_entries_give_a_fresh_layout(tmp_path):
+    engine = LayoutEngine()
+    for layouts in ({"social": {"nodes": {"c1": [1.0, 2.0]}}}, {"social": {"nodes": {"c1": [1.0, "x", "sig"]}}},
+                    {"social": {"nodes": ["c1"]}}, {"social": [1, 2]}, ["social"]):
+        (tmp_path / "layouts.json").write_text(json.dumps({"version": FORMAT_VERSION, "layouts": layouts}))
+        assert not LayoutStore(tmp_path / "layouts.json").restore("social", engine)
@@ -0,0 +1,36 @@
+import numpy as np
+
+from lore_timeline import LoreTimeline, format_date, iso_date, parse_date
+from schemas import LoreEvent
+
+def event(event_id, start, end=None):
+    return LoreEvent(id=event_id, name=event_id, description="", start=start, end=end)
+
+def test_dates_cover_their_whole_period():
+    assert parse_date("1921") == 1921 and parse_date("1921", end=True) == 1922
+    assert parse_date("1921-04") == 1921.25
+    assert parse_date("1921-12-31", end=True) == 1922
+    assert parse_date("1921-13") is None and parse_date("soon") is None
+    t = parse_date("1921-03-14")
+    assert format_date(t, "day") == "14 Mar 1921" and iso_date(t, "month") == "1921-03"
+
+def test_range_queries_use_half_open_event_spans():
+    timeline = LoreTimeline([event("war", "1914", "1918"), event("treaty", "1919-06-28"), event("lost", "someday")])
+    assert [e.id for e in timeline.undated] == ["lost"]
+    assert timeline.span() == (1914.0, parse_date("1919-06-28", end=True))
+    assert [timeline.events[i].id for i in timeline.query(1919, 1920)] == ["treaty"]
+    assert [timeline.events[i].id for i in timeline.query(1918.5, 1919.5)] == ["war", "treaty"]
+
+def test_bucket_counts_match_queries_at_every_level():
+    rng = np.random.default_rng(5)
+    events = []
+    for i in range(400):
+        year, month = rng.integers(1880, 1935), rng.integers(1, 13)
+        end = str(year + rng.integers(0, 4)) if rng.random() < 0.3 else None
+        events.append(event(f"e{i}", f"{year}-{month:02d}", end))
+    timeline = LoreTimeline(events)
+    for level, t0, t1 in (("decade", 1850, 1950), ("year", 1899.5, 1930), ("month", 1910, 1912), ("day", 1921, 1921.2)):
+        edges, counts = timeline.buckets(level, t0, t1)
+        width = edges[1] - edges[0]
+        expected = [len(timeline.query(edge + 1e-9, edge + width - 1e-9)) for edge in edges]
+        assert counts.tolist() == expected, level
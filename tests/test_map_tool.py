@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+import flet.canvas as cv
+import numpy as np
+
+from map_tool import VIEW_HEIGHT, VIEW_WIDTH, MapToolView
+
+def route_points(view):
+    routes = [shape for shape in view.canvas.shapes if isinstance(shape, cv.Points)][1]
+    return [(point.x, point.y) for point in routes.points]
+
+def test_routes_crossing_the_view_are_drawn_and_follow_a_drag(control):
+    control.create_new_location()
+    control.create_new_location()
+    west, east = control.world_data.locations[-2:]
+    west.mapX, west.mapY, east.mapX, east.mapY = 0.0, 500.0, 10000.0, 500.0
+    west.travelRoutes = [{"to": east.id, "minutes": 40}]
+    view = MapToolView(control)
+    # Centre the view on the middle of the road, with both ends far off screen.
+    view.scale = 1.0
+    view.offset = np.array([VIEW_WIDTH / 2 - 5000.0, VIEW_HEIGHT / 2 - 500.0])
+    view._draw()
+    assert route_points(view) == [(VIEW_WIDTH / 2 - 5000.0, VIEW_HEIGHT / 2), (VIEW_WIDTH / 2 + 5000.0, VIEW_HEIGHT / 2)]
+    # Panned away from the road, it is culled.
+    view.offset = view.offset + (0, 2000.0)
+    view._draw()
+    assert route_points(view) == []
+    view.offset = view.offset - (0, 2000.0)
+    view.dragging = west.id
+    view._drag_position = np.array([0.0, 500.0])
+    view._on_pan_update(SimpleNamespace(delta_x=0, delta_y=100))
+    assert route_points(view)[0] == (VIEW_WIDTH / 2 - 5000.0, VIEW_HEIGHT / 2 + 100.0)
@@ -0,0 +1,48 @@
+from navigation import AssetIndex, CASE_VIEW, WORLD_VIEW
+from schemas import CaseData, CaseMeta, CaseSuspect, Clue, InterviewQuestion, ValidationResult, WorldData
+
+def make_index(character):
+    char = character("c1", "Ada Vance")
+    suspect = CaseSuspect(characterId="c1")
+    clue = Clue(clueId="k1", criticalClue=True, redHerring=False, isLie=False, source="", clueSummary="Torn glove", knowledgeLevel="Both")
+    meta = CaseMeta(victim="c1", culprit="", crimeScene="", murderWeapon="", coreMysterySolutionDetails="")
+    index = AssetIndex()
+    index.rebuild(WorldData(characters=[char]), CaseData(caseMeta=meta, keySuspects=[suspect], clues=[clue]))
+    return index, char, suspect, clue, meta
+
+def test_ids_are_namespaced_by_asset_type(character):
+    index, char, suspect, _, _ = make_index(character)
+    target = index.resolve(ValidationResult(message="", type="error", asset_id="c1", asset_type="Character"))
+    assert (target.view_index, target.tab_index, target.asset) == (WORLD_VIEW, 0, char)
+    target = index.resolve(ValidationResult(message="", type="error", asset_id="c1", asset_type="InterviewQuestion"))
+    assert (target.view_index, target.tab_index, target.asset) == (CASE_VIEW, 1, suspect)
+
+def test_case_meta_and_unknown_types(character):
+    index, _, _, _, meta = make_index(character)
+    assert index.resolve(ValidationResult(message="", type="error", asset_id="caseMeta", asset_type="CaseMeta")).asset is meta
+    assert index.resolve(ValidationResult(message="", type="warning", asset_type="CaseData")).asset is None
+    assert index.resolve(ValidationResult(message="", type="warning", asset_type="Nonsense")) is None
+
+def test_incremental_rename_and_remove(character):
+    index, _, _, clue, _ = make_index(character)
+    clue.clueId = "k2"
+    index.rename(clue, "k1")
+    assert index.get("Clue", "k1") is None
+    assert index.get("Clue", "k2") is clue
+    index.remove(clue)
+    assert index.get("Clue", "k2") is None
+
+def test_witness_question_issues_lead_to_their_case_location(control):
+    control.create_new_character()
+    control.create_new_location()
+    character, location = control.world_data.characters[-1], control.world_data.locations[-1]
+    # The witness is a suspect too, so the suspect namespace would resolve to the wrong asset.
+    control.add_case_suspect(character.id)
+    control.add_case_location(location.id)
+    case_location = control.case_data.caseLocations[-1]
+    control.add_case_witness(case_location, character.id)
+    case_location.witnesses[-1].interview.append(InterviewQuestion(questionId="q1", question="Where were you?", answerId="", answer="", isLie=False, isClue=False, debunkingClue="missing"))
+    errors, _ = control.validate_case()
+    result = next(error for error in errors if "Witness interview question" in error.message)
+    target = control.asset_index.resolve(result)
+    assert (target.view_index, target.tab_index, target.asset) == (CASE_VIEW, 3, case_location)
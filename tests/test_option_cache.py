@@ -0,0 +1,67 @@
+from option_cache import OptionListCache
+from schemas import Clue, WorldData, CaseData
+
+def make_cache(character):
+    world = WorldData(characters=[character("c1", "Ada Vance"), character("c2", "Bruno Vale")])
+    case = CaseData(clues=[Clue(clueId="k1", criticalClue=True, redHerring=False, isLie=False, source="", clueSummary="Torn glove", knowledgeLevel="Both")])
+    cache = OptionListCache(typeahead_threshold=2)
+    cache.rebuild(world, case)
+    return cache
+
+def test_rebuild_fills_every_type(character):
+    cache = make_cache(character)
+    assert cache.options("Character") == [("c1", "Ada Vance"), ("c2", "Bruno Vale")]
+    assert cache.options("Clue") == [("k1", "Torn glove")]
+    assert cache.options("Location") == []
+
+def test_incremental_add_rename_remove(character):
+    cache = make_cache(character)
+    version = cache.version("Character")
+    char = character("c3", "Cora Lind")
+    cache.add_asset(char)
+    assert cache.label("Character", "c3") == "Cora Lind"
+    char.fullName = "Cora Lindqvist"
+    cache.update_asset(char)
+    assert cache.options("Character")[-1] == ("c3", "Cora Lindqvist")
+    char.id = "c3b"
+    cache.update_asset(char, previous_id="c3")
+    assert cache.label("Character", "c3") is None
+    assert cache.label("Character", "c3b") == "Cora Lindqvist"
+    cache.remove_asset(char)
+    assert [key for key, _ in cache.options("Character")] == ["c1", "c2"]
+    assert cache.version("Character") > version
+
+def test_typeahead_threshold_and_search(character):
+    cache = make_cache(character)
+    assert not cache.needs_typeahead("Character")
+    cache.add_asset(character("c3", "Vera Ash"))
+    assert cache.needs_typeahead("Character")
+    # Prefix matches come before substring matches.
+    assert [key for key, _ in cache.search("Character", "v")] == ["c3", "c1", "c2"]
+    assert cache.search("Character", "bruno") == [("c2", "Bruno Vale")]
+
+def test_listeners_hear_new_versions_and_are_held_weakly(character):
+    cache = make_cache(character)
+    class Watcher:
+        def __init__(self):
+            self.calls = 0
+        def refresh(self):
+            self.calls += 1
+    watcher, dropped = Watcher(), Watcher()
+    cache.add_listener("Character", watcher.refresh)
+    cache.add_listener("Character", dropped.refresh)
+    cache.add_listener("Clue", watcher.refresh)
+    del dropped
+    cache.add_asset(character("c3", "Cora Lind"))
+    assert watcher.calls == 1 and len(cache._listeners["Character"]) == 1
+
+def test_relabels_report_the_one_position_they_touched(character):
+    cache = make_cache(character)
+    char = cache.options("Character")[1]
+    version = cache.version("Character")
+    cache.update_asset(character("c2", "Bruno Valente"))
+    assert cache.relabeled("Character", version) == 1 and cache.options("Character")[1] != char
+    # Anything older, or any other change since, needs a full rebuild.
+    assert cache.relabeled("Character", version - 1) is None
+    cache.add_asset(character("c3", "Cora Lind"))
+    assert cache.relabeled("Character", version + 1) is None
@@ -0,0 +1,37 @@
+import time
+
+import numpy as np
+
+import plot_graph
+from graph_model import Graph
+from plot_graph import WORLD_SCALE, PlotGraphView
+
+def make_graph(node_ids):
+    return Graph(node_ids=list(node_ids), labels=list(node_ids), node_kinds=["Clue"] * len(node_ids), index={node_id: i for i, node_id in enumerate(node_ids)})
+
+def test_a_rebuild_during_a_drag_keeps_the_dragged_node_under_the_pointer(control):
+    view = PlotGraphView(control)
+    view.engine.wait(5)
+    view._on_layout(make_graph(["Clue:a", "Clue:b"]), np.zeros((2, 2)))
+    view.dragging = 1
+    view.positions[1] = (500, 500)
+    # Rebuilt with a node added in front: the dragged node moves to index 2.
+    view._on_layout(make_graph(["Clue:c", "Clue:a", "Clue:b"]), np.ones((3, 2)))
+    assert view.dragging == 2 and view.selected == 2
+    assert view.positions[2].tolist() == [500, 500] and view.tree.position(2) == (500, 500)
+    assert view.positions[0].tolist() == [WORLD_SCALE, WORLD_SCALE]
+    # Rebuilt without it: the drag ends.
+    view._on_layout(make_graph(["Clue:a"]), np.ones((1, 2)))
+    assert view.dragging is None and not np.isnan(view.positions).any()
+
+def test_a_batch_delete_rebuilds_the_graph_once(control, monkeypatch):
+    monkeypatch.setattr(plot_graph, "REBUILD_DELAY", 0.05)
+    control.create_new_clue()
+    control.create_new_clue()
+    view = PlotGraphView(control)
+    view.engine.wait(5)
+    rebuilds = []
+    monkeypatch.setattr(view.engine, "set_graph", rebuilds.append)
+    control.delete_assets(list(control.case_data.clues))
+    time.sleep(0.3)
+    assert len(rebuilds) == 1 and len(rebuilds[0]) == 0
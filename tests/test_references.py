@@ -0,0 +1,72 @@
+from references import FieldChange, ReferenceIndex, Removal
+from schemas import CaseData, CaseLocation, CaseMeta, CaseSuspect, CaseWitness, Clue, Faction, InterviewQuestion, WorldData
+
+def make_clue(clue_id, **kwargs):
+    return Clue(clueId=clue_id, criticalClue=False, redHerring=False, isLie=False, source="", clueSummary=clue_id, knowledgeLevel="Both", **kwargs)
+
+def make_world(character):
+    ada = character("c1", allies=["c2", "c3"])
+    bruno = character("c2", enemies=["c1"])
+    cora = character("c3", allies=["c1"])
+    faction = Faction(id="f1", name="Guild", description="", members=["c1", "c2"])
+    world = WorldData(characters=[ada, bruno, cora], factions=[faction])
+    case = CaseData(
+        caseMeta=CaseMeta(victim="c2", culprit="c1", crimeScene="", murderWeapon="", coreMysterySolutionDetails="", motiveClue="k1"),
+        keySuspects=[CaseSuspect(characterId="c1"), CaseSuspect(characterId="c2")],
+        caseLocations=[CaseLocation(locationId="l1", witnesses=[CaseWitness(characterId="c2"), CaseWitness(characterId="c3")])],
+        clues=[make_clue("k1"), make_clue("k2", dependencies=["k1"], revealsUnlocks=[{"type": "Clue", "id": "k1"}])],
+    )
+    index = ReferenceIndex()
+    index.rebuild(world, case)
+    return index, world, case
+
+def test_referrers_cover_world_and_case(character):
+    index, world, case = make_world(character)
+    owners = {(type(owner).__name__, attr) for owner, attr in index.referrers("Character", "c2")}
+    assert owners == {("Character", "allies"), ("Faction", "members"), ("CaseMeta", "victim"), ("CaseSuspect", "characterId"), ("CaseWitness", "characterId")}
+
+def test_cascade_delete_clears_references_and_owned_wrappers(character):
+    index, world, case = make_world(character)
+    bruno = world.characters[1]
+    changes = index.cascade_delete([bruno])
+    assert [c.fullName for c in world.characters] == ["c1", "c3"]
+    assert world.characters[0].allies == ["c3"]
+    assert world.factions[0].members == ["c1"]
+    assert case.caseMeta.victim == ""
+    assert [s.characterId for s in case.keySuspects] == ["c1"]
+    assert [w.characterId for w in case.caseLocations[0].witnesses] == ["c3"]
+    removed = {type(c.asset).__name__ for c in changes if isinstance(c, Removal)}
+    assert removed == {"Character", "CaseSuspect", "CaseWitness"}
+    assert index.referrers("Character", "c2") == []
+
+def test_cascade_delete_takes_clues_made_from_interview_answers(character):
+    index, world, case = make_world(character)
+    def question(question_id):
+        return InterviewQuestion(questionId=question_id, question="Where were you?", answerId=f"a-{question_id}", answer="Home.", isLie=False, isClue=True)
+    case.keySuspects[1].interview = [question("q1")]
+    case.caseLocations[0].witnesses[1].interview = [question("q2")]
+    made = [make_clue("k3"), make_clue("k4")]
+    made[0].source, made[1].source = "q1", "q2"
+    case.clues += made
+    index.rebuild(world, case)
+    index.cascade_delete([world.characters[1]])
+    assert [c.clueId for c in case.clues] == ["k1", "k2", "k4"]
+    index.cascade_delete([case.caseLocations[0]])
+    assert [c.clueId for c in case.clues] == ["k1", "k2"]
+
+def test_bulk_delete_rewrites_each_list_once(character):
+    index, world, _ = make_world(character)
+    changes = index.cascade_delete(world.characters[1:])
+    ally_changes = [c for c in changes if isinstance(c, FieldChange) and c.attr == "allies"]
+    assert len(ally_changes) == 1 and ally_changes[0].new_value == []
+    assert [c.id for c in world.characters] == ["c1"]
+
+def test_clue_delete_and_incremental_updates(character):
+    index, _, case = make_world(character)
+    first, second = case.clues
+    index.cascade_delete([first])
+    assert second.dependencies == [] and second.revealsUnlocks == []
+    assert case.caseMeta.motiveClue is None
+    second.debunkingClue = "k9"
+    index.update_field(second, "debunkingClue", None, "k9")
+    assert index.referrers("Clue", "k9") == [(second, "debunkingClue")]
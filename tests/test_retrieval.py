@@ -0,0 +1,45 @@
+from retrieval import RetrievalIndex, build_prompt, estimate_tokens
+from schemas import CaseData, Faction, WorldData
+
+def faction(faction_id, name, description):
+    return Faction(id=faction_id, name=name, description=description)
+
+def world(character):
+    return WorldData(
+        characters=[character("c1", "Ada Vance", biography="A harbour smuggler who runs contraband through the docks at night."),
+                    character("c2", "Basil Crane", biography="An orchid collector and retired botanist living in the glasshouse."),
+                    character("c3", "Cora Finch", biography="Dockside smuggler, rival of Ada.")],
+        factions=[faction("f1", "The Tidewater Ring", "Smugglers controlling the harbour docks and contraband trade."),
+                  faction("f2", "Royal Horticultural Circle", "Retired botanists, orchid collectors and glasshouse growers.")],
+    )
+
+def test_related_assets_share_vocabulary(character):
+    data = world(character)
+    index = RetrievalIndex()
+    index.reset(data, CaseData())
+    related = index.related(data.characters[0], k=2)
+    assert {asset.id for asset in related} == {"c3", "f1"}
+    assert index.related(data.characters[1], k=1)[0].id == "f2"
+
+def test_edits_reembed_only_what_changed(character):
+    data = world(character)
+    index = RetrievalIndex()
+    index.reset(data, CaseData())
+    index.search("docks")
+    assert index.embedded == 5
+    data.characters[1].biography = "Smuggles orchids through the harbour docks."
+    index.on_asset_changed(data.characters[1], "biography")
+    assert data.characters[1] in index.search("harbour docks", k=5) and index.embedded == 6
+    removed = data.factions.pop(0)
+    index.on_asset_changed(removed, None)
+    assert removed not in index.search("smugglers contraband", k=5) and index.embedded == 6
+
+def test_prompt_fits_the_budget_and_ends_with_the_instruction(character):
+    data = world(character)
+    index = RetrievalIndex()
+    index.reset(data, CaseData())
+    ada = data.characters[0]
+    prompt = build_prompt(ada, "personality", index.related(ada), budget=60)
+    assert prompt.startswith("Context:\nAbout Ada Vance: ") and "The Tidewater Ring" not in prompt
+    assert prompt.endswith("Generate a personality for a Character named Ada Vance:\n") and estimate_tokens(prompt) <= 60
+    assert "Faction The Tidewater Ring: Smugglers" in build_prompt(ada, "personality", index.related(ada))
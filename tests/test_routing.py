@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+
+from routing import TravelTable, floyd_warshall, travel_edges
+from schemas import District, Location, WorldData
+
+def make_world(n_locations=40, n_districts=4, n_routes=60, seed=1):
+    rng = random.Random(seed)
+    districts = [District(id=f"d{i}", name=f"d{i}", description="") for i in range(n_districts)]
+    locations = [Location(id=f"l{i}", name=f"l{i}", description="", district=rng.choice([None, "d0", "d1", "d2", "d3"])) for i in range(n_locations)]
+    places = locations + districts
+    for _ in range(n_routes):
+        a, b = rng.sample(places, 2)
+        a.travelRoutes.append({"to": b.id, "minutes": rng.randint(1, 30)})
+    return WorldData(locations=locations, districts=districts)
+
+def brute_force(world):
+    table = TravelTable()
+    table.reset(world)
+    table.minutes("l0", "l1")
+    return table
+
+def assert_matches_fresh_table(table, world):
+    table.minutes("l0", "l1")  # Brings the table up to date.
+    fresh = brute_force(world)
+    order = [table.index[place_id] for place_id in fresh.ids]
+    assert np.array_equal(table.dist[np.ix_(order, order)], fresh.dist)
+
+def test_floyd_warshall_matches_dijkstra_style_relaxation():
+    weights = np.array([[0, 4, np.inf], [4, 0, 1], [np.inf, 1, 0]], dtype=float)
+    assert floyd_warshall(weights)[0, 2] == 5
+
+def test_routes_are_two_way_and_districts_connect_their_locations():
+    world = make_world(n_locations=3, n_districts=2, n_routes=0)
+    world.locations[0].district, world.locations[1].district, world.locations[2].district = "d0", "d1", None
+    world.districts[0].travelRoutes.append({"to": "d1", "minutes": 20})
+    world.locations[2].travelRoutes.append({"to": "l1", "minutes": "bad"})
+    assert travel_edges(world) == {("d0", "d1"): 20.0, ("d0", "l0"): 5.0, ("d1", "l1"): 5.0}
+    table = brute_force(world)
+    assert table.minutes("l1", "l0") == 30
+    assert table.minutes("l0", "l2") == np.inf
+
+def test_incremental_updates_match_full_recompute():
+    rng = random.Random(5)
+    world = make_world()
+    table = brute_force(world)
+    places = world.locations + world.districts
+    for step in range(40):
+        place = rng.choice(places)
+        if step % 4 == 0:
+            world.locations.append(Location(id=f"new{step}", name="", description="", district="d1"))
+            places.append(world.locations[-1])
+            attr = None
+        elif step % 4 == 1 and place.travelRoutes:
+            place.travelRoutes.pop()
+            attr = "travelRoutes"
+        else:
+            place.travelRoutes.append({"to": rng.choice(places).id, "minutes": rng.randint(1, 30)})
+            attr = "travelRoutes"
+        table.on_asset_changed(place, attr)
+        assert_matches_fresh_table(table, world)
+    # Most steps are absorbed incrementally rather than by rerunning Floyd-Warshall.
+    assert table.full_recomputes < 20
@@ -0,0 +1,42 @@
+import random
+
+from spatial_index import QuadTree
+
+def brute_force(points, x0, y0, x1, y1):
+    return {k for k, (x, y) in points.items() if x0 <= x <= x1 and y0 <= y <= y1}
+
+def test_queries_match_brute_force_through_moves_and_removals():
+    rng = random.Random(7)
+    tree = QuadTree(capacity=4)
+    points = {}
+    for key in range(500):
+        points[key] = (rng.uniform(-200, 1500), rng.uniform(-200, 1500))  # Some outside the initial bounds.
+        tree.insert(key, *points[key])
+    for key in range(0, 500, 3):
+        points[key] = (points[key][0] + rng.uniform(-50, 50), points[key][1] + rng.uniform(-50, 50))
+        tree.move(key, *points[key])
+    for key in range(0, 500, 5):
+        assert tree.remove(key)
+        del points[key]
+    assert len(tree) == len(points)
+    for _ in range(50):
+        x0, y0 = rng.uniform(-300, 1500), rng.uniform(-300, 1500)
+        rect = (x0, y0, x0 + rng.uniform(0, 600), y0 + rng.uniform(0, 600))
+        assert set(tree.query_rect(*rect)) == brute_force(points, *rect)
+
+def test_nearest_respects_max_distance():
+    tree = QuadTree()
+    tree.insert("a", 10, 10)
+    tree.insert("b", 30, 10)
+    assert tree.nearest(18, 10, 15) == "a"
+    assert tree.nearest(25, 10, 15) == "b"
+    assert tree.nearest(100, 100, 15) is None
+
+def test_removing_points_collapses_split_leaves():
+    tree = QuadTree(capacity=2)
+    for key in range(10):
+        tree.insert(key, key * 10.0, key * 10.0)
+    for key in range(9):
+        tree.remove(key)
+    assert tree._root.children is None
+    assert tree.query_rect(0, 0, 1024, 1024) == [9]
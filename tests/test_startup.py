@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import startup
+from startup import StartupTimeline
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# What Control and the AI plumbing stand on. None of it may pull in the UI toolkit or a model runtime.
+CORE_MODULES = ("schemas", "data_manager", "references", "history", "navigation", "option_cache", "generation_cache",
+                "voices", "ai_backends", "ai_model", "ai_generation", "ai_workers", "startup")
+HEAVY_MODULES = ("flet", "numpy", "torch", "transformers")
+IMPORT_BUDGET = 0.5  # Seconds for all of them in a fresh interpreter; they take under 0.1 on a laptop.
+
+def run_fresh(statement):
+    """Runs `statement` in a fresh interpreter; returns the seconds it took and the heavy modules it loaded."""
+    code = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - started)\n"
+        f"print(*sorted({{name.split('.')[0] for name in sys.modules}} & {set(HEAVY_MODULES)!r}))\n"
+    )
+    elapsed, heavy = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout.splitlines()
+    return float(elapsed), heavy.split()
+
+def test_core_modules_import_within_budget():
+    elapsed, heavy = run_fresh(f"import {', '.join(CORE_MODULES)}")
+    assert heavy == []
+    assert elapsed < IMPORT_BUDGET
+
+def test_control_leaves_the_model_runtime_unloaded():
+    # Control needs the UI toolkit and numpy; torch and transformers wait until the model loads.
+    _, heavy = run_fresh("import my_control")
+    assert set(heavy) <= {"flet", "numpy"}
+
+def test_ai_workers_do_not_start_the_editor():
+    # What a spawned worker does with the editor's main script before it runs _serve.
+    _, heavy = run_fresh("import runpy; runpy.run_path('main.py', run_name='__mp_main__'); import ai_workers")
+    assert heavy == []
+
+def test_timeline_logs_each_phase_once(tmp_path):
+    timeline = StartupTimeline(tmp_path / "cases" / startup.STARTUP_LOG, started=0)
+    first = timeline.mark(startup.IMPORT)
+    assert timeline.mark(startup.IMPORT) == first
+    timeline.mark(startup.FIRST_FRAME)
+    lines = (tmp_path / "cases" / startup.STARTUP_LOG).read_text().splitlines()
+    assert [line.split()[1] for line in lines] == [startup.IMPORT, startup.FIRST_FRAME]
+    assert list(timeline.phases) == [startup.IMPORT, startup.FIRST_FRAME] and timeline.phases[startup.FIRST_FRAME] >= first
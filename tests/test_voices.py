@@ -0,0 +1,25 @@
+import voices
+from schemas import CaseData, CaseLocation, CaseSuspect, CaseWitness, InterviewQuestion, WorldData
+
+def question(question_id, text, is_lie=False):
+    return InterviewQuestion(questionId=question_id, question=text, answerId="", answer="", isLie=is_lie, isClue=False)
+
+def test_persona_prefix_is_shared_by_every_answer(character):
+    ada = character("c1", "Ada Vance", voiceModel="Low and clipped", dialogueStyle="Answers questions with questions", secrets=["She was at the docks"])
+    prefix = voices.persona_prefix(ada)
+    assert prefix.startswith("You are Ada Vance") and "Dialogue style: Answers questions with questions" in prefix
+    assert "You are hiding: She was at the docks" in prefix and prefix.endswith("\n\n")
+    prompts = [voices.answer_prompt(ada, question(f"q{i}", f"Where were you at {i}?", is_lie=i == 2)) for i in range(3)]
+    assert prompts[0] == "Detective: Where were you at 0?\nAda Vance:" and prompts[2].startswith("(This answer is a lie.)\n")
+
+def test_speakers_are_suspects_and_witnesses(character):
+    world = WorldData(characters=[character("c1", "Ada Vance"), character("c2", "Basil Crane")])
+    asked, seen, stray = question("q1", "Where were you?"), question("q2", "What did you see?"), question("q3", "?")
+    case = CaseData(keySuspects=[CaseSuspect("c1", [asked])], caseLocations=[CaseLocation("l1", witnesses=[CaseWitness("c2", [seen])])])
+    assert voices.interview_speaker(case, world, asked).id == "c1"
+    assert voices.interview_speaker(case, world, seen).id == "c2"
+    assert voices.interview_speaker(case, world, stray) is None
+
+def test_replies_stop_at_the_next_question():
+    assert voices.first_reply(" I was home.\nDetective: Alone?\nAda: Yes.") == "I was home."
+    assert voices.tidy(voices.ASSISTANT, " A damp cellar.\nDetective: x ") == "A damp cellar.\nDetective: x"
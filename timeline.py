@@ -1,10 +1,284 @@
+import threading
+from typing import Any, List, Optional, Tuple
+
 import flet as ft
+import flet.canvas as cv
+import numpy as np
+
 from my_control import Control
+import schemas
+from asset_forms import AssetForm
+from lore_timeline import ZOOM_LEVELS, LoreTimeline, format_date, iso_date
+from reference_picker import ReferencePicker
 
-def build_timeline_view(control: Control):
-    return ft.Column(
-        [
-            ft.Text("Lore & World History Timeline (Under Construction)", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
-            ft.Text("This section will allow you to visualize and manage historical events."),
+VIEW_WIDTH = 1000
+VIEW_HEIGHT = 420
+AXIS_HEIGHT = 28
+LANE_HEIGHT = 22
+MIN_SCALE, MAX_SCALE = 0.05, 80000.0  # Pixels per year.
+MIN_BUCKET_PX = 6  # Finest zoom level whose buckets are at least this wide is used for the overview.
+MIN_TICK_PX = 90
+MAX_DRAWN_EVENTS = 250  # Above this many visible events the overview histogram is drawn instead.
+CHAR_WIDTH = 7  # Rough label width per character, for lane packing.
+REBUILD_DELAY = 0.2
+FILTERS = (("characters", "Character"), ("factions", "Faction"), ("locations", "Location"))
+
+
+class TimelineView:
+    """
+    The Lore & World History Timeline.
+
+    Events come from a LoreTimeline over the world's LoreEvents, rebuilt after
+    edits. Each redraw asks the interval tree for the events in the visible
+    range and lays them out in lanes. When the range holds more events than
+    can usefully be drawn, the view shows the pre-aggregated event counts of
+    the finest zoom level that still fits instead. Either way a redraw only
+    touches what is on screen, so panning over decades of backstory stays
+    cheap. Drag to pan, scroll to zoom, click an event to edit it.
+    """
+
+    def __init__(self, control: Control):
+        self.control = control
+        self.timeline = LoreTimeline([])
+        self.scale = 10.0
+        self.left = 1900.0  # Timeline position at the left edge.
+        self.selected: Optional[schemas.LoreEvent] = None
+        self.filters = {attr: None for attr, _ in FILTERS}
+        self._boxes: List[Tuple[float, float, float, float, schemas.LoreEvent]] = []
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._fitted = False
+
+        self.canvas = cv.Canvas(width=VIEW_WIDTH, height=VIEW_HEIGHT)
+        self.status = ft.Text()
+        self.pickers = [
+            ReferencePicker(control, asset_type, asset_type, self._on_filter, data=attr)
+            for attr, asset_type in FILTERS
         ]
-    )
\ No newline at end of file
+        self.form = AssetForm(control, schemas.LoreEvent)
+        self.delete_button = ft.OutlinedButton("Delete event", icon=ft.Icons.DELETE, on_click=lambda e: self._delete_selected())
+        self.details = ft.Column(self.form.controls + [self.delete_button], visible=False)
+        surface = ft.GestureDetector(
+            content=ft.Container(self.canvas, width=VIEW_WIDTH, height=VIEW_HEIGHT, clip_behavior=ft.ClipBehavior.HARD_EDGE, border=ft.border.all(1, ft.Colors.OUTLINE)),
+            drag_interval=16,
+            on_pan_update=self._on_pan_update,
+            on_scroll=self._on_scroll,
+            on_tap_down=self._on_tap_down,
+        )
+        self.view = ft.Column(
+            [
+                ft.Row([
+                    ft.Text("Lore & World History Timeline", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
+                    self.status,
+                    ft.IconButton(icon=ft.Icons.ADD, tooltip="New event at the centre of the view", on_click=lambda e: self._new_event()),
+                    ft.IconButton(icon=ft.Icons.CENTER_FOCUS_STRONG, tooltip="Fit to view", on_click=lambda e: self.fit()),
+                ]),
+                ft.Row([picker.view for picker in self.pickers] + [
+                    ft.IconButton(icon=ft.Icons.FILTER_ALT_OFF, tooltip="Clear filters", on_click=lambda e: self._clear_filters()),
+                ]),
+                ft.Text("Drag to pan, scroll to zoom, click an event to edit it."),
+                surface,
+                self.details,
+            ],
+            scroll=ft.ScrollMode.AUTO,
+        )
+        control.add_change_listener(self._on_asset_changed)
+        self.rebuild()
+
+    # --- Data ---
+
+    def rebuild(self):
+        events = self.control.world_data.events
+        for attr, value in self.filters.items():
+            if value:
+                events = [event for event in events if value in getattr(event, attr)]
+        timeline = LoreTimeline(events)
+        with self._lock:
+            self.timeline = timeline
+            if self.selected is not None and not any(event is self.selected for event in self.control.world_data.events):
+                self._select(None)
+            if not self._fitted and len(timeline):
+                self._fitted = True
+                self._fit()
+            self._draw()
+        self._update()
+
+    def _on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        if not isinstance(asset, schemas.LoreEvent):
+            return
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(REBUILD_DELAY, self.rebuild)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_filter(self, picker: ReferencePicker, value: Optional[str]):
+        self.filters[picker.data] = value
+        self.rebuild()
+
+    def _clear_filters(self):
+        for picker in self.pickers:
+            picker.set_value(None)
+            self.filters[picker.data] = None
+        self.rebuild()
+
+    def _new_event(self):
+        centre = self.left + VIEW_WIDTH / 2 / self.scale
+        event = self.control.create_new_event(iso_date(centre, self._tick_level()[0]))
+        for attr, value in self.filters.items():
+            if value:
+                self.control.update_asset(event, attr, [value])
+        with self._lock:
+            self._select(event)
+        self.rebuild()
+
+    def _delete_selected(self):
+        if self.selected is not None:
+            self.control.delete_assets([self.selected])
+
+    def _select(self, event: Optional[schemas.LoreEvent]):
+        self.selected = event
+        self.details.visible = event is not None
+        if event is not None:
+            self.form.bind(event)
+
+    # --- Coordinates ---
+
+    def _x(self, t: float) -> float:
+        return (t - self.left) * self.scale
+
+    def _visible_range(self) -> Tuple[float, float]:
+        return self.left, self.left + VIEW_WIDTH / self.scale
+
+    def fit(self):
+        with self._lock:
+            self._fit()
+            self._draw()
+        self._update()
+
+    def _fit(self):
+        span = self.timeline.span()
+        if span is None:
+            return
+        t0, t1 = span
+        width = max(t1 - t0, 1.0)
+        self.scale = float(np.clip(VIEW_WIDTH * 0.9 / width, MIN_SCALE, MAX_SCALE))
+        self.left = (t0 + t1) / 2 - VIEW_WIDTH / 2 / self.scale
+
+    def _overview_level(self) -> Tuple[str, float]:
+        fitting = [level for level in ZOOM_LEVELS if level[1] * self.scale >= MIN_BUCKET_PX]
+        return fitting[-1] if fitting else ZOOM_LEVELS[0]
+
+    def _tick_level(self) -> Tuple[str, float]:
+        fitting = [level for level in ZOOM_LEVELS if level[1] * self.scale >= MIN_TICK_PX]
+        return fitting[-1] if fitting else ZOOM_LEVELS[0]
+
+    # --- Drawing ---
+
+    def _draw(self):
+        t0, t1 = self._visible_range()
+        hits = self.timeline.query(t0, t1)
+        shapes = self._axis_shapes(t0, t1)
+        self._boxes = []
+        if len(hits) > MAX_DRAWN_EVENTS:
+            level, _ = self._overview_level()
+            shapes += self._bucket_shapes(level, t0, t1)
+            detail = f"{len(hits)} events in view, grouped by {level}"
+        else:
+            shapes += self._event_shapes(hits)
+            detail = f"{len(hits)} events in view"
+        undated = f", {len(self.timeline.undated)} without a valid date" if self.timeline.undated else ""
+        self.status.value = f"{len(self.timeline)} events{undated}; {detail}"
+        self.canvas.shapes = shapes
+
+    def _axis_shapes(self, t0: float, t1: float) -> list:
+        level, width = self._tick_level()
+        shapes = [cv.Line(0, AXIS_HEIGHT, VIEW_WIDTH, AXIS_HEIGHT, paint=ft.Paint(color=ft.Colors.OUTLINE))]
+        for k in range(int(np.ceil(t0 / width)), int(np.floor(t1 / width)) + 1):
+            x = self._x(k * width)
+            shapes.append(cv.Line(x, AXIS_HEIGHT - 6, x, VIEW_HEIGHT, paint=ft.Paint(color=ft.Colors.with_opacity(0.15, ft.Colors.OUTLINE))))
+            shapes.append(cv.Text(x + 3, 4, format_date(k * width, level), style=ft.TextStyle(size=11)))
+        return shapes
+
+    def _bucket_shapes(self, level: str, t0: float, t1: float) -> list:
+        edges, counts = self.timeline.buckets(level, t0, t1)
+        if not len(counts) or counts.max() == 0:
+            return []
+        width = dict(ZOOM_LEVELS)[level] * self.scale
+        usable = VIEW_HEIGHT - AXIS_HEIGHT - 20
+        shapes = []
+        for start, count in zip(edges.tolist(), counts.tolist()):
+            if count == 0:
+                continue
+            height = max(usable * count / counts.max(), 2)
+            x = self._x(start)
+            shapes.append(cv.Rect(x, VIEW_HEIGHT - height, max(width - 1, 1), height, paint=ft.Paint(color=ft.Colors.INDIGO_300)))
+            if width >= 24:
+                shapes.append(cv.Text(x + 2, VIEW_HEIGHT - height - 14, str(count), style=ft.TextStyle(size=10)))
+        return shapes
+
+    def _event_shapes(self, hits: np.ndarray) -> list:
+        lanes: List[float] = []  # Right edge of the last event in each lane.
+        max_lanes = (VIEW_HEIGHT - AXIS_HEIGHT - 8) // LANE_HEIGHT
+        hidden = 0
+        shapes = []
+        for i in hits.tolist():
+            event = self.timeline.events[i]
+            x0 = self._x(self.timeline.starts[i])
+            x1 = max(self._x(self.timeline.ends[i]), x0 + 4)
+            text_x = max(x0, 0) + 4
+            right = max(x1, text_x + CHAR_WIDTH * len(event.name)) + 6
+            lane = next((n for n, end in enumerate(lanes) if end <= x0), None)
+            if lane is None:
+                if len(lanes) >= max_lanes:
+                    hidden += 1
+                    continue
+                lane = len(lanes)
+                lanes.append(right)
+            lanes[lane] = right
+            y = AXIS_HEIGHT + 6 + lane * LANE_HEIGHT
+            color = ft.Colors.AMBER_400 if event is self.selected else ft.Colors.INDIGO_300
+            shapes.append(cv.Rect(x0, y, x1 - x0, LANE_HEIGHT - 4, border_radius=4, paint=ft.Paint(color=ft.Colors.with_opacity(0.6, color))))
+            shapes.append(cv.Text(text_x, y + 2, event.name, style=ft.TextStyle(size=12)))
+            self._boxes.append((x0, y, right, y + LANE_HEIGHT - 4, event))
+        if hidden:
+            shapes.append(cv.Text(VIEW_WIDTH - 120, VIEW_HEIGHT - 18, f"+{hidden} more, zoom in", style=ft.TextStyle(size=11, italic=True)))
+        return shapes
+
+    def _update(self):
+        if self.view.page:
+            self.view.update()
+
+    # --- Interaction ---
+
+    def _on_tap_down(self, e: ft.TapEvent):
+        with self._lock:
+            hit = next((event for x0, y0, x1, y1, event in self._boxes if x0 <= e.local_x <= x1 and y0 <= e.local_y <= y1), None)
+            self._select(hit)
+            self._draw()
+        self._update()
+
+    def _on_pan_update(self, e: ft.DragUpdateEvent):
+        with self._lock:
+            self.left -= e.delta_x / self.scale
+            self._draw()
+        if self.canvas.page:
+            self.canvas.update()
+
+    def _on_scroll(self, e: ft.ScrollEvent):
+        if not e.scroll_delta_y:
+            return
+        with self._lock:
+            factor = 0.85 if e.scroll_delta_y > 0 else 1 / 0.85
+            new_scale = float(np.clip(self.scale * factor, MIN_SCALE, MAX_SCALE))
+            # Zoom around the cursor.
+            cursor = self.left + e.local_x / self.scale
+            self.left = cursor - e.local_x / new_scale
+            self.scale = new_scale
+            self._draw()
+        if self.canvas.page:
+            self.canvas.update()
+
+
+def build_timeline_view(control: Control):
+    return TimelineView(control).view
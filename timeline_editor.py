@@ -1,10 +1,453 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
 import flet as ft
+import flet.canvas as cv
+import numpy as np
+
 from my_control import Control
+import schemas
+from asset_forms import AssetForm
+from event_chain import event_names, format_minutes
+
+VIEW_WIDTH = 1000
+VIEW_HEIGHT = 440
+AXIS_HEIGHT = 28
+ROW_HEIGHT = 22
+LABEL_WIDTH = 180  # Left gutter holding the step descriptions.
+MIN_SCALE, MAX_SCALE = 0.02, 20.0  # Pixels per minute.
+SNAP_MINUTES = 5
+TICK_STEPS = (5, 15, 30, 60, 180, 360, 720, 1440, 7 * 1440)  # Minutes between axis ticks.
+MIN_TICK_PX = 80
+REBUILD_DELAY = 0.2
+CHAIN_TYPES = ("ChainEvent", "ChainLink", "CaseMeta")
+
+
+class TimelineEditorView:
+    """
+    The Gamified Timeline Editor for the case's eventChain.
+
+    Each step is a row, drawn at the earliest time the chain allows, with its
+    ordering links between rows. The ChainSolver on the control keeps that
+    schedule up to date incrementally as steps and links are edited, and any
+    rules that contradict each other are listed and drawn in red. Dragging a
+    step asks the solver once for the start times it could be pinned at; the
+    drag itself then only compares against that window, so the green or red
+    feedback keeps up with the pointer on chains of hundreds of steps.
+    Dropping pins the step's start. Drag empty space to pan, scroll to zoom.
+    """
+
+    def __init__(self, control: Control):
+        self.control = control
+        self.solver = control.chain_solver
+        self.scale = 2.0
+        self.left = -30.0  # Minute at the left edge of the time axis.
+        self.top = 0.0  # Vertical scroll offset of the rows, in pixels.
+        self.order: List[schemas.ChainEvent] = []
+        self.schedule: Dict[str, Tuple[float, float]] = {}
+        self.links_by_event: Dict[str, List[schemas.ChainLink]] = {}
+        self.conflicting: set = set()
+        self.selected: Optional[schemas.ChainEvent] = None
+        self.dragging: Optional[schemas.ChainEvent] = None
+        self._window: Optional[Tuple[float, float, List[str], List[str]]] = None
+        self._drag_raw = 0.0
+        self._drag_to = 0.0
+        self._boxes: List[Tuple[float, float, float, float, schemas.ChainEvent]] = []
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._fitted = False
+
+        self.canvas = cv.Canvas(width=VIEW_WIDTH, height=VIEW_HEIGHT)
+        self.status = ft.Text()
+        self.feedback = ft.Text()
+        self.conflict_list = ft.Column(spacing=0)
+        self.form = AssetForm(control, schemas.ChainEvent)
+        self.after_dropdown = ft.Dropdown(label="Happens after...", width=300)
+        self.link_rows = ft.Column(spacing=4)
+        self.details = ft.Column(
+            self.form.controls + [
+                ft.Text("Links", style=ft.TextThemeStyle.TITLE_MEDIUM),
+                self.link_rows,
+                ft.Row([
+                    self.after_dropdown,
+                    ft.IconButton(icon=ft.Icons.ADD_LINK, tooltip="Order the selected step after this one", on_click=lambda e: self._link_after_picked()),
+                ]),
+                ft.Row([
+                    ft.OutlinedButton("Add cause before", icon=ft.Icons.ARROW_BACK, on_click=lambda e: self._add_neighbour(before=True)),
+                    ft.OutlinedButton("Add consequence after", icon=ft.Icons.ARROW_FORWARD, on_click=lambda e: self._add_neighbour(before=False)),
+                    ft.OutlinedButton("Delete step", icon=ft.Icons.DELETE, on_click=lambda e: self._delete_selected()),
+                ]),
+            ],
+            visible=False,
+        )
+        surface = ft.GestureDetector(
+            content=ft.Container(self.canvas, width=VIEW_WIDTH, height=VIEW_HEIGHT, clip_behavior=ft.ClipBehavior.HARD_EDGE, border=ft.border.all(1, ft.Colors.OUTLINE)),
+            drag_interval=16,
+            on_pan_start=self._on_pan_start,
+            on_pan_update=self._on_pan_update,
+            on_pan_end=self._on_pan_end,
+            on_scroll=self._on_scroll,
+            on_tap_down=self._on_tap_down,
+        )
+        self.view = ft.Column(
+            [
+                ft.Row([
+                    ft.Text("Gamified Timeline Editor (eventChain)", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
+                    self.status,
+                    ft.IconButton(icon=ft.Icons.ADD, tooltip="New step", on_click=lambda e: self._new_step()),
+                    ft.IconButton(icon=ft.Icons.CENTER_FOCUS_STRONG, tooltip="Fit to view", on_click=lambda e: self.fit()),
+                ]),
+                ft.Text("Drag a step to pin its start, drag empty space to pan, scroll to zoom, click a step to edit it."),
+                self.feedback,
+                surface,
+                self.conflict_list,
+                self.details,
+            ],
+            scroll=ft.ScrollMode.AUTO,
+        )
+        control.add_change_listener(self._on_asset_changed)
+        control.register_selector("ChainEvent", self.reveal)
+        self.rebuild()
+
+    # --- Data ---
+
+    def rebuild(self):
+        case = self.control.case_data
+        schedule = self.solver.schedule()
+        conflicts = self.solver.current_conflicts()
+        names = event_names(case)
+        links_by_event: Dict[str, List[schemas.ChainLink]] = {}
+        for link in case.chainLinks:
+            links_by_event.setdefault(link.before, []).append(link)
+            links_by_event.setdefault(link.after, []).append(link)
+        with self._lock:
+            self.schedule = schedule
+            self.order = sorted(case.eventChain, key=lambda event: schedule.get(event.id, (0.0, 0.0)))
+            self.links_by_event = links_by_event
+            self.conflicting = {event_id for conflict in conflicts for event_id in conflict.events}
+            self.conflict_list.controls = [
+                ft.TextButton(
+                    conflict.describe(names),
+                    icon=ft.Icons.ERROR_OUTLINE,
+                    icon_color=ft.Colors.RED_400,
+                    on_click=lambda e, event_id=conflict.constraint.events[0]: self._select_id(event_id),
+                )
+                for conflict in conflicts
+            ]
+            if self.selected is not None and not any(event is self.selected for event in case.eventChain):
+                self._select(None)
+            elif self.selected is not None:
+                self._show_links()
+            if not self._fitted and self.order:
+                self._fitted = True
+                self._fit()
+            self._draw()
+        self._update()
+
+    def _on_asset_changed(self, asset: Any, attribute_name: Optional[str]):
+        if type(asset).__name__ not in CHAIN_TYPES:
+            return
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(REBUILD_DELAY, self.rebuild)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _new_step(self):
+        event = self.control.create_new_chain_event()
+        with self._lock:
+            self._select(event)
+        self.rebuild()
+
+    def _add_neighbour(self, before: bool):
+        if self.selected is None:
+            return
+        anchor = self.selected
+        with self.control.history.group():
+            event = self.control.create_new_chain_event()
+            if before:
+                self.control.create_new_chain_link(event.id, anchor.id)
+            else:
+                self.control.create_new_chain_link(anchor.id, event.id)
+        with self._lock:
+            self._select(event)
+        self.rebuild()
+
+    def _link_after_picked(self):
+        if self.selected is None or not self.after_dropdown.value:
+            return
+        self.control.create_new_chain_link(self.after_dropdown.value, self.selected.id)
+        self.after_dropdown.value = None
+
+    def _delete_selected(self):
+        if self.selected is not None:
+            self.control.delete_assets([self.selected])
+
+    def _select(self, event: Optional[schemas.ChainEvent]):
+        self.selected = event
+        self.details.visible = event is not None
+        if event is not None:
+            self.form.bind(event)
+            self._show_links()
+
+    def _select_id(self, event_id: str):
+        event = next((event for event in self.control.case_data.eventChain if event.id == event_id), None)
+        if event is not None:
+            self.reveal(event)
+
+    def reveal(self, event: schemas.ChainEvent):
+        """Selects a step and scrolls its row and time into view."""
+        with self._lock:
+            self._select(event)
+            row = next((n for n, other in enumerate(self.order) if other is event), None)
+            if row is not None:
+                self.top = max(row * ROW_HEIGHT - (VIEW_HEIGHT - AXIS_HEIGHT) / 2, 0.0)
+            if event.id in self.schedule:
+                start, end = self.schedule[event.id]
+                self.left = (start + end) / 2 - (VIEW_WIDTH - LABEL_WIDTH) / 2 / self.scale
+            self._draw()
+        self._update()
+
+    def _show_links(self):
+        names = event_names(self.control.case_data)
+        event = self.selected
+        rows = []
+        for link in self.links_by_event.get(event.id, []):
+            if link.after == event.id:
+                text = f"after '{names.get(link.before, link.before)}'"
+            else:
+                text = f"before '{names.get(link.after, link.after)}'"
+            rows.append(ft.Row([
+                ft.Text(text, width=260),
+                ft.TextField(label="Min gap", value=str(link.minGap or 0), width=100, keyboard_type=ft.KeyboardType.NUMBER, on_blur=lambda e, link=link: self._set_gap(e, link, "minGap")),
+                ft.TextField(label="Max gap", value="" if link.maxGap is None else str(link.maxGap), width=100, keyboard_type=ft.KeyboardType.NUMBER, on_blur=lambda e, link=link: self._set_gap(e, link, "maxGap")),
+                ft.IconButton(icon=ft.Icons.LINK_OFF, tooltip="Remove link", on_click=lambda e, link=link: self.control.delete_assets([link])),
+            ]))
+        self.link_rows.controls = rows
+        self.after_dropdown.options = [ft.dropdown.Option(other.id, names[other.id]) for other in self.control.case_data.eventChain if other is not event]
+
+    def _set_gap(self, e, link: schemas.ChainLink, attr: str):
+        raw = (e.control.value or "").strip()
+        try:
+            value = int(raw) if raw else (0 if attr == "minGap" else None)
+        except ValueError:
+            e.control.error_text = "Minutes must be a whole number."
+            e.control.update()
+            return
+        e.control.error_text = None
+        if value != getattr(link, attr):
+            self.control.update_asset(link, attr, value)
+
+    # --- Coordinates ---
+
+    def _x(self, t: float) -> float:
+        return LABEL_WIDTH + (t - self.left) * self.scale
+
+    def _row_y(self, row: int) -> float:
+        return AXIS_HEIGHT + 4 + row * ROW_HEIGHT - self.top
+
+    def fit(self):
+        with self._lock:
+            self._fit()
+            self._draw()
+        self._update()
+
+    def _fit(self):
+        if not self.schedule:
+            return
+        t0 = min(start for start, _ in self.schedule.values())
+        t1 = max(end for _, end in self.schedule.values())
+        width = max(t1 - t0, 60.0)
+        self.scale = float(np.clip((VIEW_WIDTH - LABEL_WIDTH) * 0.9 / width, MIN_SCALE, MAX_SCALE))
+        self.left = (t0 + t1) / 2 - (VIEW_WIDTH - LABEL_WIDTH) / 2 / self.scale
+        self.top = 0.0
+
+    def _visible_rows(self) -> range:
+        first = max(int(self.top // ROW_HEIGHT), 0)
+        last = min(int((self.top + VIEW_HEIGHT - AXIS_HEIGHT) // ROW_HEIGHT) + 1, len(self.order))
+        return range(first, last)
+
+    # --- Drawing ---
+
+    def _draw(self):
+        rows = self._visible_rows()
+        shapes = self._axis_shapes()
+        shapes += self._link_shapes(rows)
+        shapes += self._event_shapes(rows)
+        if self.dragging is not None:
+            shapes += self._drag_shapes()
+        pinned = sum(event.start is not None for event in self.order)
+        conflicts = f", {len(self.conflict_list.controls)} conflicts" if self.conflict_list.controls else ""
+        self.status.value = f"{len(self.order)} steps, {pinned} pinned{conflicts}"
+        self.canvas.shapes = shapes
+
+    def _axis_shapes(self) -> list:
+        t0, t1 = self.left, self.left + (VIEW_WIDTH - LABEL_WIDTH) / self.scale
+        step = next((step for step in TICK_STEPS if step * self.scale >= MIN_TICK_PX), TICK_STEPS[-1])
+        shapes = [cv.Line(0, AXIS_HEIGHT, VIEW_WIDTH, AXIS_HEIGHT, paint=ft.Paint(color=ft.Colors.OUTLINE))]
+        for k in range(int(np.ceil(t0 / step)), int(np.floor(t1 / step)) + 1):
+            x = self._x(k * step)
+            shapes.append(cv.Line(x, AXIS_HEIGHT - 6, x, VIEW_HEIGHT, paint=ft.Paint(color=ft.Colors.with_opacity(0.15, ft.Colors.OUTLINE))))
+            shapes.append(cv.Text(x + 3, 4, format_minutes(k * step), style=ft.TextStyle(size=11)))
+        x0 = self._x(0)
+        if x0 >= LABEL_WIDTH:
+            shapes.append(cv.Line(x0, AXIS_HEIGHT, x0, VIEW_HEIGHT, paint=ft.Paint(color=ft.Colors.OUTLINE, stroke_width=2)))
+        return shapes
+
+    def _link_shapes(self, rows: range) -> list:
+        row_of = {id(event): n for n, event in enumerate(self.order)}
+        by_id = {event.id: event for event in self.order}
+        shapes, drawn = [], set()
+        for n in rows:
+            for link in self.links_by_event.get(self.order[n].id, []):
+                before, after = by_id.get(link.before), by_id.get(link.after)
+                if before is None or after is None or link.id in drawn:
+                    continue
+                drawn.add(link.id)
+                x0, y0 = self._x(self.schedule[before.id][1]), self._row_y(row_of[id(before)]) + ROW_HEIGHT / 2
+                x1, y1 = self._x(self.schedule[after.id][0]), self._row_y(row_of[id(after)]) + ROW_HEIGHT / 2
+                color = ft.Colors.RED_300 if before.id in self.conflicting and after.id in self.conflicting else ft.Colors.with_opacity(0.5, ft.Colors.OUTLINE)
+                shapes.append(cv.Line(x0, y0, x1, y1, paint=ft.Paint(color=color, stroke_width=1)))
+        return shapes
+
+    def _event_shapes(self, rows: range) -> list:
+        shapes = []
+        self._boxes = []
+        for n in rows:
+            event = self.order[n]
+            start, end = self.schedule.get(event.id, (0.0, 0.0))
+            y = self._row_y(n)
+            x0 = self._x(start)
+            x1 = max(self._x(end), x0 + 4)
+            if event.id in self.conflicting:
+                color = ft.Colors.RED_400
+            elif event is self.selected:
+                color = ft.Colors.AMBER_400
+            elif event.isCrime:
+                color = ft.Colors.DEEP_PURPLE_300
+            else:
+                color = ft.Colors.INDIGO_300
+            opacity = 0.3 if event is self.dragging else 0.7
+            shapes.append(cv.Rect(x0, y + 2, x1 - x0, ROW_HEIGHT - 4, border_radius=4, paint=ft.Paint(color=ft.Colors.with_opacity(opacity, color))))
+            if event.start is not None:
+                shapes.append(cv.Circle(x0, y + ROW_HEIGHT / 2, 3, paint=ft.Paint(color=ft.Colors.ON_SURFACE)))
+            self._boxes.append((x0, y, x1, y + ROW_HEIGHT, event))
+            # The label gutter is drawn over the bars that scrolled left of the axis.
+            shapes.append(cv.Rect(0, y, LABEL_WIDTH - 2, ROW_HEIGHT, paint=ft.Paint(color=ft.Colors.SURFACE)))
+            label = event.description or event.id
+            shapes.append(cv.Text(4, y + 3, label if len(label) <= 24 else label[:23] + "…", style=ft.TextStyle(size=12, weight=ft.FontWeight.BOLD if event is self.selected else None)))
+        shapes.append(cv.Rect(0, 0, LABEL_WIDTH - 2, AXIS_HEIGHT, paint=ft.Paint(color=ft.Colors.SURFACE)))
+        return shapes
+
+    def _drag_shapes(self) -> list:
+        """The allowed start window of the dragged step and where it would land."""
+        lo, hi, _, _ = self._window
+        n = next(n for n, event in enumerate(self.order) if event is self.dragging)
+        y = self._row_y(n)
+        band_x0 = max(self._x(lo), LABEL_WIDTH)
+        band_x1 = self._x(hi) if np.isfinite(hi) else VIEW_WIDTH
+        shapes = []
+        if band_x1 >= band_x0:
+            shapes.append(cv.Rect(band_x0, AXIS_HEIGHT, band_x1 - band_x0, VIEW_HEIGHT - AXIS_HEIGHT, paint=ft.Paint(color=ft.Colors.with_opacity(0.08, ft.Colors.GREEN))))
+        start, end = self.schedule[self.dragging.id]
+        color = ft.Colors.GREEN_400 if self._fits(self._drag_to) else ft.Colors.RED_400
+        x0 = self._x(self._drag_to)
+        shapes.append(cv.Rect(x0, y + 2, max((end - start) * self.scale, 4), ROW_HEIGHT - 4, border_radius=4, paint=ft.Paint(color=color)))
+        shapes.append(cv.Line(x0, AXIS_HEIGHT, x0, VIEW_HEIGHT, paint=ft.Paint(color=color)))
+        return shapes
+
+    def _fits(self, t: float) -> bool:
+        lo, hi, _, _ = self._window
+        return lo - 1e-6 <= t <= hi + 1e-6
+
+    def _drag_feedback(self) -> str:
+        lo, hi, reasons_lo, reasons_hi = self._window
+        t = self._drag_to
+        if lo > hi:
+            return "This step cannot be pinned anywhere until the conflicts are resolved."
+        if t < lo - 1e-6:
+            return f"{format_minutes(t)} is too early, the earliest is {format_minutes(lo)}: " + "; ".join(reasons_lo or ["the case starts at D1 00:00"]) + "."
+        if t > hi + 1e-6:
+            return f"{format_minutes(t)} is too late, the latest is {format_minutes(hi)}: " + "; ".join(reasons_hi) + "."
+        latest = format_minutes(hi) if np.isfinite(hi) else "any time later"
+        return f"{format_minutes(t)} fits (between {format_minutes(lo)} and {latest})."
+
+    def _update(self):
+        if self.view.page:
+            self.view.update()
+
+    # --- Interaction ---
+
+    def _hit(self, x: float, y: float) -> Optional[schemas.ChainEvent]:
+        if y < AXIS_HEIGHT:
+            return None
+        if x < LABEL_WIDTH:
+            row = int((y - AXIS_HEIGHT - 4 + self.top) // ROW_HEIGHT)
+            return self.order[row] if 0 <= row < len(self.order) else None
+        return next((event for x0, y0, x1, y1, event in self._boxes if x0 <= x <= x1 and y0 <= y <= y1), None)
+
+    def _on_tap_down(self, e: ft.TapEvent):
+        with self._lock:
+            self._select(self._hit(e.local_x, e.local_y))
+            self._draw()
+        self._update()
+
+    def _on_pan_start(self, e: ft.DragStartEvent):
+        with self._lock:
+            hit = self._hit(e.local_x, e.local_y) if e.local_x >= LABEL_WIDTH else None
+            if hit is None or hit.id not in self.schedule:
+                return
+            self.dragging = hit
+            self._select(hit)
+            # The one solver query of the drag; every pointer move is checked against it.
+            self._window = self.solver.window(hit.id)
+            self._drag_raw = self._drag_to = self.schedule[hit.id][0]
+            self.feedback.value = self._drag_feedback()
+            self._draw()
+        self._update()
+
+    def _on_pan_update(self, e: ft.DragUpdateEvent):
+        with self._lock:
+            if self.dragging is not None:
+                self._drag_raw += e.delta_x / self.scale
+                self._drag_to = max(round(self._drag_raw / SNAP_MINUTES) * SNAP_MINUTES, 0)
+                self.feedback.value = self._drag_feedback()
+                self.feedback.color = None if self._fits(self._drag_to) else ft.Colors.RED_400
+            else:
+                self.left -= e.delta_x / self.scale
+                self.top = float(np.clip(self.top - e.delta_y, 0, max(len(self.order) * ROW_HEIGHT - ROW_HEIGHT, 0)))
+            self._draw()
+        if self.canvas.page:
+            self.canvas.update()
+            self.feedback.update()
+
+    def _on_pan_end(self, e):
+        with self._lock:
+            event, self.dragging = self.dragging, None
+            if event is None:
+                return
+            t = int(self._drag_to)
+            self.feedback.value = ""
+            self.feedback.color = None
+        if event.start != t:
+            # Pinned even when it does not fit, so the conflict shows up in the list and the validator.
+            self.control.update_asset(event, "start", t)
+        self.rebuild()
+
+    def _on_scroll(self, e: ft.ScrollEvent):
+        if not e.scroll_delta_y:
+            return
+        with self._lock:
+            factor = 0.85 if e.scroll_delta_y > 0 else 1 / 0.85
+            new_scale = float(np.clip(self.scale * factor, MIN_SCALE, MAX_SCALE))
+            # Zoom around the cursor.
+            cursor = self.left + (e.local_x - LABEL_WIDTH) / self.scale
+            self.left = cursor - (e.local_x - LABEL_WIDTH) / new_scale
+            self.scale = new_scale
+            self._draw()
+        if self.canvas.page:
+            self.canvas.update()
+
 
 def build_timeline_editor_view(control: Control):
-    return ft.Column(
-        [
-            ft.Text("Gamified Timeline Editor (eventChain) (Under Construction)", style=ft.TextThemeStyle.HEADLINE_MEDIUM),
-            ft.Text("This section will allow you to visualize and manage the event chain."),
-        ]
-    )
\ No newline at end of file
+    return TimelineEditorView(control).view
@@ -0,0 +1,64 @@
+# voices.py
+"""
+The two voices of the AI, as the blueprint's dual-voice model describes them.
+
+The Tool Assistant writes descriptions, biographies and other authoring
+material in a clinical, factual register. The Content Generator speaks as a
+character, in the voice given by `Character.voiceModel` and
+`dialogueStyle`; it writes interview answers.
+
+Each voice is a prompt prefix followed by the request itself. Prefixes do
+not depend on the request, so a backend can encode one once and reuse it.
+All 40 answers of a suspect's interview share that suspect's persona.
+"""
+from typing import Optional
+
+import schemas
+
+ASSISTANT = "assistant"
+CHARACTER = "character"
+
+ASSISTANT_PREFIX = (
+    "You are a clinical, fact-based assistant to the author of a detective story. "
+    "Write plainly and precisely, stay consistent with the context given, and add no commentary.\n\n"
+)
+
+
+def persona_prefix(character: schemas.Character) -> str:
+    """Who the character is and how they talk; the same for every line they say."""
+    lines = [f"You are {character.fullName}, a character in a detective story. Stay in character and answer in your own voice."]
+    for label, value in (
+        ("Voice", character.voiceModel),
+        ("Dialogue style", character.dialogueStyle),
+        ("Personality", character.personality),
+        ("Background", character.biography),
+    ):
+        if value:
+            lines.append(f"{label}: {' '.join(value.split())}")
+    if character.secrets:
+        lines.append("You are hiding: " + "; ".join(character.secrets))
+    return "\n".join(lines) + "\n\n"
+
+
+def answer_prompt(character: schemas.Character, question: schemas.InterviewQuestion) -> str:
+    """The interview exchange the character's answer continues."""
+    lie = "(This answer is a lie.)\n" if question.isLie else ""
+    return f"{lie}Detective: {question.question}\n{character.fullName}:"
+
+
+def first_reply(text: str) -> str:
+    """The character's own words, without the further turns the model may go on to invent."""
+    return text.split("\nDetective:", 1)[0].strip()
+
+
+def tidy(voice: str, text: str) -> str:
+    return first_reply(text) if voice == CHARACTER else text.strip()
+
+
+def interview_speaker(case_data: schemas.CaseData, world_data: schemas.WorldData, question: schemas.InterviewQuestion) -> Optional[schemas.Character]:
+    """The suspect or witness whose interview holds `question`."""
+    people = list(case_data.keySuspects) + [witness for location in case_data.caseLocations for witness in location.witnesses]
+    for person in people:
+        if any(entry is question for entry in person.interview):
+            return next((c for c in world_data.characters if c.id == person.characterId), None)
+    return None